@@ -0,0 +1,257 @@
+"""
+Autentifikatsiya: parollar, sessiyalar va telefon indeksi
+
+Parollar `pbkdf2_sha256$<iteratsiya>$<salt>$<hash>` ko'rinishida saqlanadi.
+Hisoblash og'ir (ataylab), shuning uchun u cheklangan oqimlar pulida
+bajariladi: bir vaqtda ko'pi bilan HASH_WORKERS ta hash hisoblanadi. Bu faqat
+parallellikni cheklaydi - so'rov oqimi natijani kutib turadi. Kutayotganlar
+HASH_QUEUE tadan oshsa yangi so'rov kutmasdan `HasherBusy` oladi (503 +
+Retry-After), shuning uchun band paytda oqimlar cheksiz to'planib qolmaydi.
+Eski ochiq (plaintext) parollar ham tekshiriladi va muvaffaqiyatli kirishda
+hash ko'rinishiga o'tkaziladi.
+
+Kirishdan keyin mijozga sessiya tokeni beriladi:
+
+    Authorization: Bearer <token>
+
+`SessionStore` tokenlarni `<DATA_DIR>/sessions` papkasida saqlaydi (har bir
+sessiya - bitta kichik fayl), shuning uchun bir workerda berilgan token
+boshqa workerlarda ham ishlaydi, logout esa hammasida darhol amal qiladi.
+Tekshirish bitta stat + o'qish, TTL har bir foydalanishda yangilanadi, eng
+ko'p sessiyalar soniga yetganda eng uzoq ishlatilmaganlari o'chiriladi
+(LRU). Server qayta ishga tushganda ham sessiyalar saqlanib qoladi.
+
+`PhoneIndex` studentlar va o'qituvchilarni normallashtirilgan telefon raqami
+bo'yicha topadi ("+998 (90) 123-45-67" va "998901234567" bir xil).
+"""
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from counters import IncrementalView
+from storage import atomic_write
+
+HASH_ALGORITHM = "pbkdf2_sha256"
+HASH_ITERATIONS = 200000
+HASH_WORKERS = min(4, os.cpu_count() or 1)
+HASH_QUEUE = 64          # navbatdagi hash so'rovlari chegarasi
+SESSION_TTL = 12 * 3600  # sekund, oxirgi foydalanishdan
+MAX_SESSIONS = 10000
+SESSION_CLEANUP_SECONDS = 60
+
+
+# =====================
+#  PAROLLAR
+# =====================
+def hash_password(password, salt=None, iterations=HASH_ITERATIONS):
+    salt = salt or secrets.token_hex(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt.encode("ascii"), iterations)
+    return f"{HASH_ALGORITHM}${iterations}${salt}${digest.hex()}"
+
+
+def is_hashed(stored):
+    return isinstance(stored, str) and stored.startswith(HASH_ALGORITHM + "$")
+
+
+def verify_password(password, stored):
+    """Hash yoki eski ochiq parol bilan solishtiradi (vaqt bo'yicha xavfsiz)"""
+    if not isinstance(stored, str) or not isinstance(password, str):
+        return False
+    if not is_hashed(stored):
+        return hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8"))
+    try:
+        _, iterations, salt, _ = stored.split("$")
+        expected = hash_password(password, salt, int(iterations))
+    except ValueError:
+        return False
+    return hmac.compare_digest(expected, stored)
+
+
+def needs_rehash(stored):
+    if not is_hashed(stored):
+        return True
+    try:
+        return int(stored.split("$")[1]) != HASH_ITERATIONS
+    except (IndexError, ValueError):
+        return True
+
+
+class HasherBusy(RuntimeError):
+    """Hash navbati to'lgan - so'rovni keyinroq qaytarish kerak"""
+
+
+class Hasher:
+    """hash_password / verify_password ni cheklangan pulda bajaradi.
+
+    Chaqiruvchi oqim natijagacha bloklanadi (pul faqat bir vaqtda nechta hash
+    hisoblanishini cheklaydi). workers + queue ta o'rin band bo'lsa kutilmaydi -
+    darhol HasherBusy.
+    """
+
+    def __init__(self, workers=HASH_WORKERS, queue=HASH_QUEUE):
+        self.workers = workers
+        self.queue = queue
+        self._start()
+
+    def _start(self):
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hasher")
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue)
+
+    def reset_after_fork(self):
+        # Ota jarayondagi pul oqimlari bolada yo'q - yangi pul
+        self._start()
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy("Server band, birozdan keyin urinib ko'ring")
+        try:
+            return self._pool.submit(func, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        return self._run(hash_password, password)
+
+    def verify(self, password, stored):
+        return self._run(verify_password, password, stored)
+
+
+# =====================
+#  SESSIYALAR
+# =====================
+class SessionStore:
+    """token -> sessiya; har bir sessiya `<directory>/<sha256(token)>.json` fayli.
+
+    Fayl mtime - oxirgi foydalanish vaqti: muddat `mtime + ttl`, har bir
+    tekshiruv uni `os.utime` bilan uzaytiradi. Fayl nomi tokenning hashi -
+    papka o'qilsa ham tokenlar ochilmaydi.
+    """
+
+    def __init__(self, directory, ttl=SESSION_TTL, max_sessions=MAX_SESSIONS):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._cleaned = 0.0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, token):
+        return os.path.join(self.directory, hashlib.sha256(token.encode("utf-8")).hexdigest() + ".json")
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _files(self):
+        """[(oxirgi foydalanish, yo'l)] - eng eskisi birinchi"""
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                try:
+                    files.append((entry.stat().st_mtime, entry.path))
+                except FileNotFoundError:
+                    pass
+        return sorted(files)
+
+    def cleanup(self, now=None):
+        """Muddati o'tganlarni o'chiradi; max_sessions dan oshsa eng uzoq ishlatilmaganlarini (LRU)"""
+        now = now or time.time()
+        files = self._files()
+        expired = [path for used, path in files if used + self.ttl <= now]
+        excess = max(0, len(files) - len(expired) - self.max_sessions + 1)
+        for path in expired + [path for _, path in files[len(expired):len(expired) + excess]]:
+            self._remove(path)
+
+    def create(self, user):
+        """Yangi sessiya; `user` - javobdagi foydalanuvchi (passwordsiz)"""
+        token = secrets.token_urlsafe(32)
+        now = time.time()
+        with self._lock:
+            # Papkani har yaratishda emas, daqiqada bir marta tozalaymiz
+            if now - self._cleaned >= SESSION_CLEANUP_SECONDS:
+                self._cleaned = now
+                self.cleanup(now)
+        atomic_write(self._path(token), json.dumps(
+            {"user": user, "createdAt": now}, ensure_ascii=False).encode("utf-8"))
+        return token
+
+    def get(self, token):
+        """Token amal qilsa sessiya (muddati uzaytiriladi), aks holda None"""
+        if not token:
+            return None
+        path = self._path(token)
+        now = time.time()
+        try:
+            if os.stat(path).st_mtime + self.ttl <= now:
+                self._remove(path)
+                return None
+            with open(path, encoding="utf-8") as f:
+                session = json.load(f)
+            os.utime(path, (now, now))
+        except (OSError, ValueError):
+            return None
+        session["expiresAt"] = now + self.ttl
+        return session
+
+    def revoke(self, token):
+        return bool(token) and self._remove(self._path(token))
+
+    def __len__(self):
+        return len(self._files())
+
+
+def bearer_token(req):
+    header = req.headers.get("Authorization", "")
+    scheme, _, token = header.partition(" ")
+    return token.strip() if scheme.lower() == "bearer" else None
+
+
+# =====================
+#  TELEFON INDEKSI
+# =====================
+def normalize_phone(phone):
+    """Faqat raqamlar: "+998 (90) 123-45-67" -> "998901234567" """
+    return "".join(ch for ch in str(phone or "") if ch.isdigit())
+
+
+class PhoneIndex(IncrementalView):
+    """fayl -> {normallashtirilgan telefon: {id, ...}}"""
+
+    def __init__(self, store, files):
+        self._phones = {file: {} for file in files}
+        super().__init__(store, files)
+
+    def _reset(self, file):
+        self._phones[file] = {}
+
+    def _add(self, file, record):
+        phone = normalize_phone(record.get("phone"))
+        if phone:
+            self._phones[file].setdefault(phone, set()).add(record.get("id"))
+
+    def _remove(self, file, record):
+        phone = normalize_phone(record.get("phone"))
+        ids = self._phones[file].get(phone)
+        if ids is not None:
+            ids.discard(record.get("id"))
+            if not ids:
+                del self._phones[file][phone]
+
+    def find(self, file, phone):
+        """Shu telefon raqamli yozuvlar"""
+        phone = normalize_phone(phone)
+        if not phone:
+            return []
+        self.refresh()
+        with self._lock:
+            ids = list(self._phones[file].get(phone, ()))
+        collection = self.store[file]
+        return [r for r in map(collection.get, ids) if r is not None]
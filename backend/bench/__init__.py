@@ -0,0 +1,26 @@
+"""
+Benchmark va yuklama sinovlari
+
+backend/ papkasidan ishga tushiriladi:
+
+    python -m bench generate --students 100000 --out /tmp/learnify-100k
+    python -m bench endpoints --data-dir /tmp/learnify-100k --requests 200 --concurrency 4
+    python -m bench stress --processes 4 --threads 8
+    python -m bench codec --data-dir /tmp/learnify-100k
+    python -m bench memory --data-dir /tmp/learnify-100k
+
+    generate   - barcha kolleksiyalarni bog'lanishlari to'g'ri sintetik ma'lumot
+                 bilan to'ldiradi (1k dan 1M gacha student)
+    endpoints  - har bir route uchun p50/p95/p99 kechikish, throughput va
+                 jarayonning eng katta RSS i
+    stress     - bir nechta jarayon va oqimdan parallel yozish; yo'qolgan
+                 yangilanishlar (lost update), takroriy id lar va buzilgan
+                 balanslarni tekshiradi
+    codec      - har bir kolleksiya uchun json/orjson va indent=2/ixcham
+                 fayl: serialize va parse vaqti, hajm
+    memory     - students/payments xotirasi (dict va ustunlar) va shu
+                 kolleksiyalar ustidagi skanlar
+
+Benchmarklar ma'lumotlar papkasiga yozadi (to'lov, student qo'shadi) -
+ularni faqat generate yaratgan papkada ishlating.
+"""
@@ -0,0 +1,77 @@
+"""python -m bench generate|endpoints|stress|codec|memory (qarang: bench/__init__.py)"""
+import argparse
+import sys
+import time
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Learnify benchmark va yuklama sinovlari")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    gen = commands.add_parser("generate", help="sintetik ma'lumotlar papkasini yaratish")
+    gen.add_argument("--out", required=True, help="yangi (bo'sh) papka")
+    gen.add_argument("--students", type=int, default=1000, help="studentlar soni (1000 - 1000000)")
+    gen.add_argument("--payments-per-student", type=int, default=3)
+    gen.add_argument("--tasks-per-group", type=int, default=2)
+    gen.add_argument("--seed", type=int, default=1)
+
+    ep = commands.add_parser("endpoints", help="route lar kechikishi va throughput")
+    ep.add_argument("--data-dir", help="ma'lumotlar papkasi (benchmark unga yozadi!)")
+    ep.add_argument("--url", help="ishlab turgan server, masalan http://127.0.0.1:5000")
+    ep.add_argument("--requests", type=int, default=200, help="har bir route uchun so'rovlar")
+    ep.add_argument("--concurrency", type=int, default=1, help="parallel oqimlar")
+    ep.add_argument("--warmup", type=int, default=10)
+    ep.add_argument("--only", action="append", help="faqat nomida shu matn bor routelar (takrorlanadi)")
+
+    st = commands.add_parser("stress", help="parallel yozishda lost update tekshiruvi")
+    st.add_argument("--data-dir", help="ma'lumotlar papkasi (berilmasa vaqtinchalik yaratiladi)")
+    st.add_argument("--processes", type=int, default=4)
+    st.add_argument("--threads", type=int, default=4)
+    st.add_argument("--ops", type=int, default=200, help="har bir oqimdagi amallar")
+    st.add_argument("--hot", type=int, default=5, help="yozuvlar to'planadigan studentlar soni")
+    st.add_argument("--students", type=int, default=2000, help="vaqtinchalik papka hajmi")
+
+    co = commands.add_parser("codec", help="JSON kutubxonalari va fayl ko'rinishlari: vaqt va hajm")
+    co.add_argument("--data-dir", help="ma'lumotlar papkasi (faqat o'qiladi)")
+    co.add_argument("--repeat", type=int, default=5, help="har bir o'lchov (eng yaxshisi olinadi)")
+
+    mem = commands.add_parser("memory", help="students/payments: dict va ustunli xotira, skanlar")
+    mem.add_argument("--data-dir", help="ma'lumotlar papkasi (faqat o'qiladi)")
+    mem.add_argument("--repeat", type=int, default=3)
+
+    args = parser.parse_args(argv)
+    try:
+        if args.command == "generate":
+            from bench.generate import generate
+            started = time.perf_counter()
+            counts = generate(args.out, args.students, args.payments_per_student, args.tasks_per_group, args.seed)
+            for file, count in counts.items():
+                print(f"✅ {file}: {count} ta yozuv")
+            print(f"{time.perf_counter() - started:.1f} s")
+        elif args.command == "endpoints":
+            from bench.endpoints import run
+            run(args.data_dir, args.url, args.requests, args.concurrency, args.warmup, args.only)
+        elif args.command == "codec":
+            from bench.codec import run
+            run(args.data_dir, args.repeat)
+        elif args.command == "memory":
+            from bench.memory import run
+            run(args.data_dir, args.repeat)
+        else:
+            from bench.stress import stress
+            failures, stats = stress(args.data_dir, args.processes, args.threads, args.ops, args.hot, args.students)
+            print(f"{stats['requests']} so'rov, {stats['seconds']} s ({stats['rps']} req/s), "
+                  f"409 qayta urinishlar: {stats['retries']}, papka: {stats['dataDir']}")
+            for failure in failures:
+                print(f"❌ {failure}")
+            if failures:
+                return 1
+            print("✅ yo'qolgan yangilanishlar yo'q")
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
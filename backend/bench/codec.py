@@ -0,0 +1,69 @@
+"""
+JSON codec benchmarki
+
+Har bir kolleksiya (log qo'llangan oxirgi holat) mavjud kutubxonalar va
+fayl ko'rinishlari bilan kodlanadi va qayta o'qiladi:
+
+    kolleksiya       yozuv  variant           KB  serialize ms  parse ms  tezlik
+
+`json indent=2` - hozirgi standart ombor fayli, tezlik shunga nisbatan
+(serialize + parse). orjson o'rnatilmagan bo'lsa, faqat standart json.
+"""
+import sys
+import time
+
+from codec import Codec, orjson
+
+
+def variants():
+    """[(nom, codec, pretty)] - birinchisi taqqoslash asosi"""
+    result = [("json indent=2", Codec("json"), True), ("json compact", Codec("json"), False)]
+    if orjson is not None:
+        result += [("orjson indent=2", Codec("orjson"), True), ("orjson compact", Codec("orjson"), False)]
+    return result
+
+
+def best_of(repeat, fn):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(data_dir=None, repeat=5, out=sys.stdout):
+    """Natijalar ro'yxatini ham qaytaradi"""
+    from config import load_config
+    from server import COLLECTION_FILES
+    from storage import Storage
+
+    store = Storage(data_dir or load_config()["DATA_DIR"])
+    results = []
+    try:
+        print(f"{'kolleksiya':<16}{'yozuv':>8}  {'variant':<16}{'KB':>9}{'serialize ms':>14}"
+              f"{'parse ms':>10}{'tezlik':>8}", file=out)
+        for file in COLLECTION_FILES:
+            records = store[file].all()
+            baseline = None
+            for name, codec, pretty in variants():
+                data = codec.dumps(records, pretty=pretty)
+                serialize = best_of(repeat, lambda: codec.dumps(records, pretty=pretty))
+                parse = best_of(repeat, lambda: codec.loads(data))
+                if baseline is None:
+                    baseline = serialize + parse
+                row = {
+                    "collection": file,
+                    "records": len(records),
+                    "variant": name,
+                    "bytes": len(data),
+                    "serialize": serialize * 1000,
+                    "parse": parse * 1000,
+                    "speedup": baseline / (serialize + parse) if serialize + parse else 1.0,
+                }
+                results.append(row)
+                print(f"{file:<16}{len(records):>8}  {name:<16}{len(data) / 1024:>9.1f}{row['serialize']:>14.2f}"
+                      f"{row['parse']:>10.2f}{row['speedup']:>7.1f}x", file=out)
+    finally:
+        store.close()
+    return results
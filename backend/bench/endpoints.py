@@ -0,0 +1,173 @@
+"""
+Endpoint benchmarklari
+
+Har bir route `requests` marta (oldidan `warmup` marta qizdirib)
+`concurrency` ta oqimdan chaqiriladi va quyidagilar chiqariladi:
+
+    route                       p50 ms   p95 ms   p99 ms    req/s   RSS MB
+
+Standart holatda Flask test client ishlatiladi (tarmoqsiz, ilova shu
+jarayonda - RSS shu jarayonniki). --url berilsa, ishlab turgan serverga
+(masalan gunicorn) HTTP orqali yuboriladi; u holda RSS faqat mijozniki.
+"""
+import json
+import math
+import random
+import resource
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import date
+
+
+def percentile(samples, p):
+    """Saralangan ro'yxatdan p-foiz (eng yaqin rank)"""
+    if not samples:
+        return 0.0
+    k = math.ceil(p / 100 * len(samples)) - 1
+    return samples[max(0, min(len(samples) - 1, k))]
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux da KB, macOS da bayt
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class HttpClient:
+    """Test client ga o'xshash minimal interfeys: get/post/put -> status kodi"""
+
+    def __init__(self, url):
+        self.url = url.rstrip("/")
+
+    def open(self, method, path, json_body=None):
+        data = json.dumps(json_body).encode("utf-8") if json_body is not None else None
+        req = urllib.request.Request(self.url + path, data=data, method=method,
+                                     headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(req) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            return e.code
+
+
+class AppClient:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def open(self, method, path, json_body=None):
+        response = self.client.open(path, method=method, json=json_body)
+        response.get_data()
+        return response.status_code
+
+
+def routes(sample):
+    """[(nom, method, yo'l yoki funksiya, body funksiyasi)] - sample: mavjud id lar"""
+    students, groups, teachers = sample["students"], sample["groups"], sample["teachers"]
+    today = str(date.today())
+    return [
+        ("GET /students?limit=50", "GET", "/students?limit=50", None),
+        ("GET /students", "GET", "/students", None),
+        ("GET /students?status=active", "GET", "/students?status=active&limit=50", None),
+        ("GET /groups?expand=teacher", "GET", "/groups?expand=teacher&limit=50", None),
+        ("GET /groups/<id>", "GET", lambda: f"/groups/{random.choice(groups)}", None),
+        ("GET /payments?limit=50", "GET", "/payments?limit=50", None),
+        ("GET /dashboard/summary", "GET", "/dashboard/summary", None),
+        ("GET /reports/revenue", "GET", "/reports/revenue?bucket=month&by=type", None),
+        ("GET /search", "GET", lambda: random.choice(["/search?q=ali", "/search?q=karimov", "/search?q=fiz"]), None),
+        ("GET /students/<id>/ledger", "GET", lambda: f"/students/{random.choice(students)}/ledger", None),
+        ("GET /timetable", "GET", lambda: f"/timetable?teacherId={random.choice(teachers)}", None),
+        ("POST /payments", "POST", "/payments", lambda: {
+            "studentId": random.choice(students), "amount": 500000, "paymentDate": today,
+            "paymentType": "card", "description": "bench",
+        }),
+        ("POST /students/<id>/charges", "POST",
+         lambda: f"/students/{random.choice(students)}/charges", lambda: {"amount": 500000}),
+        ("PUT /students/<id>", "PUT", lambda: f"/students/{random.choice(students)}",
+         lambda: {"status": random.choice(["active", "inactive"])}),
+    ]
+
+
+def measure(make_client, method, path, body, requests, concurrency, warmup):
+    """(saralangan kechikishlar sekundda, umumiy vaqt, xatolar soni)"""
+    client = make_client()
+    for _ in range(warmup):
+        client.open(method, path() if callable(path) else path, body() if body else None)
+
+    per_thread = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+    latencies, errors = [], []
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(concurrency)
+
+    def worker(count):
+        own = make_client()
+        samples, failed = [], 0
+        start_barrier.wait()
+        for _ in range(count):
+            url = path() if callable(path) else path
+            payload = body() if body else None
+            t = time.perf_counter()
+            status = own.open(method, url, payload)
+            samples.append(time.perf_counter() - t)
+            if status >= 400:
+                failed += 1
+        with lock:
+            latencies.extend(samples)
+            errors.append(failed)
+
+    threads = [threading.Thread(target=worker, args=(count,)) for count in per_thread]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return sorted(latencies), elapsed, sum(errors)
+
+
+def run(data_dir=None, url=None, requests=200, concurrency=1, warmup=10, only=None, out=sys.stdout):
+    """Barcha (yoki `only` ga mos) routelar; natijalar ro'yxatini ham qaytaradi"""
+    import server
+    from storage import Storage
+
+    started = time.perf_counter()
+    if url:
+        make_client = lambda: HttpClient(url)
+        local = Storage(data_dir) if data_dir else None
+    else:
+        app = server.create_app({"DATA_DIR": data_dir} if data_dir else None)
+        make_client = lambda: AppClient(app)
+        local = server.store
+    if local is None:
+        raise ValueError("--url bilan namunaviy id lar uchun --data-dir ham kerak")
+    load_seconds = time.perf_counter() - started
+
+    def ids(file, limit=1000):
+        return [r["id"] for r in local[file].all()[:limit]] or [0]
+
+    sample = {"students": ids("students.json"), "groups": ids("groups.json"), "teachers": ids("teachers.json")}
+    print(f"yuklash: {load_seconds:.2f} s, RSS {peak_rss_mb():.0f} MB", file=out)
+    print(f"{'route':<32}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>9}{'xato':>6}{'RSS MB':>9}", file=out)
+
+    results = []
+    for name, method, path, body in routes(sample):
+        if only and not any(part in name for part in only):
+            continue
+        latencies, elapsed, errors = measure(make_client, method, path, body, requests, concurrency, warmup)
+        row = {
+            "route": name,
+            "p50": percentile(latencies, 50) * 1000,
+            "p95": percentile(latencies, 95) * 1000,
+            "p99": percentile(latencies, 99) * 1000,
+            "rps": len(latencies) / elapsed if elapsed else 0.0,
+            "errors": errors,
+            "rss": peak_rss_mb(),
+        }
+        results.append(row)
+        print(f"{name:<32}{row['p50']:>9.2f}{row['p95']:>9.2f}{row['p99']:>9.2f}"
+              f"{row['rps']:>9.0f}{errors:>6}{row['rss']:>9.0f}", file=out)
+    return results
@@ -0,0 +1,198 @@
+"""
+Sintetik ma'lumotlar generatori
+
+Hajm studentlar soniga qarab tanlanadi: har 25 studentga bitta o'qituvchi,
+12 taga bitta guruh, 2500 taga bitta filial va hokazo. Bog'lanishlar
+izchil: student guruhida, guruh ro'yxatida student, to'lov studentning
+guruh/filialiga, vazifa guruh o'qituvchisiga bog'langan. Bir o'qituvchining
+guruhlari jadvalda to'qnashmaydi.
+
+Yozuvlar fayllarga oqim bilan yoziladi (1M studentda ham xotirada butun
+kolleksiya saqlanmaydi). Bir xil --seed bir xil ma'lumot beradi.
+"""
+import json
+import math
+import os
+import random
+from datetime import date, timedelta
+
+FIRST_NAMES = [
+    "Ali", "Vali", "Sardor", "Jasur", "Bekzod", "Aziz", "Shahzod", "Otabek", "Javohir", "Doniyor",
+    "Dilnoza", "Madina", "Nodira", "Gulnora", "Malika", "Sevara", "Zarina", "Kamola", "Nilufar", "Shahnoza",
+]
+LAST_NAMES = [
+    "Karimov", "Valiyev", "Toshmatov", "Rahimov", "Yusupov", "Ergashev", "Qodirov", "Nazarov",
+    "Xolmatov", "Usmonov", "Aliyev", "Saidov", "Mirzayev", "Sobirov", "Abdullayev", "Tursunov",
+]
+SUBJECTS = ["Matematika", "Fizika", "Ingliz tili", "Kimyo", "Biologiya", "Frontend", "Backend", "Tarix"]
+CITIES = ["Chilonzor", "Yunusobod", "Mirzo Ulug'bek", "Sergeli", "Samarqand", "Buxoro", "Namangan", "Farg'ona"]
+PAYMENT_TYPES = ["cash", "card", "transfer"]
+AMOUNTS = [300000.0, 400000.0, 500000.0, 600000.0]
+# O'qituvchining k-guruhi: juft k - toq kunlar, toq k - juft kunlar, har juftlik 2 soat keyin
+SCHEDULES = ["Dushanba Chorshanba Juma", "Seshanba Payshanba Shanba"]
+SLOTS_PER_DAY = 6
+BENCH_PASSWORD = "bench123"
+
+
+def sizes(students, payments_per_student=3, tasks_per_group=2):
+    """Kolleksiyalar hajmi studentlar soniga nisbatan"""
+    groups = max(1, students // 12)
+    teachers = max(1, students // 25, math.ceil(groups / (2 * SLOTS_PER_DAY)))
+    branches = max(1, students // 2500)
+    return {
+        "companies": max(1, branches // 20),
+        "branches": branches,
+        "teachers": teachers,
+        "groups": groups,
+        "students": students,
+        "payments": students * payments_per_student,
+        "tasks": groups * tasks_per_group,
+    }
+
+
+def _write(path, records):
+    """Massivni yozuvma-yozuv yozadi; yozilganlar sonini qaytaradi"""
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for record in records:
+            f.write(",\n" if count else "\n")
+            f.write(json.dumps(record, ensure_ascii=False))
+            count += 1
+        f.write("\n]\n")
+    return count
+
+
+def _phone(prefix, n):
+    return f"+998{prefix}{n:07d}"
+
+
+def generate(out, students=1000, payments_per_student=3, tasks_per_group=2, seed=1):
+    """`out` papkasiga barcha kolleksiyalarni yozadi; {fayl: yozuvlar soni}"""
+    from auth import hash_password
+
+    rng = random.Random(seed)
+    n = sizes(students, payments_per_student, tasks_per_group)
+    os.makedirs(out, exist_ok=True)
+    stale = [f for f in os.listdir(out) if f.endswith((".json", ".log", ".db"))]
+    if stale:
+        raise ValueError(f"{out} bo'sh emas ({stale[0]} ...) - yangi papka bering")
+
+    today = date.today()
+    created = f"{today - timedelta(days=365)} 09:00:00"
+    branch_company = [b % n["companies"] + 1 for b in range(n["branches"])]
+    teacher_branch = [t % n["branches"] + 1 for t in range(n["teachers"])]
+    group_teacher = [g % n["teachers"] + 1 for g in range(n["groups"])]
+    capacity = math.ceil(students / n["groups"]) + 5
+
+    def name(i):
+        return f"{FIRST_NAMES[i % len(FIRST_NAMES)]} {LAST_NAMES[(i // len(FIRST_NAMES)) % len(LAST_NAMES)]}"
+
+    def group_name(g):
+        return f"{SUBJECTS[g % len(SUBJECTS)]} {g + 1}"
+
+    def companies():
+        for c in range(n["companies"]):
+            yield {
+                "id": c + 1, "name": f"Learnify {c + 1}", "address": "Toshkent shahar",
+                "phone": _phone(71, c), "email": f"info{c + 1}@learnify.uz",
+                "status": "active", "createdAt": created,
+            }
+
+    def branches():
+        for b in range(n["branches"]):
+            yield {
+                "id": b + 1, "companyId": branch_company[b],
+                "name": f"{CITIES[b % len(CITIES)]} {b + 1}", "address": CITIES[b % len(CITIES)],
+                "phone": _phone(78, b), "email": f"branch{b + 1}@learnify.uz",
+                "status": "active", "createdAt": created,
+            }
+
+    def teachers():
+        for t in range(n["teachers"]):
+            branch = teacher_branch[t]
+            yield {
+                "id": t + 1, "name": name(t * 7 + 3), "subject": SUBJECTS[t % len(SUBJECTS)],
+                "phone": _phone(93, t), "salary": str(rng.randrange(30, 90) * 100000),
+                "status": "active", "branchId": branch, "companyId": branch_company[branch - 1],
+            }
+
+    def groups():
+        for g in range(n["groups"]):
+            teacher = group_teacher[g]
+            k = g // n["teachers"]   # o'qituvchining nechanchi guruhi
+            start = 8 * 60 + (k // 2 % SLOTS_PER_DAY) * 120
+            members = list(range(g + 1, students + 1, n["groups"]))
+            branch = teacher_branch[teacher - 1]
+            yield {
+                "id": g + 1, "name": group_name(g), "teacherId": teacher,
+                "startDate": str(today - timedelta(days=rng.randrange(0, 300))),
+                "schedule": SCHEDULES[k % 2],
+                "startTime": f"{start // 60:02d}:{start % 60:02d}",
+                "endTime": f"{(start + 90) // 60:02d}:{(start + 90) % 60:02d}",
+                "capacity": capacity, "status": "active",
+                "students": members, "studentsCount": len(members),
+                "branchId": branch, "companyId": branch_company[branch - 1],
+            }
+
+    def student_records():
+        for s in range(students):
+            g = s % n["groups"]
+            branch = teacher_branch[group_teacher[g] - 1]
+            first, last = name(s).split(" ")
+            yield {
+                "id": s + 1, "name": f"{first} {last}", "firstName": first, "lastName": last,
+                "groupId": g + 1, "group": group_name(g), "phone": _phone(90, s),
+                "status": "active" if rng.random() < 0.9 else "inactive",
+                "payment": "paid" if rng.random() < 0.8 else "pending",
+                "joinDate": str(today - timedelta(days=rng.randrange(0, 365))),
+                "branchId": branch, "companyId": branch_company[branch - 1],
+            }
+
+    def payments():
+        for p in range(n["payments"]):
+            s = p % students
+            g = s % n["groups"]
+            branch = teacher_branch[group_teacher[g] - 1]
+            paid = today - timedelta(days=rng.randrange(0, 365))
+            yield {
+                "id": p + 1, "studentId": s + 1, "amount": rng.choice(AMOUNTS),
+                "paymentDate": str(paid), "paymentType": rng.choice(PAYMENT_TYPES),
+                "description": "", "createdAt": f"{paid} 10:00:00",
+                "groupId": g + 1, "branchId": branch, "companyId": branch_company[branch - 1],
+            }
+
+    def tasks():
+        for t in range(n["tasks"]):
+            g = t % n["groups"]
+            yield {
+                "id": t + 1, "groupId": g + 1, "teacherId": group_teacher[g],
+                "title": f"Vazifa {t // n['groups'] + 1}", "description": "",
+                "dueDate": str(today + timedelta(days=rng.randrange(-30, 30))),
+                "status": rng.choice(["pending", "completed"]), "createdAt": created,
+            }
+
+    def users():
+        # Hash qimmat - barcha foydalanuvchilar bitta (bir xil parolli) hashni ulashadi
+        password = hash_password(BENCH_PASSWORD)
+        yield {"id": 1, "username": "admin", "password": password, "role": "admin",
+               "name": "Admin", "createdAt": created}
+        next_id = 2
+        for c in range(n["companies"]):
+            yield {"id": next_id, "username": f"company{c + 1}", "password": password, "role": "company",
+                   "name": f"Learnify {c + 1}", "companyId": c + 1, "createdAt": created}
+            next_id += 1
+        for b in range(n["branches"]):
+            yield {"id": next_id, "username": f"branch{b + 1}", "password": password, "role": "branch",
+                   "name": f"Filial {b + 1}", "branchId": b + 1, "companyId": branch_company[b],
+                   "createdAt": created}
+            next_id += 1
+
+    counts = {}
+    for file, records in (
+        ("companies.json", companies()), ("branches.json", branches()), ("teachers.json", teachers()),
+        ("groups.json", groups()), ("students.json", student_records()), ("payments.json", payments()),
+        ("tasks.json", tasks()), ("users.json", users()), ("ledger.json", iter(())),
+    ):
+        counts[file] = _write(os.path.join(out, file), records)
+    return counts
@@ -0,0 +1,92 @@
+"""
+Xotira va ustunli skan benchmarki
+
+students.json va payments.json bir xil ma'lumotlar papkasidan ikki xil
+yuklanadi - oddiy dict lar (COLUMNAR=0) va ustunlar (server.COLUMNAR_SCHEMAS) -
+va quyidagilar taqqoslanadi:
+
+    * xotira: yuklangan kolleksiya egallagan baytlar (tracemalloc)
+    * skanlar: to'lov turlari bo'yicha summa, ?status=active filtri,
+      ?sort=-amount&limit=50 sahifasi
+
+Papka faqat o'qiladi (kolleksiyalar siqilmaydi).
+"""
+import gc
+import os
+import sys
+import tracemalloc
+from collections import Counter
+
+from bench.codec import best_of
+
+FILES = ("students.json", "payments.json")
+
+
+def _load(data_dir, file, schema):
+    from storage import Collection
+
+    gc.collect()
+    tracemalloc.start()
+    collection = Collection(os.path.join(data_dir, file), schema=schema)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return collection, size
+
+
+def _sum_by_type(collection):
+    records = collection.all()
+    if hasattr(records, "totals"):
+        return records.totals("paymentType", "amount")
+    totals = Counter()
+    for payment in records:
+        totals[payment.get("paymentType")] += payment.get("amount") or 0
+    return dict(totals)
+
+
+def _list(collection, args, filters=()):
+    from query import ListQuery
+
+    page, total, _ = ListQuery(args, filters).apply(collection.all())
+    return list(page), total
+
+
+def scans(file):
+    """[(nom, funksiya)] - kolleksiyaga mos skanlar"""
+    if file == "payments.json":
+        return [
+            ("summa turlar bo'yicha", _sum_by_type),
+            ("?sort=-amount&limit=50", lambda c: _list(c, {"sort": "-amount", "limit": "50"})),
+            ("?limit=50", lambda c: _list(c, {"limit": "50"})),
+        ]
+    return [
+        ("?status=active&limit=50", lambda c: _list(c, {"status": "active", "limit": "50"}, ("status",))),
+        ("?sort=name&limit=50", lambda c: _list(c, {"sort": "name", "limit": "50"})),
+    ]
+
+
+def run(data_dir=None, repeat=3, out=sys.stdout):
+    from config import load_config
+    from server import COLUMNAR_SCHEMAS
+
+    data_dir = data_dir or load_config()["DATA_DIR"]
+    results = []
+    for file in FILES:
+        plain, plain_bytes = _load(data_dir, file, None)
+        columns, column_bytes = _load(data_dir, file, COLUMNAR_SCHEMAS[file])
+        records = len(plain.all())
+        print(f"{file}: {records} ta yozuv, dict {plain_bytes / 2**20:.1f} MB, "
+              f"ustunlar {column_bytes / 2**20:.1f} MB ({plain_bytes / max(column_bytes, 1):.1f}x kam)", file=out)
+        row = {"file": file, "records": records, "dictBytes": plain_bytes, "columnarBytes": column_bytes, "scans": []}
+        for name, scan in scans(file):
+            if scan(plain) != scan(columns):
+                raise ValueError(f"{file} {name}: dict va ustunli natijalar farq qiladi")
+            dict_ms = best_of(repeat, lambda s=scan, c=plain: s(c)) * 1000
+            column_ms = best_of(repeat, lambda s=scan, c=columns: s(c)) * 1000
+            row["scans"].append({"scan": name, "dictMs": dict_ms, "columnarMs": column_ms})
+            print(f"    {name:<28}dict {dict_ms:>9.2f} ms   ustunlar {column_ms:>9.2f} ms"
+                  f"   {dict_ms / column_ms if column_ms else 0:>5.1f}x", file=out)
+        plain.close()
+        columns.close()
+        del plain, columns
+        results.append(row)
+    return results
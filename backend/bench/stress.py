@@ -0,0 +1,235 @@
+"""
+Parallel yozish sinovi (lost update detektori)
+
+gunicorn dagidek bir nechta jarayon (har birida o'z ilovasi va ombori) bir
+xil ma'lumotlar papkasiga bir nechta oqimdan yozadi. Barcha yozuvlar bir
+nechta "issiq" yozuvga to'planadi, shuning uchun lock yoki tranzaksiyadagi
+har qanday xato yo'qolgan yangilanish bo'lib ko'rinadi:
+
+    * hisoblash/to'lov - har bir issiq studentning yakuniy balansi
+      (students.json va ledger) barcha jarayonlar yuborgan summalarga teng
+    * If-Match bilan read-modify-write - o'qituvchidagi hisoblagich
+      muvaffaqiyatli oshirishlar soniga teng (409 da qayta urinadi)
+    * add-student - guruh ro'yxatida qo'shilgan barcha studentlar bor,
+      studentsCount mos, studentlarning groupId si shu guruh
+    * id lar - barcha yangi to'lov id lari noyob va saqlangan
+
+Xato topilsa, chiqish kodi 1.
+"""
+import multiprocessing
+import random
+import tempfile
+import threading
+import time
+from datetime import date
+
+STUDENTS_FILE = "students.json"
+TEACHERS_FILE = "teachers.json"
+GROUPS_FILE = "groups.json"
+PAYMENTS_FILE = "payments.json"
+
+
+def _worker(data_dir, plan, threads, ops, seed):
+    """Bitta jarayon: o'z ilovasi, `threads` ta oqim, har biri `ops` ta amal"""
+    import server
+
+    app = server.create_app({"DATA_DIR": data_dir})
+    today = str(date.today())
+    result = {"charges": {}, "payments": {}, "paymentIds": [], "increments": 0, "retries": 0,
+              "added": [], "errors": [], "requests": 0}
+    lock = threading.Lock()
+
+    def run(index):
+        rng = random.Random(seed * 1000 + index)
+        client = app.test_client()
+        charges, payments, payment_ids, errors, added = {}, {}, [], [], []
+        increments = retries = requests = 0
+        teacher = dict(plan["teacher"])
+        etag = plan["teacherEtag"]
+        # Har bir oqim (barcha jarayonlar bo'yicha) o'z studentlarini qo'shadi
+        members = plan["members"][seed * threads + index::plan["processes"] * threads]
+
+        for i in range(ops):
+            if members and i % max(1, ops // len(members)) == 0:
+                student_id = members.pop()
+                response = client.put(f"/groups/{plan['group']}/add-student", json={"studentId": student_id})
+                requests += 1
+                if response.status_code == 200:
+                    added.append(student_id)
+                else:
+                    errors.append(f"add-student {student_id}: {response.status_code}")
+                continue
+
+            op = rng.random()
+            student_id = rng.choice(plan["students"])
+            amount = rng.randrange(1, 100) * 1000
+            if op < 0.4:
+                response = client.post(f"/students/{student_id}/charges", json={"amount": amount})
+                requests += 1
+                if response.status_code == 201:
+                    charges[student_id] = charges.get(student_id, 0) + amount
+                else:
+                    errors.append(f"charge: {response.status_code}")
+            elif op < 0.8:
+                response = client.post("/payments", json={
+                    "studentId": student_id, "amount": amount, "paymentDate": today, "paymentType": "cash",
+                })
+                requests += 1
+                if response.status_code == 201:
+                    payments[student_id] = payments.get(student_id, 0) + amount
+                    payment_ids.append(response.get_json()["id"])
+                else:
+                    errors.append(f"payment: {response.status_code}")
+            else:
+                # Optimistik oshirish: 409 bo'lsa joriy holat bilan qayta urinish
+                while True:
+                    response = client.put(
+                        f"/teachers/{teacher['id']}",
+                        json={"benchCounter": (teacher.get("benchCounter") or 0) + 1},
+                        headers={"If-Match": f'"{etag}"'},
+                    )
+                    requests += 1
+                    if response.status_code == 200:
+                        teacher, etag = response.get_json(), response.headers["ETag"].strip('"')
+                        increments += 1
+                        break
+                    if response.status_code != 409:
+                        errors.append(f"increment: {response.status_code}")
+                        break
+                    teacher, etag = response.get_json()["current"], response.headers["ETag"].strip('"')
+                    retries += 1
+
+        with lock:
+            for key, sums in (("charges", charges), ("payments", payments)):
+                for sid, value in sums.items():
+                    result[key][sid] = result[key].get(sid, 0) + value
+            result["paymentIds"].extend(payment_ids)
+            result["increments"] += increments
+            result["retries"] += retries
+            result["added"].extend(added)
+            result["errors"].extend(errors)
+            result["requests"] += requests
+
+    workers = [threading.Thread(target=run, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    server.store.close()
+    return result
+
+
+def _prepare(data_dir, processes, threads, hot):
+    """Issiq yozuvlarni tanlaydi va boshlang'ich holatni yozib oladi"""
+    import server
+    from caching import record_etag
+
+    server.create_app({"DATA_DIR": data_dir})
+    store = server.store
+    students = store[STUDENTS_FILE].all()
+    groups = store[GROUPS_FILE].all()
+    teachers = store[TEACHERS_FILE].all()
+    if len(students) < hot + 2 or not groups or not teachers:
+        raise ValueError("Ma'lumot juda kam - avval `python -m bench generate` bilan yarating")
+
+    group = groups[0]
+    in_group = set(group.get("students") or [])
+    outsiders = [s["id"] for s in students if s["id"] not in in_group]
+    hot_students = [s["id"] for s in students[:hot]]
+    members = [sid for sid in outsiders if sid not in hot_students][:processes * threads * 4]
+    # Sig'im sinovga xalaqit bermasin
+    store[GROUPS_FILE].update(group["id"], {"capacity": len(in_group) + len(members) + 10})
+    teacher = store[TEACHERS_FILE].update(teachers[0]["id"], {"benchCounter": 0})
+
+    plan = {
+        "students": hot_students,
+        "group": group["id"],
+        "members": members,
+        "processes": processes,
+        "teacher": teacher,
+        "teacherEtag": record_etag(teacher),
+    }
+    initial = {sid: server.ledger.balance(sid) or float(store[STUDENTS_FILE].get(sid).get("balance") or 0)
+               for sid in hot_students}
+    payments_before = len(store[PAYMENTS_FILE].all())
+    store.close()
+    return plan, initial, in_group, payments_before
+
+
+def _verify(data_dir, plan, initial, in_group, payments_before, results):
+    import server
+
+    server.create_app({"DATA_DIR": data_dir})
+    store = server.store
+    failures = []
+
+    charges, payments, payment_ids, added = {}, {}, [], []
+    increments = 0
+    for result in results:
+        for sid, value in result["charges"].items():
+            charges[sid] = charges.get(sid, 0) + value
+        for sid, value in result["payments"].items():
+            payments[sid] = payments.get(sid, 0) + value
+        payment_ids.extend(result["paymentIds"])
+        added.extend(result["added"])
+        increments += result["increments"]
+
+    for sid in plan["students"]:
+        expected = round(initial[sid] + charges.get(sid, 0) - payments.get(sid, 0), 2)
+        stored = store[STUDENTS_FILE].get(sid).get("balance")
+        from_ledger = server.ledger.balance(sid)
+        entries = round(sum(e.get("delta") or 0 for e in store["ledger.json"].find_by("studentId", sid)), 2)
+        if not (stored == from_ledger == entries == expected):
+            failures.append(f"student {sid}: kutilgan {expected}, students.json {stored}, "
+                            f"ledger {from_ledger}, yozuvlar {entries}")
+
+    counter = store[TEACHERS_FILE].get(plan["teacher"]["id"]).get("benchCounter")
+    if counter != increments:
+        failures.append(f"benchCounter {counter}, muvaffaqiyatli oshirishlar {increments}")
+
+    group = store[GROUPS_FILE].get(plan["group"])
+    members = group.get("students") or []
+    if set(members) != in_group | set(added):
+        failures.append(f"guruh: {len(set(in_group) | set(added) - set(members))} ta student yo'qolgan")
+    if len(members) != len(set(members)) or group.get("studentsCount") != len(members):
+        failures.append(f"guruh: studentsCount {group.get('studentsCount')}, ro'yxat {len(members)}")
+    moved = [sid for sid in added if store[STUDENTS_FILE].get(sid).get("groupId") != plan["group"]]
+    if moved:
+        failures.append(f"{len(moved)} ta studentning groupId si guruhga mos emas")
+
+    if len(payment_ids) != len(set(payment_ids)):
+        failures.append(f"to'lov id lari takrorlangan: {len(payment_ids) - len(set(payment_ids))} ta")
+    missing = [pid for pid in payment_ids if store[PAYMENTS_FILE].get(pid) is None]
+    if missing:
+        failures.append(f"{len(missing)} ta to'lov saqlanmagan")
+    if len(store[PAYMENTS_FILE].all()) != payments_before + len(payment_ids):
+        failures.append("to'lovlar soni yuborilganlarga mos emas")
+    store.close()
+    return failures
+
+
+def stress(data_dir=None, processes=4, threads=4, ops=200, hot=5, students=2000):
+    """(xatolar ro'yxati, statistika); data_dir berilmasa vaqtinchalik papkada yaratiladi"""
+    if data_dir is None:
+        from bench.generate import generate
+        data_dir = tempfile.mkdtemp(prefix="learnify-stress-")
+        generate(data_dir, students=students)
+    plan, initial, in_group, payments_before = _prepare(data_dir, processes, threads, hot)
+
+    started = time.perf_counter()
+    # spawn: har bir jarayon ombor va ilovani noldan ochadi (gunicorn workerlari kabi)
+    with multiprocessing.get_context("spawn").Pool(processes) as pool:
+        results = pool.starmap(_worker, [(data_dir, plan, threads, ops, seed) for seed in range(processes)])
+    elapsed = time.perf_counter() - started
+
+    failures = [error for result in results for error in result["errors"]]
+    failures += _verify(data_dir, plan, initial, in_group, payments_before, results)
+    requests = sum(result["requests"] for result in results)
+    stats = {
+        "dataDir": data_dir,
+        "requests": requests,
+        "seconds": round(elapsed, 2),
+        "rps": round(requests / elapsed) if elapsed else 0,
+        "retries": sum(result["retries"] for result in results),
+    }
+    return failures, stats
@@ -0,0 +1,120 @@
+"""
+Ommaviy import (bulk): studentlar, o'qituvchilar va to'lovlar
+
+    POST /students/bulk   Content-Type: application/json   [ {...}, {...} ]
+    POST /students/bulk   Content-Type: text/csv           name,phone,group ...
+    POST /students/bulk   multipart/form-data              file=students.csv
+
+CSV so'rov tanasidan oqim sifatida qatorma-qator o'qiladi - butun fayl
+xotiraga yuklanmaydi. Har bir qator bir marta tekshiriladi; yaroqli
+qatorlar bitta tranzaksiyada saqlanadi (har bir fayl partiya uchun bir marta
+yoziladi), yaroqsizlari uchun qator raqami va xato matni qaytariladi.
+
+    ?atomic=1   biror qatorda xato bo'lsa, hech narsa saqlanmaydi
+"""
+import codecs
+import csv
+
+MAX_ROWS = 20000
+CSV_MIMETYPES = ("text/csv", "application/csv", "text/plain")
+
+
+def iter_rows(req):
+    """(qator raqami, dict) juftliklari - JSON massiv yoki CSV dan"""
+    if req.mimetype == "application/json":
+        data = req.get_json(silent=True)
+        if not isinstance(data, list):
+            raise ValueError("JSON massiv kutilgan")
+        return enumerate(data, start=1)
+
+    if req.mimetype == "multipart/form-data":
+        upload = req.files.get("file")
+        if upload is None:
+            raise ValueError("'file' maydonida CSV fayl yuborilmagan")
+        stream = upload.stream
+    elif req.mimetype in CSV_MIMETYPES:
+        stream = req.stream
+    else:
+        raise ValueError("Faqat application/json yoki text/csv qabul qilinadi")
+
+    reader = csv.DictReader(codecs.getreader("utf-8-sig")(stream))
+    return (
+        (i, {k.strip(): v.strip() for k, v in row.items() if k and isinstance(v, str) and v.strip()})
+        for i, row in enumerate(reader, start=1)
+    )
+
+
+def _text(row, field, default=None, required=False):
+    value = row.get(field)
+    if value is None or value == "":
+        if required:
+            raise ValueError(f"'{field}' maydoni majburiy")
+        return default
+    return str(value).strip()
+
+
+def _number(row, field, cast, default=None, required=False):
+    value = row.get(field)
+    if value is None or value == "":
+        if required:
+            raise ValueError(f"'{field}' maydoni majburiy")
+        return default
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{field}' son bo'lishi kerak")
+
+
+# ---------- qator tekshiruvchilari (POST /... dagi maydonlar bilan bir xil) ----------
+def student_row(row):
+    record = {**row}
+    record["name"] = _text(row, "name", required=True)
+    record["status"] = _text(row, "status", "active")
+    record["payment"] = _text(row, "payment", "unpaid")
+    if "groupId" in row:
+        record["groupId"] = _number(row, "groupId", int)
+    if "balance" in row:
+        record["balance"] = _number(row, "balance", float)
+    return record
+
+
+def teacher_row(row):
+    record = {**row}
+    for field in ("name", "subject", "phone"):
+        record[field] = _text(row, field, required=True)
+    record["status"] = _text(row, "status", "active")
+    return record
+
+
+def payment_row(row):
+    amount = _number(row, "amount", float, required=True)
+    if amount <= 0:
+        raise ValueError("'amount' musbat bo'lishi kerak")
+    return {
+        "studentId": _number(row, "studentId", int, required=True),
+        "amount": amount,
+        "paymentDate": _text(row, "paymentDate", required=True),
+        "paymentType": _text(row, "paymentType", "cash"),
+        "description": _text(row, "description", ""),
+    }
+
+
+def validate(rows, check):
+    """Qatorlarni bir marta o'tib tekshiradi: ([(qator, yozuv)], [xatolar])"""
+    records, errors = [], []
+    for number, row in rows:
+        if number > MAX_ROWS:
+            errors.append({"row": number, "error": f"Bir so'rovda ko'pi bilan {MAX_ROWS} ta qator"})
+            break
+        if not isinstance(row, dict):
+            errors.append({"row": number, "error": "Qator obyekt bo'lishi kerak"})
+            continue
+        try:
+            records.append((number, check(row)))
+        except ValueError as e:
+            errors.append({"row": number, "error": str(e)})
+    return records, errors
+
+
+def is_atomic(args):
+    return args.get("atomic", "").lower() in ("1", "true", "yes")
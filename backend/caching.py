@@ -0,0 +1,90 @@
+"""
+Shartli GET so'rovlar (ETag / Last-Modified)
+
+Har bir kolleksiya har yozishda oshadigan `version` va `updated_at` ga ega.
+GET javobining ETag qiymati u o'qiydigan kolleksiyalar versiyalaridan
+(masalan /groups uchun groups + teachers + students) va so'rov manzilidan
+hosil qilinadi. Mijoz `If-None-Match` bilan shu qiymatni yuborsa va hech narsa
+o'zgarmagan bo'lsa, handler umuman chaqirilmaydi - fayl o'qilmaydi, join
+qilinmaydi, 304 qaytadi.
+
+    conditional = ConditionalGet(store)
+
+    @app.route("/groups")
+    @conditional(GROUPS_FILE, TEACHERS_FILE, STUDENTS_FILE)
+    def get_groups(): ...
+
+Yozish so'rovlari uchun optimistik tekshiruv: PUT/POST javobidagi yozuv ETag
+qiymatini mijoz keyingi PUT/DELETE da `If-Match` bilan yuborsa, yozuv shu
+orada boshqa admin tomonidan o'zgartirilgan bo'lsa 409 qaytadi.
+"""
+import hashlib
+import json
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import make_response, request
+
+
+def record_etag(record):
+    """Bitta yozuv mazmunidan olingan kuchli ETag"""
+    raw = json.dumps(record, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:24]
+
+
+def if_match(record):
+    """`If-Match` berilmagan yoki yozuvning joriy ETag iga mos bo'lsa True"""
+    if not request.if_match:
+        return True
+    return request.if_match.contains(record_etag(record))
+
+
+class ConditionalGet:
+    def __init__(self, store):
+        self.store = store
+
+    def validators(self, files):
+        """(etag, last_modified) - kolleksiyalar holati va so'rov ko'rinishi bo'yicha"""
+        state = []
+        last_modified = 0.0
+        for file in files:
+            collection = self.store[file]
+            with collection.lock:
+                # Boshqa workerlar yozgan o'zgarishlar avval o'qiladi (bitta log stat),
+                # aks holda eski versiya bilan yangi javobga eski ETag beriladi
+                collection.sync()
+                updated_at = collection.updated_at or 0.0
+                state.append((file, collection.version, updated_at))
+            last_modified = max(last_modified, updated_at)
+        # Bir xil ma'lumotning turli ko'rinishlari (filtr, format) turli ETag oladi
+        variant = (request.full_path, request.headers.get("Accept", ""))
+        digest = hashlib.sha1(repr((variant, state)).encode("utf-8")).hexdigest()[:24]
+        return digest, datetime.fromtimestamp(int(last_modified), timezone.utc)
+
+    def _not_modified(self, etag, last_modified):
+        if request.if_none_match:
+            return request.if_none_match.contains_weak(etag)
+        since = request.if_modified_since
+        return since is not None and last_modified <= since
+
+    def __call__(self, *files):
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                # Versiyalar handlerdan oldin olinadi: handler ishlayotganda yozuv
+                # kelsa, keyingi so'rov eski ETag bilan to'liq javob oladi
+                etag, last_modified = self.validators(files)
+                if self._not_modified(etag, last_modified):
+                    response = make_response("", 304)
+                else:
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                response.set_etag(etag, weak=True)
+                response.last_modified = last_modified
+                # Brauzer har safar qayta tekshiradi (If-None-Match bilan)
+                response.headers["Cache-Control"] = "no-cache"
+                response.vary.add("Accept")
+                return response
+            return wrapper
+        return decorator
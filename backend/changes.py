@@ -0,0 +1,211 @@
+"""
+O'zgarishlar lentasi (change feed)
+
+Har bir yozish (qo'shish, o'zgartirish, o'chirish) storage listeneri orqali
+xotiradagi lentaga tushadi. Mijoz butun kolleksiyani qayta yuklash o'rniga
+oxirgi ko'rgan joyidan keyingi o'zgarishlarni oladi:
+
+    GET /changes                               -> {"cursor": "..."}  (boshlang'ich nuqta)
+    GET /changes?since=<cursor>&collections=students,groups
+        -> {"cursor": "...", "changes": [...], "reset": []}
+    GET /changes/stream?since=<cursor>         -> Server-Sent Events
+
+Har bir o'zgarish:
+    {"collection": "students", "seq": 57, "op": "update", "id": 1001, "record": {...}}
+
+`seq` - kolleksiya versiyasi. U har bir yozishda bittaga oshadi va barcha
+worker jarayonlarida bir xil, shuning uchun cursor kolleksiyalar
+versiyalaridan tuziladi: so'rov qaysi workerga tushishidan qat'i nazar,
+cursor bir xil ma'noga ega. Bitta yozuv oraliqda bir necha marta o'zgargan
+bo'lsa, faqat oxirgi holati qaytadi.
+
+Lenta har bir kolleksiya uchun oxirgi MAX_EVENTS ta o'zgarishni saqlaydi.
+Cursor bundan eski bo'lsa (yoki kolleksiya butunlay almashgan bo'lsa),
+kolleksiya `reset` ro'yxatida qaytadi - mijoz uni to'liq qayta yuklaydi.
+
+Ishlatish tartibi: avval `GET /changes` dan cursor olinadi, keyin ro'yxatlar
+yuklanadi, so'ng shu cursor bilan o'zgarishlar so'raladi (ikki orada
+kelgan o'zgarishlar takrorlanishi mumkin - ular yozuvni qayta o'rnatadi xolos).
+
+SSE ulanishi gthread workerida butun STREAM_SECONDS davomida bitta oqimni
+band qiladi, shuning uchun bir jarayondagi ulanishlar soni oqimlar sonidan
+(THREADS) kelib chiqadi: max(1, THREADS - 2), undan ortig'iga 503 +
+Retry-After. Ko'p mijozli o'rnatishda SSE uchun async worker (gevent/eventlet)
+kerak; frontend esa `/changes` ni davriy so'rov (long-poll) bilan ishlatadi.
+"""
+import base64
+import json
+import os
+import threading
+from collections import deque
+
+MAX_EVENTS = 5000      # har bir kolleksiya uchun saqlanadigan o'zgarishlar
+STREAM_SECONDS = 300   # SSE ulanishi shuncha vaqtdan keyin yopiladi (mijoz qayta ulanadi)
+HEARTBEAT = 15         # SSE izoh qatori (proxy ulanishni uzmasligi uchun)
+FREE_THREADS = 2       # SSE band qila olmaydigan oqimlar (oddiy so'rovlar uchun)
+
+
+def max_streams(threads):
+    """Bir jarayondagi bir vaqtdagi SSE ulanishlari: gthread da har biri bitta oqimni band qiladi"""
+    return max(1, threads - FREE_THREADS)
+
+
+def collection_name(file):
+    return os.path.splitext(os.path.basename(file))[0]
+
+
+def encode_cursor(versions):
+    raw = json.dumps(versions, separators=(",", ":"), sort_keys=True)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        versions = json.loads(raw)
+        if not isinstance(versions, dict):
+            raise ValueError
+        return {str(name): int(version) for name, version in versions.items()}
+    except (ValueError, TypeError):
+        raise ValueError("since noto'g'ri cursor")
+
+
+class _Events:
+    """Bitta kolleksiyaning oxirgi o'zgarishlari (seq tartibida)"""
+
+    def __init__(self, version):
+        self.events = deque(maxlen=MAX_EVENTS)
+        self.floor = version   # shu versiyagacha bo'lgan cursorlar uchun o'zgarishlar yo'q
+        self.version = version
+
+    def reset(self, version):
+        self.events.clear()
+        self.floor = self.version = version
+
+    def append(self, event):
+        if len(self.events) == self.events.maxlen:
+            self.floor = self.events[0]["seq"]
+        self.events.append(event)
+        self.version = event["seq"]
+
+    def since(self, version):
+        """version dan keyingi o'zgarishlar; None - lentada yetarli tarix yo'q"""
+        if version < self.floor or version > self.version:
+            return None
+        return [e for e in self.events if e["seq"] > version]
+
+
+class ChangeFeed:
+    """files - lentaga kiradigan kolleksiyalar; clean(fayl, yozuv) - maxfiy maydonlarni olib tashlash;
+    streams - bir vaqtdagi SSE ulanishlari chegarasi"""
+
+    def __init__(self, store, files, clean=None, streams=max_streams(4)):
+        self.store = store
+        self.names = {collection_name(f): f for f in files}
+        self.clean = clean
+        self._cond = threading.Condition()
+        self._feeds = {}
+        self._streams = 0
+        self.max_streams = streams
+        for file in files:
+            store.subscribe(file, self._on_change)
+
+    def _feed(self, file):
+        feed = self._feeds.get(file)
+        if feed is None:
+            feed = self._feeds[file] = _Events(self.store[file].version)
+        return feed
+
+    def _on_change(self, file, old, new):
+        with self._cond:
+            version = self.store[file].version
+            if file not in self._feeds:
+                # Jarayondagi birinchi o'zgarish: undan oldingi holat (version - 1) ma'lum,
+                # aks holda bu o'zgarish lentaga tushmay, cursorlar reset olardi
+                self._feeds[file] = _Events(version - 1)
+            feed = self._feed(file)
+            if old is None and new is None or version != feed.version + 1:
+                # Kolleksiya almashgan yoki o'zgarishlar o'tkazib yuborilgan
+                feed.reset(version)
+            else:
+                record = new if new is not None else old
+                if self.clean is not None and new is not None:
+                    new = self.clean(file, new)
+                feed.append({
+                    "collection": collection_name(file),
+                    "seq": version,
+                    "op": "delete" if new is None else "insert" if old is None else "update",
+                    "id": record.get("id"),
+                    "record": new,
+                })
+            self._cond.notify_all()
+
+    def files(self, names=None):
+        """`collections` parametri (vergul bilan) -> fayllar"""
+        if not names:
+            return list(self.names.values())
+        files = []
+        for name in names.split(","):
+            name = name.strip()
+            if name not in self.names:
+                raise ValueError(f"collections quyidagilardan bo'lishi kerak: {', '.join(self.names)}")
+            files.append(self.names[name])
+        return files
+
+    def changes(self, since, files):
+        """(yangi cursor, o'zgarishlar, to'liq qayta yuklanishi kerak bo'lgan kolleksiyalar)"""
+        versions = decode_cursor(since) if since else {}
+        cursor, changes, reset = dict(versions), [], []
+        for file in files:
+            collection = self.store[file]
+            # Kolleksiya locki: shu jarayondagi tugallanmagan tranzaksiya o'zgarishlari ko'rinmaydi
+            with collection.lock:
+                collection.sync()
+                with self._cond:
+                    feed = self._feed(file)
+                    if collection.version != feed.version:
+                        # Listener ko'rmagan o'zgarish (masalan boshqa jarayonning SQLite yozuvi)
+                        feed.reset(collection.version)
+                    name = collection_name(file)
+                    cursor[name] = feed.version
+                    if not since:
+                        continue
+                    events = feed.since(versions.get(name, 0))
+                    if events is None:
+                        reset.append(name)
+                    else:
+                        changes.extend(events)
+        return encode_cursor(cursor), _collapse(changes), reset
+
+    def wait(self, timeout):
+        """Shu jarayonda yangi o'zgarish bo'lguncha yoki timeout gacha kutadi"""
+        with self._cond:
+            self._cond.wait(timeout)
+
+    def open_stream(self):
+        with self._cond:
+            if self._streams >= self.max_streams:
+                return False
+            self._streams += 1
+            return True
+
+    def close_stream(self):
+        with self._cond:
+            self._streams -= 1
+
+
+def _collapse(events):
+    """Bir yozuvning bir nechta o'zgarishidan oxirgisi (seq tartibida)"""
+    last, inserted = {}, set()
+    for event in events:
+        key = (event["collection"], event["id"])
+        if event["op"] == "insert":
+            inserted.add(key)
+        last[key] = event
+    result = []
+    for key, event in last.items():
+        if key in inserted and event["op"] == "update":
+            event = {**event, "op": "insert"}
+        result.append(event)
+    result.sort(key=lambda e: (e["collection"], e["seq"]))
+    return result
@@ -0,0 +1,123 @@
+"""
+JSON kodlash (codec)
+
+Ombor fayllari, loglar va HTTP javoblari shu modul orqali kodlanadi.
+`orjson` o'rnatilgan bo'lsa u ishlatiladi (parse/serialize bir necha
+barobar tez), aks holda standart `json`:
+
+    pip install orjson              # ixtiyoriy
+    LEARNIFY_JSON_LIBRARY=json      # orjson bo'lsa ham standart json
+
+Ikkala kutubxona bir xil sozlamada ishlaydi: UTF-8 (ensure_ascii=False),
+bo'sh joylarsiz ajratgichlar, HTTP javoblarida kalitlar saralangan (Flask
+standarti kabi). 64 bitdan katta butun sonlar kabi orjson kodlay
+olmaydigan qiymatlar standart json bilan kodlanadi.
+
+Ombor JSON fayllari standart holatda `indent=2` bilan yoziladi (qo'lda
+o'qish uchun). LEARNIFY_JSON_COMPACT=1 - bo'sh joylarsiz: fayl kichikroq,
+siqish (compaction) va yuklash tezroq. O'qishda ikkala ko'rinish ham
+qabul qilinadi, shuning uchun rejimni istalgan vaqtda almashtirish mumkin.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson ixtiyoriy
+    orjson = None
+
+LIBRARIES = ("auto", "orjson", "json")
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS
+    # datetime/dataclass - Flask dagi kabi `default` orqali (http_date va h.k.)
+    _HTTP_OPTIONS = (_OPTIONS | orjson.OPT_SORT_KEYS
+                     | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS)
+
+
+class Codec:
+    """loads/dumps - tanlangan kutubxona bilan (qarang: configure)"""
+
+    def __init__(self, library="auto"):
+        self.configure(library)
+
+    def configure(self, library="auto"):
+        if library not in LIBRARIES:
+            raise ValueError(f"JSON_LIBRARY quyidagilardan biri bo'lishi kerak: {', '.join(LIBRARIES)}")
+        if library == "orjson" and orjson is None:
+            raise ValueError("JSON_LIBRARY=orjson, lekin orjson o'rnatilmagan (pip install orjson)")
+        self.fast = orjson is not None and library != "json"
+        self.name = "orjson" if self.fast else "json"
+
+    def loads(self, data):
+        """bytes yoki str -> obyekt (buzilgan JSON - ValueError)"""
+        if self.fast:
+            return orjson.loads(data)
+        return json.loads(data)
+
+    def dumps(self, obj, pretty=False):
+        """obyekt -> UTF-8 bytes; pretty=True - indent=2 (ombor fayllari)"""
+        if self.fast:
+            try:
+                return orjson.dumps(obj, option=(_OPTIONS | orjson.OPT_INDENT_2) if pretty else _OPTIONS)
+            except TypeError:
+                pass   # 64 bitdan katta son va h.k. - standart json
+        if pretty:
+            return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def dumps_http(self, obj, default=None):
+        """HTTP javoblari uchun: saralangan kalitlar, bo'sh joylarsiz (str)"""
+        if self.fast:
+            try:
+                return orjson.dumps(obj, default=default, option=_HTTP_OPTIONS).decode("utf-8")
+            except TypeError:
+                pass
+        return json.dumps(obj, default=default, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+
+
+# Jarayonda bitta codec (create_app da JSON_LIBRARY bo'yicha sozlanadi)
+CODEC = Codec()
+
+
+class JsonProvider:
+    """Flask `app.json` (jsonify, stream_list, request.get_json).
+
+    flask.json.provider.JSONProvider interfeysi; flask import qilinmaydi -
+    ombor (storage) Flask siz ham ishlaydi.
+    """
+
+    mimetype = "application/json"
+
+    def __init__(self, app):
+        self._app = app
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            # Aniq parametrlar berilgan (masalan indent) - standart json
+            kwargs.setdefault("default", _default)
+            kwargs.setdefault("ensure_ascii", False)
+            return json.dumps(obj, **kwargs)
+        return CODEC.dumps_http(obj, _default)
+
+    def dump(self, obj, fp, **kwargs):
+        fp.write(self.dumps(obj, **kwargs))
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return json.loads(s, **kwargs)
+        return CODEC.loads(s)
+
+    def load(self, fp, **kwargs):
+        return self.loads(fp.read(), **kwargs)
+
+    def response(self, *args, **kwargs):
+        if args and kwargs:
+            raise TypeError("jsonify() behavior undefined when passed both args and kwargs")
+        obj = args[0] if len(args) == 1 else (args or kwargs or None)
+        return self._app.response_class(f"{self.dumps(obj)}\n", mimetype=self.mimetype)
+
+
+def _default(o):
+    # date, Decimal, UUID, dataclass - Flask dagi kabi
+    from flask.json.provider import _default as flask_default
+    return flask_default(o)
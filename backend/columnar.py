@@ -0,0 +1,395 @@
+"""
+Katta kolleksiyalar uchun ustunli (columnar) xotira
+
+Yuz minglab to'lov/student alohida dict bo'lib saqlansa, har bir yozuv bir
+xil kalitlarni (studentId, amount, paymentDate, ...) va alohida int/float
+obyektlarini qayta-qayta saqlaydi. `ColumnTable` sxemadagi maydonlarni
+ustunlarda saqlaydi:
+
+    "int"     - array('q')                      (id, studentId, groupId, ...)
+    "number"  - array('d'), int/float turi saqlanadi (amount, balance)
+    "enum"    - array('I') kodlar + qiymatlar jadvali (status, paymentType, sanalar)
+    "str"     - str ro'yxati (name, phone, createdAt)
+
+Yozuv tashqariga odatdagi dict bo'lib chiqadi (kalitlar tartibi va qiymat
+turlari aynan saqlanadi). Sxemaga sig'maydigan qiymatlar (None dan boshqa
+turdagi groupId, ro'yxatlar, yangi maydonlar) yozuvning `extra` lug'atiga
+tushadi. Kalitlar tartibi va har bir kalit qayerdan o'qilishi "layout" da -
+ular kam va umumiy.
+
+Qatorlar yozilgandan keyin o'zgarmaydi: `update` yangi qator qo'shadi, eski
+qator o'likka chiqadi. O'liklar tiriklardan ko'payganda jadval yangi
+ustunlarga ko'chiriladi (vacuum). Shu sababli `rows()` qaytargan `Rows`
+keyingi yozishlardan ta'sirlanmaydigan snapshot - ro'yxat kabi o'qiladi,
+dict lar faqat murojaat qilinganda (masalan sahifa uchun) yaratiladi.
+`Rows.column(field)`, `Rows.take(indices)` va `Rows.totals(by, field)` -
+dict yaratmasdan filtr, saralash va yig'indilar uchun.
+"""
+from array import array
+from collections.abc import Sequence
+
+KINDS = ("int", "number", "enum", "str")
+VACUUM_MIN_DEAD = 1024
+_INT_MIN, _INT_MAX = -(1 << 63), (1 << 63) - 1
+_EXACT_FLOAT = 1 << 53
+
+# Layoutdagi kalitni o'qish usullari
+_EXTRA, _RAW, _INT, _ENUM, _CONST = range(5)
+# Ustunsiz saqlanadigan keng tarqalgan qiymatlar (layoutning o'zida)
+_CONSTANTS = (None, True, False, "")
+
+
+def _pick(values, rows):
+    """[values[row] for row in rows]; ketma-ket qatorlar (range) - kesma bilan"""
+    if type(rows) is range and rows.step == 1:
+        return values[rows.start:rows.stop]
+    return list(map(values.__getitem__, rows))
+
+
+def _constant(value):
+    for constant in _CONSTANTS:
+        if value is constant or (type(value) is str and value == constant):
+            return True
+    return False
+
+
+class _Segment:
+    """Ustunlar + har bir qator layouti va tartib raqami; qatorlar faqat qo'shiladi"""
+
+    def __init__(self, schema):
+        self.fields = list(schema)
+        self.slots = {field: i for i, field in enumerate(self.fields)}
+        self.kinds = [schema[field] for field in self.fields]
+        self.columns = []
+        self.enums = []   # enum ustunlar uchun (qiymatlar ro'yxati, qiymat -> kod)
+        for kind in self.kinds:
+            if kind == "int":
+                self.columns.append(array("q"))
+            elif kind == "number":
+                self.columns.append(array("d"))
+            elif kind == "enum":
+                self.columns.append(array("I"))
+            else:
+                self.columns.append([])
+            self.enums.append(([], {}) if kind == "enum" else None)
+        self.seq = array("q")       # qator -> yozuv qo'shilgan tartib raqami
+        self.layout_of = array("I")
+        self.layouts = []        # kod -> ((kalit, usul, argument), ...)
+        self.layout_codes = {}   # layout -> kod
+        self.layout_fields = []  # kod -> {kalit: (usul, argument)}
+        self.readers = []        # kod -> ((kalit, usul, ustun, qiymatlar), ...) - record() uchun
+        self.extras = {}         # qator -> {kalit: qiymat}
+
+    def __len__(self):
+        return len(self.layout_of)
+
+    def _encode(self, slot, value):
+        """(usul, saqlanadigan qiymat) yoki None - ustunga sig'maydi"""
+        kind = self.kinds[slot]
+        kind_type = type(value)
+        if kind == "int":
+            if kind_type is int and _INT_MIN <= value <= _INT_MAX:
+                return _RAW, value
+        elif kind == "number":
+            if kind_type is float:
+                return _RAW, value
+            if kind_type is int and -_EXACT_FLOAT <= value <= _EXACT_FLOAT:
+                return _INT, value
+        elif kind == "enum":
+            if kind_type is str:
+                values, codes = self.enums[slot]
+                code = codes.get(value)
+                if code is None:
+                    code = codes[value] = len(values)
+                    values.append(value)
+                return _ENUM, code
+        elif kind_type is str:
+            return _RAW, value
+        return None
+
+    def append(self, record, seq):
+        row = len(self.layout_of)
+        plan, stored, extra = [], {}, None
+        for key, value in record.items():
+            slot = self.slots.get(key)
+            encoded = self._encode(slot, value) if slot is not None else None
+            if encoded is not None:
+                plan.append((key, encoded[0], slot))
+                stored[slot] = encoded[1]
+            elif _constant(value):
+                plan.append((key, _CONST, value))
+            else:
+                plan.append((key, _EXTRA, None))
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        # Har bir ustunda har qatorga joy bor (ishlatilmasa - bo'sh qiymat)
+        for slot, column in enumerate(self.columns):
+            value = stored.get(slot)
+            if value is None:
+                value = "" if self.kinds[slot] == "str" else 0
+            column.append(value)
+        if extra is not None:
+            self.extras[row] = extra
+        layout = tuple(plan)
+        code = self.layout_codes.get(layout)
+        if code is None:
+            code = self.layout_codes[layout] = len(self.layouts)
+            self.layouts.append(layout)
+            self.layout_fields.append({key: (how, arg) for key, how, arg in layout})
+            self.readers.append(tuple(self._reader(key, how, arg) for key, how, arg in layout))
+        self.seq.append(seq)
+        self.layout_of.append(code)
+        return row
+
+    def _reader(self, key, how, arg):
+        if how in (_RAW, _INT):
+            return key, how, self.columns[arg], None
+        if how == _ENUM:
+            return key, how, self.columns[arg], self.enums[arg][0]
+        return key, how, None, arg
+
+    def _value(self, row, key, how, arg):
+        if how == _RAW:
+            return self.columns[arg][row]
+        if how == _INT:
+            return int(self.columns[arg][row])
+        if how == _ENUM:
+            return self.enums[arg][0][self.columns[arg][row]]
+        if how == _CONST:
+            return arg
+        return self.extras[row][key]
+
+    def record(self, row):
+        record = {}
+        for key, how, column, values in self.readers[self.layout_of[row]]:
+            if how == _RAW:
+                record[key] = column[row]
+            elif how == _ENUM:
+                record[key] = values[column[row]]
+            elif how == _INT:
+                record[key] = int(column[row])
+            elif how == _CONST:
+                record[key] = values
+            else:
+                record[key] = self.extras[row][key]
+        return record
+
+    def _decode(self, how, slot, rows):
+        """Butun ustun bitta usul bilan (map - C tezligida)"""
+        values = _pick(self.columns[slot], rows)
+        if how == _INT:
+            return list(map(int, values))
+        if how == _ENUM:
+            return list(map(self.enums[slot][0].__getitem__, values))
+        return values if type(values) is list else values.tolist()
+
+    def column(self, field, rows):
+        """`rows` qatorlaridagi `field` qiymatlari (yo'q bo'lsa None)"""
+        plans = [fields.get(field) for fields in self.layout_fields]
+        main = next((p for p in plans if p is not None and p[0] in (_RAW, _INT, _ENUM)), None)
+        if main is None:
+            out = [None] * len(rows)
+        else:
+            out = self._decode(main[0], main[1], rows)
+        # Boshqa usulda saqlangan qatorlar (None, extra, ...) alohida to'g'rilanadi
+        odd = {code for code, plan in enumerate(plans) if plan != main}
+        if odd:
+            for i, code in enumerate(_pick(self.layout_of, rows)):
+                if code in odd:
+                    plan = plans[code]
+                    out[i] = None if plan is None else self._value(rows[i], field, *plan)
+        return out
+
+    def codes(self, field, rows):
+        """Enum ustun: (kodlar, qiymatlar) - faqat barcha qatorlarda enum bo'lsa, aks holda None"""
+        slot = self.slots.get(field)
+        if slot is None or self.kinds[slot] != "enum":
+            return None
+        main = (_ENUM, slot)
+        used = set(_pick(self.layout_of, rows)) if len(self.layouts) > 1 else range(len(self.layouts))
+        if any(self.layout_fields[code].get(field) != main for code in used):
+            return None
+        return _pick(self.columns[slot], rows), self.enums[slot][0]
+
+
+class Rows(Sequence):
+    """Jadvalning o'zgarmas snapshoti: indeks/kesma/iteratsiyada dict yaratiladi"""
+
+    __slots__ = ("_segment", "_order")
+
+    def __init__(self, segment, order):
+        self._segment = segment
+        self._order = order
+
+    def __len__(self):
+        return len(self._order)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(map(self._segment.record, self._order[index]))
+        return self._segment.record(self._order[index])
+
+    def __iter__(self):
+        return map(self._segment.record, self._order)
+
+    def column(self, field):
+        """Barcha yozuvlardagi `field` qiymatlari (tartib bir xil)"""
+        return self._segment.column(field, self._order)
+
+    def take(self, indices):
+        """Shu tartibdagi yozuvlardan tanlangan pozitsiyalar (yangi Rows)"""
+        if type(self._order) is range and self._order.start == 0 and self._order.step == 1:
+            return Rows(self._segment, array("q", indices))
+        return Rows(self._segment, array("q", map(self._order.__getitem__, indices)))
+
+    def totals(self, by, field):
+        """{`by` qiymati: `field` yig'indisi} - masalan to'lov turlari bo'yicha summa"""
+        amounts = self.column(field)
+        grouped = self._segment.codes(by, self._order)
+        if grouped is None:
+            totals = {}
+            for key, amount in zip(self.column(by), amounts):
+                totals[key] = totals.get(key, 0) + (amount or 0)
+            return totals
+        # Enum: qiymatlar o'rniga kichik butun kodlar bo'yicha
+        codes, values = grouped
+        sums = [0] * len(values)
+        for code, amount in zip(codes, amounts):
+            sums[code] += amount or 0
+        present = set(codes)
+        return {values[code]: total for code, total in enumerate(sums) if code in present}
+
+    def lookup(self, field):
+        """{qiymat: birinchi yozuv} xaritasi - qiymat -> qator, dict murojaatda yaratiladi"""
+        rows = {}
+        for value, row in zip(self.column(field), self._order):
+            if value is not None and not isinstance(value, (list, dict)):
+                rows.setdefault(value, row)
+        return Lookup(self._segment, rows)
+
+
+class Lookup:
+    """Rows.lookup natijasi: dict kabi get/[]/in"""
+
+    __slots__ = ("_segment", "_rows")
+
+    def __init__(self, segment, rows):
+        self._segment = segment
+        self._rows = rows
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, key):
+        return key in self._rows
+
+    def __getitem__(self, key):
+        return self._segment.record(self._rows[key])
+
+    def get(self, key, default=None):
+        row = self._rows.get(key)
+        return default if row is None else self._segment.record(row)
+
+
+class ColumnTable:
+    """id -> yozuv; storage.Collection dagi RecordDict o'rnida (bir xil interfeys)"""
+
+    def __init__(self, schema, records=()):
+        for field, kind in schema.items():
+            if kind not in KINDS:
+                raise ValueError(f"{field}: noma'lum ustun turi {kind!r} ({', '.join(KINDS)})")
+        self.schema = dict(schema)
+        self._segment = _Segment(self.schema)
+        self._index = {}   # id -> qator (kalitlar tartibi - kolleksiya tartibi)
+        self._seq = 0
+        self._order = None
+        for record in records:
+            self[record.get("id")] = record
+
+    # ---------- o'qish ----------
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __getitem__(self, key):
+        return self._segment.record(self._index[key])
+
+    def get(self, key, default=None):
+        row = self._index.get(key)
+        return default if row is None else self._segment.record(row)
+
+    def position(self, key):
+        return self._segment.seq[self._index[key]]
+
+    def values(self):
+        return self.rows()
+
+    def rows(self):
+        if self._order is None:
+            if len(self._segment) == len(self._index):
+                # O'lik qator yo'q: qatorlar aynan kolleksiya tartibida
+                self._order = range(len(self._index))
+            else:
+                self._order = array("q", self._index.values())
+        return Rows(self._segment, self._order)
+
+    def field_items(self, field):
+        """(id, qiymat) juftlari - indeks qurish uchun"""
+        return zip(self._index, self.rows().column(field))
+
+    # ---------- yozish ----------
+    def __setitem__(self, key, record):
+        row = self._index.get(key)
+        if row is None:
+            seq = self._seq = self._seq + 1
+        else:
+            seq = self._segment.seq[row]
+        self._index[key] = self._segment.append(record, seq)
+        self._order = None
+        self._maybe_vacuum()
+
+    def pop(self, key, default=None):
+        row = self._index.pop(key, None)
+        if row is None:
+            return default
+        self._order = None
+        record = self._segment.record(row)
+        self._maybe_vacuum()
+        return record
+
+    def rekey(self, old_key, new_key, record):
+        """id o'zgarganda: tartib saqlanadi"""
+        old_row = self._index[old_key]
+        row = self._segment.append(record, self._segment.seq[old_row])
+        self._index = {(new_key if k == old_key else k): (row if k == old_key else r)
+                       for k, r in self._index.items()}
+        self._order = None
+        return self
+
+    # ---------- xotira ----------
+    def _maybe_vacuum(self):
+        dead = len(self._segment) - len(self._index)
+        if dead >= VACUUM_MIN_DEAD and dead > len(self._index):
+            self.vacuum()
+
+    def vacuum(self):
+        """Tirik qatorlarni yangi ustunlarga ko'chiradi (eski snapshotlar eski ustunlarda qoladi)"""
+        old, segment = self._segment, _Segment(self.schema)
+        self._index = {key: segment.append(old.record(row), old.seq[row]) for key, row in self._index.items()}
+        self._segment = segment
+        self._order = None
+
+    def stats(self):
+        segment = self._segment
+        return {
+            "records": len(self._index),
+            "rows": len(segment),
+            "layouts": len(segment.layouts),
+            "extras": len(segment.extras),
+        }
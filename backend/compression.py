@@ -0,0 +1,149 @@
+"""
+Javoblarni siqish (gzip / brotli)
+
+Accept-Encoding bo'yicha brotli (o'rnatilgan bo'lsa) yoki gzip tanlanadi.
+JSON javoblar juda takrorlanuvchan (bir xil maydon nomlari, "Noma'lum" va
+h.k.), shuning uchun hajm bir necha barobar kamayadi.
+
+Parametrsiz kolleksiya GET javoblari (masalan `/groups`) siqilgan holda
+ETag bo'yicha keshlanadi - ETag kolleksiya versiyalaridan hosil bo'lgani
+uchun ma'lumot o'zgarmaguncha Dashboard qayta yuklanganda qayta siqilmaydi.
+Keshdan javob berilganda handler baribir ishlaydi (birinchi bo'lak kodlangan
+bo'ladi), lekin oqimning qolgan qismi kodlanmaydi. Xato belgisi bilan tugagan
+oqim (qarang: streaming.py) keshlanmaydi. Boshqa oqimli javoblar bo'laklab
+siqiladi.
+"""
+import gzip
+import threading
+import zlib
+from collections import OrderedDict
+
+from flask import request
+
+from streaming import stream_failed
+
+try:
+    import brotli
+except ImportError:  # brotli ixtiyoriy
+    brotli = None
+
+COMPRESSIBLE = {"application/json", "application/x-ndjson", "text/csv", "text/plain"}
+MIN_SIZE = 1024                     # bundan kichik javoblar siqilmaydi
+CACHE_MAX_BYTES = 32 * 1024 * 1024  # siqilgan javoblar keshi hajmi
+
+
+def negotiate(accept_encoding):
+    """Mijoz qabul qiladigan eng yaxshi kodlash ("br", "gzip" yoki None)"""
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name.strip().lower()] = q
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=9)
+    return gzip.compress(data, compresslevel=6)
+
+
+def compress_stream(chunks, encoding):
+    """Oqimli javobni bo'laklab siqadi"""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=4)
+        process, finish = compressor.process, compressor.finish
+    else:
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # 31 = gzip sarlavhasi bilan
+        process, finish = compressor.compress, compressor.flush
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        out = process(chunk)
+        if out:
+            yield out
+    yield finish()
+
+
+class CompressedCache:
+    """(yo'l, ETag, kodlash) -> siqilgan tana; hajm bo'yicha LRU"""
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._items.get(key)
+            if body is not None:
+                self._items.move_to_end(key)
+            return body
+
+    def put(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._items[key] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= len(evicted)
+
+
+class Compressor:
+    """`app.after_request` uchun: javobni siqadi va keshlaydi"""
+
+    def __init__(self, cache=None):
+        self.cache = cache or CompressedCache()
+
+    def after_request(self, response):
+        if (response.status_code != 200
+                or response.mimetype not in COMPRESSIBLE
+                or "Content-Encoding" in response.headers):
+            return response
+        response.vary.add("Accept-Encoding")
+        encoding = negotiate(request.headers.get("Accept-Encoding"))
+        if encoding is None:
+            return response
+
+        etag, _ = response.get_etag()
+        if etag and not request.query_string:
+            key = (request.path, request.headers.get("Accept", ""), etag, encoding)
+            body = self.cache.get(key)
+            if body is None:
+                body = compress(response.get_data(), encoding)
+                # Qisman (xato bilan tugagan) tana to'g'ri ETag ostida keshlanmasin
+                if not stream_failed():
+                    self.cache.put(key, body)
+            else:
+                # Keshdan: handler ishlagan va birinchi bo'lak tayyor, oqimning
+                # qolgan qismi kodlanmaydi - generator yopiladi
+                response.close()
+            response.response = [body]
+            response.headers["Content-Length"] = str(len(body))
+        elif response.is_streamed:
+            response.response = compress_stream(response.response, encoding)
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+            if len(data) < MIN_SIZE:
+                return response
+            response.set_data(compress(data, encoding))
+        response.headers["Content-Encoding"] = encoding
+        return response
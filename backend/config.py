@@ -0,0 +1,83 @@
+"""
+Server sozlamalari
+
+Qiymatlar ustuvorligi: create_app(config) ga berilgan dict > muhit
+o'zgaruvchilari (LEARNIFY_*) > standart qiymatlar.
+
+    LEARNIFY_DATA_DIR=/var/lib/learnify LEARNIFY_PORT=8000 python server.py
+
+Ma'lumotlar papkasi berilmasa, JSON fayllar shu papkadan (backend/) olinadi -
+server qaysi papkadan ishga tushirilganiga bog'liq emas.
+"""
+import os
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULTS = {
+    "DATA_DIR": BACKEND_DIR,
+    "STORAGE": "json",            # "json" yoki "sqlite"
+    "SQLITE_PATH": "learnify.db",  # DATA_DIR ga nisbatan
+    "JSON_LIBRARY": "auto",       # "auto" (orjson bo'lsa u), "orjson" yoki "json"
+    "JSON_COMPACT": False,        # ombor JSON fayllari indentsiz (qarang: codec.py)
+    "COLUMNAR": True,             # students/payments xotirada ustunlarda (qarang: columnar.py)
+    "HOST": "127.0.0.1",
+    "PORT": 5000,
+    "DEBUG": False,
+    "PRELOAD": True,              # ishga tushishda kolleksiya va indekslarni yuklash
+    "ADMIN_TOKEN": "",            # X-Admin-Token: /admin/*, X-Profile, admin ro'yxatdan o'tkazish (bo'sh - o'chiq)
+    "PROFILE_ROUTES": "",         # profillanadigan routelar, "*" - hammasi (qarang: profiling.py)
+    "PROFILE_RATE": 1.0,          # mos so'rovlarning profillanadigan qismi
+    "PROFILE_MODE": "cprofile",   # "cprofile" yoki "sample"
+    "PROFILE_KEEP": 100,          # diskda saqlanadigan profillar soni
+    "JOBS_WORKERS": 2,            # jarayondagi bir vaqtda ishlaydigan fon joblari (qarang: jobs.py)
+    "JOBS_QUEUE": 8,              # navbatda kutishi mumkin bo'lgan joblar
+    "JOBS_KEEP_HOURS": 24,        # tugagan job natijalari shuncha soat saqlanadi
+    "SNAPSHOT_DIR": "",           # snapshotlar papkasi, bo'sh - <DATA_DIR>/snapshots (qarang: snapshot.py)
+    "SNAPSHOT_KEEP": 10,          # saqlanadigan snapshotlar soni
+    "THREADS": 4,                 # gunicorn gthread: jarayondagi oqimlar (SSE cheklovi shundan)
+}
+
+ENVIRON = {
+    "DATA_DIR": "LEARNIFY_DATA_DIR",
+    "STORAGE": "LEARNIFY_STORAGE",
+    "SQLITE_PATH": "LEARNIFY_SQLITE_PATH",
+    "JSON_LIBRARY": "LEARNIFY_JSON_LIBRARY",
+    "JSON_COMPACT": "LEARNIFY_JSON_COMPACT",
+    "COLUMNAR": "LEARNIFY_COLUMNAR",
+    "HOST": "LEARNIFY_HOST",
+    "PORT": "LEARNIFY_PORT",
+    "DEBUG": "LEARNIFY_DEBUG",
+    "PRELOAD": "LEARNIFY_PRELOAD",
+    "ADMIN_TOKEN": "LEARNIFY_ADMIN_TOKEN",
+    "PROFILE_ROUTES": "LEARNIFY_PROFILE_ROUTES",
+    "PROFILE_RATE": "LEARNIFY_PROFILE_RATE",
+    "PROFILE_MODE": "LEARNIFY_PROFILE_MODE",
+    "PROFILE_KEEP": "LEARNIFY_PROFILE_KEEP",
+    "JOBS_WORKERS": "LEARNIFY_JOBS_WORKERS",
+    "JOBS_QUEUE": "LEARNIFY_JOBS_QUEUE",
+    "JOBS_KEEP_HOURS": "LEARNIFY_JOBS_KEEP_HOURS",
+    "SNAPSHOT_DIR": "LEARNIFY_SNAPSHOT_DIR",
+    "SNAPSHOT_KEEP": "LEARNIFY_SNAPSHOT_KEEP",
+    "THREADS": "LEARNIFY_THREADS",
+}
+
+
+def _cast(default, value):
+    if isinstance(default, bool):
+        return str(value).lower() in ("1", "true", "yes", "on")
+    if isinstance(default, int):
+        return int(value)
+    if isinstance(default, float):
+        return float(value)
+    return value
+
+
+def load_config(overrides=None):
+    config = dict(DEFAULTS)
+    for key, name in ENVIRON.items():
+        if os.environ.get(name):
+            config[key] = _cast(DEFAULTS[key], os.environ[name])
+    for key, value in (overrides or {}).items():
+        config[key] = _cast(DEFAULTS[key], value) if key in DEFAULTS else value
+    config["DATA_DIR"] = os.path.abspath(config["DATA_DIR"])
+    return config
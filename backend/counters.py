@@ -0,0 +1,103 @@
+"""
+Yozishda yangilanib boradigan hisoblagichlar
+
+`IncrementalView` - storage listenerlari orqali har bir o'zgarishda
+yangilanadigan agregatlar uchun asos: eski yozuv hissasi olib tashlanadi,
+yangisi qo'shiladi. Kolleksiya versiyasi view ko'rgan oxirgi versiyadan farq
+qilsa (masalan SQLite bazasiga boshqa jarayon yozgan bo'lsa yoki tranzaksiya
+bekor qilingan bo'lsa), shu kolleksiya bo'yicha holat bir marta qaytadan
+quriladi.
+
+`Counters` - Dashboard sanoqlari. Har bir yozuv o'zining doirasiga
+(companyId, branchId) tegishli sanoqlarga hissa qo'shadi, shuning uchun
+`/dashboard/summary` javobi yozuvlar soniga emas, faqat doiralar (filiallar)
+soniga bog'liq.
+"""
+import threading
+from collections import Counter
+
+
+class IncrementalView:
+    """Voris klasslar `_reset(file)`, `_add(file, record)`, `_remove(file, record)` ni yozadi"""
+
+    def __init__(self, store, files):
+        self.store = store
+        self.files = tuple(files)
+        self._lock = threading.Lock()
+        self._seen = dict.fromkeys(self.files)   # fayl -> version (None - qayta qurish)
+        for file in self.files:
+            store.subscribe(file, self._on_change)
+
+    def _on_change(self, file, old, new):
+        with self._lock:
+            if self._seen[file] is None:
+                return
+            if old is None and new is None:
+                self._seen[file] = None
+                return
+            if old is not None:
+                self._remove(file, old)
+            if new is not None:
+                self._add(file, new)
+            self._seen[file] = self.store[file].version
+
+    def _rebuild(self, file, collection):
+        # Lock tartibi listener bilan bir xil: avval kolleksiya, keyin view
+        with collection.lock:
+            records = collection.all()
+            with self._lock:
+                self._reset(file)
+                for record in records:
+                    self._add(file, record)
+                self._seen[file] = collection.version
+
+    def refresh(self):
+        """Boshqa jarayonlarning o'zgarishlarini o'qiydi, kerak bo'lsa qayta quradi"""
+        for file in self.files:
+            collection = self.store[file]
+            collection.sync()
+            with self._lock:
+                fresh = self._seen[file] == collection.version
+            if not fresh:
+                self._rebuild(file, collection)
+
+
+def _scope(record):
+    return record.get("companyId"), record.get("branchId")
+
+
+class Counters(IncrementalView):
+    """metrics: {fayl: yozuv -> [(kalit, qiymat), ...]}"""
+
+    def __init__(self, store, metrics):
+        self.metrics = metrics
+        self._scopes = {file: {} for file in metrics}   # fayl -> {doira: Counter}
+        super().__init__(store, metrics)
+
+    def _count(self, file, record, sign):
+        counter = self._scopes[file].setdefault(_scope(record), Counter())
+        for key, value in self.metrics[file](record):
+            counter[key] += sign * value
+
+    def _reset(self, file):
+        self._scopes[file] = {}
+
+    def _add(self, file, record):
+        self._count(file, record, 1)
+
+    def _remove(self, file, record):
+        self._count(file, record, -1)
+
+    def totals(self, company_id=None, branch_id=None):
+        """Berilgan company/branch (yoki hammasi) bo'yicha jamlangan Counter"""
+        self.refresh()
+        total = Counter()
+        with self._lock:
+            for scopes in self._scopes.values():
+                for (company, branch), counter in scopes.items():
+                    if company_id is not None and company != company_id:
+                        continue
+                    if branch_id is not None and branch != branch_id:
+                        continue
+                    total.update(counter)
+        return total
@@ -0,0 +1,150 @@
+"""
+Eksportlar: to'lovlar tarixi va balansli studentlar ro'yxati (CSV/XLSX)
+
+Fon jobida bajariladi (qarang: jobs.py):
+
+    POST /jobs/export  {"type": "payments", "format": "csv", "branchId": 3, "from": "2025-01", "to": "2025-06"}
+    POST /jobs/export  {"type": "students", "format": "xlsx", "status": "active"}
+
+Filtrlar:
+    payments - branchId, groupId, studentId, paymentType, from, to (paymentDate prefiksi)
+    students - branchId, groupId, status, paymentStatus
+
+Eski to'lovlarda groupId/branchId bo'lmasa, ular studentdan olinadi (hisobotlar
+kabi). Formula bilan boshlanadigan matnlar (`=`, `+`, `-`, `@`) oldiga `'`
+qo'yiladi - Excel ularni bajarmaydi. XLSX uchun openpyxl kerak (ixtiyoriy):
+
+    pip install openpyxl
+"""
+import csv
+import re
+
+try:
+    import openpyxl
+except ImportError:  # openpyxl ixtiyoriy - faqat XLSX uchun
+    openpyxl = None
+
+KINDS = ("payments", "students")
+FORMATS = ("csv", "xlsx")
+MIMETYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+FILTERS = {
+    "payments": {"branchId": int, "groupId": int, "studentId": int, "paymentType": str, "from": str, "to": str},
+    "students": {"branchId": int, "groupId": int, "status": str, "paymentStatus": str},
+}
+COLUMNS = {
+    "payments": ["id", "paymentDate", "amount", "paymentType", "studentId", "studentName",
+                 "groupId", "branchId", "description", "createdAt"],
+    "students": ["id", "name", "firstName", "lastName", "phone", "group", "groupId", "branchId",
+                 "status", "joinDate", "balance", "paymentStatus"],
+}
+BATCH = 1000   # shuncha yozuvdan keyin progress (va bekor qilish) tekshiriladi
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")   # Excel formula deb o'qiydigan boshlanishlar
+_PERIOD = re.compile(r"^\d{4}(-\d{2}(-\d{2})?)?$")
+
+
+def parse(body):
+    """So'rov tanasi -> (tur, format, filtrlar); noto'g'ri bo'lsa ValueError"""
+    if not isinstance(body, dict):
+        raise ValueError("JSON obyekt kutilgan")
+    kind = body.get("type")
+    if kind not in KINDS:
+        raise ValueError(f"type quyidagilardan biri bo'lishi kerak: {', '.join(KINDS)}")
+    fmt = body.get("format", "csv")
+    if fmt not in FORMATS:
+        raise ValueError(f"format quyidagilardan biri bo'lishi kerak: {', '.join(FORMATS)}")
+    if fmt == "xlsx" and openpyxl is None:
+        raise ValueError("XLSX uchun openpyxl o'rnatilmagan (pip install openpyxl), format=csv dan foydalaning")
+    filters = {}
+    for field, cast in FILTERS[kind].items():
+        value = body.get(field)
+        if value is None or value == "":
+            continue
+        try:
+            filters[field] = cast(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"'{field}' son bo'lishi kerak")
+    for field in ("from", "to"):
+        if field in filters and not _PERIOD.match(filters[field]):
+            raise ValueError(f"'{field}' YYYY, YYYY-MM yoki YYYY-MM-DD ko'rinishida bo'lishi kerak")
+    return kind, fmt, filters
+
+
+def _scan(job, records):
+    """Yozuvlar + har BATCH tadan keyin job.progress"""
+    total = len(records)
+    for i, record in enumerate(records):
+        if i % BATCH == 0:
+            job.progress(i, total)
+        yield record
+
+
+def payment_rows(job, payments, students, filters):
+    """payments - (sana oralig'idagi) to'lovlar, students - {id: student}"""
+    for payment in _scan(job, payments):
+        student = students.get(payment.get("studentId"))
+        group, branch = payment.get("groupId"), payment.get("branchId")
+        if student is not None:
+            group = student.get("groupId") if group is None else group
+            branch = student.get("branchId") if branch is None else branch
+        if ("branchId" in filters and branch != filters["branchId"]
+                or "groupId" in filters and group != filters["groupId"]
+                or "studentId" in filters and payment.get("studentId") != filters["studentId"]
+                or "paymentType" in filters and payment.get("paymentType") != filters["paymentType"]):
+            continue
+        yield {
+            **payment,
+            "studentName": f"{student.get('firstName','')} {student.get('lastName','')}" if student else "Noma'lum",
+            "groupId": group,
+            "branchId": branch,
+        }
+
+
+def student_rows(job, students, balances, filters):
+    """balances - {studentId: ledger balansi}; ledgerda yo'q studentlar - o'z balance maydoni"""
+    for student in _scan(job, students):
+        if any(student.get(field) != value for field, value in filters.items()):
+            continue
+        balance = balances.get(student.get("id"))
+        yield {**student, "balance": student.get("balance") if balance is None else balance}
+
+
+def _cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, (list, dict)):
+        value = ", ".join(map(str, value)) if isinstance(value, list) else str(value)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        # Ism yoki izoh "=HYPERLINK(...)" bo'lsa Excel uni formula sifatida bajarmasin
+        return "'" + value
+    return value
+
+
+def write(path, fmt, kind, rows):
+    """rows (dict lar) -> CSV yoki XLSX fayl; yozilgan qatorlar soni"""
+    columns = COLUMNS[kind]
+    count = 0
+    if fmt == "csv":
+        # utf-8-sig: Excel o'zbekcha harflarni to'g'ri ochadi (bulk import ham shuni o'qiydi)
+        with open(path, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for row in rows:
+                writer.writerow([_cell(row.get(c)) for c in columns])
+                count += 1
+        return count
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet(kind)
+    sheet.append(columns)
+    try:
+        for row in rows:
+            sheet.append([_cell(row.get(c)) for c in columns])
+            count += 1
+    except BaseException:
+        # Bekor qilindi yoki xato: yarim yozilgan varaq yopiladi (vaqtinchalik faylni openpyxl o'zi o'chiradi)
+        sheet.close()
+        raise
+    workbook.save(path)
+    return count
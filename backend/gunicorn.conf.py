@@ -0,0 +1,46 @@
+"""
+gunicorn sozlamalari
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+    LEARNIFY_WORKERS   - jarayonlar soni (standart: 2 * CPU + 1, ko'pi bilan 16)
+    LEARNIFY_THREADS   - har bir jarayondagi oqimlar soni (standart: 4)
+
+preload_app: ilova (kolleksiyalar va indekslar) ota jarayonda bir marta
+yuklanadi, workerlar uni fork orqali oladi. Fork dan keyin har bir worker
+o'z lock fayllari, compaction oqimi va id slotini oladi (server.after_fork).
+Workerlar o'zgarishlarni bir-biridan storage loglari orqali ko'radi,
+sessiya tokenlari esa DATA_DIR/sessions da (qarang: auth.py) - sticky
+routing shart emas.
+
+Qayta yuklash: `kill -HUP <master pid>` - workerlar birma-bir almashtiriladi,
+ishlayotgan so'rovlar graceful_timeout ichida tugatiladi.
+"""
+import multiprocessing
+import os
+import sys
+
+# Istalgan papkadan ishga tushirish mumkin: wsgi.py va config.py shu yerda
+chdir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, chdir)
+
+from config import load_config
+
+_config = load_config()
+
+bind = f"{_config['HOST']}:{_config['PORT']}"
+# ids.py da worker uchun 4 bit - bir ma'lumotlar papkasida 16 tadan ortiq jarayon bo'lmasin
+workers = int(os.environ.get("LEARNIFY_WORKERS", min(2 * multiprocessing.cpu_count() + 1, 16)))
+worker_class = "gthread"
+threads = _config["THREADS"]
+preload_app = True
+
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
+# Xotira o'sib ketmasligi uchun workerlar vaqti-vaqti bilan yangilanadi
+max_requests = 10000
+max_requests_jitter = 1000
+
+accesslog = "-"
+errorlog = "-"
@@ -0,0 +1,77 @@
+"""
+Bog'langan ma'lumotlarni qo'shish (hydration)
+
+Ro'yxat endpointlari (groups, payments, tasks) har bir yozuv uchun boshqa
+kolleksiyadan nom qidirardi - bu O(N×M). Bu yerda id -> yozuv va
+tashqi kalit -> yozuvlar xaritalari bir marta quriladi va kolleksiya versiyasi
+o'zgarmaguncha keshda saqlanadi, shuning uchun har bir bog'lanish O(1).
+
+    teachers = hydrator.index(TEACHERS_FILE)                 # {id: teacher}
+    by_group = hydrator.group(STUDENTS_FILE, "groupId")      # {groupId: [student, ...]}
+"""
+import threading
+
+
+def parse_expand(value, allowed):
+    """`?expand=teacher,students` qiymatini to'plamga aylantiradi.
+
+    Parametr berilmasa, barcha bog'lanishlar qaytadi (eski javob formati).
+    Bo'sh qiymat (`?expand=`) - hech qanday bog'lanish yo'q.
+    """
+    if value is None:
+        return set(allowed)
+    names = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = names - set(allowed)
+    if unknown:
+        raise ValueError(
+            f"Noma'lum expand qiymati: {', '.join(sorted(unknown))} "
+            f"(mumkin: {', '.join(allowed)})"
+        )
+    return names
+
+
+class Hydrator:
+    """Kolleksiya versiyasi bo'yicha keshlanadigan hash xaritalar"""
+
+    def __init__(self, store):
+        self.store = store
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def index(self, file, field="id"):
+        """{qiymat: birinchi yozuv} - `next(...)` qidiruvining o'rnini bosadi"""
+        def build(records):
+            if hasattr(records, "lookup"):
+                # Ustunli kolleksiya: xaritada qator raqamlari, yozuv murojaatda yaratiladi
+                return records.lookup(field)
+            result = {}
+            for r in records:
+                value = r.get(field)
+                if value is not None and not isinstance(value, (list, dict)):
+                    result.setdefault(value, r)
+            return result
+        return self._cached(("index", file, field), file, build)
+
+    def group(self, file, field):
+        """{qiymat: [yozuvlar]} - `[s for s in ... if s[field] == x]` o'rnini bosadi"""
+        def build(records):
+            result = {}
+            for r in records:
+                value = r.get(field)
+                if value is not None and not isinstance(value, (list, dict)):
+                    result.setdefault(value, []).append(r)
+            return result
+        return self._cached(("group", file, field), file, build)
+
+    def _cached(self, key, file, build):
+        collection = self.store[file]
+        version = collection.version
+        hit = self._cache.get(key)
+        if hit is not None and hit[0] == version:
+            return hit[1]
+        # Versiyani o'qishdan oldin olamiz: qurish vaqtida yozuv kelsa,
+        # keyingi so'rov xaritani qayta quradi
+        value = build(collection.all())
+        with self._lock:
+            self._cache[key] = (version, value)
+        return value
@@ -0,0 +1,127 @@
+"""
+Id generatori
+
+Yangi yozuvlarning id si snowflake uslubida: vaqt + worker + tartib raqami
+
+    id = (ms - EPOCH_MS) << 13 | worker << 9 | seq
+
+    ms      - 2025-01-01 dan beri millisekundlar (40 bit, ~34 yil)
+    worker  - jarayon sloti (4 bit, 16 ta jarayon); `ids.worker-N.lock`
+              fayliga flock orqali band qilinadi
+    seq     - shu millisekund ichidagi tartib raqami (9 bit, 512 ta)
+
+Id lar 2**53 dan kichik (JavaScript Number da aniq), taxminan vaqt bo'yicha
+o'sadi va `/students/<int:student_id>` kabi routelar bilan mos. Eski
+yozuvlarning id lari (`int(time.time() * 1000)` yoki qo'lda berilgan) bilan
+to'qnashmasligi uchun ishga tushishda `floor` - ombordagi eng katta id -
+beriladi va ichki soat kamida shu id dan keyingi millisekunddan boshlanadi:
+yangi id lar har doim undan katta.
+
+Bir worker millisekundiga 512 ta (sekundiga ~500 000 ta) id beradi; tartib
+raqami tugasa yoki soat orqaga surilsa, ichki soat oldinga siljitiladi -
+kutilmaydi va id takrorlanmaydi.
+"""
+import os
+import threading
+import time
+import weakref
+
+try:
+    import fcntl
+except ImportError:   # Windows - bitta jarayon
+    fcntl = None
+
+EPOCH_MS = 1735689600000   # 2025-01-01 00:00:00 UTC
+WORKER_BITS = 4
+SEQUENCE_BITS = 9
+MAX_WORKERS = 1 << WORKER_BITS
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+_generators = weakref.WeakSet()
+
+
+class IdGenerator:
+    """worker berilmasa, birinchi id so'ralganda bo'sh slot band qilinadi;
+    floor - mavjud eng katta id (yangi id lar undan katta)"""
+
+    def __init__(self, data_dir=".", worker=None, floor=0):
+        if worker is not None and not 0 <= worker < MAX_WORKERS:
+            raise ValueError(f"worker 0..{MAX_WORKERS - 1} oralig'ida bo'lishi kerak")
+        self.data_dir = data_dir
+        self._fixed_worker = worker
+        self._lock = threading.Lock()
+        self._worker = worker
+        self._fd = None
+        self._last = -1   # oxirgi ishlatilgan millisekund (EPOCH_MS dan)
+        self._seq = 0
+        # floor dan katta id beradigan eng kichik millisekund
+        self._min_ms = max(0, (floor >> (WORKER_BITS + SEQUENCE_BITS)) + 1)
+        _generators.add(self)
+
+    # ---------- worker sloti ----------
+    def _claim_worker(self):
+        """Bo'sh slotni flock bilan band qiladi (jarayon tugaguncha ushlab turiladi)"""
+        if fcntl is None:
+            return 0
+        for worker in range(MAX_WORKERS):
+            path = os.path.join(self.data_dir, f"ids.worker-{worker}.lock")
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                continue
+            self._fd = fd
+            return worker
+        raise RuntimeError(f"Bo'sh id worker sloti yo'q: {MAX_WORKERS} ta jarayon band")
+
+    @property
+    def worker(self):
+        with self._lock:
+            if self._worker is None:
+                self._worker = self._claim_worker()
+            return self._worker
+
+    def reset_after_fork(self):
+        # Bola jarayon ota jarayonning slotini ishlatmasligi kerak - o'zinikini oladi
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        self._worker = self._fixed_worker
+        self._lock = threading.Lock()
+        self._last, self._seq = -1, 0
+
+    # ---------- id lar ----------
+    def next_ids(self, count):
+        """`count` ta yangi, o'sib boruvchi id"""
+        prefix = self.worker << SEQUENCE_BITS
+        ids = []
+        with self._lock:
+            last, seq = self._last, self._seq
+            while len(ids) < count:
+                now = max(int(time.time() * 1000) - EPOCH_MS, self._min_ms)
+                if now > last:
+                    last, seq = now, 0
+                elif seq < MAX_SEQUENCE:
+                    seq += 1
+                else:
+                    last, seq = last + 1, 0
+                # Shu millisekunddagi qolgan tartib raqamlari birdaniga
+                take = min(count - len(ids), MAX_SEQUENCE - seq + 1)
+                base = last << (WORKER_BITS + SEQUENCE_BITS) | prefix
+                ids.extend(range(base | seq, (base | seq) + take))
+                seq += take - 1
+            self._last, self._seq = last, seq
+        return ids
+
+    def next_id(self):
+        return self.next_ids(1)[0]
+
+
+def _after_fork():
+    for generator in list(_generators):
+        generator.reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
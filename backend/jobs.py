@@ -0,0 +1,246 @@
+"""
+Fon vazifalari (jobs): og'ir eksport va hisobotlar
+
+To'liq to'lovlar tarixi yoki balansli studentlar ro'yxati kabi eksportlar
+so'rov oqimida bir necha soniya ishlab, workerni band qilardi. Endi ular
+cheklangan pulda bajariladi, so'rov esa darhol job id qaytaradi (barcha
+routelar faqat X-Admin-Token bilan - natijalarda telefonlar va balanslar bor):
+
+    POST   /jobs/export            -> 202 {"id": ..., "status": "queued"}
+    GET    /jobs/<id>              -> holat va progress
+    GET    /jobs/<id>/download     -> tayyor natija fayli
+    DELETE /jobs/<id>              -> bekor qilish (yoki natijani o'chirish)
+
+Holatlar: queued -> running -> done | failed | cancelled.
+
+Har bir jarayonda bir vaqtda ko'pi bilan JOBS_WORKERS ta job ishlaydi,
+navbatda JOBS_QUEUE tadan ortiq job bo'lsa yangisi JobsBusy (503) bilan
+qaytariladi - interaktiv so'rovlar uchun oqimlar va CPU qoladi.
+
+Holat `<DATA_DIR>/jobs/<id>.json` da saqlanadi, shuning uchun so'rov
+qaysi workerga tushishidan qat'i nazar job ko'rinadi. Bekor qilish
+`<id>.cancel` belgisi orqali: jobni bajarayotgan jarayon uni progress
+yozishda ko'radi. Jarayon to'xtab qolsa (masalan worker qayta ishga
+tushirilsa), ishlayotgan job `failed` deb ko'rsatiladi. Tugagan jobs
+natijalari JOBS_KEEP_HOURS dan keyin o'chiriladi.
+"""
+import json
+import os
+import re
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from storage import atomic_write, pid_alive
+
+FINISHED = ("done", "failed", "cancelled")
+PROGRESS_SECONDS = 0.5   # holat fayli shundan tez-tez yozilmaydi
+_JOB_ID = re.compile(r"^[0-9a-f]+-[0-9a-f]{8}$")
+
+
+class JobsBusy(RuntimeError):
+    """Navbat to'lgan - so'rovni keyinroq qaytarish kerak"""
+
+
+class JobCancelled(Exception):
+    """Job bekor qilindi (Job.progress ichidan)"""
+
+
+class Job:
+    """Bajarilayotgan job: natija `path` ga yoziladi, `progress` - holat va bekor qilish"""
+
+    def __init__(self, queue, meta):
+        self.queue = queue
+        self.meta = meta
+        self.id = meta["id"]
+        self.path = queue.result_path(self.id) + ".part"
+        self._written = 0.0
+
+    def cancelled(self):
+        return os.path.exists(self.queue.file(self.id, ".cancel"))
+
+    def progress(self, done, total=None):
+        """Har bir partiyadan keyin chaqiriladi; bekor qilingan bo'lsa JobCancelled"""
+        now = time.monotonic()
+        if now - self._written < PROGRESS_SECONDS:
+            return
+        self._written = now
+        if self.cancelled():
+            raise JobCancelled(self.id)
+        self.meta["rows"] = done
+        if total is not None:
+            self.meta["total"] = total
+        if self.meta.get("total"):
+            self.meta["progress"] = round(min(done / self.meta["total"], 1.0), 3)
+        self.queue.save(self.meta)
+
+
+class JobQueue:
+    """Cheklangan pul + diskdagi holat fayllari (directory)"""
+
+    def __init__(self, directory, workers=2, queue=8, keep_hours=24):
+        self.directory = directory
+        self.workers = workers
+        self.queue = queue
+        self.keep_seconds = keep_hours * 3600
+        self._futures = {}   # shu jarayondagi navbatdagi/ishlayotgan joblar
+        self._lock = threading.Lock()
+        self._start()
+
+    def _start(self):
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="jobs")
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue)
+        self._futures = {}
+
+    def reset_after_fork(self):
+        # Ota jarayondagi pul oqimlari bolada yo'q - yangi pul
+        self._start()
+
+    # ---------- fayllar ----------
+    def file(self, job_id, ext):
+        return os.path.join(self.directory, job_id + ext)
+
+    def result_path(self, job_id):
+        return self.file(job_id, ".result")
+
+    def save(self, meta):
+        atomic_write(self.file(meta["id"], ".json"), json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+
+    def _load(self, job_id):
+        try:
+            with open(self.file(job_id, ".json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _remove(self, job_id):
+        for ext in (".json", ".result", ".result.part", ".cancel"):
+            try:
+                os.remove(self.file(job_id, ext))
+            except FileNotFoundError:
+                pass
+
+    # ---------- navbat ----------
+    def submit(self, kind, params, run, filename):
+        """run(job) natijani job.path ga yozadi; filename - yuklab olishdagi nom"""
+        if not self._slots.acquire(blocking=False):
+            raise JobsBusy("Navbatda juda ko'p job bor, birozdan keyin urinib ko'ring")
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            self.cleanup()
+            job_id = f"{time.time_ns():x}-{secrets.token_hex(4)}"
+            meta = {
+                "id": job_id, "type": kind, "params": params, "status": "queued",
+                "progress": 0.0, "rows": 0, "total": None, "filename": filename,
+                "createdAt": time.strftime("%Y-%m-%d %H:%M:%S"), "pid": os.getpid(),
+            }
+            self.save(meta)
+            future = self._pool.submit(self._run, Job(self, meta), run)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._futures[job_id] = future
+        future.add_done_callback(lambda _: self._done(job_id))
+        return meta
+
+    def _done(self, job_id):
+        with self._lock:
+            self._futures.pop(job_id, None)
+        self._slots.release()
+
+    def _run(self, job, run):
+        meta = job.meta
+        if job.cancelled():
+            self._finish(job, "cancelled")
+            return
+        meta.update(status="running", startedAt=time.strftime("%Y-%m-%d %H:%M:%S"))
+        self.save(meta)
+        try:
+            run(job)
+            os.replace(job.path, self.result_path(job.id))
+        except JobCancelled:
+            self._finish(job, "cancelled")
+        except Exception as e:
+            self._finish(job, "failed", f"{type(e).__name__}: {e}")
+        else:
+            meta.update(progress=1.0, size=os.path.getsize(self.result_path(job.id)))
+            self._finish(job, "done")
+
+    def _finish(self, job, status, error=None):
+        meta = job.meta
+        meta.update(status=status, finishedAt=time.strftime("%Y-%m-%d %H:%M:%S"), finished=time.time())
+        if error:
+            meta["error"] = error
+        if status != "done":
+            for path in (job.path, self.file(job.id, ".cancel")):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        self.save(meta)
+
+    # ---------- holat ----------
+    def get(self, job_id):
+        """Job holati; topilmasa LookupError"""
+        meta = self._load(job_id) if _JOB_ID.match(job_id) else None
+        if meta is None:
+            raise LookupError(job_id)
+        if meta["status"] in FINISHED:
+            return meta
+        if not pid_alive(meta["pid"]):
+            # Jobni bajarayotgan jarayon to'xtagan - natija hech qachon tayyor bo'lmaydi
+            meta.update(status="failed", error="Jobni bajarayotgan jarayon to'xtadi",
+                        finishedAt=time.strftime("%Y-%m-%d %H:%M:%S"), finished=time.time())
+            self.save(meta)
+        elif os.path.exists(self.file(job_id, ".cancel")):
+            meta["cancelling"] = True
+        return meta
+
+    def cancel(self, job_id):
+        """Tugamagan job bekor qilinadi, tugaganining natijasi o'chiriladi (yangi holat yoki None)"""
+        meta = self.get(job_id)
+        if meta["status"] in FINISHED:
+            self._remove(job_id)
+            return None
+        with open(self.file(job_id, ".cancel"), "w"):
+            pass
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None and future.cancel():
+            # Navbatdan chiqarildi - hech qachon ishlamaydi
+            meta.update(status="cancelled", finishedAt=time.strftime("%Y-%m-%d %H:%M:%S"), finished=time.time())
+            self.save(meta)
+            os.remove(self.file(job_id, ".cancel"))
+            return meta
+        meta["cancelling"] = True
+        return meta
+
+    def result(self, job_id):
+        """(natija fayli, meta); topilmasa LookupError, tayyor bo'lmasa ValueError"""
+        meta = self.get(job_id)
+        path = self.result_path(job_id)
+        if meta["status"] != "done" or not os.path.exists(path):
+            raise ValueError(f"Natija tayyor emas (holat: {meta['status']})")
+        return path, meta
+
+    def cleanup(self, now=None):
+        """Muddati o'tgan tugagan joblar va yetim fayllarni o'chiradi"""
+        now = now or time.time()
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return
+        known = {n[:-5] for n in names if n.endswith(".json") and _JOB_ID.match(n[:-5])}
+        for job_id in known:
+            meta = self._load(job_id)
+            if meta is not None and meta["status"] in FINISHED and now - meta.get("finished", now) > self.keep_seconds:
+                self._remove(job_id)
+        for name in names:
+            job_id = name.split(".", 1)[0]
+            if _JOB_ID.match(job_id) and job_id not in known and name.endswith((".result", ".cancel")):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
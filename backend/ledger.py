@@ -0,0 +1,159 @@
+"""
+To'lovlar daftari (ledger)
+
+Har bir to'lov, hisoblangan to'lov (charge) va balans tuzatishi `ledger.json`
+kolleksiyasiga o'zgarmas yozuv bo'lib qo'shiladi - yozuvlar hech qachon
+o'zgartirilmaydi va o'chirilmaydi:
+
+    {"id": ..., "studentId": 1004, "type": "payment", "amount": 500000.0,
+     "delta": -500000.0, "refId": 1763621549033, "description": "", "createdAt": "..."}
+
+    type:  opening     - student ledgerga birinchi marta tushgandagi balansi
+           charge      - hisoblangan to'lov, balansni oshiradi
+           payment     - to'lov, balansni kamaytiradi
+           adjustment  - balansni qo'lda o'zgartirish (farqi)
+
+Student balansi = uning yozuvlaridagi `delta` lar yig'indisi (musbat - qarz).
+`Ledger` har bir student uchun joriy balansni xotirada saqlaydi (storage
+listenerlari orqali yangilanadi), shuning uchun to'lov yozish bitta log
+qo'shishdan iborat. Balanslar vaqti-vaqti bilan `ledger.snapshot.json` ga
+yoziladi; qayta hisoblash snapshotdan boshlanib, faqat undan keyingi
+yozuvlarni qo'llaydi. `students.json` dagi `balance`/`paymentStatus`
+maydonlari mavjud mijozlar uchun shu balansning nusxasi.
+"""
+import time
+
+from codec import CODEC
+from counters import IncrementalView
+from storage import atomic_write
+
+ENTRY_TYPES = ("opening", "charge", "payment", "adjustment")
+SNAPSHOT_EVERY = 1000   # shuncha yangi yozuvdan keyin snapshot olinadi
+
+
+class Ledger(IncrementalView):
+    def __init__(self, store, ledger_file, snapshot_path, snapshot_every=SNAPSHOT_EVERY):
+        self.ledger_file = ledger_file
+        self.snapshot_path = snapshot_path
+        self.snapshot_every = snapshot_every
+        self._snapshot_count = 0
+        self._reset(ledger_file)
+        super().__init__(store, (ledger_file,))
+
+    # ---------- yozuvlar ----------
+    @staticmethod
+    def entry(entry_id, student_id, entry_type, amount, ref_id=None, description=""):
+        """Yangi ledger yozuvi (saqlash chaqiruvchining ishi)"""
+        if entry_type not in ENTRY_TYPES:
+            raise ValueError(f"Noma'lum ledger yozuvi turi: {entry_type}")
+        amount = float(amount)
+        delta = -amount if entry_type == "payment" else amount
+        return {
+            "id": entry_id,
+            "studentId": student_id,
+            "type": entry_type,
+            "amount": abs(amount) if entry_type in ("charge", "payment") else amount,
+            "delta": delta,
+            "refId": ref_id,
+            "description": description,
+            "createdAt": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+    # ---------- holat ----------
+    def _reset(self, file):
+        self._balances = {}   # studentId -> balans
+        self._counts = {}     # studentId -> yozuvlar soni
+        self._total = 0
+
+    def _add(self, file, entry):
+        self._apply(entry.get("studentId"), entry.get("delta") or 0, 1)
+
+    def _remove(self, file, entry):
+        # Ledger append-only; bu faqat replace/rollback holatlari uchun
+        self._apply(entry.get("studentId"), -(entry.get("delta") or 0), -1)
+
+    def _apply(self, student_id, delta, count):
+        self._balances[student_id] = self._balances.get(student_id, 0) + delta
+        self._counts[student_id] = self._counts.get(student_id, 0) + count
+        self._total += count
+        if not self._counts[student_id]:
+            del self._balances[student_id], self._counts[student_id]
+
+    def _load_snapshot(self, available):
+        """Snapshot dagi holat; ledger undan qisqa bo'lsa (tozalangan), e'tiborsiz qoldiriladi"""
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                snapshot = CODEC.loads(f.read())
+        except (FileNotFoundError, ValueError):
+            return 0
+        if snapshot.get("count", 0) > available:
+            return 0
+        for student_id, balance, count in snapshot.get("students", ()):
+            self._balances[student_id] = balance
+            self._counts[student_id] = count
+        self._total = snapshot["count"]
+        return self._total
+
+    def _rebuild(self, file, collection):
+        """Snapshot + undan keyingi yozuvlar (yozuvlar faqat oxiriga qo'shiladi)"""
+        with collection.lock:
+            records = collection.all()
+            with self._lock:
+                self._reset(file)
+                start = self._snapshot_count = self._load_snapshot(len(records))
+                for record in records[start:]:
+                    self._add(file, record)
+                self._seen[file] = collection.version
+        return start, len(records)
+
+    # ---------- so'rovlar ----------
+    def has(self, student_id):
+        self.refresh()
+        with self._lock:
+            return student_id in self._counts
+
+    def balance(self, student_id):
+        """Ledger bo'yicha balans (studentning yozuvlari bo'lmasa None)"""
+        self.refresh()
+        with self._lock:
+            balance = self._balances.get(student_id)
+        return None if balance is None else round(balance, 2)
+
+    def balances(self):
+        self.refresh()
+        with self._lock:
+            return {sid: round(balance, 2) for sid, balance in self._balances.items()}
+
+    # ---------- snapshot ----------
+    def snapshot(self):
+        """Barcha balanslarni diskka yozadi; qamrab olingan yozuvlar sonini qaytaradi"""
+        # Kolleksiya locki: shu jarayondagi tugallanmagan tranzaksiya yozuvlari kirmasin
+        with self.store[self.ledger_file].lock:
+            self.refresh()
+            with self._lock:
+                data = {
+                    "count": self._total,
+                    "createdAt": time.strftime("%Y-%m-%d %H:%M:%S"),
+                    "students": [[sid, self._balances[sid], self._counts[sid]] for sid in self._counts],
+                }
+                self._snapshot_count = self._total
+        atomic_write(self.snapshot_path, CODEC.dumps(data))
+        return data["count"]
+
+    def maybe_snapshot(self):
+        if self._total - self._snapshot_count >= self.snapshot_every:
+            self.snapshot()
+
+    def rebuild(self):
+        """Barcha balanslarni snapshotdan qayta hisoblaydi"""
+        started = time.perf_counter()
+        collection = self.store[self.ledger_file]
+        collection.sync()
+        start, total = self._rebuild(self.ledger_file, collection)
+        return {
+            "entries": total,
+            "fromSnapshot": start,
+            "replayed": total - start,
+            "students": len(self._counts),
+            "seconds": round(time.perf_counter() - started, 4),
+        }
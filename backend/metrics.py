@@ -0,0 +1,340 @@
+"""
+Metrikalar (Prometheus text formati)
+
+    GET /metrics
+
+Har bir so'rov uchun route (shablon: "/groups/<int:group_id>"), method va
+status bo'yicha kechikish gistogrammasi, so'rovlar soni va javob baytlari;
+storage uchun esa JSON parse/serialize vaqti, o'qilgan/yozilgan baytlar va
+lock kutish vaqti yig'iladi. Har bir o'lchov - bitta perf_counter juftligi
+va lug'atdagi bir nechta qo'shish, shuning uchun doim yoqilgan holda
+ishlatiladi.
+
+Bir nechta worker (gunicorn) bo'lsa, har bir jarayon o'z qiymatlarini
+(o'zgargan bo'lsa) FLUSH_SECONDS da bir marta `<DATA_DIR>/metrics/<pid>.json`
+ga yozadi, /metrics esa barcha jarayonlarnikini qo'shib beradi (so'rov qaysi
+workerga tushishidan qat'i nazar bir xil yig'indi, ko'pi bilan FLUSH_SECONDS
+kechikish bilan). To'xtagan workerlarning
+qiymatlari `archive.json` ga qo'shiladi - hisoblagichlar kamaymaydi.
+"""
+import bisect
+import json
+import os
+import threading
+import time
+
+# Sekundlar: 0.5 ms dan 10 s gacha
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Lock kutish odatda juda qisqa
+WAIT_BUCKETS = (0.00001, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+FLUSH_SECONDS = 1.0
+ARCHIVE = "archive"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labels):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}   # yorliqlar qiymatlari (tuple) -> qiymat
+        self._lock = threading.Lock()
+
+    def reset(self):
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(key), self._copy(value)] for key, value in self._values.items()]
+
+    @staticmethod
+    def _copy(value):
+        return value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    @staticmethod
+    def merge(total, value):
+        return (total or 0) + value
+
+    def samples(self, key, value):
+        yield self.name + "_total", key, value
+
+
+class Histogram(_Metric):
+    """Qiymat: [har bir chegara uchun soni (kumulyativ emas) + "+Inf", yig'indi, soni]"""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels, buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, labels, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    @staticmethod
+    def _copy(value):
+        return [list(value[0]), value[1], value[2]]
+
+    @staticmethod
+    def merge(total, value):
+        if total is None:
+            return [list(value[0]), value[1], value[2]]
+        return [[a + b for a, b in zip(total[0], value[0])], total[1] + value[1], total[2] + value[2]]
+
+    def samples(self, key, value):
+        running = 0
+        for bound, count in zip(self.buckets + (float("inf"),), value[0]):
+            running += count
+            yield self.name + "_bucket", key + (("le", _format(bound)),), running
+        yield self.name + "_sum", key, value[1]
+        yield self.name + "_count", key, value[2]
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.directory = None
+        self._lock = None       # metrics.lock - arxivni bir vaqtda bitta jarayon yozadi
+        self._flusher = None
+        self._flushed = None   # oxirgi yozilgan holat (o'zgarmagan bo'lsa qayta yozilmaydi)
+        self._stop = threading.Event()
+
+    def counter(self, name, help_text, labels=()):
+        metric = Counter(name, help_text, labels)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        metric = Histogram(name, help_text, labels, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def snapshot(self):
+        return {m.name: m.snapshot() for m in self.metrics}
+
+    # ---------- jarayonlararo ----------
+    def start(self, directory):
+        """Qiymatlarni `directory` ga vaqti-vaqti bilan yozishni boshlaydi"""
+        from storage import FileLock
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self._lock = FileLock(os.path.join(directory, "metrics.lock"))
+        self._start_flusher()
+
+    def _start_flusher(self):
+        if self._flusher is not None:
+            return
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
+
+    def _flush_loop(self):
+        while not self._stop.wait(FLUSH_SECONDS):
+            try:
+                self.flush()
+            except OSError:
+                pass
+
+    def flush(self):
+        if self.directory is None:
+            return
+        data = json.dumps({"pid": os.getpid(), "metrics": self.snapshot()}).encode("utf-8")
+        if data == self._flushed:
+            return
+        # fsync shart emas: metrikalar yo'qolsa, faqat oxirgi soniya yo'qoladi
+        path = os.path.join(self.directory, f"{os.getpid()}.json")
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+        self._flushed = data
+
+    def reset_after_fork(self):
+        """Bola jarayon ota jarayon qiymatlarini qayta hisoblamasligi uchun noldan boshlaydi"""
+        for metric in self.metrics:
+            metric.reset()
+        self._flusher = None
+        self._flushed = None
+        if self.directory is not None:
+            self._lock.reset_after_fork()
+            self._start_flusher()
+
+    def collect(self):
+        """{metrika nomi: {yorliqlar: qiymat}} - barcha jarayonlar yig'indisi"""
+        if self.directory is None:
+            return {m.name: {tuple(k): v for k, v in m.snapshot()} for m in self.metrics}
+        self.flush()
+        from storage import atomic_write, pid_alive
+        by_name = {m.name: m for m in self.metrics}
+        totals = {m.name: {} for m in self.metrics}
+
+        def add(snapshot):
+            for name, values in snapshot.items():
+                metric = by_name.get(name)
+                if metric is None:
+                    continue
+                for key, value in values:
+                    key = tuple(key)
+                    totals[name][key] = metric.merge(totals[name].get(key), value)
+
+        with self._lock:
+            archive_path = os.path.join(self.directory, ARCHIVE + ".json")
+            archive = _load(archive_path) or {}
+            add(archive)
+            dead = []
+            for entry in os.listdir(self.directory):
+                pid, ext = os.path.splitext(entry)
+                if ext != ".json" or not pid.isdigit():
+                    continue
+                data = _load(os.path.join(self.directory, entry))
+                if data is None:
+                    continue
+                add(data["metrics"])
+                if not pid_alive(int(pid)):
+                    dead.append((entry, data["metrics"]))
+            if dead:
+                # To'xtagan workerlar arxivga qo'shiladi (ularning qiymatlari allaqachon totals da)
+                merged = {name: {tuple(k): v for k, v in values} for name, values in archive.items()}
+                for _, snapshot in dead:
+                    for name, values in snapshot.items():
+                        if name in by_name:
+                            bucket = merged.setdefault(name, {})
+                            for key, value in values:
+                                bucket[tuple(key)] = by_name[name].merge(bucket.get(tuple(key)), value)
+                data = {name: [[list(k), v] for k, v in values.items()] for name, values in merged.items()}
+                atomic_write(archive_path, json.dumps(data).encode("utf-8"))
+                for entry, _ in dead:
+                    os.remove(os.path.join(self.directory, entry))
+        return totals
+
+    def render(self, extra=()):
+        """Prometheus text formati; extra - [(nom, yordam, tur, [(yorliqlar, qiymat)])] (gauge lar)"""
+        totals = self.collect()
+        lines = []
+        for metric in self.metrics:
+            values = totals.get(metric.name)
+            if not values:
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for key in sorted(values, key=str):
+                labels = tuple(zip(metric.labels, key))
+                for name, sample_labels, value in metric.samples(labels, values[key]):
+                    lines.append(f"{name}{_labels(sample_labels)} {_format(value)}")
+        for name, help_text, kind, samples in extra:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_labels(labels)} {_format(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _load(path):
+    try:
+        with open(path, "rb") as f:
+            return json.loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+# =====================
+#  Umumiy metrikalar
+# =====================
+REGISTRY = Registry()
+
+HTTP_DURATION = REGISTRY.histogram(
+    "learnify_http_request_duration_seconds", "So'rov bajarilish vaqti (javob oxirigacha)", ("route", "method"))
+HTTP_REQUESTS = REGISTRY.counter(
+    "learnify_http_requests", "So'rovlar soni", ("route", "method", "status"))
+HTTP_RESPONSE_BYTES = REGISTRY.counter(
+    "learnify_http_response_bytes", "Javob tanasi baytlari (siqilgandan keyin)", ("route", "method"))
+
+STORAGE_PARSE = REGISTRY.histogram(
+    "learnify_storage_parse_seconds", "JSON fayl/log qatorlarini o'qib tahlil qilish vaqti", ("collection",))
+STORAGE_SERIALIZE = REGISTRY.histogram(
+    "learnify_storage_serialize_seconds", "Log qatorlari va compaction uchun JSON kodlash vaqti", ("collection",))
+STORAGE_READ_BYTES = REGISTRY.counter(
+    "learnify_storage_read_bytes", "Diskdan o'qilgan baytlar", ("collection",))
+STORAGE_WRITTEN_BYTES = REGISTRY.counter(
+    "learnify_storage_written_bytes", "Diskka yozilgan baytlar", ("collection",))
+STORAGE_LOCK_WAIT = REGISTRY.histogram(
+    "learnify_storage_lock_wait_seconds", "Jarayonlararo lockni kutish vaqti", ("lock",), WAIT_BUCKETS)
+STORAGE_COMPACTIONS = REGISTRY.counter(
+    "learnify_storage_compactions", "Log -> JSON siqishlar soni", ("collection",))
+
+
+class RequestMetrics:
+    """before_request/after_request - create_app da Compressor dan OLDIN ro'yxatga olinadi,
+    shunda after_request oxirida ishlaydi va siqilgan javob hajmini ko'radi"""
+
+    def __init__(self):
+        # Flask faqat shu yerda kerak - storage metrikalari Flasksiz ishlaydi
+        from flask import g, request
+        self.g = g
+        self.request = request
+
+    def before_request(self):
+        self.g.metrics_started = time.perf_counter()
+
+    def after_request(self, response):
+        started = self.g.pop("metrics_started", None)
+        if started is None:
+            return response
+        request = self.request
+        rule = request.url_rule
+        labels = (rule.rule if rule is not None else "unmatched", request.method)
+        status = str(response.status_code)
+
+        if not response.is_streamed:
+            _observe(labels, status, started, response.calculate_content_length() or 0)
+            return response
+
+        # Oqimli javob: vaqt va baytlar oqim tugaganda (mijozga yuborib bo'lingach)
+        sent = [0]
+        body = response.response
+
+        def counted():
+            for chunk in body:
+                sent[0] += len(chunk)
+                yield chunk
+
+        response.response = counted()
+        response.call_on_close(lambda: _observe(labels, status, started, sent[0]))
+        return response
+
+
+def _observe(labels, status, started, size):
+    HTTP_DURATION.observe(labels, time.perf_counter() - started)
+    HTTP_REQUESTS.inc(labels + (status,))
+    HTTP_RESPONSE_BYTES.inc(labels, size)
@@ -0,0 +1,35 @@
+"""
+JSON fayllarni SQLite bazasiga ko'chirish (bir martalik buyruq)
+
+    python migrate.py                 # learnify.db ga
+    python migrate.py --db other.db
+    python migrate.py --data-dir /var/lib/learnify
+
+Keyin serverni SQLite bilan ishga tushirish:
+    LEARNIFY_STORAGE=sqlite python server.py
+"""
+import argparse
+
+from config import load_config
+from server import COLLECTION_FILES
+from storage import Storage
+
+CONFIG = load_config()
+
+
+def migrate(data_dir=CONFIG["DATA_DIR"], db_path=CONFIG["SQLITE_PATH"]):
+    # JSON ombori *.log fayllarni ham qayta qo'llaydi, shuning uchun oxirgi holat ko'chiriladi
+    source = Storage(data_dir, compact_json=CONFIG["JSON_COMPACT"])
+    target = Storage(data_dir, backend="sqlite", db_path=db_path)
+    for file in COLLECTION_FILES:
+        records = source[file].all()
+        target[file].replace(records)
+        print(f"✅ {file}: {len(records)} ta yozuv ko'chirildi")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="JSON fayllarni SQLite bazasiga ko'chirish")
+    parser.add_argument("--data-dir", default=CONFIG["DATA_DIR"], help="JSON fayllar joylashgan papka")
+    parser.add_argument("--db", default=CONFIG["SQLITE_PATH"], help="SQLite fayl nomi")
+    args = parser.parse_args()
+    migrate(args.data_dir, args.db)
@@ -0,0 +1,224 @@
+"""
+So'rovlarni profillash (ixtiyoriy)
+
+Standart holatda o'chiq. Yoqish yo'llari:
+
+    LEARNIFY_PROFILE_ROUTES=/groups,/branches   # shu routelar (shablon yoki funksiya nomi), "*" - hammasi
+    LEARNIFY_PROFILE_RATE=0.05                  # mos so'rovlarning qancha qismi (standart 1.0)
+    LEARNIFY_PROFILE_MODE=sample                # "cprofile" (standart) yoki "sample"
+
+yoki bitta so'rov uchun sarlavha bilan (faqat X-Admin-Token bilan):
+
+    X-Profile: cprofile | sample
+
+`cprofile` - handler ichidagi har bir funksiya chaqiruvi (aniq, lekin
+sekinlashtiradi), `sample` - alohida oqim handler oqimining stekini har
+SAMPLE_INTERVAL da yozib oladi (arzon, flamegraph uchun collapsed stack).
+Oqimli javoblarda profil javob oxirigacha davom etadi.
+
+Natijalar `<DATA_DIR>/profiles/` dagi halqada saqlanadi (eng ko'pi
+PROFILE_KEEP ta, eskilari o'chiriladi):
+
+    GET /admin/profiles                          -> ro'yxat (yangilari birinchi)
+    GET /admin/profiles/<id>?format=pstats       -> cprofile natijasi (snakeviz, flameprof)
+    GET /admin/profiles/<id>?format=collapsed    -> sample natijasi (flamegraph.pl, speedscope)
+
+Bir jarayonda bir vaqtda bitta so'rov profillanadi (cProfile bir nechta
+profilni birga ishlata olmaydi), band bo'lsa so'rov profilsiz o'tadi.
+"""
+import cProfile
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+MODES = ("cprofile", "sample")
+SAMPLE_INTERVAL = 0.002   # sekund
+FORMATS = {"cprofile": "pstats", "sample": "collapsed"}
+_TRACE_ID = re.compile(r"^[0-9a-f]+-\d+$")
+
+
+class _Sampler:
+    """Berilgan oqim stekini fon oqimidan vaqti-vaqti bilan o'qiydi"""
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="profiler")
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class Profiler:
+    """before_request/after_request hook; config - PROFILE_* sozlamalari"""
+
+    def __init__(self, directory, routes="", rate=1.0, mode="cprofile", keep=100, allow_header=None):
+        if mode not in MODES:
+            raise ValueError(f"PROFILE_MODE quyidagilardan biri bo'lishi kerak: {', '.join(MODES)}")
+        self.directory = directory
+        self.routes = {r.strip() for r in routes.split(",") if r.strip()}
+        self.rate = rate
+        self.mode = mode
+        self.keep = keep
+        self.allow_header = allow_header   # request -> X-Profile sarlavhasiga ruxsat bormi
+        self._busy = threading.Lock()
+        from flask import g, request
+        self.g = g
+        self.request = request
+
+    def _wanted(self):
+        """Shu so'rov profillanadimi: rejim yoki None"""
+        request = self.request
+        header = request.headers.get("X-Profile")
+        if header and self.allow_header is not None and self.allow_header(request):
+            return header if header in MODES else self.mode
+        if not self.routes:
+            return None
+        rule = request.url_rule
+        if "*" not in self.routes and not (
+            rule is not None and (rule.rule in self.routes or rule.endpoint.rpartition(".")[2] in self.routes)
+        ):
+            return None
+        return self.mode if random.random() < self.rate else None
+
+    def before_request(self):
+        mode = self._wanted()
+        if mode is None or not self._busy.acquire(blocking=False):
+            return
+        if mode == "cprofile":
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Boshqa profiler (masalan debugger) faol
+                self._busy.release()
+                return
+        else:
+            profile = _Sampler(threading.get_ident())
+            profile.start()
+        self.g.profile = (mode, profile, time.perf_counter())
+
+    def after_request(self, response):
+        active = self.g.pop("profile", None)
+        if active is None:
+            return response
+        request = self.request
+        rule = request.url_rule
+        meta = {
+            "route": rule.rule if rule is not None else "unmatched",
+            "method": request.method,
+            "path": request.full_path.rstrip("?"),
+        }
+        if response.is_streamed:
+            response.call_on_close(lambda: self._finish(active, meta, response.status_code))
+        else:
+            self._finish(active, meta, response.status_code)
+        return response
+
+    def teardown_request(self, exc=None):
+        # after_request ishlamay qolsa (tutilmagan xatolik) ham profil to'xtatiladi
+        active = self.g.pop("profile", None)
+        if active is not None:
+            self._finish(active, {"route": "error", "method": self.request.method,
+                                  "path": self.request.full_path.rstrip("?")}, 500)
+
+    def _finish(self, active, meta, status):
+        mode, profile, started = active
+        duration = time.perf_counter() - started
+        try:
+            if mode == "cprofile":
+                profile.disable()
+            else:
+                profile.stop()
+        finally:
+            self._busy.release()
+        try:
+            self.save(mode, profile, {**meta, "status": status, "durationMs": round(duration * 1000, 2)})
+        except OSError:
+            pass
+
+    # ---------- halqa (ring) ----------
+    def save(self, mode, profile, meta):
+        os.makedirs(self.directory, exist_ok=True)
+        trace_id = f"{time.time_ns():x}-{os.getpid()}"
+        path = os.path.join(self.directory, trace_id)
+        if mode == "cprofile":
+            profile.dump_stats(path + ".pstats")
+        else:
+            with open(path + ".collapsed", "w", encoding="utf-8") as f:
+                f.write(profile.collapsed())
+        meta = {"id": trace_id, "mode": mode, "format": FORMATS[mode],
+                "createdAt": time.strftime("%Y-%m-%d %H:%M:%S"), "pid": os.getpid(), **meta}
+        if mode == "sample":
+            # SAMPLE_INTERVAL dan qisqa so'rovlarda 0 bo'lishi mumkin
+            meta["samples"] = sum(profile.stacks.values())
+        # Meta oxirida yoziladi: ro'yxatda faqat to'liq saqlangan profillar ko'rinadi
+        with open(path + ".json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        self._trim()
+        return meta
+
+    def _ids(self):
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        ids = (n[:-5] for n in names if n.endswith(".json"))
+        # id boshidagi vaqt (nanosekund, hex) bo'yicha
+        return sorted((i for i in ids if _TRACE_ID.match(i)), key=lambda i: int(i.split("-")[0], 16))
+
+    def _trim(self):
+        ids = self._ids()
+        for trace_id in ids[:max(0, len(ids) - self.keep)]:
+            for ext in (".json", ".pstats", ".collapsed"):
+                try:
+                    os.remove(os.path.join(self.directory, trace_id + ext))
+                except FileNotFoundError:
+                    pass
+
+    def list(self):
+        traces = []
+        for trace_id in reversed(self._ids()):
+            try:
+                with open(os.path.join(self.directory, trace_id + ".json"), encoding="utf-8") as f:
+                    traces.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return traces
+
+    def path(self, trace_id, fmt=None):
+        """(fayl yo'li, format) - topilmasa LookupError, format mos kelmasa ValueError"""
+        if not _TRACE_ID.match(trace_id):
+            raise LookupError(trace_id)
+        for mode, available in FORMATS.items():
+            path = os.path.join(self.directory, f"{trace_id}.{available}")
+            if os.path.exists(path):
+                if fmt and fmt != available:
+                    raise ValueError(f"Bu profil faqat {available} formatida ({mode} rejimi)")
+                return path, available
+        raise LookupError(trace_id)
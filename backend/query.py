@@ -0,0 +1,193 @@
+"""
+Ro'yxat endpointlari uchun server tomonidagi so'rov parametrlari
+
+    ?status=active,inactive      maydon bo'yicha filtr (vergul bilan bir nechta qiymat)
+    ?from=2025-01-01&to=2025-01-31
+                                 endpointning sana maydoni bo'yicha oraliq (ikkalasi ham kiradi)
+    ?sort=name  /  ?sort=-amount,name
+                                 saralash ("-" kamayish tartibi)
+    ?limit=50&offset=100         sahifalash
+    ?limit=50&cursor=...         keyingi sahifa (X-Next-Cursor sarlavhasidan)
+    ?fields=id,name              faqat kerakli maydonlar
+
+Noma'lum parametrlar e'tiborsiz qoldiriladi, shuning uchun frontend yuborayotgan
+boshqa parametrlar xatoga olib kelmaydi.
+"""
+import base64
+import json
+from collections.abc import Sequence
+from itertools import compress
+
+MAX_LIMIT = 1000
+
+
+def _as_str(value):
+    return "" if value is None else str(value)
+
+
+def _sort_key(value):
+    # Har xil turdagi qiymatlarni solishtirishda TypeError bo'lmasligi uchun
+    if value is None:
+        return (2, "")
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (0, value)
+    return (1, str(value))
+
+
+def _sort_keys(column):
+    """Saralash kalitlari; bir turdagi ustunda qiymatlarning o'zi (tartib _sort_key bilan bir xil)"""
+    types = set(map(type, column))
+    if types and (types <= {int, float} or types == {str}):
+        return column
+    return list(map(_sort_key, column))
+
+
+def _matching(column, values):
+    """`_as_str(qiymat) in values` bo'lgan pozitsiyalar belgisi (map - C tezligida)"""
+    try:
+        distinct = set(column)
+    except TypeError:   # ro'yxat/dict qiymatlar
+        distinct = None
+    # 1 == True == 1.0 set ichida birlashadi - faqat to'qnashmaydigan turlar uchun
+    if distinct is not None and set(map(type, distinct)) - {type(None)} in ({str}, {int}, set()):
+        allowed = {v for v in distinct if _as_str(v) in values}
+        return map(allowed.__contains__, column)
+    return (_as_str(v) in values for v in column)
+
+
+def encode_cursor(record_id, offset):
+    raw = json.dumps({"id": record_id, "o": offset}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        return data.get("id"), int(data["o"])
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("cursor noto'g'ri")
+
+
+def _int_arg(args, name, default):
+    value = args.get(name)
+    if value in (None, ""):
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"{name} butun son bo'lishi kerak")
+    if number < 0:
+        raise ValueError(f"{name} manfiy bo'lmasligi kerak")
+    return number
+
+
+class ListQuery:
+    """So'rov parametrlarini bir marta tahlil qiladi va ro'yxatga qo'llaydi"""
+
+    def __init__(self, args, filters=(), date_field=None):
+        self.filters = {}
+        for field in filters:
+            value = args.get(field)
+            if value is not None:
+                self.filters[field] = {v.strip() for v in value.split(",")}
+
+        self.date_field = date_field
+        self.date_from = args.get("from") or None
+        self.date_to = args.get("to") or None
+
+        self.sort = []
+        for name in (args.get("sort") or "").split(","):
+            name = name.strip()
+            if name:
+                self.sort.append((name.lstrip("-"), name.startswith("-")))
+
+        self.limit = _int_arg(args, "limit", None)
+        if self.limit is not None:
+            self.limit = min(self.limit, MAX_LIMIT)
+        self.offset = _int_arg(args, "offset", 0)
+        self.cursor = decode_cursor(args["cursor"]) if args.get("cursor") else None
+
+        fields = args.get("fields")
+        self.fields = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+
+    def _in_range(self, value):
+        if not value:
+            return False
+        value = str(value)
+        if self.date_from and value < self.date_from:
+            return False
+        # "to" sanasi ham kiradi: "2025-01-31 10:00" <= "2025-01-31"
+        if self.date_to and value[:len(self.date_to)] > self.date_to:
+            return False
+        return True
+
+    def matches(self, record):
+        for field, values in self.filters.items():
+            if _as_str(record.get(field)) not in values:
+                return False
+        if self.date_from or self.date_to:
+            return self._in_range(record.get(self.date_field))
+        return True
+
+    def _select(self, rows):
+        """columnar.Rows: filtr va saralash ustunlar ustida, dict lar faqat sahifa uchun yaratiladi"""
+        if not (self.filters or self.date_from or self.date_to or self.sort):
+            return rows
+        if self.filters or self.date_from or self.date_to:
+            rows = self._filter(rows)
+        if self.sort:
+            positions = range(len(rows))
+            for field, descending in reversed(self.sort):
+                keys = _sort_keys(rows.column(field))
+                positions = sorted(positions, key=keys.__getitem__, reverse=descending)
+            rows = rows.take(positions)
+        return rows
+
+    def _filter(self, rows):
+        positions = range(len(rows))
+        for field, values in self.filters.items():
+            column = rows.column(field)
+            if len(positions) != len(column):
+                column = list(map(column.__getitem__, positions))
+            positions = list(compress(positions, _matching(column, values)))
+        if self.date_from or self.date_to:
+            column = rows.column(self.date_field)
+            positions = [i for i in positions if self._in_range(column[i])]
+        return rows.take(positions)
+
+    def apply(self, records):
+        """(sahifa, filtrdan keyingi umumiy soni, keyingi cursor yoki None)"""
+        if hasattr(records, "take"):
+            records = self._select(records)
+        else:
+            if self.filters or self.date_from or self.date_to:
+                records = [r for r in records if self.matches(r)]
+            elif not isinstance(records, Sequence):
+                records = list(records)
+            # Barqaror saralash: oxirgi kalitdan birinchisiga qarab
+            for field, descending in reversed(self.sort):
+                records = sorted(records, key=lambda r: _sort_key(r.get(field)), reverse=descending)
+
+        total = len(records)
+        start = self.offset
+        if self.cursor is not None:
+            last_id, offset = self.cursor
+            start = offset
+            # Yozuv qo'shilgan/o'chirilgan bo'lsa ham cursor o'z joyidan davom etadi
+            if not (0 < offset <= total and records[offset - 1].get("id") == last_id):
+                start = next(
+                    (i + 1 for i, r in enumerate(records) if r.get("id") == last_id), offset
+                )
+
+        end = total if self.limit is None else start + self.limit
+        page = records[start:end]
+        next_cursor = None
+        if self.limit is not None and end < total and page:
+            next_cursor = encode_cursor(page[-1].get("id"), end)
+        return page, total, next_cursor
+
+    def project(self, records):
+        if not self.fields:
+            return records
+        return ({f: r[f] for f in self.fields if f in r} for r in records)
@@ -0,0 +1,176 @@
+"""
+To'lovlar bo'yicha hisobotlar
+
+`RevenueIndex` to'lovlarni `paymentDate` bo'yicha saralangan ro'yxatda
+saqlaydi (sana oralig'i bisect bilan topiladi) va kunlik hamda oylik
+yig'indilarni (rollup) to'lov turi, guruh va filial kesimida yuritadi.
+Ikkalasi ham to'lov qo'shilganda/o'zgarganda storage listeneri orqali
+yangilanadi, shuning uchun hisobot to'lovlar tarixi uzunligiga emas, faqat
+so'ralgan davrdagi kunlar/oylar soniga bog'liq.
+
+    GET /reports/revenue?from=2025-01-01&to=2025-06-30&bucket=month&by=group
+
+Oylik hisobotda to'liq kirgan oylar oylik yig'indidan, chetdagi qisman
+oylar esa kunlik yig'indilardan olinadi.
+"""
+import bisect
+import calendar
+import re
+from collections import Counter
+
+from counters import IncrementalView
+
+BUCKETS = ("day", "month")
+DIMENSIONS = ("type", "group", "branch")
+_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+_PERIOD = re.compile(r"^\d{4}(-\d{2}(-\d{2})?)?$")
+_MAX = "\uffff"   # "to" prefiks sifatida: "2025-01" butun yanvarni qamraydi
+
+
+def _amount(payment):
+    try:
+        return float(payment.get("amount") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _month_end(month):
+    """Oyning oxirgi kuni, YYYY-MM-DD"""
+    try:
+        days = calendar.monthrange(int(month[:4]), int(month[5:7]))[1]
+    except ValueError:   # noto'g'ri oy ("2025-13") - kunlar baribir 31 dan oshmaydi
+        days = 31
+    return f"{month}-{days:02d}"
+
+
+def _slice(keys, lo, hi):
+    """Saralangan `keys` dan lo <= k <= hi (hi prefiks) bo'lganlari"""
+    i = bisect.bisect_left(keys, lo) if lo else 0
+    j = bisect.bisect_right(keys, hi + _MAX) if hi else len(keys)
+    return keys[i:j]
+
+
+class RevenueIndex(IncrementalView):
+    """resolve(to'lov) - to'lovda groupId/branchId bo'lmasa, ularni qaytaradi (masalan studentdan)"""
+
+    def __init__(self, store, payments_file, resolve=None):
+        self.resolve = resolve
+        self._reset(payments_file)
+        super().__init__(store, (payments_file,))
+
+    # ---------- holat ----------
+    def _reset(self, file):
+        self._order = []      # [(paymentDate, tartib, id)] - sana bo'yicha saralangan
+        self._payments = {}   # id -> (kalit, kun, summa, kesimlar)
+        self._n = 0
+        self._daily, self._days = {}, []
+        self._monthly, self._months = {}, []
+
+    def _dims(self, payment):
+        group, branch = payment.get("groupId"), payment.get("branchId")
+        if (group is None or branch is None) and self.resolve is not None:
+            source = self.resolve(payment) or {}
+            group = source.get("groupId") if group is None else group
+            branch = source.get("branchId") if branch is None else branch
+        return (("type", payment.get("paymentType") or "unknown"), ("group", group), ("branch", branch))
+
+    def _roll(self, day, dims, amount, sign):
+        for period, buckets, keys in ((day, self._daily, self._days),
+                                      (day[:7], self._monthly, self._months)):
+            counter = buckets.get(period)
+            if counter is None:
+                counter = buckets[period] = Counter()
+                bisect.insort(keys, period)
+            counter["revenue"] += sign * amount
+            counter["count"] += sign
+            for dim in dims:
+                counter[dim] += sign * amount
+            if counter["count"] <= 0:
+                del buckets[period]
+                del keys[bisect.bisect_left(keys, period)]
+
+    def _add(self, file, payment):
+        self._remove(file, payment)
+        date = str(payment.get("paymentDate") or "")
+        self._n += 1
+        key = (date, self._n, payment.get("id"))
+        bisect.insort(self._order, key)
+        day = date[:10] if _DATE.match(date) else None
+        dims, amount = self._dims(payment), _amount(payment)
+        self._payments[payment.get("id")] = (key, day, amount, dims)
+        if day:
+            self._roll(day, dims, amount, 1)
+
+    def _remove(self, file, payment):
+        # Kesimlar qo'shilgandagi holatdan olinadi (student guruhini almashtirgan bo'lsa ham)
+        entry = self._payments.pop(payment.get("id"), None)
+        if entry is None:
+            return
+        key, day, amount, dims = entry
+        del self._order[bisect.bisect_left(self._order, key)]
+        if day:
+            self._roll(day, dims, amount, -1)
+
+    # ---------- so'rovlar ----------
+    def between(self, date_from=None, date_to=None):
+        """paymentDate oralig'idagi to'lov id lari (sana tartibida, ikkala chet ham kiradi)"""
+        self.refresh()
+        with self._lock:
+            lo = bisect.bisect_left(self._order, (date_from,)) if date_from else 0
+            hi = bisect.bisect_left(self._order, (date_to + _MAX,)) if date_to else len(self._order)
+            return [pid for _, _, pid in self._order[lo:hi]]
+
+    def _days_total(self, lo, hi):
+        total = Counter()
+        for day in _slice(self._days, lo, hi):
+            total.update(self._daily[day])
+        return total
+
+    def _month_total(self, month, date_from, date_to):
+        starts_inside = not date_from or date_from[:7] < month or date_from <= month + "-01"
+        # "to" prefiks: "2025", "2025-02" va "2025-02-28" fevralni to'liq qamraydi
+        ends_inside = not date_to or date_to + _MAX >= _month_end(month)
+        if starts_inside and ends_inside:
+            return self._monthly[month]
+        # Chetdagi qisman oy - kunlik yig'indilardan (ko'pi bilan 31 ta)
+        lo = max(date_from or "", month)
+        hi = date_to if date_to and date_to[:7] == month else month
+        return self._days_total(lo, hi)
+
+    def report(self, date_from=None, date_to=None, bucket="month", by=None):
+        for value in (date_from, date_to):
+            if value and not _PERIOD.match(value):
+                raise ValueError("Sana YYYY, YYYY-MM yoki YYYY-MM-DD ko'rinishida bo'lishi kerak")
+        if bucket not in BUCKETS:
+            raise ValueError(f"bucket quyidagilardan biri bo'lishi kerak: {', '.join(BUCKETS)}")
+        if by and by not in DIMENSIONS:
+            raise ValueError(f"by quyidagilardan biri bo'lishi kerak: {', '.join(DIMENSIONS)}")
+
+        self.refresh()
+        with self._lock:
+            if bucket == "day":
+                periods = [(d, self._daily[d]) for d in _slice(self._days, date_from, date_to)]
+            else:
+                months = _slice(self._months, date_from and date_from[:7], date_to)
+                periods = [(m, self._month_total(m, date_from, date_to)) for m in months]
+
+            rows, total = [], Counter()
+            for period, counter in periods:
+                if not counter["count"]:
+                    continue
+                total.update(counter)
+                rows.append(self._row(period, counter, by))
+        summary = self._row(None, total, by)
+        summary.pop("period")
+        return {"from": date_from, "to": date_to, "bucket": bucket, "by": by, **summary, "buckets": rows}
+
+    @staticmethod
+    def _row(period, counter, by):
+        row = {"period": period, "revenue": round(counter["revenue"], 2), "count": counter["count"]}
+        if by:
+            row["by"] = {
+                "null" if key[1] is None else str(key[1]): round(value, 2)
+                for key, value in counter.items()
+                if isinstance(key, tuple) and key[0] == by and round(value, 2)
+            }
+        return row
@@ -0,0 +1,219 @@
+"""
+Dars jadvali: o'qituvchi (va xona) bandligi
+
+Guruhning `schedule` maydoni erkin matn ("Dushanba Chorshanba Juma",
+"Toq kunlar", "Mon Wed Fri"), `startTime`/`endTime` - "HH:MM". Har bir
+guruh kunlarga bo'linib, (o'qituvchi, kun) bo'yicha intervallar indeksiga
+tushadi va storage listeneri orqali yangilanadi:
+
+    GET /timetable?teacherId=1&day=dushanba
+    GET /timetable/free?teacherId=1&day=dushanba&from=08:00&to=20:00&duration=90
+
+Indeks har bir (resurs, kun) uchun boshlanish vaqti bo'yicha saralangan
+ro'yxat. Dars bir kundan uzun bo'lmaydi, shuning uchun eng uzun dars
+uzunligi ma'lum bo'lsa, [start, end) bilan kesishadigan darslar ikki bisect
+orasida turadi: qidiruv O(log n + topilganlar), guruhlar juftlarini
+solishtirish kerak emas.
+
+Guruhda `room` bo'lsa, u filial ichidagi xona sifatida alohida resurs
+bo'ladi (bir xonada bir vaqtda ikki dars ham to'qnashuv).
+Tugagan/bekor qilingan guruhlar jadvalda joy egallamaydi.
+"""
+import bisect
+import re
+
+from counters import IncrementalView
+from search import normalize
+
+DAYS = ("dushanba", "seshanba", "chorshanba", "payshanba", "juma", "shanba", "yakshanba")
+_DAY_ALIASES = {
+    **{name: (i,) for i, name in enumerate(DAYS)},
+    **{name: (i,) for i, name in enumerate(("du", "se", "chor", "pay", "ju", "sha", "yak"))},
+    **{name: (i,) for i, name in enumerate(("mon", "tue", "wed", "thu", "fri", "sat", "sun"))},
+    **{name: (i,) for i, name in enumerate(("monday", "tuesday", "wednesday", "thursday",
+                                            "friday", "saturday", "sunday"))},
+    "toq": (0, 2, 4),    # toq kunlar: dushanba, chorshanba, juma
+    "juft": (1, 3, 5),   # juft kunlar: seshanba, payshanba, shanba
+}
+INACTIVE = {"completed", "finished", "cancelled", "archived", "inactive"}
+DAY_START, DAY_END = "08:00", "20:00"   # bo'sh vaqt qidirishda standart oraliq
+_TIME = re.compile(r"^(\d{1,2}):(\d{2})$")
+_WORD = re.compile(r"\w+")
+
+
+def parse_time(value):
+    """"HH:MM" -> kun boshidan daqiqalar; noto'g'ri bo'lsa None"""
+    match = _TIME.match(str(value or "").strip())
+    if not match:
+        return None
+    hours, minutes = int(match.group(1)), int(match.group(2))
+    if minutes > 59 or hours > 24 or hours == 24 and minutes:
+        return None
+    return hours * 60 + minutes
+
+
+def format_time(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def parse_days(schedule):
+    """Jadval matnidagi hafta kunlari (0 - dushanba)"""
+    days = set()
+    for word in _WORD.findall(normalize(schedule)):
+        days.update(_DAY_ALIASES.get(word, ()))
+    return tuple(sorted(days))
+
+
+def parse_day(value):
+    """`day` parametri: nom, qisqartma yoki 0-6 raqami"""
+    value = normalize(value).strip()
+    if value.isdigit() and int(value) < len(DAYS):
+        return int(value)
+    days = _DAY_ALIASES.get(value)
+    if days is None or len(days) != 1:
+        raise ValueError(f"day quyidagilardan biri bo'lishi kerak: {', '.join(DAYS)}")
+    return days[0]
+
+
+def validate(group):
+    """startTime/endTime berilgan bo'lsa to'g'ri va startTime < endTime bo'lishi kerak"""
+    start, end = group.get("startTime"), group.get("endTime")
+    if start and parse_time(start) is None or end and parse_time(end) is None:
+        raise ValueError("startTime va endTime HH:MM ko'rinishida bo'lishi kerak")
+    if start and end and parse_time(start) >= parse_time(end):
+        raise ValueError("startTime endTime dan oldin bo'lishi kerak")
+
+
+def resources(group):
+    """Guruh band qiladigan resurslar: o'qituvchi va (bo'lsa) xona"""
+    keys = []
+    if group.get("teacherId") is not None:
+        keys.append(("teacher", group["teacherId"]))
+    if group.get("room"):
+        keys.append(("room", group.get("branchId"), str(group["room"])))
+    return keys
+
+
+def lessons(group):
+    """[(resurs, kun, boshlanish, tugash)] - vaqti yoki kunlari noma'lum guruhda bo'sh"""
+    if str(group.get("status") or "").lower() in INACTIVE:
+        return []
+    start, end = parse_time(group.get("startTime")), parse_time(group.get("endTime"))
+    if start is None or end is None or start >= end:
+        return []
+    days = parse_days(group.get("schedule"))
+    return [(key, day, start, end) for key in resources(group) for day in days]
+
+
+class _Day:
+    """Bitta resursning bir kundagi darslari: [(boshlanish, tugash, guruh id)] saralangan"""
+
+    __slots__ = ("items", "longest")
+
+    def __init__(self):
+        self.items = []
+        self.longest = 0   # o'chirishda kamaytirilmaydi - chegara sifatida yetarli
+
+    def add(self, start, end, group_id):
+        bisect.insort(self.items, (start, end, group_id))
+        self.longest = max(self.longest, end - start)
+
+    def remove(self, start, end, group_id):
+        i = bisect.bisect_left(self.items, (start, end, group_id))
+        if i < len(self.items) and self.items[i] == (start, end, group_id):
+            del self.items[i]
+
+    def overlapping(self, start, end):
+        """[start, end) bilan kesishadigan darslar"""
+        lo = bisect.bisect_left(self.items, (start - self.longest + 1,))
+        hi = bisect.bisect_left(self.items, (end,))
+        return [item for item in self.items[lo:hi] if item[1] > start]
+
+
+class ScheduleIndex(IncrementalView):
+    """(resurs, kun) -> darslar; resurs - ("teacher", id) yoki ("room", filial, xona)"""
+
+    def __init__(self, store, file):
+        self.file = file
+        self._days = {}      # (resurs, kun) -> _Day
+        self._lessons = {}   # guruh id -> lessons()
+        super().__init__(store, (file,))
+
+    # ---------- holat ----------
+    def _reset(self, file):
+        self._days = {}
+        self._lessons = {}
+
+    def _add(self, file, record):
+        group_id = record.get("id")
+        self._drop(group_id)
+        items = lessons(record)
+        if not items:
+            return
+        self._lessons[group_id] = items
+        for key, day, start, end in items:
+            self._days.setdefault((key, day), _Day()).add(start, end, group_id)
+
+    def _remove(self, file, record):
+        self._drop(record.get("id"))
+
+    def _drop(self, group_id):
+        for key, day, start, end in self._lessons.pop(group_id, ()):
+            slot = self._days[(key, day)]
+            slot.remove(start, end, group_id)
+            if not slot.items:
+                del self._days[(key, day)]
+
+    # ---------- so'rovlar ----------
+    def conflicts(self, group):
+        """Guruh darslari bilan kesishadigan boshqa guruhlar darslari"""
+        self.refresh()
+        found = []
+        with self._lock:
+            for key, day, start, end in lessons(group):
+                slot = self._days.get((key, day))
+                if slot is None:
+                    continue
+                for other_start, other_end, other_id in slot.overlapping(start, end):
+                    if other_id == group.get("id"):
+                        continue
+                    found.append({
+                        "groupId": other_id,
+                        "resource": key[0],
+                        "day": DAYS[day],
+                        "startTime": format_time(other_start),
+                        "endTime": format_time(other_end),
+                    })
+        return found
+
+    def timetable(self, key, days=range(len(DAYS))):
+        """{kun: [(boshlanish, tugash, guruh id, [to'qnashgan guruhlar])]}"""
+        self.refresh()
+        result = {}
+        with self._lock:
+            for day in days:
+                slot = self._days.get((key, day))
+                if slot is None:
+                    continue
+                result[DAYS[day]] = [
+                    (start, end, group_id,
+                     [other for _, _, other in slot.overlapping(start, end) if other != group_id])
+                    for start, end, group_id in slot.items
+                ]
+        return result
+
+    def free(self, key, day, start, end, duration=1):
+        """[start, end) oralig'idagi kamida `duration` daqiqalik bo'sh oraliqlar"""
+        self.refresh()
+        with self._lock:
+            slot = self._days.get((key, day))
+            busy = slot.overlapping(start, end) if slot is not None else []
+        gaps = []
+        cursor = start
+        for lesson_start, lesson_end, _ in busy:
+            if lesson_start - cursor >= duration:
+                gaps.append((cursor, lesson_start))
+            cursor = max(cursor, lesson_end)
+        if end - cursor >= duration:
+            gaps.append((cursor, end))
+        return gaps
@@ -0,0 +1,234 @@
+"""
+Qidiruv: studentlar, o'qituvchilar va guruhlar
+
+    GET /search?q=ali&type=student&limit=20&offset=0
+
+`SearchIndex` har bir yozuvning qidiriladigan maydonlarini (ism, telefon,
+fan, guruh nomi) trigrammalarga ajratib inverted indeksda saqlaydi va
+storage listenerlari orqali har bir qo'shish/o'zgartirish/o'chirishda
+yangilaydi. So'rovda faqat so'rov trigrammalari bo'lgan so'zlar tekshiriladi,
+shuning uchun javob vaqti kolleksiya hajmiga emas, mos yozuvlar soniga
+bog'liq.
+
+    * 3 va undan uzun so'z - maydon ichidagi istalgan joydan (substring)
+    * 1-2 harfli so'z - so'z boshidan (prefix)
+    * faqat raqamlar (+, bo'shliq, -, qavslar bilan) - telefon raqami qismi
+
+Bir nechta so'z berilsa, hammasi mos kelishi kerak. Natijalar ball bo'yicha
+saralanadi: to'liq so'z > so'z boshi > so'z ichi, ism maydoni telefon va
+fandan ustun.
+"""
+import heapq
+import re
+import unicodedata
+
+from counters import IncrementalView
+
+# fayl turi -> {maydon: og'irlik}
+FIELDS = {
+    "student": {"name": 3, "firstName": 3, "lastName": 3, "phone": 2},
+    "teacher": {"name": 3, "phone": 2, "subject": 1},
+    "group": {"name": 3},
+}
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+_APOSTROPHES = re.compile(r"[`'ʻʼ‘’]")
+_WORD = re.compile(r"\w+")
+_PHONE_QUERY = re.compile(r"^[\d\s+\-()]+$")
+# Moslik turi bo'yicha ball (so'z ichidagi moslik eng pasti)
+_EXACT, _PREFIX, _INFIX = 3, 2, 1
+
+
+def normalize(text):
+    """Kichik harf, diakritikasiz, o'/g' dagi apostroflarsiz"""
+    text = unicodedata.normalize("NFKD", str(text or "")).casefold()
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _APOSTROPHES.sub("", text)
+
+
+def _field_words(field, value):
+    if field == "phone":
+        digits = "".join(ch for ch in str(value or "") if ch.isdigit())
+        return [digits] if digits else []
+    return _WORD.findall(normalize(value))
+
+
+def _grams(word):
+    # Boshiga ikki, oxiriga bitta bo'shliq: "  a", " al" - prefix so'rovlar uchun
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _query_grams(term):
+    if len(term) >= 3:
+        return {term[i:i + 3] for i in range(len(term) - 2)}
+    return {("  " + term)[-3:]}
+
+
+def query_terms(q):
+    q = str(q or "").strip()
+    if _PHONE_QUERY.match(q) and any(ch.isdigit() for ch in q):
+        return ["".join(ch for ch in q if ch.isdigit())]
+    return _WORD.findall(normalize(q))
+
+
+def parse_args(args):
+    """(so'rov, turlar, limit, offset) - noto'g'ri qiymatda ValueError"""
+    types = tuple(t.strip().rstrip("s") for t in args.get("type", "").split(",") if t.strip())
+    unknown = [t for t in types if t not in FIELDS]
+    if unknown:
+        raise ValueError(f"type quyidagilardan biri bo'lishi kerak: {', '.join(FIELDS)}")
+    try:
+        limit = int(args.get("limit") or DEFAULT_LIMIT)
+        offset = int(args.get("offset") or 0)
+    except ValueError:
+        raise ValueError("limit va offset butun son bo'lishi kerak")
+    if limit < 1 or offset < 0:
+        raise ValueError("limit musbat, offset manfiy bo'lmasligi kerak")
+    return args.get("q", ""), types or tuple(FIELDS), min(limit, MAX_LIMIT), offset
+
+
+def _top(scores, count):
+    """Eng yuqori `count` ta (ball, tur, id): ball kamayishi, teng ballda (tur, id) bo'yicha.
+
+    scores: {tur: {id: ball}}. Ballar bir nechta kichik butun son, shuning
+    uchun yozuvlar ball bo'yicha guruhlanadi va faqat sahifaga kiradigan
+    guruhlar tartiblanadi.
+    """
+    page = []
+    values = set()
+    for bucket in scores.values():
+        values.update(bucket.values())
+    for score in sorted(values, reverse=True):
+        for kind in sorted(scores):
+            need = count - len(page)
+            if need <= 0:
+                return page
+            ids = [i for i, value in scores[kind].items() if value == score]
+            try:
+                ids = heapq.nsmallest(need, ids)
+            except TypeError:   # int va str id lar aralash
+                ids = heapq.nsmallest(need, ids, key=str)
+            page.extend((score, kind, record_id) for record_id in ids)
+    return page
+
+
+class SearchIndex(IncrementalView):
+    """files: {fayl: tur} - masalan {"students.json": "student"}
+
+    Indeks ikki qavatli: trigramma -> so'zlar (lug'at) va so'z -> yozuvlar.
+    So'rov so'zi avval lug'atdan mos so'zlarni topadi (har bir so'z bir marta
+    tekshiriladi), keyin ularning yozuvlari ball bilan yig'iladi.
+    """
+
+    def __init__(self, store, files):
+        self.types = dict(files)
+        self._docs = {}       # (tur, id) -> {so'z: og'irlik}
+        self._postings = {}   # so'z -> {tur: {id: og'irlik}}
+        self._grams = {}      # trigramma -> {so'z}
+        super().__init__(store, self.types)
+
+    # ---------- holat ----------
+    def _reset(self, file):
+        kind = self.types[file]
+        for key in [k for k in self._docs if k[0] == kind]:
+            self._drop(key)
+
+    def _add(self, file, record):
+        kind = self.types[file]
+        key = (kind, record.get("id"))
+        self._drop(key)
+        words = {}
+        for field, weight in FIELDS[kind].items():
+            for word in _field_words(field, record.get(field)):
+                words[word] = max(weight, words.get(word, 0))
+        if not words:
+            return
+        self._docs[key] = words
+        for word, weight in words.items():
+            postings = self._postings.get(word)
+            if postings is None:
+                postings = self._postings[word] = {}
+                for gram in _grams(word):
+                    self._grams.setdefault(gram, set()).add(word)
+            postings.setdefault(kind, {})[key[1]] = weight
+
+    def _remove(self, file, record):
+        self._drop((self.types[file], record.get("id")))
+
+    def _drop(self, key):
+        words = self._docs.pop(key, None)
+        if words is None:
+            return
+        kind, record_id = key
+        for word in words:
+            postings = self._postings[word]
+            del postings[kind][record_id]
+            if not postings[kind]:
+                del postings[kind]
+            if postings:
+                continue
+            # So'z boshqa hech bir yozuvda yo'q - lug'atdan ham olinadi
+            del self._postings[word]
+            for gram in _grams(word):
+                self._grams[gram].discard(word)
+                if not self._grams[gram]:
+                    del self._grams[gram]
+
+    # ---------- so'rov ----------
+    def _words(self, term):
+        """Lug'atdagi mos so'zlar: [(so'z, moslik bali)]"""
+        postings = sorted((self._grams.get(g, ()) for g in _query_grams(term)), key=len)
+        if not postings[0]:
+            return []
+        words = set(postings[0]).intersection(*postings[1:])
+        matches = []
+        for word in words:
+            if word == term:
+                matches.append((word, _EXACT))
+            elif word.startswith(term):
+                matches.append((word, _PREFIX))
+            elif len(term) >= 3 and term in word:
+                matches.append((word, _INFIX))
+        return matches
+
+    def _term_scores(self, term, types):
+        """{tur: {id: shu so'z bo'yicha eng yaxshi ball}}"""
+        scores = {}
+        for word, match in self._words(term):
+            postings = self._postings[word]
+            for kind in types:
+                docs = postings.get(kind)
+                if not docs:
+                    continue
+                bucket = scores.get(kind)
+                if bucket is None:
+                    scores[kind] = {i: match * weight for i, weight in docs.items()}
+                    continue
+                for record_id, weight in docs.items():
+                    score = match * weight
+                    if score > bucket.get(record_id, 0):
+                        bucket[record_id] = score
+        return scores
+
+    def search(self, q, types=None, limit=DEFAULT_LIMIT, offset=0):
+        """(sahifa [(ball, tur, id)], jami mosliklar soni)"""
+        terms = query_terms(q)
+        if not terms:
+            return [], 0
+        types = set(types or FIELDS)
+        self.refresh()
+        with self._lock:
+            per_term = [self._term_scores(term, types) for term in terms]
+        # Barcha so'zlar mos kelishi kerak: har bir tur bo'yicha eng kichik natijadan kesishma
+        totals = {}
+        for kind in types:
+            buckets = sorted((scores.get(kind, {}) for scores in per_term), key=len)
+            bucket = buckets[0]
+            for other in buckets[1:]:
+                bucket = {i: score + other[i] for i, score in bucket.items() if i in other}
+            if bucket:
+                totals[kind] = bucket
+        total = sum(len(bucket) for bucket in totals.values())
+        return _top(totals, offset + limit)[offset:], total
@@ -1,10 +1,31 @@
-from flask import Flask, jsonify, request
+from flask import Blueprint, Flask, Response, current_app, jsonify, request, send_file, stream_with_context
 from flask_cors import CORS
-import json, os, time
-
-app = Flask(__name__)
-CORS(app)  # CORS ni qo'shish
-PORT = 5000
+import hmac, os, time
+from config import load_config
+from codec import CODEC, JsonProvider
+from storage import Storage
+from hydrate import Hydrator, parse_expand
+from query import ListQuery
+from caching import ConditionalGet, if_match, record_etag
+from streaming import stream_list
+from compression import Compressor
+import metrics
+import profiling
+import exports
+import snapshot
+import bulk
+from counters import Counters
+from reports import RevenueIndex
+from ledger import Ledger
+from ids import IdGenerator
+import search
+import schedule
+from changes import HEARTBEAT, STREAM_SECONDS, ChangeFeed, max_streams
+from auth import Hasher, HasherBusy, PhoneIndex, SessionStore, bearer_token, needs_rehash
+from jobs import JobQueue, JobsBusy
+
+# Barcha endpointlar; ilova create_app() da yig'iladi
+api = Blueprint("api", __name__)
 
 # Fayl manzillari
 TEACHERS_FILE = "teachers.json"
@@ -15,141 +36,467 @@ USERS_FILE = "users.json"
 TASKS_FILE = "tasks.json"
 COMPANIES_FILE = "companies.json"
 BRANCHES_FILE = "branches.json"
+LEDGER_FILE = "ledger.json"
+LEDGER_SNAPSHOT = "ledger.snapshot.json"
+
+COLLECTION_FILES = [
+    TEACHERS_FILE, STUDENTS_FILE, GROUPS_FILE, PAYMENTS_FILE,
+    USERS_FILE, TASKS_FILE, COMPANIES_FILE, BRANCHES_FILE, LEDGER_FILE
+]
+
+# Ombor va undan o'qiydigan indekslar - init_storage() da yaratiladi
+store = hydrator = id_generator = counters = revenue = ledger = None
+hasher = sessions = phone_index = search_index = feed = timetable = None
+# GET javoblari uchun ETag/Last-Modified (kolleksiya versiyalaridan); ombor init_storage() da beriladi
+conditional = ConditionalGet(None)
+# gzip/brotli; parametrsiz GET javoblari versiya bo'yicha siqilgan holda keshlanadi
+compressor = Compressor()
+# Route kechikishi, status kodlari va javob baytlari (/metrics)
+request_metrics = metrics.RequestMetrics()
+# Ixtiyoriy profillash (PROFILE_* sozlamalari) va admin tokeni - create_app() da
+profiler = None
+admin_token = ""
+# Og'ir eksportlar uchun fon joblari (JOBS_* sozlamalari) - create_app() da
+job_queue = None
+# Izchil snapshotlar (SNAPSHOT_* sozlamalari) - create_app() da
+snapshots = None
+SEARCH_FILES = {STUDENTS_FILE: "student", TEACHERS_FILE: "teacher", GROUPS_FILE: "group"}
+
+# Eng katta kolleksiyalar xotirada ustunlarda (COLUMNAR sozlamasi, qarang: columnar.py).
+# Takrorlanuvchi qiymatlar (holatlar, sanalar, ismlar) - enum; erkin matn (izoh) - str,
+# aks holda enum jadvali har bir noyob izoh bilan cheksiz o'sadi
+COLUMNAR_SCHEMAS = {
+    STUDENTS_FILE: {
+        "id": "int", "name": "str", "firstName": "enum", "lastName": "enum",
+        "groupId": "int", "group": "enum", "phone": "str", "status": "enum", "payment": "enum",
+        "joinDate": "enum", "balance": "number", "paymentStatus": "enum",
+        "branchId": "int", "companyId": "int",
+    },
+    PAYMENTS_FILE: {
+        "id": "int", "studentId": "int", "amount": "number", "paymentDate": "enum",
+        "paymentType": "enum", "description": "str", "createdAt": "str",
+        "groupId": "int", "branchId": "int", "companyId": "int",
+    },
+}
+
+# Dashboard hisoblagichlari: har bir yozuv qaysi sanoqlarga qancha qo'shadi
+def student_metrics(student):
+    yield "students", 1
+    if student.get("status") == "active":
+        yield "activeStudents", 1
+    yield ("studentsByPayment", student.get("payment") or "unknown"), 1
+    yield ("studentsByStatus", student.get("status") or "unknown"), 1
+
+def teacher_metrics(teacher):
+    yield "teachers", 1
+    if teacher.get("status") == "active":
+        yield "activeTeachers", 1
+
+def group_metrics(group):
+    yield "groups", 1
+    yield ("groupsByStatus", group.get("status") or "unknown"), 1
+
+def payment_metrics(payment):
+    yield "payments", 1
+    yield "revenue", payment.get("amount", 0) or 0
+    yield ("revenueByType", payment.get("paymentType") or "unknown"), payment.get("amount", 0) or 0
+
+def public_record(file, record):
+    """O'zgarishlar lentasidagi yozuv: foydalanuvchilar passwordsiz"""
+    if file == USERS_FILE:
+        return {k: v for k, v in record.items() if k != "password"}
+    return record
+
+def max_record_id():
+    """Barcha kolleksiyalardagi eng katta butun son id (IdGenerator floor i)"""
+    top = 0
+    for file in COLLECTION_FILES:
+        for record in store[file].all():
+            record_id = record.get("id")
+            if type(record_id) is int and record_id > top:
+                top = record_id
+    return top
+
+def init_storage(config):
+    """Ombor va indekslarni yaratadi (jarayonda bitta to'plam - endpointlar shularni ishlatadi)"""
+    global store, hydrator, id_generator, counters, revenue, ledger
+    global hasher, sessions, phone_index, search_index, feed, timetable
+    if store is not None:
+        store.close()
+    # JSON backendda kolleksiyalar xotirada saqlanadi, o'zgarishlar *.log fayllarga
+    # yoziladi; SQLite backendda esa indekslangan jadvallarda
+    store = Storage(config["DATA_DIR"], backend=config["STORAGE"], db_path=config["SQLITE_PATH"],
+                    compact_json=config["JSON_COMPACT"],
+                    schemas=COLUMNAR_SCHEMAS if config["COLUMNAR"] else None)
+    conditional.store = store
+    # Workerlar metrikalari shu papka orqali yig'iladi
+    metrics.REGISTRY.start(os.path.join(store.data_dir, "metrics"))
+    # Bog'lanishlar uchun id -> yozuv xaritalari (versiya bo'yicha keshlanadi)
+    hydrator = Hydrator(store)
+    # Yangi yozuvlar id si: vaqt + worker + tartib raqami (jarayonlar orasida ham noyob),
+    # eski yozuvlarning eng katta id sidan katta
+    id_generator = IdGenerator(store.data_dir, floor=max_record_id())
+    counters = Counters(store, {
+        STUDENTS_FILE: student_metrics,
+        TEACHERS_FILE: teacher_metrics,
+        GROUPS_FILE: group_metrics,
+        PAYMENTS_FILE: payment_metrics,
+    })
+    # To'lovlar: paymentDate bo'yicha indeks va kunlik/oylik tushum yig'indilari.
+    # Eski to'lovlarda groupId/branchId yo'q - ular studentdan olinadi
+    revenue = RevenueIndex(store, PAYMENTS_FILE, lambda p: store[STUDENTS_FILE].get(p.get("studentId")))
+    # To'lovlar daftari: studentlar balansi append-only yozuvlardan
+    ledger = Ledger(store, LEDGER_FILE, os.path.join(store.data_dir, LEDGER_SNAPSHOT))
+    # Parollar cheklangan pulda hashlanadi; sessiya tokenlari DATA_DIR/sessions da (TTL/LRU) -
+    # barcha workerlar uchun umumiy
+    hasher = Hasher()
+    sessions = SessionStore(os.path.join(store.data_dir, "sessions"))
+    # Student/teacher login uchun normallashtirilgan telefon indeksi
+    phone_index = PhoneIndex(store, (STUDENTS_FILE, TEACHERS_FILE))
+    # /search uchun trigramma indeksi (har bir yozishda yangilanadi)
+    search_index = search.SearchIndex(store, SEARCH_FILES)
+    # Dars jadvali: (o'qituvchi/xona, kun) bo'yicha intervallar - to'qnashuvlar va bo'sh vaqtlar
+    timetable = schedule.ScheduleIndex(store, GROUPS_FILE)
+    # /changes: har bir yozish lentaga tushadi (foydalanuvchilar passwordsiz).
+    # SSE ulanishlari oqim band qiladi - oddiy so'rovlar uchun oqimlar qoldiriladi
+    feed = ChangeFeed(store, COLLECTION_FILES, clean=public_record, streams=max_streams(config["THREADS"]))
+
+def preload():
+    """Kolleksiyalar va indekslarni oldindan yuklaydi.
+
+    gunicorn preload_app rejimida bu ota jarayonda bir marta bajariladi,
+    workerlar tayyor holatni fork orqali (copy-on-write) oladi.
+    """
+    for file in COLLECTION_FILES:
+        store[file].all()
+    for view in (counters, revenue, ledger, phone_index, search_index, timetable):
+        view.refresh()
+    hydrator.index(STUDENTS_FILE)
+    hydrator.index(TEACHERS_FILE)
+    feed.changes(None, feed.files())
+
+def after_fork():
+    """Fork qilingan workerda: lock fayllar, SQLite ulanishi, compaction oqimi, hash va job pullari qaytadan"""
+    if store is not None:
+        store.reset_after_fork()
+        hasher.reset_after_fork()
+    if job_queue is not None:
+        job_queue.reset_after_fork()
+    metrics.REGISTRY.reset_after_fork()
 
 # =====================
 #  Yordamchi funksiyalar
 # =====================
 def read_json(file):
-    if not os.path.exists(file):
-        with open(file, "w", encoding="utf-8") as f:
-            f.write("[]")
-    with open(file, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return store[file].all()
 
 def write_json(file, data):
-    with open(file, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    store[file].replace(data)
+
+def record_response(record, status=200):
+    """Bitta yozuv + uning ETag i (keyingi PUT/DELETE da If-Match uchun)"""
+    response = jsonify(record)
+    response.status_code = status
+    response.set_etag(record_etag(record))
+    return response
+
+def conflict_response(record):
+    response = jsonify({
+        "error": "Yozuv boshqa foydalanuvchi tomonidan o'zgartirilgan, sahifani yangilang",
+        "current": record
+    })
+    response.status_code = 409
+    response.set_etag(record_etag(record))
+    return response
+
+def update_record(file, record_id, changes, not_found):
+    """If-Match tekshiruvi bilan yangilash (tekshiruv va yozish bitta lock ostida)"""
+    with store.transaction(file):
+        current = store[file].get(record_id)
+        if current is None:
+            return jsonify({"error": not_found}), 404
+        if not if_match(current):
+            return conflict_response(current)
+        return record_response(store[file].update(record_id, changes))
+
+def delete_record(file, record_id, not_found, message):
+    """If-Match tekshiruvi bilan o'chirish"""
+    with store.transaction(file):
+        current = store[file].get(record_id)
+        if current is None:
+            return jsonify({"error": not_found}), 404
+        if not if_match(current):
+            return conflict_response(current)
+        store[file].delete(record_id)
+    return jsonify({"message": message})
+
+def schedule_conflict_response(conflicts):
+    """Guruh vaqti o'qituvchi (yoki xona) ning boshqa darsi bilan to'qnashadi"""
+    return jsonify({
+        "error": "Jadval to'qnashuvi: bu vaqtda o'qituvchi yoki xona band",
+        "conflicts": conflicts
+    }), 409
+
+def is_admin(req):
+    """X-Admin-Token (ADMIN_TOKEN sozlamasi); bo'sh bo'lsa admin funksiyalari o'chiq.
+
+    Sessiyadagi role yetarli emas: /admin/* (snapshotlar, profillar) va
+    X-Profile faqat server sozlamasidagi token bilan ochiladi.
+    """
+    token = req.headers.get("X-Admin-Token")
+    return bool(admin_token and token and hmac.compare_digest(token, admin_token))
+
+def bulk_response(ids, errors):
+    status = 201 if ids else 400
+    return jsonify({"inserted": len(ids), "failed": len(errors), "ids": ids, "errors": errors}), status
+
+def bulk_insert(file, check):
+    """JSON massiv yoki CSV dagi yozuvlarni bitta tranzaksiyada qo'shadi"""
+    try:
+        rows, errors = bulk.validate(bulk.iter_rows(request), check)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if errors and bulk.is_atomic(request.args):
+        return bulk_response([], errors)
+
+    with store.transaction(file):
+        ids = id_generator.next_ids(len(rows))
+        for new_id, (_, record) in zip(ids, rows):
+            record.pop("id", None)
+            store[file].insert({"id": new_id, **record})
+    return bulk_response(ids, errors)
+
+def payment_scope(student):
+    """To'lovga yoziladigan guruh/filial (hisobotlar kesimi uchun)"""
+    return {f: student[f] for f in ("groupId", "branchId", "companyId") if student.get(f) is not None}
+
+def ledger_append(student, entry_type, amount, ref_id=None, description=""):
+    """Ledger yozuvi (LEDGER_FILE tranzaksiyasi ichida chaqiriladi).
+
+    Student ledgerga birinchi marta tushayotgan bo'lsa, uning hozirgi balansi
+    "opening" yozuvi bo'lib oldindan qo'shiladi.
+    """
+    student_id = student["id"]
+    if not ledger.has(student_id) and student.get("balance"):
+        store[LEDGER_FILE].insert(ledger.entry(
+            id_generator.next_id(), student_id, "opening", student["balance"], description="Boshlang'ich balans"
+        ))
+    entry = ledger.entry(id_generator.next_id(), student_id, entry_type, amount, ref_id, description)
+    store[LEDGER_FILE].insert(entry)
+    return entry
+
+def sync_balance(student_id):
+    """students.json dagi balance/paymentStatus nusxasini ledger bilan tenglashtiradi"""
+    balance = ledger.balance(student_id)
+    if balance is None:
+        return None
+    return store[STUDENTS_FILE].update(student_id, {
+        "balance": balance,
+        "paymentStatus": "paid" if balance <= 0 else "unpaid"
+    })
+
+def list_response(records, query, hydrate=None, error="Ro'yxatni o'qishda xatolik"):
+    """Filtr, saralash, sahifalash va projection qo'llangan ro'yxat javobi.
+
+    Bog'lanishlar (hydrate) faqat qaytadigan sahifa uchun, yozuvlar kodlanib
+    yuborilayotgan paytda hisoblanadi. Umumiy soni X-Total-Count, keyingi
+    sahifa esa X-Next-Cursor sarlavhasida. Birinchi bo'lakkacha bo'lgan
+    xatolar - 500 va `error`; keyingilari oqim ichida (qarang: streaming.py).
+    """
+    try:
+        page, total, next_cursor = query.apply(records)
+        if hydrate:
+            page = hydrate(page)
+        headers = {"X-Total-Count": str(total)}
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+        return stream_list(query.project(page), headers)
+    except Exception:
+        current_app.logger.exception(error)
+        return jsonify({"error": error}), 500
 
 # =====================
 #  TEACHERS CRUD
 # =====================
-@app.route("/teachers", methods=["GET"])
+@api.route("/teachers", methods=["GET"])
+@conditional(TEACHERS_FILE)
 def get_teachers():
     try:
-        return jsonify(read_json(TEACHERS_FILE))
-    except:
-        return jsonify({"error": "O'qituvchilarni o'qishda xatolik"}), 500
+        query = ListQuery(request.args, ("status", "subject"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return list_response(read_json(TEACHERS_FILE), query, error="O'qituvchilarni o'qishda xatolik")
 
-@app.route("/teachers", methods=["POST"])
+@api.route("/teachers", methods=["POST"])
 def add_teacher():
     try:
-        teachers = read_json(TEACHERS_FILE)
-        new_teacher = {"id": int(time.time() * 1000), **request.json}
-        teachers.append(new_teacher)
-        write_json(TEACHERS_FILE, teachers)
-        return jsonify(new_teacher), 201
+        new_teacher = store[TEACHERS_FILE].insert({"id": id_generator.next_id(), **request.json})
+        return record_response(new_teacher, 201)
     except:
         return jsonify({"error": "O'qituvchi qo'shishda xatolik"}), 500
 
-@app.route("/teachers/<int:teacher_id>", methods=["PUT"])
+@api.route("/teachers/<int:teacher_id>", methods=["PUT"])
 def update_teacher(teacher_id):
-    teachers = read_json(TEACHERS_FILE)
-    for t in teachers:
-        if t["id"] == teacher_id:
-            t.update(request.json)
-            write_json(TEACHERS_FILE, teachers)
-            return jsonify(t)
-    return jsonify({"error": "O'qituvchi topilmadi"}), 404
-
-@app.route("/teachers/<int:teacher_id>", methods=["DELETE"])
+    return update_record(TEACHERS_FILE, teacher_id, request.json, "O'qituvchi topilmadi")
+
+@api.route("/teachers/<int:teacher_id>", methods=["DELETE"])
 def delete_teacher(teacher_id):
-    teachers = read_json(TEACHERS_FILE)
-    new_teachers = [t for t in teachers if t["id"] != teacher_id]
-    if len(new_teachers) == len(teachers):
-        return jsonify({"error": "O'qituvchi topilmadi"}), 404
-    write_json(TEACHERS_FILE, new_teachers)
-    return jsonify({"message": "✅ O'qituvchi o'chirildi"})
+    return delete_record(TEACHERS_FILE, teacher_id, "O'qituvchi topilmadi", "✅ O'qituvchi o'chirildi")
+
+@api.route("/teachers/bulk", methods=["POST"])
+def add_teachers_bulk():
+    """Ko'p o'qituvchini bitta so'rovda qo'shish (JSON massiv yoki CSV)"""
+    return bulk_insert(TEACHERS_FILE, bulk.teacher_row)
 
 # =====================
 #  STUDENTS CRUD
 # =====================
-@app.route("/students", methods=["GET"])
+@api.route("/students", methods=["GET"])
+@conditional(STUDENTS_FILE)
 def get_students():
     try:
-        return jsonify(read_json(STUDENTS_FILE))
-    except:
-        return jsonify({"error": "Studentlarni o'qishda xatolik"}), 500
+        query = ListQuery(request.args, ("status", "groupId", "group", "payment", "paymentStatus"), "joinDate")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return list_response(read_json(STUDENTS_FILE), query, error="Studentlarni o'qishda xatolik")
 
-@app.route("/students", methods=["POST"])
+@api.route("/students", methods=["POST"])
 def add_student():
-    students = read_json(STUDENTS_FILE)
-    new_student = {"id": int(time.time() * 1000), **request.json}
-    students.append(new_student)
-    write_json(STUDENTS_FILE, students)
-    return jsonify(new_student), 201
+    new_student = store[STUDENTS_FILE].insert({"id": id_generator.next_id(), **request.json})
+    return record_response(new_student, 201)
 
-@app.route("/students/<int:student_id>", methods=["PUT"])
+@api.route("/students/<int:student_id>", methods=["PUT"])
 def update_student(student_id):
-    students = read_json(STUDENTS_FILE)
-    for s in students:
-        if s["id"] == student_id:
-            s.update(request.json)
-            write_json(STUDENTS_FILE, students)
-            return jsonify(s)
-    return jsonify({"error": "Student topilmadi"}), 404
-
-@app.route("/students/<int:student_id>", methods=["DELETE"])
-def delete_student(student_id):
-    students = read_json(STUDENTS_FILE)
-    new_students = [s for s in students if s["id"] != student_id]
-    if len(new_students) == len(students):
+    changes = request.json or {}
+    if "balance" not in changes:
+        return update_record(STUDENTS_FILE, student_id, changes, "Student topilmadi")
+    try:
+        new_balance = round(float(changes["balance"] or 0), 2)
+    except (TypeError, ValueError):
+        return jsonify({"error": "balance son bo'lishi kerak"}), 400
+
+    # Balansni qo'lda o'zgartirish ledgerga tuzatish yozuvi bo'lib tushadi; saqlanadigan
+    # balance - ledgerdagi son (mijoz yuborgan satr emas), paymentStatus sync_balance dagi kabi
+    changes = {"paymentStatus": "paid" if new_balance <= 0 else "unpaid", **changes, "balance": new_balance}
+    with store.transaction(LEDGER_FILE, STUDENTS_FILE):
+        student = store[STUDENTS_FILE].get(student_id)
+        if student is not None and if_match(student):
+            current = ledger.balance(student_id)
+            if current is None:
+                current = float(student.get("balance") or 0)
+            diff = round(new_balance - current, 2)
+            if diff:
+                ledger_append(student, "adjustment", diff, description="Balans qo'lda o'zgartirildi")
+        return update_record(STUDENTS_FILE, student_id, changes, "Student topilmadi")
+
+@api.route("/students/<int:student_id>/ledger", methods=["GET"])
+@conditional(STUDENTS_FILE, LEDGER_FILE)
+def get_student_ledger(student_id):
+    """Studentning to'lov/hisob tarixi (har bir yozuvdan keyingi balans bilan), sahifalab"""
+    student = store[STUDENTS_FILE].get(student_id)
+    if not student:
         return jsonify({"error": "Student topilmadi"}), 404
-    write_json(STUDENTS_FILE, new_students)
-    return jsonify({"message": "✅ Student o'chirildi"})
+    try:
+        query = ListQuery(request.args, ("type",), "createdAt")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    running, history = 0, []
+    for entry in store[LEDGER_FILE].find_by("studentId", student_id):
+        running += entry.get("delta") or 0
+        history.append({**entry, "balance": round(running, 2)})
+
+    page, total, next_cursor = query.apply(history)
+    headers = {"X-Total-Count": str(total)}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    balance = ledger.balance(student_id)
+    return jsonify({
+        "studentId": student_id,
+        "balance": student.get("balance", 0) if balance is None else balance,
+        "entries": list(query.project(page))
+    }), 200, headers
+
+@api.route("/students/<int:student_id>/charges", methods=["POST"])
+def add_student_charge(student_id):
+    """Studentga to'lov hisoblash (oylik to'lov va h.k.) - balansni oshiradi"""
+    data = request.json or {}
+    try:
+        amount = float(data.get("amount"))
+    except (TypeError, ValueError):
+        return jsonify({"error": "amount son bo'lishi kerak"}), 400
+    if amount <= 0:
+        return jsonify({"error": "amount musbat bo'lishi kerak"}), 400
+
+    with store.transaction(LEDGER_FILE, STUDENTS_FILE):
+        student = store[STUDENTS_FILE].get(student_id)
+        if not student:
+            return jsonify({"error": "Student topilmadi"}), 404
+        entry = ledger_append(student, "charge", amount, description=data.get("description", ""))
+        student = sync_balance(student_id)
+    ledger.maybe_snapshot()
+    return jsonify({**entry, "balance": student["balance"]}), 201
+
+@api.route("/students/<int:student_id>", methods=["DELETE"])
+def delete_student(student_id):
+    return delete_record(STUDENTS_FILE, student_id, "Student topilmadi", "✅ Student o'chirildi")
+
+@api.route("/students/bulk", methods=["POST"])
+def add_students_bulk():
+    """Ko'p studentni bitta so'rovda qo'shish (JSON massiv yoki CSV)"""
+    return bulk_insert(STUDENTS_FILE, bulk.student_row)
 
 # =====================
 #  GROUPS CRUD
 # =====================
-@app.route("/groups", methods=["GET"])
+@api.route("/groups", methods=["GET"])
+@conditional(GROUPS_FILE, TEACHERS_FILE, STUDENTS_FILE)
 def get_groups():
-    groups = read_json(GROUPS_FILE)
-    teachers = read_json(TEACHERS_FILE)
-    students = read_json(STUDENTS_FILE)
-
-    full_groups = []
-    for g in groups:
-        teacher = next((t for t in teachers if t["id"] == g.get("teacherId")), None)
-        group_students = [s for s in students if s.get("groupId") == g["id"]]
-        full_groups.append({
-            **g,
-            "teacherName": teacher["name"] if teacher else "O'qituvchi topilmadi",
-            "studentsCount": len(group_students),
-            "students": [s["id"] for s in group_students]
-        })
-    return jsonify(full_groups)
-
-@app.route("/groups/<int:group_id>", methods=["GET"])
+    """Guruhlar; ?expand=teacher,students qaysi bog'lanishlar qo'shilishini tanlaydi"""
+    try:
+        expand = parse_expand(request.args.get("expand"), ("teacher", "students"))
+        query = ListQuery(request.args, ("status", "teacherId"), "startDate")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    def hydrate(groups):
+        teachers = hydrator.index(TEACHERS_FILE) if "teacher" in expand else {}
+        students_by_group = hydrator.group(STUDENTS_FILE, "groupId") if "students" in expand else {}
+
+        for g in groups:
+            full = {**g}
+            if "teacher" in expand:
+                teacher = teachers.get(g.get("teacherId"))
+                full["teacherName"] = teacher["name"] if teacher else "O'qituvchi topilmadi"
+            if "students" in expand:
+                group_students = students_by_group.get(g["id"], [])
+                full["studentsCount"] = len(group_students)
+                full["students"] = [s["id"] for s in group_students]
+            yield full
+
+    return list_response(read_json(GROUPS_FILE), query, hydrate)
+
+@api.route("/groups/<int:group_id>", methods=["GET"])
+@conditional(GROUPS_FILE, TEACHERS_FILE, STUDENTS_FILE)
 def get_group(group_id):
-    groups = read_json(GROUPS_FILE)
-    group = next((g for g in groups if g["id"] == group_id), None)
+    group = store[GROUPS_FILE].get(group_id)
     if not group:
         return jsonify({"error": "Guruh topilmadi"}), 404
 
-    students = read_json(STUDENTS_FILE)
-    teachers = read_json(TEACHERS_FILE)
-    group_students = [s for s in students if s.get("groupId") == group_id]
-    teacher = next((t for t in teachers if t["id"] == group.get("teacherId")), None)
+    group_students = store[STUDENTS_FILE].find_by("groupId", group_id)
+    teacher = store[TEACHERS_FILE].get(group.get("teacherId"))
 
     return jsonify({**group, "students": group_students, "teacher": teacher})
 
-@app.route("/groups", methods=["POST"])
+@api.route("/groups", methods=["POST"])
 def add_group():
-    groups = read_json(GROUPS_FILE)
-    students = read_json(STUDENTS_FILE)
-
     data = request.json
+    try:
+        schedule.validate(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     new_group = {
-        "id": int(time.time() * 1000),
+        "id": id_generator.next_id(),
         "name": data.get("name"),
         "teacherId": int(data.get("teacherId")),
         "schedule": data.get("schedule"),
@@ -160,30 +507,60 @@ def add_group():
         "students": data.get("studentIds", []),
         "studentsCount": len(data.get("studentIds", []))
     }
+    for field in ("branchId", "room"):
+        if data.get(field) is not None:
+            new_group[field] = data[field]
+
+    # Guruh va uning studentlari birga saqlanadi; jadval tekshiruvi shu lock ostida
+    with store.transaction(GROUPS_FILE, STUDENTS_FILE):
+        conflicts = timetable.conflicts(new_group)
+        if conflicts:
+            return schedule_conflict_response(conflicts)
+        for sid in data.get("studentIds", []):
+            store[STUDENTS_FILE].update(sid, {"groupId": new_group["id"], "group": new_group["name"]})
+
+        store[GROUPS_FILE].insert(new_group)
+
+    return record_response(new_group, 201)
+
+@api.route("/groups/<int:group_id>", methods=["PUT"])
+def update_group(group_id):
+    changes = dict(request.json or {})
+    changes.pop("id", None)
+    try:
+        if changes.get("teacherId") is not None:
+            changes["teacherId"] = int(changes["teacherId"])
+    except (TypeError, ValueError):
+        return jsonify({"error": "teacherId butun son bo'lishi kerak"}), 400
+    try:
+        schedule.validate(changes)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    for sid in data.get("studentIds", []):
-        for s in students:
-            if s["id"] == sid:
-                s["groupId"] = new_group["id"]
-                s["group"] = new_group["name"]
-    write_json(STUDENTS_FILE, students)
-
-    groups.append(new_group)
-    write_json(GROUPS_FILE, groups)
-
-    return jsonify(new_group), 201
-
-@app.route("/groups/<int:group_id>", methods=["DELETE"])
+    with store.transaction(GROUPS_FILE, STUDENTS_FILE):
+        current = store[GROUPS_FILE].get(group_id)
+        if current is None:
+            return jsonify({"error": "Guruh topilmadi"}), 404
+        if not if_match(current):
+            return conflict_response(current)
+        # Faqat vaqt/o'qituvchi o'zgarsa tekshiriladi: eski to'qnashuvlar boshqa tahrirlarni to'smaydi
+        if schedule.lessons(current) != schedule.lessons({**current, **changes}):
+            conflicts = timetable.conflicts({**current, **changes})
+            if conflicts:
+                return schedule_conflict_response(conflicts)
+
+        group = store[GROUPS_FILE].update(group_id, changes)
+        if group.get("name") != current.get("name"):
+            for student in store[STUDENTS_FILE].find_by("groupId", group_id):
+                store[STUDENTS_FILE].update(student["id"], {"group": group.get("name")})
+    return record_response(group)
+
+@api.route("/groups/<int:group_id>", methods=["DELETE"])
 def delete_group(group_id):
-    groups = read_json(GROUPS_FILE)
-    new_groups = [g for g in groups if g["id"] != group_id]
-    if len(new_groups) == len(groups):
-        return jsonify({"error": "Guruh topilmadi"}), 404
-    write_json(GROUPS_FILE, new_groups)
-    return jsonify({"message": "✅ Guruh o'chirildi"})
+    return delete_record(GROUPS_FILE, group_id, "Guruh topilmadi", "✅ Guruh o'chirildi")
 
 
-@app.route("/groups/<int:group_id>/add-student", methods=["PUT"])
+@api.route("/groups/<int:group_id>/add-student", methods=["PUT"])
 def add_student_to_group(group_id):
     """
     Guruhga student qo'shish
@@ -193,47 +570,47 @@ def add_student_to_group(group_id):
         data = request.json or {}
         student_id = int(data.get("studentId"))
 
-        groups = read_json(GROUPS_FILE)
-        students = read_json(STUDENTS_FILE)
-
-        group = next((g for g in groups if g["id"] == group_id), None)
-        if not group:
-            return jsonify({"error": "Guruh topilmadi"}), 404
-
-        student = next((s for s in students if s["id"] == student_id), None)
-        if not student:
-            return jsonify({"error": "Student topilmadi"}), 404
+        # Guruh va student birga o'zgaradi: boshqa worker orada yoza olmaydi
+        with store.transaction(GROUPS_FILE, STUDENTS_FILE):
+            group = store[GROUPS_FILE].get(group_id)
+            if not group:
+                return jsonify({"error": "Guruh topilmadi"}), 404
+            if not if_match(group):
+                return conflict_response(group)
 
-        # students ro'yxati bo'lmasa, yaratib olamiz
-        group.setdefault("students", [])
-        group.setdefault("capacity", 0)
+            if not store[STUDENTS_FILE].get(student_id):
+                return jsonify({"error": "Student topilmadi"}), 404
 
-        if student_id in group["students"]:
-            return jsonify({"error": "Student allaqachon ushbu guruhda"}), 400
+            # students ro'yxati bo'lmasa, yaratib olamiz
+            group_students = list(group.get("students") or [])
 
-        if len(group["students"]) >= int(group.get("capacity") or 0):
-            return jsonify({"error": "Guruh to'ligan"}), 400
+            if student_id in group_students:
+                return jsonify({"error": "Student allaqachon ushbu guruhda"}), 400
 
-        # Guruhga qo'shish
-        group["students"].append(student_id)
-        group["studentsCount"] = len(group["students"])
+            if len(group_students) >= int(group.get("capacity") or 0):
+                return jsonify({"error": "Guruh to'ligan"}), 400
 
-        # Student ma'lumotlarini yangilash
-        student["groupId"] = group_id
-        student["group"] = group.get("name")
+            # Guruhga qo'shish
+            group_students.append(student_id)
+            group = store[GROUPS_FILE].update(group_id, {
+                "students": group_students,
+                "studentsCount": len(group_students)
+            })
 
-        write_json(GROUPS_FILE, groups)
-        write_json(STUDENTS_FILE, students)
+            # Student ma'lumotlarini yangilash
+            store[STUDENTS_FILE].update(student_id, {"groupId": group_id, "group": group.get("name")})
 
-        return jsonify({
-            "message": "✅ Student guruhga qo'shildi",
-            "group": group
-        })
+            response = jsonify({
+                "message": "✅ Student guruhga qo'shildi",
+                "group": group
+            })
+            response.set_etag(record_etag(group))
+            return response
     except Exception as e:
         return jsonify({"error": f"Studentni guruhga qo'shishda xatolik: {str(e)}"}), 500
 
 
-@app.route("/groups/<int:group_id>/remove-student", methods=["PUT"])
+@api.route("/groups/<int:group_id>/remove-student", methods=["PUT"])
 def remove_student_from_group(group_id):
     """
     Guruhdan studentni o'chirish
@@ -243,63 +620,75 @@ def remove_student_from_group(group_id):
         data = request.json or {}
         student_id = int(data.get("studentId"))
 
-        groups = read_json(GROUPS_FILE)
-        students = read_json(STUDENTS_FILE)
-
-        group = next((g for g in groups if g["id"] == group_id), None)
-        if not group:
-            return jsonify({"error": "Guruh topilmadi"}), 404
-
-        student = next((s for s in students if s["id"] == student_id), None)
-        if not student:
-            return jsonify({"error": "Student topilmadi"}), 404
-
-        group.setdefault("students", [])
-        if student_id not in group["students"]:
-            return jsonify({"error": "Student ushbu guruhda emas"}), 400
-
-        # Guruhdan o'chirish
-        group["students"] = [sid for sid in group["students"] if sid != student_id]
-        group["studentsCount"] = len(group["students"])
-
-        # Student ma'lumotlarini yangilash
-        student["groupId"] = None
-        student["group"] = None
+        # Guruh va student birga o'zgaradi: boshqa worker orada yoza olmaydi
+        with store.transaction(GROUPS_FILE, STUDENTS_FILE):
+            group = store[GROUPS_FILE].get(group_id)
+            if not group:
+                return jsonify({"error": "Guruh topilmadi"}), 404
+            if not if_match(group):
+                return conflict_response(group)
+
+            if not store[STUDENTS_FILE].get(student_id):
+                return jsonify({"error": "Student topilmadi"}), 404
+
+            group_students = group.get("students") or []
+            if student_id not in group_students:
+                return jsonify({"error": "Student ushbu guruhda emas"}), 400
+
+            # Guruhdan o'chirish
+            group_students = [sid for sid in group_students if sid != student_id]
+            group = store[GROUPS_FILE].update(group_id, {
+                "students": group_students,
+                "studentsCount": len(group_students)
+            })
 
-        write_json(GROUPS_FILE, groups)
-        write_json(STUDENTS_FILE, students)
+            # Student ma'lumotlarini yangilash
+            store[STUDENTS_FILE].update(student_id, {"groupId": None, "group": None})
 
-        return jsonify({
-            "message": "✅ Student guruhdan o'chirildi",
-            "group": group
-        })
+            response = jsonify({
+                "message": "✅ Student guruhdan o'chirildi",
+                "group": group
+            })
+            response.set_etag(record_etag(group))
+            return response
     except Exception as e:
         return jsonify({"error": f"Studentni guruhdan o'chirishda xatolik: {str(e)}"}), 500
 
 # =====================
 #  PAYMENTS CRUD
 # =====================
-@app.route("/payments", methods=["GET"])
+@api.route("/payments", methods=["GET"])
+@conditional(PAYMENTS_FILE, STUDENTS_FILE)
 def get_payments():
-    payments = read_json(PAYMENTS_FILE)
-    students = read_json(STUDENTS_FILE)
-    result = []
-    for p in payments:
-        student = next((s for s in students if s["id"] == p["studentId"]), None)
-        result.append({
-            **p,
-            "studentName": f"{student.get('firstName','')} {student.get('lastName','')}" if student else "Noma'lum"
-        })
-    return jsonify(result)
-
-@app.route("/payments", methods=["POST"])
-def add_payment():
-    payments = read_json(PAYMENTS_FILE)
-    students = read_json(STUDENTS_FILE)
+    """To'lovlar; ?expand=student studentName qo'shadi (standart)"""
+    try:
+        expand = parse_expand(request.args.get("expand"), ("student",))
+        query = ListQuery(request.args, ("studentId", "paymentType"), "paymentDate")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    def hydrate(payments):
+        students = hydrator.index(STUDENTS_FILE)
+        for p in payments:
+            student = students.get(p["studentId"])
+            yield {
+                **p,
+                "studentName": f"{student.get('firstName','')} {student.get('lastName','')}" if student else "Noma'lum"
+            }
+
+    if query.date_from or query.date_to:
+        # Sana oralig'i indeksdan (bisect) - barcha to'lovlar ko'rib chiqilmaydi
+        payments = store[PAYMENTS_FILE]
+        records = [p for p in map(payments.get, revenue.between(query.date_from, query.date_to)) if p]
+    else:
+        records = read_json(PAYMENTS_FILE)
+    return list_response(records, query, hydrate if "student" in expand else None)
 
+@api.route("/payments", methods=["POST"])
+def add_payment():
     data = request.json
     new_payment = {
-        "id": int(time.time() * 1000),
+        "id": id_generator.next_id(),
         "studentId": int(data["studentId"]),
         "amount": float(data["amount"]),
         "paymentDate": data["paymentDate"],
@@ -308,20 +697,77 @@ def add_payment():
         "createdAt": time.strftime("%Y-%m-%d %H:%M:%S")
     }
 
-    for s in students:
-        if s["id"] == new_payment["studentId"]:
-            s["balance"] = s.get("balance", 0) - new_payment["amount"]
-            s["paymentStatus"] = "paid" if s["balance"] <= 0 else "unpaid"
-    write_json(STUDENTS_FILE, students)
+    # To'lov, ledger yozuvi va balans nusxasi bitta tranzaksiyada
+    with store.transaction(LEDGER_FILE, PAYMENTS_FILE, STUDENTS_FILE):
+        student = store[STUDENTS_FILE].get(new_payment["studentId"])
+        if student:
+            # Hisobotlar to'lov paytidagi guruh/filial bo'yicha yuritiladi
+            new_payment.update(payment_scope(student))
+
+        store[PAYMENTS_FILE].insert(new_payment)
+
+        if student:
+            ledger_append(student, "payment", new_payment["amount"], new_payment["id"], new_payment["description"])
+            sync_balance(student["id"])
+    ledger.maybe_snapshot()
+    return record_response(new_payment, 201)
 
-    payments.append(new_payment)
-    write_json(PAYMENTS_FILE, payments)
-    return jsonify(new_payment), 201
+@api.route("/payments/bulk", methods=["POST"])
+def add_payments_bulk():
+    """Ko'p to'lovni bitta so'rovda qo'shish; balanslar har bir student uchun bir marta yangilanadi"""
+    try:
+        rows, errors = bulk.validate(bulk.iter_rows(request), bulk.payment_row)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    created_at = time.strftime("%Y-%m-%d %H:%M:%S")
+    with store.transaction(LEDGER_FILE, PAYMENTS_FILE, STUDENTS_FILE):
+        students = store[STUDENTS_FILE]
+        valid = []
+        for number, payment in rows:
+            if students.get(payment["studentId"]) is None:
+                errors.append({"row": number, "error": "Student topilmadi"})
+            else:
+                valid.append(payment)
+        errors.sort(key=lambda e: e["row"])
+        if errors and bulk.is_atomic(request.args):
+            return bulk_response([], errors)
+
+        ids = id_generator.next_ids(len(valid))
+        touched = {}
+        for new_id, payment in zip(ids, valid):
+            student = touched.get(payment["studentId"]) or students.get(payment["studentId"])
+            touched[student["id"]] = student
+            store[PAYMENTS_FILE].insert({"id": new_id, **payment, "createdAt": created_at, **payment_scope(student)})
+            ledger_append(student, "payment", payment["amount"], new_id, payment["description"])
+
+        # Balans nusxasi har bir student uchun bir marta
+        for student_id in touched:
+            sync_balance(student_id)
+    ledger.maybe_snapshot()
+    return bulk_response(ids, errors)
 
 # =====================
 #  AUTHENTICATION CRUD
 # =====================
-@app.route("/auth/login", methods=["POST"])
+def session_response(user_response, message="Muvaffaqiyatli kirildi"):
+    """Login javobi: foydalanuvchi (passwordsiz) va yangi sessiya tokeni"""
+    return jsonify({
+        "success": True,
+        "user": user_response,
+        "token": sessions.create(user_response),
+        "expiresIn": sessions.ttl,
+        "message": message
+    }), 200
+
+def upgrade_password(user, password_hash):
+    """Parol hashini yangilash (shu orada parol o'zgarmagan bo'lsa)"""
+    with store.transaction(USERS_FILE):
+        current = store[USERS_FILE].get(user["id"])
+        if current and current.get("password") == user.get("password"):
+            store[USERS_FILE].update(user["id"], {"password": password_hash})
+
+@api.route("/auth/login", methods=["POST"])
 def login():
     try:
         data = request.json
@@ -331,25 +777,43 @@ def login():
         if not username or not password:
             return jsonify({"error": "Username va password kiritilishi shart"}), 400
         
-        users = read_json(USERS_FILE)
-        user = next((u for u in users if u.get("username") == username and u.get("password") == password), None)
+        # username bo'yicha hash indeks; parol tekshiruvi hash pulida
+        users = store[USERS_FILE].find_by("username", username)
+        user = next((u for u in users if hasher.verify(password, u.get("password"))), None)
         
         if not user:
             return jsonify({"error": "Noto'g'ri username yoki password"}), 401
         
+        # Eski ochiq parol (yoki eski parametrlar bilan hash) - yangisiga o'tkazish
+        if needs_rehash(user.get("password")):
+            upgrade_password(user, hasher.hash(password))
+        
         # Passwordni qaytarmaslik
         user_response = {**user}
         user_response.pop("password", None)
         
-        return jsonify({
-            "success": True,
-            "user": user_response,
-            "message": "Muvaffaqiyatli kirildi"
-        }), 200
+        return session_response(user_response)
+    except HasherBusy as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
     except Exception as e:
         return jsonify({"error": f"Login xatolik: {str(e)}"}), 500
 
-@app.route("/auth/register", methods=["POST"])
+@api.route("/auth/me", methods=["GET"])
+def auth_me():
+    """Token egasi (Authorization: Bearer <token>)"""
+    session = sessions.get(bearer_token(request))
+    if session is None:
+        return jsonify({"error": "Avtorizatsiya talab qilinadi"}), 401
+    return jsonify({"success": True, "user": session["user"], "expiresAt": session["expiresAt"]})
+
+@api.route("/auth/logout", methods=["POST"])
+def logout():
+    """Tokenni bekor qilish"""
+    if not sessions.revoke(bearer_token(request)):
+        return jsonify({"error": "Sessiya topilmadi"}), 401
+    return jsonify({"success": True, "message": "Tizimdan chiqildi"})
+
+@api.route("/auth/register", methods=["POST"])
 def register():
     try:
         data = request.json
@@ -364,23 +828,24 @@ def register():
         if role not in ["admin", "company", "branch", "teacher", "student"]:
             return jsonify({"error": "Noto'g'ri role"}), 400
         
-        users = read_json(USERS_FILE)
-        
-        # Username takrorlanmasligini tekshirish
-        if any(u.get("username") == username for u in users):
-            return jsonify({"error": "Bu username allaqachon mavjud"}), 400
+        # Ro'yxatdan o'tish ochiq - admin foydalanuvchini faqat admin token egasi yaratadi
+        if role == "admin" and not is_admin(request):
+            return jsonify({"error": "Admin foydalanuvchini faqat admin yaratishi mumkin"}), 403
         
         new_user = {
-            "id": int(time.time() * 1000),
+            "id": id_generator.next_id(),
             "username": username,
-            "password": password,
+            "password": hasher.hash(password),
             "role": role,
             "name": name,
             "createdAt": time.strftime("%Y-%m-%d %H:%M:%S")
         }
         
-        users.append(new_user)
-        write_json(USERS_FILE, users)
+        # Username takrorlanmasligini tekshirish (tekshiruv va yozish bitta lock ostida)
+        with store.transaction(USERS_FILE):
+            if store[USERS_FILE].find_by("username", username):
+                return jsonify({"error": "Bu username allaqachon mavjud"}), 400
+            store[USERS_FILE].insert(new_user)
         
         # Passwordni qaytarmaslik
         user_response = {**new_user}
@@ -391,23 +856,26 @@ def register():
             "user": user_response,
             "message": "Foydalanuvchi muvaffaqiyatli ro'yxatdan o'tdi"
         }), 201
+    except HasherBusy as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
     except Exception as e:
         return jsonify({"error": f"Ro'yxatdan o'tish xatolik: {str(e)}"}), 500
 
-@app.route("/users", methods=["GET"])
+@api.route("/users", methods=["GET"])
+@conditional(USERS_FILE)
 def get_users():
     try:
-        users = read_json(USERS_FILE)
-        # Passwordlarni olib tashlash
-        safe_users = [{k: v for k, v in u.items() if k != "password"} for u in users]
-        return jsonify(safe_users)
-    except:
-        return jsonify({"error": "Foydalanuvchilarni o'qishda xatolik"}), 500
+        query = ListQuery(request.args, ("role", "companyId", "branchId"), "createdAt")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    # Passwordlarni olib tashlash (sort=password ham ishlamasligi uchun oldinroq)
+    safe_users = [{k: v for k, v in u.items() if k != "password"} for u in read_json(USERS_FILE)]
+    return list_response(safe_users, query, error="Foydalanuvchilarni o'qishda xatolik")
 
 # =====================
 #  STUDENT va TEACHER LOGIN (Telefon va Ism bilan)
 # =====================
-@app.route("/auth/login/student", methods=["POST"])
+@api.route("/auth/login/student", methods=["POST"])
 def login_student():
     """Student login - telefon raqami va ism bilan"""
     try:
@@ -418,8 +886,7 @@ def login_student():
         if not phone or not name:
             return jsonify({"error": "Telefon raqami va ism kiritilishi shart"}), 400
         
-        students = read_json(STUDENTS_FILE)
-        student = next((s for s in students if s.get("phone") == phone and s.get("name") == name), None)
+        student = next((s for s in phone_index.find(STUDENTS_FILE, phone) if s.get("name") == name), None)
         
         if not student:
             return jsonify({"error": "Noto'g'ri telefon raqami yoki ism"}), 401
@@ -435,15 +902,11 @@ def login_student():
             "status": student.get("status")
         }
         
-        return jsonify({
-            "success": True,
-            "user": user_response,
-            "message": "Muvaffaqiyatli kirildi"
-        }), 200
+        return session_response(user_response)
     except Exception as e:
         return jsonify({"error": f"Login xatolik: {str(e)}"}), 500
 
-@app.route("/auth/login/teacher", methods=["POST"])
+@api.route("/auth/login/teacher", methods=["POST"])
 def login_teacher():
     """Teacher login - telefon raqami va ism bilan"""
     try:
@@ -454,8 +917,7 @@ def login_teacher():
         if not phone or not name:
             return jsonify({"error": "Telefon raqami va ism kiritilishi shart"}), 400
         
-        teachers = read_json(TEACHERS_FILE)
-        teacher = next((t for t in teachers if t.get("phone") == phone and t.get("name") == name), None)
+        teacher = next((t for t in phone_index.find(TEACHERS_FILE, phone) if t.get("name") == name), None)
         
         if not teacher:
             return jsonify({"error": "Noto'g'ri telefon raqami yoki ism"}), 401
@@ -470,66 +932,60 @@ def login_teacher():
             "status": teacher.get("status")
         }
         
-        return jsonify({
-            "success": True,
-            "user": user_response,
-            "message": "Muvaffaqiyatli kirildi"
-        }), 200
+        return session_response(user_response)
     except Exception as e:
         return jsonify({"error": f"Login xatolik: {str(e)}"}), 500
 
 # =====================
 #  TASKS CRUD (Vazifalar)
 # =====================
-@app.route("/tasks", methods=["GET"])
+@api.route("/tasks", methods=["GET"])
+@conditional(TASKS_FILE, GROUPS_FILE, TEACHERS_FILE)
 def get_tasks():
-    """Barcha vazifalarni olish"""
+    """Barcha vazifalarni olish (?expand=group,teacher)"""
     try:
-        tasks = read_json(TASKS_FILE)
-        groups = read_json(GROUPS_FILE)
-        teachers = read_json(TEACHERS_FILE)
-        
+        expand = parse_expand(request.args.get("expand"), ("group", "teacher"))
+        query = ListQuery(request.args, ("status", "groupId", "teacherId"), "dueDate")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    def hydrate(tasks):
+        groups = hydrator.index(GROUPS_FILE) if "group" in expand else {}
+        teachers = hydrator.index(TEACHERS_FILE) if "teacher" in expand else {}
+
         # Guruh va o'qituvchi ma'lumotlarini qo'shish
-        full_tasks = []
         for task in tasks:
-            group = next((g for g in groups if g["id"] == task.get("groupId")), None)
-            teacher = next((t for t in teachers if t["id"] == task.get("teacherId")), None)
-            
-            full_tasks.append({
-                **task,
-                "groupName": group.get("name") if group else "Noma'lum",
-                "teacherName": teacher.get("name") if teacher else "Noma'lum"
-            })
-        
-        return jsonify(full_tasks)
-    except Exception as e:
-        return jsonify({"error": f"Vazifalarni olishda xatolik: {str(e)}"}), 500
-
-@app.route("/tasks/group/<int:group_id>", methods=["GET"])
+            full = {**task}
+            if "group" in expand:
+                group = groups.get(task.get("groupId"))
+                full["groupName"] = group.get("name") if group else "Noma'lum"
+            if "teacher" in expand:
+                teacher = teachers.get(task.get("teacherId"))
+                full["teacherName"] = teacher.get("name") if teacher else "Noma'lum"
+            yield full
+    
+    return list_response(read_json(TASKS_FILE), query, hydrate, error="Vazifalarni olishda xatolik")
+
+@api.route("/tasks/group/<int:group_id>", methods=["GET"])
+@conditional(TASKS_FILE)
 def get_tasks_by_group(group_id):
     """Guruh bo'yicha vazifalarni olish"""
     try:
-        tasks = read_json(TASKS_FILE)
-        group_tasks = [t for t in tasks if t.get("groupId") == group_id]
-        return jsonify(group_tasks)
+        return stream_list(store[TASKS_FILE].find_by("groupId", group_id))
     except Exception as e:
         return jsonify({"error": f"Vazifalarni olishda xatolik: {str(e)}"}), 500
 
-@app.route("/tasks", methods=["POST"])
+@api.route("/tasks", methods=["POST"])
 def add_task():
     """Yangi vazifa qo'shish"""
     try:
         data = request.json
-        tasks = read_json(TASKS_FILE)
-        groups = read_json(GROUPS_FILE)
-        teachers = read_json(TEACHERS_FILE)
-        
         # Guruh va o'qituvchi mavjudligini tekshirish
-        group = next((g for g in groups if g["id"] == data.get("groupId")), None)
+        group = store[GROUPS_FILE].get(data.get("groupId"))
         if not group:
             return jsonify({"error": "Guruh topilmadi"}), 404
         
-        teacher = next((t for t in teachers if t["id"] == data.get("teacherId")), None)
+        teacher = store[TEACHERS_FILE].get(data.get("teacherId"))
         if not teacher:
             return jsonify({"error": "O'qituvchi topilmadi"}), 404
         
@@ -538,7 +994,7 @@ def add_task():
             return jsonify({"error": "O'qituvchi ushbu guruhga tegishli emas"}), 403
         
         new_task = {
-            "id": int(time.time() * 1000),
+            "id": id_generator.next_id(),
             "groupId": int(data.get("groupId")),
             "teacherId": int(data.get("teacherId")),
             "title": data.get("title"),
@@ -548,66 +1004,48 @@ def add_task():
             "createdAt": time.strftime("%Y-%m-%d %H:%M:%S")
         }
         
-        tasks.append(new_task)
-        write_json(TASKS_FILE, tasks)
+        store[TASKS_FILE].insert(new_task)
         
-        return jsonify(new_task), 201
+        return record_response(new_task, 201)
     except Exception as e:
         return jsonify({"error": f"Vazifa qo'shishda xatolik: {str(e)}"}), 500
 
-@app.route("/tasks/<int:task_id>", methods=["PUT"])
+@api.route("/tasks/<int:task_id>", methods=["PUT"])
 def update_task(task_id):
     """Vazifani yangilash"""
     try:
-        tasks = read_json(TASKS_FILE)
-        task = next((t for t in tasks if t["id"] == task_id), None)
-        
-        if not task:
-            return jsonify({"error": "Vazifa topilmadi"}), 404
-        
-        task.update(request.json)
-        write_json(TASKS_FILE, tasks)
-        
-        return jsonify(task)
+        return update_record(TASKS_FILE, task_id, request.json, "Vazifa topilmadi")
     except Exception as e:
         return jsonify({"error": f"Vazifani yangilashda xatolik: {str(e)}"}), 500
 
-@app.route("/tasks/<int:task_id>", methods=["DELETE"])
+@api.route("/tasks/<int:task_id>", methods=["DELETE"])
 def delete_task(task_id):
     """Vazifani o'chirish"""
     try:
-        tasks = read_json(TASKS_FILE)
-        new_tasks = [t for t in tasks if t["id"] != task_id]
-        
-        if len(new_tasks) == len(tasks):
-            return jsonify({"error": "Vazifa topilmadi"}), 404
-        
-        write_json(TASKS_FILE, new_tasks)
-        return jsonify({"message": "✅ Vazifa o'chirildi"})
+        return delete_record(TASKS_FILE, task_id, "Vazifa topilmadi", "✅ Vazifa o'chirildi")
     except Exception as e:
         return jsonify({"error": f"Vazifani o'chirishda xatolik: {str(e)}"}), 500
 
 # =====================
 #  COMPANIES CRUD
 # =====================
-@app.route("/companies", methods=["GET"])
+@api.route("/companies", methods=["GET"])
+@conditional(COMPANIES_FILE)
 def get_companies():
     """Barcha companylarni olish"""
     try:
-        companies = read_json(COMPANIES_FILE)
-        return jsonify(companies)
+        return stream_list(read_json(COMPANIES_FILE))
     except Exception as e:
         return jsonify({"error": f"Companylarni olishda xatolik: {str(e)}"}), 500
 
-@app.route("/companies", methods=["POST"])
+@api.route("/companies", methods=["POST"])
 def add_company():
     """Yangi company qo'shish (user yaratilmaydi - admin keyinchalik yaratadi)"""
     try:
         data = request.json
-        companies = read_json(COMPANIES_FILE)
         
         new_company = {
-            "id": int(time.time() * 1000),
+            "id": id_generator.next_id(),
             "name": data.get("name"),
             "address": data.get("address", ""),
             "phone": data.get("phone", ""),
@@ -616,92 +1054,73 @@ def add_company():
             "createdAt": time.strftime("%Y-%m-%d %H:%M:%S")
         }
         
-        companies.append(new_company)
-        write_json(COMPANIES_FILE, companies)
+        store[COMPANIES_FILE].insert(new_company)
         
-        return jsonify(new_company), 201
+        return record_response(new_company, 201)
     except Exception as e:
         return jsonify({"error": f"Company qo'shishda xatolik: {str(e)}"}), 500
 
-@app.route("/companies/<int:company_id>", methods=["PUT"])
+@api.route("/companies/<int:company_id>", methods=["PUT"])
 def update_company(company_id):
     """Companyni yangilash"""
     try:
-        companies = read_json(COMPANIES_FILE)
-        company = next((c for c in companies if c["id"] == company_id), None)
-        
-        if not company:
-            return jsonify({"error": "Company topilmadi"}), 404
-        
-        company.update(request.json)
-        write_json(COMPANIES_FILE, companies)
-        
-        return jsonify(company)
+        return update_record(COMPANIES_FILE, company_id, request.json, "Company topilmadi")
     except Exception as e:
         return jsonify({"error": f"Companyni yangilashda xatolik: {str(e)}"}), 500
 
-@app.route("/companies/<int:company_id>", methods=["DELETE"])
+@api.route("/companies/<int:company_id>", methods=["DELETE"])
 def delete_company(company_id):
     """Companyni o'chirish"""
     try:
-        companies = read_json(COMPANIES_FILE)
-        new_companies = [c for c in companies if c["id"] != company_id]
-        
-        if len(new_companies) == len(companies):
-            return jsonify({"error": "Company topilmadi"}), 404
-        
-        write_json(COMPANIES_FILE, new_companies)
-        return jsonify({"message": "✅ Company o'chirildi"})
+        return delete_record(COMPANIES_FILE, company_id, "Company topilmadi", "✅ Company o'chirildi")
     except Exception as e:
         return jsonify({"error": f"Companyni o'chirishda xatolik: {str(e)}"}), 500
 
 # =====================
 #  BRANCHES CRUD
 # =====================
-@app.route("/branches", methods=["GET"])
+@api.route("/branches", methods=["GET"])
+@conditional(BRANCHES_FILE, STUDENTS_FILE, TEACHERS_FILE, GROUPS_FILE)
 def get_branches():
     """Barcha branchlarni olish"""
     try:
-        branches = read_json(BRANCHES_FILE)
         company_id = request.args.get("companyId")
         
         if company_id:
-            branches = [b for b in branches if b.get("companyId") == int(company_id)]
+            branches = store[BRANCHES_FILE].find_by("companyId", int(company_id))
+        else:
+            branches = read_json(BRANCHES_FILE)
         
         # Har bir branch uchun statistikani qo'shish
-        students = read_json(STUDENTS_FILE)
-        teachers = read_json(TEACHERS_FILE)
-        groups = read_json(GROUPS_FILE)
-        
-        full_branches = []
-        for branch in branches:
-            # Branch statistikasini hisoblash (demo - keyinchalik branchId bo'yicha)
-            branch_students = len(students)  # Keyinchalik branchId bo'yicha filter qilish
-            branch_teachers = len(teachers)  # Keyinchalik branchId bo'yicha filter qilish
-            branch_groups = len(groups)  # Keyinchalik branchId bo'yicha filter qilish
-            
-            full_branches.append({
-                **branch,
-                "studentsCount": branch_students,
-                "teachersCount": branch_teachers,
-                "groupsCount": branch_groups
-            })
-        
-        return jsonify(full_branches)
+        students_count = len(store[STUDENTS_FILE])
+        teachers_count = len(store[TEACHERS_FILE])
+        groups_count = len(store[GROUPS_FILE])
+        
+        def with_stats(branches):
+            for branch in branches:
+                # Branch statistikasini hisoblash (demo - keyinchalik branchId bo'yicha)
+                branch_students = students_count  # Keyinchalik branchId bo'yicha filter qilish
+                branch_teachers = teachers_count  # Keyinchalik branchId bo'yicha filter qilish
+                branch_groups = groups_count  # Keyinchalik branchId bo'yicha filter qilish
+                
+                yield {
+                    **branch,
+                    "studentsCount": branch_students,
+                    "teachersCount": branch_teachers,
+                    "groupsCount": branch_groups
+                }
+        
+        return stream_list(with_stats(branches))
     except Exception as e:
         return jsonify({"error": f"Branchlarni olishda xatolik: {str(e)}"}), 500
 
-@app.route("/branches", methods=["POST"])
+@api.route("/branches", methods=["POST"])
 def add_branch():
     """Yangi branch qo'shish va avtomatik user yaratish"""
     try:
         data = request.json
-        branches = read_json(BRANCHES_FILE)
-        companies = read_json(COMPANIES_FILE)
-        users = read_json(USERS_FILE)
-        
         # Company mavjudligini tekshirish
-        company = next((c for c in companies if c["id"] == data.get("companyId")), None)
+        company = store[COMPANIES_FILE].get(data.get("companyId"))
         if not company:
             return jsonify({"error": "Company topilmadi"}), 404
         
@@ -711,39 +1130,41 @@ def add_branch():
         
         if not username or not password:
             return jsonify({"error": "Username va password kiritilishi shart"}), 400
+        # Hash lock olinishidan oldin hisoblanadi
+        password_hash = hasher.hash(password)
+        
+        # Branch va uning useri birga saqlanadi
+        with store.transaction(BRANCHES_FILE, USERS_FILE):
+            # Username takrorlanmasligini tekshirish
+            if store[USERS_FILE].find_by("username", username):
+                return jsonify({"error": "Bu username allaqachon mavjud"}), 400
+        
+            new_branch = {
+                "id": id_generator.next_id(),
+                "companyId": int(data.get("companyId")),
+                "name": data.get("name"),
+                "address": data.get("address", ""),
+                "phone": data.get("phone", ""),
+                "email": data.get("email", ""),
+                "status": data.get("status", "active"),
+                "createdAt": time.strftime("%Y-%m-%d %H:%M:%S")
+            }
         
-        # Username takrorlanmasligini tekshirish
-        if any(u.get("username") == username for u in users):
-            return jsonify({"error": "Bu username allaqachon mavjud"}), 400
-        
-        new_branch = {
-            "id": int(time.time() * 1000),
-            "companyId": int(data.get("companyId")),
-            "name": data.get("name"),
-            "address": data.get("address", ""),
-            "phone": data.get("phone", ""),
-            "email": data.get("email", ""),
-            "status": data.get("status", "active"),
-            "createdAt": time.strftime("%Y-%m-%d %H:%M:%S")
-        }
-        
-        branches.append(new_branch)
-        write_json(BRANCHES_FILE, branches)
+            store[BRANCHES_FILE].insert(new_branch)
         
-        # Avtomatik user yaratish
-        new_user = {
-            "id": int(time.time() * 1000) + 1,
-            "username": username,
-            "password": password,
-            "role": "branch",
-            "name": new_branch["name"],
-            "companyId": new_branch["companyId"],
-            "branchId": new_branch["id"],
-            "createdAt": time.strftime("%Y-%m-%d %H:%M:%S")
-        }
+            # Avtomatik user yaratish
+            new_user = {
+                "id": id_generator.next_id(),
+                "username": username,
+                "password": password_hash,
+                "role": "branch",
+                "name": new_branch["name"],
+                "companyId": new_branch["companyId"],
+                "branchId": new_branch["id"],
+                "createdAt": time.strftime("%Y-%m-%d %H:%M:%S")
+            }
         
-        users.append(new_user)
-        write_json(USERS_FILE, users)
+            store[USERS_FILE].insert(new_user)
         
         return jsonify({
             **new_branch,
@@ -752,69 +1173,421 @@ def add_branch():
                 "role": "branch"
             }
         }), 201
+    except HasherBusy as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
     except Exception as e:
         return jsonify({"error": f"Branch qo'shishda xatolik: {str(e)}"}), 500
 
-@app.route("/branches/<int:branch_id>", methods=["PUT"])
+@api.route("/branches/<int:branch_id>", methods=["PUT"])
 def update_branch(branch_id):
     """Branchni yangilash"""
     try:
-        branches = read_json(BRANCHES_FILE)
-        branch = next((b for b in branches if b["id"] == branch_id), None)
-        
-        if not branch:
-            return jsonify({"error": "Branch topilmadi"}), 404
-        
-        branch.update(request.json)
-        write_json(BRANCHES_FILE, branches)
-        
-        return jsonify(branch)
+        return update_record(BRANCHES_FILE, branch_id, request.json, "Branch topilmadi")
     except Exception as e:
         return jsonify({"error": f"Branchni yangilashda xatolik: {str(e)}"}), 500
 
-@app.route("/branches/<int:branch_id>", methods=["DELETE"])
+@api.route("/branches/<int:branch_id>", methods=["DELETE"])
 def delete_branch(branch_id):
     """Branchni o'chirish"""
     try:
-        branches = read_json(BRANCHES_FILE)
-        new_branches = [b for b in branches if b["id"] != branch_id]
-        
-        if len(new_branches) == len(branches):
-            return jsonify({"error": "Branch topilmadi"}), 404
-        
-        write_json(BRANCHES_FILE, new_branches)
-        return jsonify({"message": "✅ Branch o'chirildi"})
+        return delete_record(BRANCHES_FILE, branch_id, "Branch topilmadi", "✅ Branch o'chirildi")
     except Exception as e:
         return jsonify({"error": f"Branchni o'chirishda xatolik: {str(e)}"}), 500
 
-@app.route("/branches/<int:branch_id>/stats", methods=["GET"])
+@api.route("/branches/<int:branch_id>/stats", methods=["GET"])
+@conditional(STUDENTS_FILE, TEACHERS_FILE, GROUPS_FILE, PAYMENTS_FILE)
 def get_branch_stats(branch_id):
     """Branch statistikasini olish"""
     try:
-        students = read_json(STUDENTS_FILE)
-        teachers = read_json(TEACHERS_FILE)
-        groups = read_json(GROUPS_FILE)
-        payments = read_json(PAYMENTS_FILE)
+        totals = counters.totals()
         
-        # Keyinchalik branchId bo'yicha filter qilish
+        # Keyinchalik branchId bo'yicha filter qilish (counters.totals(branch_id=...))
         # Hozircha demo ma'lumotlar
         stats = {
-            "students": len(students),
-            "teachers": len(teachers),
-            "groups": len(groups),
-            "totalRevenue": sum(p.get("amount", 0) for p in payments),
-            "activeStudents": len([s for s in students if s.get("status") == "active"])
+            "students": totals["students"],
+            "teachers": totals["teachers"],
+            "groups": totals["groups"],
+            "totalRevenue": round(float(totals["revenue"]), 2),
+            "activeStudents": totals["activeStudents"]
         }
         
         return jsonify(stats)
     except Exception as e:
         return jsonify({"error": f"Statistikani olishda xatolik: {str(e)}"}), 500
 
+# =====================
+#  DASHBOARD
+# =====================
+@api.route("/dashboard/summary", methods=["GET"])
+@conditional(STUDENTS_FILE, TEACHERS_FILE, GROUPS_FILE, PAYMENTS_FILE)
+def get_dashboard_summary():
+    """Dashboard uchun jamlangan statistika; ?companyId=&branchId= bo'yicha"""
+    try:
+        company_id = int(request.args["companyId"]) if request.args.get("companyId") else None
+        branch_id = int(request.args["branchId"]) if request.args.get("branchId") else None
+    except ValueError:
+        return jsonify({"error": "companyId va branchId butun son bo'lishi kerak"}), 400
+
+    totals = counters.totals(company_id, branch_id)
+    summary = {
+        "students": totals["students"],
+        "activeStudents": totals["activeStudents"],
+        "teachers": totals["teachers"],
+        "activeTeachers": totals["activeTeachers"],
+        "groups": totals["groups"],
+        "payments": totals["payments"],
+        "revenue": round(float(totals["revenue"]), 2),
+    }
+    # ("studentsByPayment", "paid") -> {"studentsByPayment": {"paid": ...}}
+    for (group, name), value in ((k, v) for k, v in totals.items() if isinstance(k, tuple)):
+        if value:
+            summary.setdefault(group, {})[name] = round(value, 2) if isinstance(value, float) else value
+    for group in ("studentsByPayment", "studentsByStatus", "groupsByStatus", "revenueByType"):
+        summary.setdefault(group, {})
+    paid = summary["studentsByPayment"].get("paid", 0)
+    summary["paymentRate"] = round(paid * 100 / summary["students"]) if summary["students"] else 0
+    return jsonify(summary)
+
+# =====================
+#  LEDGER
+# =====================
+@api.route("/ledger/snapshot", methods=["POST"])
+def create_ledger_snapshot():
+    """Barcha balanslar snapshotini hozir yozish"""
+    if not is_admin(request):
+        return jsonify({"error": "Faqat admin uchun"}), 403
+    try:
+        return jsonify({"count": ledger.snapshot()}), 201
+    except Exception as e:
+        return jsonify({"error": f"Snapshot yozishda xatolik: {str(e)}"}), 500
+
+@api.route("/ledger/rebuild", methods=["POST"])
+def rebuild_ledger():
+    """Balanslarni snapshot + ledgerdan qayta hisoblab, students.json nusxalarini tuzatadi"""
+    if not is_admin(request):
+        return jsonify({"error": "Faqat admin uchun"}), 403
+    try:
+        stats = ledger.rebuild()
+        updated = 0
+        with store.transaction(LEDGER_FILE, STUDENTS_FILE):
+            for student_id, balance in ledger.balances().items():
+                student = store[STUDENTS_FILE].get(student_id)
+                if student and student.get("balance") != balance:
+                    sync_balance(student_id)
+                    updated += 1
+        return jsonify({**stats, "updated": updated})
+    except Exception as e:
+        return jsonify({"error": f"Ledgerni qayta hisoblashda xatolik: {str(e)}"}), 500
+
+# =====================
+#  REPORTS
+# =====================
+@api.route("/reports/revenue", methods=["GET"])
+@conditional(PAYMENTS_FILE)
+def get_revenue_report():
+    """Davr bo'yicha tushum: ?from=&to=&bucket=day|month&by=type|group|branch"""
+    try:
+        report = revenue.report(
+            request.args.get("from") or None,
+            request.args.get("to") or None,
+            request.args.get("bucket", "month"),
+            request.args.get("by") or None
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(report)
+
+# =====================
+#  SEARCH
+# =====================
+@api.route("/search", methods=["GET"])
+@conditional(STUDENTS_FILE, TEACHERS_FILE, GROUPS_FILE)
+def search_records():
+    """Ism, telefon, fan va guruh nomi bo'yicha qidiruv: ?q=&type=student,teacher,group&limit=&offset="""
+    try:
+        q, types, limit, offset = search.parse_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    page, total = search_index.search(q, types, limit, offset)
+    files = {kind: file for file, kind in SEARCH_FILES.items()}
+    hits = []
+    for score, kind, record_id in page:
+        record = store[files[kind]].get(record_id)
+        if record is not None:
+            hits.append({"type": kind, "id": record_id, "score": score, "record": record})
+    return jsonify({"q": q, "total": total, "hits": hits}), 200, {"X-Total-Count": str(total)}
+
+# =====================
+#  TIMETABLE
+# =====================
+def timetable_resource(args):
+    """?teacherId= yoki ?branchId=&room= -> jadval indeksi kaliti"""
+    if args.get("teacherId"):
+        try:
+            return ("teacher", int(args["teacherId"]))
+        except ValueError:
+            raise ValueError("teacherId butun son bo'lishi kerak")
+    if args.get("room"):
+        branch_id = args.get("branchId")
+        try:
+            return ("room", int(branch_id) if branch_id else None, args["room"])
+        except ValueError:
+            raise ValueError("branchId butun son bo'lishi kerak")
+    raise ValueError("teacherId yoki room kiritilishi shart")
+
+@api.route("/timetable", methods=["GET"])
+@conditional(GROUPS_FILE)
+def get_timetable():
+    """O'qituvchi (yoki xona) darslari kunlar bo'yicha: ?teacherId=&day="""
+    try:
+        key = timetable_resource(request.args)
+        days = [schedule.parse_day(request.args["day"])] if request.args.get("day") else range(len(schedule.DAYS))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    result = {}
+    for day, lessons in timetable.timetable(key, days).items():
+        result[day] = []
+        for start, end, group_id, conflicts in lessons:
+            group = store[GROUPS_FILE].get(group_id) or {}
+            result[day].append({
+                "groupId": group_id,
+                "name": group.get("name"),
+                "startTime": schedule.format_time(start),
+                "endTime": schedule.format_time(end),
+                "conflicts": conflicts
+            })
+    return jsonify({"days": result})
+
+@api.route("/timetable/free", methods=["GET"])
+@conditional(GROUPS_FILE)
+def get_free_slots():
+    """Bo'sh vaqtlar: ?teacherId=&day=&from=08:00&to=20:00&duration=90 (daqiqa)"""
+    try:
+        key = timetable_resource(request.args)
+        if not request.args.get("day"):
+            raise ValueError("day kiritilishi shart")
+        day = schedule.parse_day(request.args["day"])
+        start = schedule.parse_time(request.args.get("from") or schedule.DAY_START)
+        end = schedule.parse_time(request.args.get("to") or schedule.DAY_END)
+        if start is None or end is None or start >= end:
+            raise ValueError("from va to HH:MM ko'rinishida, from < to bo'lishi kerak")
+        duration = request.args.get("duration") or "1"
+        if not duration.isdigit() or int(duration) < 1:
+            raise ValueError("duration musbat butun son bo'lishi kerak (daqiqa)")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    slots = timetable.free(key, day, start, end, int(duration))
+    return jsonify({
+        "day": schedule.DAYS[day],
+        "free": [{"startTime": schedule.format_time(s), "endTime": schedule.format_time(e)} for s, e in slots]
+    })
+
+# =====================
+#  CHANGES
+# =====================
+@api.route("/changes", methods=["GET"])
+def get_changes():
+    """?since=<cursor>&collections=students,groups - cursordan keyingi o'zgarishlar"""
+    try:
+        files = feed.files(request.args.get("collections"))
+        cursor, changes, reset = feed.changes(request.args.get("since"), files)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"cursor": cursor, "changes": changes, "reset": reset})
+
+@api.route("/changes/stream", methods=["GET"])
+def stream_changes():
+    """Server-Sent Events: har bir o'zgarishlar to'plami `changes` hodisasi, id - yangi cursor"""
+    since = request.headers.get("Last-Event-ID") or request.args.get("since")
+    try:
+        files = feed.files(request.args.get("collections"))
+        cursor, _, _ = feed.changes(since, files)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not feed.open_stream():
+        return jsonify({"error": "Ulanishlar soni chegarasida, keyinroq urinib ko'ring"}), 503, {"Retry-After": "5"}
+
+    def events():
+        yield "retry: 3000\n\n"
+        position = since
+        if not position:
+            # Boshlang'ich nuqta: mijoz ro'yxatlarni yuklab, shu cursordan davom etadi
+            position = cursor
+            yield f"id: {position}\nevent: ready\ndata: {CODEC.dumps_http({'cursor': position})}\n\n"
+        started = last_sent = time.monotonic()
+        while time.monotonic() - started < STREAM_SECONDS:
+            position, changes, reset = feed.changes(position, files)
+            if changes or reset:
+                data = CODEC.dumps_http({"cursor": position, "changes": changes, "reset": reset})
+                yield f"id: {position}\nevent: changes\ndata: {data}\n\n"
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent >= HEARTBEAT:
+                yield ": ping\n\n"
+                last_sent = time.monotonic()
+            # Shu jarayondagi yozish darhol uyg'otadi, boshqa workerlarniki sekundiga bir tekshiriladi
+            feed.wait(1.0)
+
+    response = Response(stream_with_context(events()), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+    # Mijoz birinchi qatorgacha uzilsa ham (generator boshlanmagan) ulanish bo'shatiladi
+    response.call_on_close(feed.close_stream)
+    return response
+
+# =====================
+#  FON JOBLARI (eksport)
+# =====================
+def export_job(kind, fmt, filters):
+    """Fon jobida bajariladigan eksport (ma'lumotlar job boshlanganda o'qiladi)"""
+    def run(job):
+        if kind == "payments":
+            if "from" in filters or "to" in filters:
+                payments = store[PAYMENTS_FILE]
+                records = [p for p in map(payments.get, revenue.between(filters.get("from"), filters.get("to"))) if p]
+            else:
+                records = read_json(PAYMENTS_FILE)
+            rows = exports.payment_rows(job, records, hydrator.index(STUDENTS_FILE), filters)
+        else:
+            rows = exports.student_rows(job, read_json(STUDENTS_FILE), ledger.balances(), filters)
+        job.meta["exported"] = exports.write(job.path, fmt, kind, rows)
+    return run
+
+@api.route("/jobs/export", methods=["POST"])
+def create_export_job():
+    """{"type": "payments"|"students", "format": "csv"|"xlsx", ...filtrlar} -> 202 + job"""
+    if not is_admin(request):
+        return jsonify({"error": "Faqat admin uchun"}), 403
+    try:
+        kind, fmt, filters = exports.parse(request.get_json(silent=True))
+        job = job_queue.submit(f"export:{kind}", {"format": fmt, **filters}, export_job(kind, fmt, filters),
+                               f"{kind}-{time.strftime('%Y%m%d-%H%M%S')}.{fmt}")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except JobsBusy as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "10"}
+    return jsonify(job), 202, {"Location": f"/jobs/{job['id']}"}
+
+@api.route("/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    if not is_admin(request):
+        return jsonify({"error": "Faqat admin uchun"}), 403
+    try:
+        return jsonify(job_queue.get(job_id))
+    except LookupError:
+        return jsonify({"error": "Job topilmadi"}), 404
+
+@api.route("/jobs/<job_id>", methods=["DELETE"])
+def cancel_job(job_id):
+    """Tugamagan job bekor qilinadi, tugaganining natijasi o'chiriladi"""
+    if not is_admin(request):
+        return jsonify({"error": "Faqat admin uchun"}), 403
+    try:
+        job = job_queue.cancel(job_id)
+    except LookupError:
+        return jsonify({"error": "Job topilmadi"}), 404
+    if job is None:
+        return jsonify({"message": "Job natijasi o'chirildi"})
+    return jsonify(job), 202 if job.get("cancelling") else 200
+
+@api.route("/jobs/<job_id>/download", methods=["GET"])
+def download_job(job_id):
+    if not is_admin(request):
+        return jsonify({"error": "Faqat admin uchun"}), 403
+    try:
+        path, job = job_queue.result(job_id)
+    except LookupError:
+        return jsonify({"error": "Job topilmadi"}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 409
+    fmt = job["params"].get("format")
+    return send_file(path, mimetype=exports.MIMETYPES.get(fmt, "application/octet-stream"),
+                     as_attachment=True, download_name=job["filename"])
+
+# =====================
+#  SNAPSHOTLAR (admin)
+# =====================
+@api.route("/admin/snapshots", methods=["GET"])
+def list_snapshots():
+    """Snapshotlar (yangilari birinchi); tiklash - `python snapshot.py restore <id>`"""
+    if not is_admin(request):
+        return jsonify({"error": "Faqat admin uchun"}), 403
+    return jsonify({"directory": snapshots.directory, "keep": snapshots.keep, "snapshots": snapshots.list()})
+
+@api.route("/admin/snapshots", methods=["POST"])
+def create_snapshot():
+    """?full=1 - oldingi snapshotdan foydalanmasdan; fon jobi, natijasi - manifest"""
+    if not is_admin(request):
+        return jsonify({"error": "Faqat admin uchun"}), 403
+    full = request.args.get("full", "").lower() in ("1", "true", "yes")
+
+    def run(job):
+        manifest = snapshots.create(full, progress=job.progress)
+        job.meta["snapshot"] = manifest["id"]
+        with open(job.path, "wb") as f:
+            f.write(CODEC.dumps(manifest, pretty=True))
+
+    try:
+        job = job_queue.submit("snapshot", {"format": "json", "full": full}, run,
+                               f"snapshot-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    except JobsBusy as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "10"}
+    return jsonify(job), 202, {"Location": f"/jobs/{job['id']}"}
+
+# =====================
+#  PROFILLASH (admin)
+# =====================
+@api.route("/admin/profiles", methods=["GET"])
+def list_profiles():
+    """Saqlangan profillar (yangilari birinchi)"""
+    if not is_admin(request):
+        return jsonify({"error": "Faqat admin uchun"}), 403
+    return jsonify({
+        "enabled": bool(profiler.routes),
+        "routes": sorted(profiler.routes),
+        "rate": profiler.rate,
+        "mode": profiler.mode,
+        "profiles": profiler.list()
+    })
+
+@api.route("/admin/profiles/<trace_id>", methods=["GET"])
+def download_profile(trace_id):
+    """?format=pstats|collapsed - oflayn flamegraph uchun"""
+    if not is_admin(request):
+        return jsonify({"error": "Faqat admin uchun"}), 403
+    try:
+        path, fmt = profiler.path(trace_id, request.args.get("format"))
+    except LookupError:
+        return jsonify({"error": "Profil topilmadi"}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if fmt == "collapsed":
+        return send_file(path, mimetype="text/plain", as_attachment=True, download_name=f"{trace_id}.collapsed")
+    return send_file(path, mimetype="application/octet-stream", as_attachment=True, download_name=f"{trace_id}.pstats")
+
+# =====================
+#  METRICS
+# =====================
+@api.route("/metrics", methods=["GET"])
+def get_metrics():
+    """Prometheus text formati (barcha workerlar yig'indisi)"""
+    collections = [(os.path.splitext(file)[0], store[file]) for file in COLLECTION_FILES]
+    body = metrics.REGISTRY.render(extra=[
+        ("learnify_collection_records", "Kolleksiyadagi yozuvlar soni", "gauge",
+         [((("collection", name),), len(collection)) for name, collection in collections]),
+        ("learnify_collection_version", "Kolleksiya versiyasi (o'zgarishlar soni)", "gauge",
+         [((("collection", name),), collection.version) for name, collection in collections]),
+    ])
+    return Response(body, content_type="text/plain; version=0.0.4; charset=utf-8")
+
 # =====================
 #  Qo'shimcha endpointlar
 # =====================
 
-@app.route("/", methods=["GET"])
+@api.route("/", methods=["GET"])
 def health_check():
     """Test endpoint - backend ishlayotganini tekshirish uchun"""
     return jsonify({
@@ -831,12 +1604,18 @@ def health_check():
             "payments": "/payments",
             "tasks": "/tasks",
             "companies": "/companies",
-            "branches": "/branches"
+            "branches": "/branches",
+            "search": "/search",
+            "timetable": "/timetable",
+            "changes": "/changes",
+            "metrics": "/metrics",
+            "jobs": "/jobs/export",
+            "profiles": "/admin/profiles",
+            "snapshots": "/admin/snapshots"
         }
     })
 
 
-@app.errorhandler(404)
 def handle_404(err):
     return jsonify({
         "error": "Endpoint topilmadi",
@@ -844,8 +1623,61 @@ def handle_404(err):
     }), 404
 
 
+# =====================
+#  Ilova (app factory)
+# =====================
+_fork_hook = False
+
+def create_app(config=None):
+    """Flask ilovasi: config - DATA_DIR, STORAGE, PORT, ... (qarang: config.py)"""
+    global _fork_hook, profiler, admin_token, job_queue, snapshots
+    settings = load_config(config)
+    # orjson (o'rnatilgan bo'lsa) yoki standart json - ombor va javoblar uchun bitta sozlama
+    CODEC.configure(settings["JSON_LIBRARY"])
+    app = Flask(__name__)
+    app.json = JsonProvider(app)
+    app.config.update(settings)
+    # CORS ni qo'shish (sahifalash sarlavhalari frontendga ko'rinishi uchun)
+    CORS(app, expose_headers=["X-Total-Count", "X-Next-Cursor", "ETag"])
+
+    init_storage(settings)
+    admin_token = settings["ADMIN_TOKEN"]
+    profiler = profiling.Profiler(
+        os.path.join(store.data_dir, "profiles"), settings["PROFILE_ROUTES"], settings["PROFILE_RATE"],
+        settings["PROFILE_MODE"], settings["PROFILE_KEEP"], allow_header=is_admin,
+    )
+    job_queue = JobQueue(os.path.join(store.data_dir, "jobs"), settings["JOBS_WORKERS"],
+                         settings["JOBS_QUEUE"], settings["JOBS_KEEP_HOURS"])
+    snapshots = snapshot.Snapshots(store, settings["SNAPSHOT_DIR"] or os.path.join(store.data_dir, "snapshots"),
+                                   COLLECTION_FILES, settings["SNAPSHOT_KEEP"])
+    if settings["PRELOAD"]:
+        preload()
+    if not _fork_hook and hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=after_fork)
+        _fork_hook = True
+
+    app.register_blueprint(api)
+    # after_request lar teskari tartibda ishlaydi: metrikalar siqilgan javobni ko'radi
+    app.before_request(request_metrics.before_request)
+    app.after_request(request_metrics.after_request)
+    app.after_request(compressor.after_request)
+    # Profil faqat handlerni o'raydi (siqish va metrikalar kirmaydi)
+    app.before_request(profiler.before_request)
+    app.after_request(profiler.after_request)
+    app.teardown_request(profiler.teardown_request)
+    app.register_error_handler(404, handle_404)
+    return app
+
 # =====================
 #  Serverni ishga tushirish
 # =====================
+# Ishlab chiqish:  python server.py  (bitta jarayon, ko'p oqimli)
+# Production:      gunicorn -c gunicorn.conf.py wsgi:app
 if __name__ == "__main__":
-    app.run(port=PORT, debug=True)
+    app = create_app()
+    app.run(
+        host=app.config["HOST"],
+        port=app.config["PORT"],
+        debug=app.config["DEBUG"],
+        threaded=True
+    )
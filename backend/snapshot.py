@@ -0,0 +1,394 @@
+"""
+Snapshotlar (zaxira nusxa) va tiklash
+
+Ishlayotgan serverdan barcha kolleksiyalarning bir vaqtdagi (izchil)
+nusxasi olinadi. `*.json` fayllarni oddiy nusxalash yarim yozilgan
+compaction yoki tranzaksiyaning faqat bir qismini olib qolishi mumkin edi.
+
+    POST /admin/snapshots           -> fon jobi (qarang: jobs.py), ?full=1 - to'liq
+    GET  /admin/snapshots           -> ro'yxat (yangilari birinchi)
+
+    python snapshot.py create [--full]
+    python snapshot.py list
+    python snapshot.py restore <id> [--no-verify]
+
+Snapshot olish:
+  * Barcha kolleksiyalar locki (nom tartibida, tranzaksiyalar kabi) bir
+    lahzaga olinadi - shu paytdagi xotira holati (`all()`, o'zgarmas) va
+    versiyalar yozib olinadi. Yozish lock ostida qilinmaydi, yozuvchilar
+    faqat shu lahza kutadi (manifestdagi `blockedMs`).
+  * Oldingi snapshotdan beri o'zgarmagan kolleksiya (versiyasi bir xil)
+    qayta yozilmaydi - oldingi fayl hardlink qilinadi (inkremental, joy
+    egallamaydi). Siqilgan (logi bo'sh) kolleksiyaning `*.json` fayli ham
+    hardlink qilinadi: fayllar joyida o'zgartirilmaydi, faqat os.replace
+    bilan almashtiriladi. Qolganlari lockdan keyin ixcham JSON bo'lib yoziladi.
+  * Har bir snapshot papkasi to'liq (`manifest.json` + fayllar, sha256
+    bilan) - eskilarini istalgan tartibda o'chirish mumkin, SNAPSHOT_KEEP
+    tadan ortig'i avtomatik o'chiriladi.
+
+Tiklash fayllarni ma'lumotlar papkasiga hardlink (boshqa disk bo'lsa -
+nusxa) qiladi va kolleksiya locklari ostida os.replace bilan almashtiradi,
+shuning uchun yuzlab MB ham soniyalarda tiklanadi. Loglar "base" qatori
+bilan boshlanadi, versiyalar esa avvalgilaridan katta bo'ladi - ishlayotgan
+workerlar o'zgarishni ko'rib kolleksiyani qayta yuklaydi, mijozlar ETag va
+/changes cursorlari eskirgan deb topiladi. Shunga qaramay tiklashni server
+to'xtatilgan holda bajarish tavsiya etiladi (ochiq so'rovlar va fon joblari).
+
+SQLite backendda snapshot - SQLite backup API orqali bazaning izchil
+nusxasi (inkremental emas), tiklash faqat server to'xtatilganda.
+"""
+import argparse
+import hashlib
+import os
+import re
+import secrets
+import shutil
+import sqlite3
+import time
+from contextlib import ExitStack
+
+from codec import CODEC
+from storage import LOCK_SUFFIX, LOG_SUFFIX, TXN_LOG, FileLock, atomic_write, fsync_dir
+
+MANIFEST = "manifest.json"
+_SNAPSHOT_ID = re.compile(r"^[0-9a-f]+-[0-9a-f]{6}$")   # time_ns (hex) - tasodifiy qism
+
+
+def _created_ns(snapshot_id):
+    return int(snapshot_id.split("-")[0], 16)
+
+
+def _link_or_copy(src, dst):
+    """Hardlink (bir zumda), boshqa fayl tizimida bo'lsa - nusxa"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+def _write(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _replace(staged, target):
+    os.replace(staged, target)
+    if os.path.exists(staged):
+        # Ikkalasi bitta faylning hardlinklari bo'lsa, rename hech narsa qilmaydi
+        os.remove(staged)
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_manifest(path):
+    try:
+        with open(os.path.join(path, MANIFEST), "rb") as f:
+            return CODEC.loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+class Snapshots:
+    """`store` kolleksiyalarining snapshotlari `directory` da"""
+
+    def __init__(self, store, directory, files, keep=10):
+        self.store = store
+        self.directory = directory
+        self.files = list(files)
+        self.keep = keep
+
+    # ---------- ro'yxat ----------
+    def _ids(self):
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        # Nom bo'yicha emas, yaratilish vaqti bo'yicha (bir soniyada bir nechta snapshot ham)
+        return sorted((n for n in names if _SNAPSHOT_ID.match(n)), key=_created_ns)
+
+    def list(self):
+        """Manifestlar, yangilari birinchi"""
+        manifests = (_load_manifest(os.path.join(self.directory, i)) for i in reversed(self._ids()))
+        return [m for m in manifests if m is not None]
+
+    def path(self, snapshot_id):
+        """Snapshot papkasi; topilmasa LookupError"""
+        path = os.path.join(self.directory, snapshot_id)
+        if not _SNAPSHOT_ID.match(snapshot_id) or _load_manifest(path) is None:
+            raise LookupError(snapshot_id)
+        return path
+
+    # ---------- olish ----------
+    def create(self, full=False, progress=None):
+        """Yangi snapshot; progress(bajarilgan, jami) - har bir fayldan keyin (masalan Job.progress)"""
+        os.makedirs(self.directory, exist_ok=True)
+        # Bir vaqtda bitta snapshot (jarayonlar orasida ham)
+        with FileLock(os.path.join(self.directory, "snapshots" + LOCK_SUFFIX)):
+            self._remove_unfinished()
+            # Oxirgisidan katta: soat orqaga surilsa ham _previous/_trim tartibi buzilmaydi
+            ids = self._ids()
+            created = max(time.time_ns(), _created_ns(ids[-1]) + 1 if ids else 0)
+            snapshot_id = f"{created:x}-{secrets.token_hex(3)}"
+            tmp = os.path.join(self.directory, f".{snapshot_id}.tmp")
+            os.makedirs(tmp)
+            try:
+                if self.store.db is not None:
+                    manifest = self._create_sqlite(snapshot_id, tmp)
+                else:
+                    manifest = self._create_json(snapshot_id, tmp, None if full else self._previous(), progress)
+                _write(os.path.join(tmp, MANIFEST), CODEC.dumps(manifest, pretty=True))
+                fsync_dir(os.path.join(tmp, MANIFEST))
+                os.rename(tmp, os.path.join(self.directory, snapshot_id))
+                fsync_dir(tmp)
+            except BaseException:
+                shutil.rmtree(tmp, ignore_errors=True)
+                raise
+            self._trim()
+        return manifest
+
+    def _previous(self):
+        """Inkremental asos: shu papka va backenddagi oxirgi snapshot"""
+        for manifest in self.list():
+            if manifest.get("backend") == "json" and manifest.get("dataDir") == self.store.data_dir:
+                return manifest
+        return None
+
+    def _create_json(self, snapshot_id, tmp, previous, progress):
+        started = time.perf_counter()
+        reused = previous["collections"] if previous else {}
+        collections, pending = {}, {}
+        cols = [self.store[f] for f in sorted(set(self.files))]
+        with ExitStack() as stack:
+            for col in cols:
+                stack.enter_context(col.exclusive())
+            locked = time.perf_counter()
+            for col in cols:
+                entry = collections[col.name] = {"version": col.version, "records": len(col)}
+                before = reused.get(col.name)
+                if before is not None and before["version"] == col.version:
+                    # O'zgarmagan: oldingi snapshot fayli (lockdan keyin link qilinadi)
+                    entry.update(source="previous", sha256=before["sha256"], bytes=before["bytes"],
+                                 writtenIn=before.get("writtenIn", previous["id"]))
+                elif col.base_version == col.version and os.path.exists(col.path):
+                    try:
+                        # Logi bo'sh: JSON fayl aynan shu versiya
+                        os.link(col.path, os.path.join(tmp, col.name))
+                        entry["source"] = "data"
+                        continue
+                    except OSError:
+                        pass
+                    pending[col.name] = col.all()
+                else:
+                    pending[col.name] = col.all()
+            blocked = time.perf_counter() - locked
+
+        done = 0
+        for name, entry in collections.items():
+            path = os.path.join(tmp, name)
+            if entry.get("source") == "previous":
+                _link_or_copy(os.path.join(self.directory, previous["id"], name), path)
+            elif name in pending:
+                records = pending.pop(name)
+                _write(path, CODEC.dumps(records if isinstance(records, list) else list(records)))
+                entry["source"] = "written"
+            if entry["source"] != "previous":
+                entry.update(sha256=_sha256(path), bytes=os.path.getsize(path), writtenIn=snapshot_id)
+            done += 1
+            if progress is not None:
+                progress(done, len(collections))
+        return {
+            "id": snapshot_id,
+            "createdAt": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "backend": "json",
+            "dataDir": self.store.data_dir,
+            "parent": previous["id"] if previous else None,
+            "blockedMs": round(blocked * 1000, 2),
+            "seconds": round(time.perf_counter() - started, 3),
+            "newBytes": sum(e["bytes"] for e in collections.values() if e["source"] == "written"),
+            "collections": collections,
+        }
+
+    def _create_sqlite(self, snapshot_id, tmp):
+        started = time.perf_counter()
+        name = os.path.basename(self.store.db.path)
+        path = os.path.join(tmp, name)
+        target = sqlite3.connect(path)
+        try:
+            # Backup API: bitta o'qish tranzaksiyasi - yozuvchilar to'xtamaydi (WAL)
+            self.store.db.conn.backup(target)
+        finally:
+            target.close()
+        return {
+            "id": snapshot_id,
+            "createdAt": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "backend": "sqlite",
+            "dataDir": self.store.data_dir,
+            "parent": None,
+            "seconds": round(time.perf_counter() - started, 3),
+            "database": {"file": name, "sha256": _sha256(path), "bytes": os.path.getsize(path)},
+        }
+
+    def _remove_unfinished(self):
+        # Yarim qolgan (jarayon to'xtagan) snapshotlar - snapshots.lock bizda
+        for name in os.listdir(self.directory):
+            if name.startswith(".") and name.endswith(".tmp"):
+                shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+    def _trim(self):
+        ids = self._ids()
+        for snapshot_id in ids[:max(0, len(ids) - self.keep)]:
+            shutil.rmtree(os.path.join(self.directory, snapshot_id), ignore_errors=True)
+
+
+# =====================
+#  Tiklash
+# =====================
+def _current_versions(data_dir, names):
+    """{kolleksiya: diskdagi eng katta versiya} - log va transactions.log dan"""
+    versions = dict.fromkeys(names, 0)
+
+    def lines(path):
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+        for raw in data.splitlines():
+            try:
+                yield CODEC.loads(raw)
+            except ValueError:
+                continue
+
+    for name in names:
+        for entry in lines(os.path.join(data_dir, os.path.splitext(name)[0] + LOG_SUFFIX)):
+            versions[name] = max(versions[name], entry.get("v", 0))
+    for txn in lines(os.path.join(data_dir, TXN_LOG)):
+        for entry in txn.get("entries", ()):
+            if entry.get("c") in versions:
+                versions[entry["c"]] = max(versions[entry["c"]], entry.get("v", 0))
+    return versions
+
+
+def verify(snapshot_dir):
+    """Manifestdagi sha256 lar bilan solishtiradi; mos kelmasa ValueError"""
+    manifest = _load_manifest(snapshot_dir)
+    if manifest is None:
+        raise ValueError(f"{snapshot_dir}: manifest.json topilmadi")
+    files = manifest["collections"] if manifest["backend"] == "json" else {
+        manifest["database"]["file"]: manifest["database"]}
+    for name, entry in files.items():
+        if _sha256(os.path.join(snapshot_dir, name)) != entry["sha256"]:
+            raise ValueError(f"{name}: sha256 mos kelmadi, snapshot buzilgan")
+    return manifest
+
+
+def restore(snapshot_dir, data_dir, db_path=None, check=True, derived=()):
+    """Snapshotni `data_dir` ga tiklaydi; derived - o'chiriladigan hosila fayllar (masalan ledger snapshoti)"""
+    manifest = verify(snapshot_dir) if check else _load_manifest(snapshot_dir)
+    if manifest is None:
+        raise ValueError(f"{snapshot_dir}: manifest.json topilmadi")
+    started = time.perf_counter()
+    if manifest["backend"] == "sqlite":
+        target = os.path.join(data_dir, db_path or manifest["database"]["file"])
+        _link_or_copy(os.path.join(snapshot_dir, manifest["database"]["file"]), target + ".restore")
+        _replace(target + ".restore", target)
+        for suffix in ("-wal", "-shm"):
+            try:
+                os.remove(target + suffix)
+            except FileNotFoundError:
+                pass
+        return {"id": manifest["id"], "seconds": round(time.perf_counter() - started, 3)}
+
+    names = sorted(manifest["collections"])
+    # Fayllar oldindan joylanadi - lock ostida faqat os.replace
+    for name in names:
+        staged = os.path.join(data_dir, name + ".restore")
+        if os.path.exists(staged):
+            os.remove(staged)
+        _link_or_copy(os.path.join(snapshot_dir, name), staged)
+
+    bases = [os.path.join(data_dir, os.path.splitext(name)[0]) for name in names]
+    restored = {}
+    with ExitStack() as stack:
+        # Tartib storage bilan bir xil: compaction locki, keyin yozish locki, keyin transactions.log
+        for base in bases:
+            stack.enter_context(FileLock(base + ".compact" + LOCK_SUFFIX))
+        for base in bases:
+            stack.enter_context(FileLock(base + LOCK_SUFFIX))
+        stack.enter_context(FileLock(os.path.join(data_dir, os.path.splitext(TXN_LOG)[0] + LOCK_SUFFIX)))
+        current = _current_versions(data_dir, names)
+        now = time.time()
+        for name, base in zip(names, bases):
+            version = max(current[name], manifest["collections"][name]["version"]) + 1
+            _replace(os.path.join(data_dir, name + ".restore"), os.path.join(data_dir, name))
+            atomic_write(base + LOG_SUFFIX, CODEC.dumps({"v": version, "ts": now, "op": "base"}) + b"\n")
+            restored[name] = version
+        # Eski tranzaksiyalar endi eskirgan (versiyalar ulardan katta)
+        atomic_write(os.path.join(data_dir, TXN_LOG), b"")
+        for file in derived:
+            try:
+                os.remove(os.path.join(data_dir, file))
+            except FileNotFoundError:
+                pass
+    return {"id": manifest["id"], "versions": restored, "seconds": round(time.perf_counter() - started, 3)}
+
+
+# =====================
+#  Buyruqlar
+# =====================
+def main(argv=None):
+    from config import load_config
+    from server import COLLECTION_FILES, LEDGER_SNAPSHOT
+    from storage import Storage
+
+    config = load_config()
+    parser = argparse.ArgumentParser(description="Ma'lumotlar snapshotlari va tiklash")
+    parser.add_argument("--data-dir", default=config["DATA_DIR"])
+    parser.add_argument("--dir", default=config["SNAPSHOT_DIR"], help="snapshotlar papkasi (standart: <DATA_DIR>/snapshots)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    create = commands.add_parser("create", help="yangi snapshot")
+    create.add_argument("--full", action="store_true", help="oldingi snapshotdan foydalanmasdan")
+    commands.add_parser("list", help="snapshotlar ro'yxati")
+    restore_cmd = commands.add_parser("restore", help="snapshotni tiklash")
+    restore_cmd.add_argument("id")
+    restore_cmd.add_argument("--no-verify", action="store_true", help="sha256 tekshirilmaydi")
+    args = parser.parse_args(argv)
+
+    data_dir = os.path.abspath(args.data_dir)
+    directory = args.dir or os.path.join(data_dir, "snapshots")
+    store = Storage(data_dir, backend=config["STORAGE"], db_path=config["SQLITE_PATH"],
+                    compact_json=config["JSON_COMPACT"]) if args.command == "create" else None
+    snapshots = Snapshots(store, directory, COLLECTION_FILES, config["SNAPSHOT_KEEP"])
+    if args.command == "create":
+        try:
+            manifest = snapshots.create(args.full)
+        finally:
+            store.close()
+        print(f"✅ {manifest['id']}: {manifest['seconds']} s, yozuvchilar {manifest.get('blockedMs', 0)} ms kutdi")
+        for name, entry in manifest.get("collections", {}).items():
+            print(f"    {name:<16}v{entry['version']:<8}{entry['records']:>9} ta  {entry['bytes'] / 1024:>10.1f} KB  {entry['source']}")
+    elif args.command == "list":
+        for manifest in snapshots.list():
+            size = manifest.get("newBytes", manifest.get("database", {}).get("bytes", 0))
+            print(f"{manifest['id']}  {manifest['createdAt']}  {manifest['backend']:<7}"
+                  f"yangi {size / 2**20:.1f} MB  asos: {manifest.get('parent') or '-'}")
+    else:
+        try:
+            path = snapshots.path(args.id)
+        except LookupError:
+            parser.error(f"snapshot topilmadi: {args.id}")
+        result = restore(path, data_dir, config["SQLITE_PATH"], check=not args.no_verify,
+                         derived=(LEDGER_SNAPSHOT,))
+        print(f"✅ {result['id']} tiklandi: {result['seconds']} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,885 @@
+"""
+Ma'lumotlar ombori (storage)
+
+Har bir kolleksiya (teachers.json, students.json, ...) xotirada saqlanadi.
+Har bir o'zgarish kolleksiyaning `*.log` fayliga bitta qator bo'lib qo'shiladi
+(append-only), shuning uchun yozish narxi fayl hajmiga emas, o'zgarish hajmiga
+bog'liq. Fon oqimi logni vaqti-vaqti bilan asosiy `*.json` fayliga siqib
+(compaction) yozadi. Server qayta ishga tushganda `*.json` o'qiladi va log
+undan keyin qayta qo'llanadi (replay).
+
+Log qatori formati:
+    {"v": 12, "ts": 1700000000.0, "op": "insert", "record": {...}}
+    {"v": 13, "ts": ..., "op": "update", "id": 1001, "changes": {...}}
+    {"v": 14, "ts": ..., "op": "delete", "id": 1001}
+    {"v": 15, "ts": ..., "op": "replace", "records": [...]}
+    {"v": 15, "ts": ..., "op": "base"}   # compactiondan keyingi boshlang'ich qator
+
+Bir nechta jarayon (worker) bilan ishlash:
+  * Har bir kolleksiya `*.lock` fayli orqali jarayonlararo lock (flock) bilan
+    himoyalangan. Yozuvchi lockni olgach, boshqa jarayonlar yozgan log
+    qatorlarini o'qib oladi (sync) va shundan keyingina yozadi, shuning uchun
+    versiya raqamlari barcha jarayonlarda bir xil.
+  * O'qishda ham log oxiri tekshiriladi (os.stat), boshqa jarayon yozgan
+    o'zgarishlar darhol ko'rinadi.
+  * Bir nechta kolleksiyani o'zgartiradigan amallar `store.transaction(...)`
+    ichida bajariladi. Ularning barcha o'zgarishlari umumiy
+    `transactions.log` fayliga BITTA qator bo'lib yoziladi - yoki hammasi
+    saqlanadi, yoki hech biri.
+  * JSON va log fayllar vaqtinchalik faylga yozilib, fsync qilinib, keyin
+    atomik `os.replace` bilan almashtiriladi.
+
+Kodlash codec.py orqali (orjson o'rnatilgan bo'lsa u). Log qatorlari
+bo'sh joylarsiz, JSON fayllar standart holatda indent=2 bilan yoziladi;
+`compact_json=True` bo'lsa ular ham ixcham.
+"""
+import atexit
+import os
+import threading
+import time
+import uuid
+from contextlib import ExitStack, contextmanager
+
+import metrics
+from codec import CODEC
+from columnar import ColumnTable
+
+try:
+    import fcntl
+except ImportError:  # Windows: faqat bitta jarayon rejimi
+    fcntl = None
+
+BACKENDS = ("json", "sqlite")
+LOG_SUFFIX = ".log"
+LOCK_SUFFIX = ".lock"
+TXN_LOG = "transactions.log"
+COMPACT_INTERVAL = 30.0   # soniya: kutilayotgan o'zgarishlar shu vaqtdan keyin siqiladi
+COMPACT_MAX_OPS = 1000    # shuncha o'zgarish yig'ilsa, darhol siqiladi
+TXN_LOG_MAX_BYTES = 1024 * 1024
+_TXN_LABEL = ("transactions",)
+
+
+def _key(record):
+    return record.get("id")
+
+
+class RecordDict(dict):
+    """id -> yozuv (standart). columnar.ColumnTable ham shu interfeysda.
+
+    `position(id)` - yozuv qo'shilgan tartib raqami (find_by natijasini saralash uchun).
+    """
+
+    def __init__(self, items=()):
+        super().__init__(items)
+        self._pos = {k: i for i, k in enumerate(self)}
+        self._seq = len(self._pos)
+
+    def __setitem__(self, key, record):
+        if key not in self._pos:
+            self._seq += 1
+            self._pos[key] = self._seq
+        super().__setitem__(key, record)
+
+    def pop(self, key, default=None):
+        self._pos.pop(key, None)
+        return super().pop(key, default)
+
+    def position(self, key):
+        return self._pos[key]
+
+    def rows(self):
+        return list(self.values())
+
+    def field_items(self, field):
+        return ((k, r.get(field)) for k, r in self.items())
+
+    def rekey(self, old_key, new_key, record):
+        # Tartibni saqlagan holda kalitni almashtiramiz
+        records = RecordDict(
+            ((new_key if k == old_key else k), (record if k == old_key else v)) for k, v in self.items()
+        )
+        records._pos, records._seq = self._pos, self._seq
+        records._pos[new_key] = records._pos.pop(old_key)
+        return records
+
+
+def fsync_dir(path):
+    """Papkadagi nom o'zgarishlarini (yaratish, os.replace) diskka yozadi"""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path, data):
+    """Faylni vaqtinchalik nusxa + fsync + os.replace orqali almashtiradi"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    fsync_dir(path)
+
+
+def pid_alive(pid):
+    """Jarayon hali ishlayaptimi (shu mashinada) - tashlab ketilgan fayllarni aniqlash uchun"""
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class _Tail:
+    """Append-only faylni oxiridan o'qish.
+
+    Fayl ochiq fd orqali kuzatiladi: boshqa jarayon uni os.replace bilan
+    almashtirsa, fd dagi inode yo'ldagi inode bilan mos kelmay qoladi (ochiq
+    fd eski inode qayta ishlatilishiga yo'l qo'ymaydi) va fayl boshidan o'qiladi.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.fd = None
+        self.offset = 0
+
+    def read(self):
+        """(to'liq qatorlar, boshlang'ich offset, fayl yangidan ochildimi)
+
+        Yarim yozilgan oxirgi qator keyingi safar o'qiladi. `offset` ni
+        chaqiruvchi qatorlarni tahlil qilgach o'zi suradi.
+        """
+        try:
+            ino = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            self.close()
+            return [], 0, False
+        fresh = False
+        if self.fd is None or os.fstat(self.fd).st_ino != ino:
+            self.close()
+            self.fd = os.open(self.path, os.O_RDONLY)
+            fresh = True
+        size = os.fstat(self.fd).st_size
+        if size <= self.offset:
+            return [], self.offset, fresh
+        data = os.pread(self.fd, size - self.offset, self.offset)
+        end = data.rfind(b"\n") + 1
+        return data[:end].split(b"\n")[:-1], self.offset, fresh
+
+    def size(self):
+        return os.fstat(self.fd).st_size if self.fd is not None else 0
+
+    def same_file(self, fd):
+        return self.fd is not None and os.fstat(self.fd).st_ino == os.fstat(fd).st_ino
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+        self.fd = None
+        self.offset = 0
+
+
+class FileLock:
+    """Oqimlar (RLock) va jarayonlar (flock) orasidagi qayta kiriladigan lock"""
+
+    def __init__(self, path):
+        self.path = path
+        self.thread_lock = threading.RLock()
+        self.wait_seconds = 0.0   # lock kutishga ketgan umumiy vaqt
+        self._label = (os.path.splitext(os.path.basename(path))[0],)
+        self._fd = None
+        self._depth = 0
+
+    def acquire(self, blocking=True):
+        if not self.thread_lock.acquire(blocking):
+            return False
+        if self._depth == 0 and fcntl is not None:
+            if self._fd is None:
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+            started = time.perf_counter()
+            try:
+                fcntl.flock(self._fd, flags)
+            except BlockingIOError:
+                self.thread_lock.release()
+                return False
+            waited = time.perf_counter() - started
+            self.wait_seconds += waited
+            metrics.STORAGE_LOCK_WAIT.observe(self._label, waited)
+        self._depth += 1
+        return True
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0 and fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self.thread_lock.release()
+
+    @property
+    def held(self):
+        return self._depth > 0
+
+    def reset_after_fork(self):
+        # flock ochiq fayl tavsifiga bog'langan - bola jarayon o'z faylini ochishi kerak
+        self._fd = None
+        self._depth = 0
+        self.thread_lock = threading.RLock()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class TransactionLog:
+    """Bir nechta kolleksiyaga tegishli o'zgarishlar uchun umumiy log.
+
+    Har bir qator bitta tranzaksiya:
+        {"txn": "...", "ts": ..., "entries": [{"c": "students.json", "v": 8, "op": ...}, ...]}
+    Qator bitta `write` bilan yoziladi, shuning uchun tranzaksiya atomik.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = FileLock(os.path.splitext(path)[0] + LOCK_SUFFIX)
+
+    def append(self, entries):
+        started = time.perf_counter()
+        data = CODEC.dumps(
+            {"txn": uuid.uuid4().hex, "ts": time.time(),
+             "entries": [{"c": name, **entry} for name, entry in entries]}
+        ) + b"\n"
+        metrics.STORAGE_SERIALIZE.observe(_TXN_LABEL, time.perf_counter() - started)
+        with self.lock:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, data)
+            finally:
+                os.close(fd)
+        metrics.STORAGE_WRITTEN_BYTES.inc(_TXN_LABEL, len(data))
+
+    def tail(self):
+        return _Tail(self.path)
+
+    @staticmethod
+    def read(name, tail):
+        """`name` kolleksiyasiga tegishli yangi yozuvlar (tail - kolleksiyaning o'z _Tail i)"""
+        lines, offset, _ = tail.read()
+        if not lines:
+            return []
+        entries = []
+        start, started = offset, time.perf_counter()
+        for raw in lines:
+            offset += len(raw) + 1
+            try:
+                txn = CODEC.loads(raw)
+            except ValueError:
+                continue
+            for entry in txn.get("entries", ()):
+                if entry.get("c") == name:
+                    entries.append(entry)
+        tail.offset = offset
+        metrics.STORAGE_PARSE.observe(_TXN_LABEL, time.perf_counter() - started)
+        metrics.STORAGE_READ_BYTES.inc(_TXN_LABEL, offset - start)
+        return entries
+
+    def compact(self, base_version):
+        """Barcha kolleksiyalar JSON fayliga tushib bo'lgan tranzaksiyalarni olib tashlaydi.
+
+        `base_version(name)` - kolleksiyaning siqilgan (JSON dagi) versiyasi.
+        """
+        with self.lock:
+            try:
+                if os.path.getsize(self.path) < TXN_LOG_MAX_BYTES:
+                    return False
+                with open(self.path, "rb") as f:
+                    lines = f.read().splitlines(keepends=True)
+            except FileNotFoundError:
+                return False
+            keep = []
+            for raw in lines:
+                try:
+                    txn = CODEC.loads(raw)
+                except ValueError:
+                    continue
+                if any(e["v"] > base_version(e["c"]) for e in txn.get("entries", ())):
+                    keep.append(raw)
+            atomic_write(self.path, b"".join(keep))
+            return True
+
+
+class _Transaction:
+    def __init__(self):
+        self.entries = []
+
+
+class Collection:
+    """Bitta JSON kolleksiya: xotiradagi yozuvlar + append-only log.
+
+    Yozuvlar `id` bo'yicha tartiblangan lug'atda (insertion order) saqlanadi.
+    Yozuvlar joyida o'zgartirilmaydi - `update` yangi dict yaratadi, shuning
+    uchun `all()` qaytargan ro'yxatni xavfsiz o'qish mumkin. Qaytgan dictlarni
+    o'zgartirmang, buning uchun `update` dan foydalaning.
+
+    `schema` berilsa, yozuvlar ustunlarda saqlanadi (columnar.ColumnTable):
+    `get` har safar yangi dict qaytaradi, `all()` esa ro'yxat o'rnida
+    o'zgarmas `columnar.Rows` ketma-ketligini.
+    """
+
+    def __init__(self, path, txn_log=None, pretty=True, schema=None):
+        self.path = path
+        self.pretty = pretty   # JSON fayl indent=2 bilan (False - ixcham)
+        self.schema = schema   # maydon -> ustun turi yoki None (dict lar)
+        self.name = os.path.basename(path)
+        self._label = (os.path.splitext(self.name)[0],)   # metrikalar uchun
+        self.log_path = os.path.splitext(path)[0] + LOG_SUFFIX
+        self.file_lock = FileLock(os.path.splitext(path)[0] + LOCK_SUFFIX)
+        self._compact_lock = FileLock(os.path.splitext(path)[0] + ".compact" + LOCK_SUFFIX)
+        self.txn_log = txn_log
+        self._txn = None
+        self.listeners = []   # listener(old, new) - har bir o'zgarishdan keyin
+        self._compacted_at = time.time()
+        self._reset_state()
+        with self.lock:
+            self._reload()
+
+    @property
+    def lock(self):
+        return self.file_lock.thread_lock
+
+    def _reset_state(self):
+        self.version = 0
+        self.updated_at = None
+        self.base_version = 0  # JSON faylga tushgan versiya
+        self._records = self._new_records(())
+        self._indexes = {}    # maydon -> {qiymat: {id: None}}
+        self._pending = 0
+        for tail in ("_log_tail", "_txn_tail"):
+            if getattr(self, tail, None) is not None:
+                getattr(self, tail).close()
+        self._log_tail = _Tail(self.log_path)
+        self._txn_tail = self.txn_log.tail() if self.txn_log is not None else None
+
+    # ---------- o'qish ----------
+    def all(self):
+        with self.lock:
+            self._sync()
+            return self._records.rows()
+
+    def get(self, record_id):
+        with self.lock:
+            self._sync()
+            return self._records.get(record_id)
+
+    def find_by(self, field, value):
+        """`field == value` bo'lgan yozuvlar (kolleksiyadagi tartibda).
+
+        Maydon bo'yicha hash indeks birinchi so'rovda quriladi va keyingi
+        yozishlarda yangilanib boriladi.
+        """
+        with self.lock:
+            self._sync()
+            try:
+                keys = self._index(field).get(value, ())
+            except TypeError:
+                return [r for r in self._records.values() if r.get(field) == value]
+            return [self._records[k] for k in sorted(keys, key=self._records.position)]
+
+    def __len__(self):
+        with self.lock:
+            self._sync()
+            return len(self._records)
+
+    def sync(self):
+        """Boshqa jarayonlarning o'zgarishlarini o'qib oladi (version yangilanadi)"""
+        with self.lock:
+            self._sync()
+
+    # ---------- yozish ----------
+    @contextmanager
+    def exclusive(self):
+        """Yozish uchun lock: boshqa jarayonlarning o'zgarishlari avval o'qiladi"""
+        with self.file_lock:
+            if self.file_lock._depth == 1:
+                self._sync(exclusive=True)
+            yield self
+
+    def insert(self, record):
+        record = dict(record)
+        with self.exclusive():
+            self._append({"op": "insert", "record": record})
+            self._put(_key(record), record)
+        return record
+
+    def update(self, record_id, changes):
+        """Yozuvni yangilaydi va yangi dictni qaytaradi (topilmasa None)"""
+        with self.exclusive():
+            old = self._records.get(record_id)
+            if old is None:
+                return None
+            new = {**old, **changes}
+            self._append({"op": "update", "id": record_id, "changes": changes})
+            self._put(record_id, new)
+        return new
+
+    def delete(self, record_id):
+        """Yozuvni o'chiradi va uni qaytaradi (topilmasa None)"""
+        with self.exclusive():
+            if record_id not in self._records:
+                return None
+            self._append({"op": "delete", "id": record_id})
+            old = self._remove(record_id)
+        return old
+
+    def replace(self, records):
+        """Butun kolleksiyani almashtiradi (eski write_json bilan moslik uchun)"""
+        records = [dict(r) for r in records]
+        with self.exclusive():
+            self._append({"op": "replace", "records": records})
+            self._reset_records(records)
+
+    # ---------- indekslar ----------
+    def _index(self, field):
+        index = self._indexes.get(field)
+        if index is None:
+            index = {}
+            for k, value in self._records.field_items(field):
+                self._index_add(index, value, k)
+            self._indexes[field] = index
+        return index
+
+    @staticmethod
+    def _index_add(index, value, key):
+        try:
+            index.setdefault(value, {})[key] = None
+        except TypeError:
+            # Ro'yxat/dict qiymatlar indekslanmaydi - ular skalyar qiymatga teng bo'lmaydi
+            pass
+
+    @staticmethod
+    def _index_remove(index, value, key):
+        try:
+            bucket = index.get(value)
+        except TypeError:
+            return
+        if bucket is not None:
+            bucket.pop(key, None)
+            if not bucket:
+                del index[value]
+
+    # ---------- xotiradagi holat ----------
+    # O'zgarish xotiraga qo'llangach (version allaqachon yangilangan) listenerlar
+    # chaqiriladi. old=new=None - kolleksiya butunlay almashdi (qayta hisoblash kerak).
+    def _notify(self, old, new):
+        for listener in self.listeners:
+            listener(old, new)
+
+    def _put(self, record_id, new):
+        """Yozuvni joylaydi (insert yoki update), indekslarni yangilaydi"""
+        old = self._records.get(record_id)
+        new_id = _key(new)
+        if old is not None and new_id != record_id:
+            # id o'zgargan bo'lsa, tartibni saqlagan holda kalitni almashtiramiz
+            self._records = self._records.rekey(record_id, new_id, new)
+        else:
+            self._records[new_id] = new
+        for field, index in self._indexes.items():
+            if old is not None:
+                self._index_remove(index, old.get(field), record_id)
+            self._index_add(index, new.get(field), new_id)
+        self._notify(old, new)
+
+    def _remove(self, record_id):
+        old = self._records.pop(record_id, None)
+        if old is not None:
+            for field, index in self._indexes.items():
+                self._index_remove(index, old.get(field), record_id)
+            self._notify(old, None)
+        return old
+
+    def _new_records(self, records):
+        if self.schema is not None:
+            return ColumnTable(self.schema, records)
+        return RecordDict((_key(r), r) for r in records)
+
+    def _reset_records(self, records):
+        self._records = self._new_records(records)
+        self._indexes = {}
+        self._notify(None, None)
+
+    def _apply(self, entry):
+        self.version = entry.get("v", self.version)
+        self.updated_at = entry.get("ts", self.updated_at)
+        op = entry.get("op")
+        if op == "insert":
+            record = entry["record"]
+            self._put(_key(record), record)
+        elif op == "update":
+            old = self._records.get(entry["id"])
+            if old is not None:
+                self._put(entry["id"], {**old, **entry["changes"]})
+        elif op == "delete":
+            self._remove(entry["id"])
+        elif op == "replace":
+            self._reset_records(entry["records"])
+
+    # ---------- log ----------
+    def _append(self, entry):
+        """Log yozuvi; versiya faqat yozish muvaffaqiyatli bo'lgach oshadi"""
+        entry = {"v": self.version + 1, "ts": time.time(), **entry}
+        if self._txn is not None:
+            # Tranzaksiya yakunida transactions.log ga bitta qator bo'lib yoziladi
+            self._txn.entries.append((self.name, entry))
+        else:
+            self._write([entry])
+        self.version, self.updated_at = entry["v"], entry["ts"]
+        self._pending += 1
+
+    def _write(self, entries):
+        """Log qatorlarini bitta `write` bilan yozadi (O_APPEND)"""
+        started = time.perf_counter()
+        data = b"".join(CODEC.dumps(e) + b"\n" for e in entries)
+        metrics.STORAGE_SERIALIZE.observe(self._label, time.perf_counter() - started)
+        fd = os.open(self.log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+            # Log hali ochilmagan bo'lsa, keyingi sync uni boshidan o'qiydi
+            if self._log_tail.same_file(fd):
+                self._log_tail.offset += len(data)
+        finally:
+            os.close(fd)
+        metrics.STORAGE_WRITTEN_BYTES.inc(self._label, len(data))
+
+    def _parse(self, lines, offset, exclusive):
+        """Log qatorlarini o'qiydi va log tail offsetini suradi"""
+        entries = []
+        start, started = offset, time.perf_counter()
+        for raw in lines:
+            try:
+                entries.append(CODEC.loads(raw))
+            except ValueError:
+                # Buzilgan qator (jarayon yozish paytida to'xtagan) - lock ostida kesib tashlaymiz
+                if exclusive:
+                    self._truncate_log(offset)
+                break
+            offset += len(raw) + 1
+        self._log_tail.offset = offset
+        if lines:
+            metrics.STORAGE_PARSE.observe(self._label, time.perf_counter() - started)
+            metrics.STORAGE_READ_BYTES.inc(self._label, offset - start)
+        if exclusive and self._log_tail.size() > offset:
+            # Yarim yozilgan qator: lock bizda, demak yozuvchi to'xtab qolgan
+            self._truncate_log(offset)
+        return entries
+
+    def _truncate_log(self, offset):
+        with open(self.log_path, "r+b") as f:
+            f.truncate(offset)
+
+    def _sync(self, exclusive=False):
+        """Boshqa jarayonlar yozgan o'zgarishlarni xotiraga qo'llaydi"""
+        if self._txn is not None:
+            return
+        lines, offset, fresh = self._log_tail.read()
+        entries = self._parse(lines, offset, exclusive)
+        if fresh and entries and entries[0].get("op") == "base" \
+                and entries[0]["v"] > self.version:
+            # Boshqa jarayon siqib bo'lgan, oraliq o'zgarishlar endi faqat JSON da
+            self._reload()
+            return
+        if self._txn_tail is not None:
+            entries.extend(self.txn_log.read(self.name, self._txn_tail))
+
+        for entry in entries:
+            if entry.get("op") == "base":
+                self.base_version = max(self.base_version, entry["v"])
+        new = sorted((e for e in entries if e.get("op") != "base" and e["v"] > self.version),
+                     key=lambda e: e["v"])
+        for entry in new:
+            if entry["v"] != self.version + 1:
+                # Kutilmagan bo'shliq - holatni diskdan to'liq qayta yuklaymiz
+                self._reload()
+                return
+            self._apply(entry)
+            self._pending += 1
+
+    def _reload(self):
+        """JSON + log + transactions.log dan holatni noldan tiklaydi.
+
+        JSON va log bitta fayl locki ostida o'qiladi: aks holda boshqa
+        jarayonning compactioni ular orasida logni almashtirib, eski JSON bilan
+        yangi "base" versiyani birlashtirib qo'yishi (oraliq yozuvlar yo'qolishi)
+        mumkin edi. Lock ostida JSON yangi, log esa eski bo'lishi mumkin - eski
+        log qayta qo'llanadi, natija o'zgarmaydi (qarang: compact).
+        """
+        with self.file_lock:
+            self._reset_state()
+            if not os.path.exists(self.path):
+                with open(self.path, "w", encoding="utf-8") as f:
+                    f.write("[]")
+            with open(self.path, "rb") as f:
+                data = f.read()
+            updated_at = os.path.getmtime(self.path)
+            lines, offset, _ = self._log_tail.read()
+            entries = self._parse(lines, offset, False)
+            # transactions.log ham shu yerda: lock bo'shagach siqilishi mumkin
+            txn_entries = self.txn_log.read(self.name, self._txn_tail) if self._txn_tail is not None else []
+        started = time.perf_counter()
+        records = CODEC.loads(data)
+        metrics.STORAGE_PARSE.observe(self._label, time.perf_counter() - started)
+        metrics.STORAGE_READ_BYTES.inc(self._label, len(data))
+        self._reset_records(records)
+        self.updated_at = updated_at
+
+        if entries and entries[0].get("op") == "base":
+            self.version = self.base_version = entries[0]["v"]
+            self.updated_at = entries[0].get("ts", self.updated_at)
+        entries.extend(txn_entries)
+        for entry in sorted((e for e in entries if e.get("op") != "base"), key=lambda e: e["v"]):
+            if entry["v"] > self.version:
+                self._apply(entry)
+                self._pending += 1
+
+    # ---------- siqish (compaction) ----------
+    def compact(self):
+        """Logni asosiy JSON faylga siqib yozadi.
+
+        JSON fayl yozish lockisiz yoziladi, shu vaqt ichida kelgan
+        o'zgarishlar yangi logga ko'chiriladi. Bir vaqtda faqat bitta jarayon
+        siqadi (`*.compact.lock`). Agar server JSON yozilgandan keyin, log
+        almashtirilishidan oldin to'xtasa, eski log qayta qo'llanadi -
+        operatsiyalar qiymatni o'rnatadi, shuning uchun natija o'zgarmaydi.
+        """
+        if not self._compact_lock.acquire(blocking=False):
+            return False
+        try:
+            return self._compact()
+        finally:
+            self._compact_lock.release()
+
+    def _compact(self):
+        with self.exclusive():
+            if not self._pending:
+                return False
+            records = self._records.rows()
+            version, updated_at = self.version, self.updated_at
+            offset = self._log_tail.offset if self._log_tail.fd is not None else 0
+
+        started = time.perf_counter()
+        data = CODEC.dumps(records if isinstance(records, list) else list(records), pretty=self.pretty)
+        metrics.STORAGE_SERIALIZE.observe(self._label, time.perf_counter() - started)
+        atomic_write(self.path, data)
+        metrics.STORAGE_WRITTEN_BYTES.inc(self._label, len(data))
+        metrics.STORAGE_COMPACTIONS.inc(self._label)
+
+        with self.exclusive():
+            tail = b""
+            if self._log_tail.fd is not None and self._log_tail.offset > offset:
+                tail = os.pread(self._log_tail.fd, self._log_tail.offset - offset, offset)
+            # ts - oxirgi yozish vaqti: qayta yuklagan jarayonlarda ham updated_at (ETag) bir xil
+            base = CODEC.dumps({"v": version, "ts": updated_at or time.time(), "op": "base"})
+            atomic_write(self.log_path, base + b"\n" + tail)
+            self._log_tail.close()
+            lines, offset, _ = self._log_tail.read()
+            self._log_tail.offset = offset + sum(len(raw) + 1 for raw in lines)
+            self.base_version = version
+            self._pending = self.version - version
+            self._compacted_at = time.time()
+        return True
+
+    def needs_compaction(self, now):
+        return self._pending >= COMPACT_MAX_OPS or (
+            self._pending > 0 and now - self._compacted_at >= COMPACT_INTERVAL
+        )
+
+    def reset_after_fork(self):
+        self.file_lock.reset_after_fork()
+        self._compact_lock.reset_after_fork()
+
+    def close(self):
+        pass
+
+
+class Storage:
+    """Barcha kolleksiyalar va fon compaction oqimi
+
+    backend="json"   - *.json fayllar + append-only log (standart)
+    backend="sqlite" - bitta SQLite bazasi, indekslangan jadvallar
+    """
+
+    def __init__(self, data_dir=".", backend="json", db_path=None, compact_json=False, schemas=None):
+        if backend not in BACKENDS:
+            raise ValueError(f"Noma'lum storage backend: {backend}")
+        self.data_dir = data_dir
+        self.backend = backend
+        self.compact_json = compact_json
+        self.schemas = schemas or {}   # fayl -> ustunli saqlash sxemasi (faqat JSON backend)
+        self.collections = {}
+        self._lock = threading.Lock()
+        self._compactor = None
+        self._stop = threading.Event()
+        self._atexit = False
+        self.db = None
+        self.txn_log = None
+        if backend == "sqlite":
+            from storage_sqlite import SqliteDatabase
+            self.db = SqliteDatabase(os.path.join(data_dir, db_path or "learnify.db"))
+        else:
+            self.txn_log = TransactionLog(os.path.join(data_dir, TXN_LOG))
+
+    def __getitem__(self, file):
+        return self.collection(file)
+
+    def collection(self, file):
+        col = self.collections.get(file)
+        if col is None:
+            with self._lock:
+                col = self.collections.get(file)
+                if col is None:
+                    col = self._open(file)
+                    self.collections[file] = col
+        return col
+
+    def _open(self, file):
+        if self.db is not None:
+            return self.db.collection(file)
+        col = Collection(os.path.join(self.data_dir, file), self.txn_log, pretty=not self.compact_json,
+                         schema=self.schemas.get(file))
+        self._start_compactor()
+        return col
+
+    def subscribe(self, file, callback):
+        """`callback(file, old, new)` - kolleksiyadagi har bir o'zgarishdan keyin.
+
+        Yozuvchi oqimda, kolleksiya locki ostida chaqiriladi - tez bo'lishi kerak.
+        old=new=None bo'lsa, kolleksiya butunlay almashgan.
+        """
+        self[file].listeners.append(lambda old, new: callback(file, old, new))
+
+    @contextmanager
+    def transaction(self, *files):
+        """Bir nechta kolleksiyani birga o'zgartirish.
+
+            with store.transaction(GROUPS_FILE, STUDENTS_FILE):
+                store[GROUPS_FILE].update(...)
+                store[STUDENTS_FILE].update(...)
+
+        Kolleksiyalar nom tartibida lock qilinadi (deadlock bo'lmasligi uchun).
+        Xatolik bo'lsa, xotiradagi o'zgarishlar diskdan qayta yuklash orqali
+        bekor qilinadi.
+        """
+        if self.db is not None:
+            cols = [self[f] for f in sorted(set(files))]
+            with ExitStack() as stack:
+                for col in cols:
+                    stack.enter_context(col.lock)
+                try:
+                    with self.db.transaction():
+                        yield self
+                except BaseException:
+                    # Bekor qilingan o'zgarishlar listenerlarga yuborilgan edi
+                    for col in cols:
+                        col._notify(None, None)
+                    raise
+            return
+
+        cols = [self[f] for f in sorted(set(files))]
+        with ExitStack() as stack:
+            for col in cols:
+                stack.enter_context(col.exclusive())
+            active = {col._txn for col in cols}
+            if active != {None}:
+                # Ichma-ich tranzaksiya - tashqi tranzaksiya bilan birga yoziladi
+                if None in active:
+                    raise RuntimeError("Ichki tranzaksiya tashqi tranzaksiyaga kirmagan kolleksiyani o'zgartira olmaydi")
+                yield self
+                return
+            txn = _Transaction()
+            for col in cols:
+                col._txn = txn
+            try:
+                yield self
+                for col in cols:
+                    col._txn = None
+                if len({name for name, _ in txn.entries}) == 1:
+                    # Bitta kolleksiya - o'z logiga bitta yozish bilan
+                    self[txn.entries[0][0]]._write([entry for _, entry in txn.entries])
+                elif txn.entries:
+                    self.txn_log.append(txn.entries)
+            except BaseException:
+                for col in cols:
+                    col._txn = None
+                    col._reload()
+                raise
+
+    def _start_compactor(self):
+        if self._compactor is not None or self._stop.is_set():
+            return
+        self._compactor = threading.Thread(target=self._compact_loop, daemon=True)
+        self._compactor.start()
+        if not self._atexit:
+            atexit.register(self.compact_all)
+            self._atexit = True
+
+    def _compact_loop(self):
+        while not self._stop.wait(1.0):
+            now = time.time()
+            for col in list(self.collections.values()):
+                if col.needs_compaction(now):
+                    try:
+                        col.compact()
+                    except OSError:
+                        # Keyingi aylanishda qayta urinib ko'ramiz
+                        pass
+            self._compact_txn_log()
+
+    def _compact_txn_log(self):
+        if self.txn_log is None:
+            return
+        try:
+            self.txn_log.compact(lambda name: self[name].base_version)
+        except OSError:
+            pass
+
+    def compact_all(self):
+        for col in list(self.collections.values()):
+            col.compact()
+        self._compact_txn_log()
+
+    def reset_after_fork(self):
+        """Fork qilingan jarayonda (masalan gunicorn workeri) chaqiriladi.
+
+        flock ochiq fayl tavsifiga bog'langan, ota jarayondagi oqimlar esa
+        bolada yo'q - lock fayllar, SQLite ulanishi va compaction oqimi
+        shu jarayon uchun qaytadan olinadi. Xotiradagi yozuvlar saqlanadi.
+        """
+        self._lock = threading.Lock()
+        for col in self.collections.values():
+            col.reset_after_fork()
+        if self.txn_log is not None:
+            self.txn_log.lock.reset_after_fork()
+        if self.db is not None:
+            self.db.reset_after_fork()
+        if self._compactor is not None:
+            self._compactor = None
+            self._start_compactor()
+
+    def close(self):
+        """Compaction oqimini to'xtatib, loglarni siqadi"""
+        self._stop.set()
+        if self._compactor is not None:
+            self._compactor.join()
+            self._compactor = None
+        self.compact_all()
+        for col in self.collections.values():
+            col.close()
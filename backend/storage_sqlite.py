@@ -0,0 +1,264 @@
+"""
+SQLite ombori
+
+`Storage(backend="sqlite")` tanlanganda kolleksiyalar bitta SQLite bazasida
+saqlanadi. Har bir kolleksiya alohida jadval: yozuvning o'zi `data` ustunida
+JSON ko'rinishida, tez-tez qidiriladigan maydonlar (INDEXED_FIELDS) esa
+alohida indekslangan ustunlarda turadi. `seq` ustuni yozuvlarning qo'shilish
+tartibini saqlaydi, shuning uchun javoblar JSON fayllardagi tartibda qaytadi.
+
+Kolleksiya interfeysi storage.Collection bilan bir xil:
+all, get, find_by, insert, update, delete, replace, version, updated_at.
+"""
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import metrics
+from codec import CODEC
+
+INDEXED_FIELDS = ("id", "groupId", "teacherId", "studentId", "companyId", "phone", "username")
+
+_COLUMNS = ", ".join(f'"{f}"' for f in INDEXED_FIELDS)
+_PLACEHOLDERS = ", ".join("?" for _ in INDEXED_FIELDS)
+_ASSIGNMENTS = ", ".join(f'"{f}" = ?' for f in INDEXED_FIELDS)
+_DB_LABEL = ("sqlite",)
+
+
+def _column_value(value):
+    # Ro'yxat va dictlar ustunga yozilmaydi - ular bo'yicha qidirilmaydi
+    return None if isinstance(value, (list, dict)) else value
+
+
+def _row(record):
+    return [_column_value(record.get(f)) for f in INDEXED_FIELDS] + [
+        CODEC.dumps(record).decode("utf-8")
+    ]
+
+
+class SqliteDatabase:
+    """Bitta SQLite fayli; har bir oqim o'z ulanishidan foydalanadi"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    @property
+    def conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.depth = 0
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Yozish tranzaksiyasi (ichma-ich chaqirilsa, tashqi tranzaksiya ishlatiladi)"""
+        conn = self.conn
+        if self._local.depth:
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+        started = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE")
+        metrics.STORAGE_LOCK_WAIT.observe(_DB_LABEL, time.perf_counter() - started)
+        self._local.depth = 1
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+        finally:
+            self._local.depth = 0
+
+    def collection(self, file):
+        return SqliteCollection(self, file)
+
+    def reset_after_fork(self):
+        # SQLite ulanishini fork orqali ulashib bo'lmaydi - bola jarayon o'zinikini ochadi
+        self._local = threading.local()
+
+
+class SqliteCollection:
+    """Bitta kolleksiya = bitta jadval"""
+
+    def __init__(self, db, file):
+        self.db = db
+        self.name = os.path.splitext(os.path.basename(file))[0]
+        if not self.name.isidentifier():
+            raise ValueError(f"Kolleksiya nomi noto'g'ri: {self.name}")
+        self.table = f'"{self.name}"'
+        self._label = (self.name,)   # metrikalar uchun
+        self.lock = threading.RLock()
+        self.listeners = []
+        self._cache_version = None
+        self._cache = []
+        self._create()
+
+    def _create(self):
+        with self.db.transaction() as conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                f"seq INTEGER PRIMARY KEY AUTOINCREMENT, {_COLUMNS}, data TEXT NOT NULL)"
+            )
+            for field in INDEXED_FIELDS:
+                conn.execute(
+                    f'CREATE INDEX IF NOT EXISTS "idx_{self.name}_{field}" '
+                    f'ON {self.table} ("{field}")'
+                )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS _meta ("
+                "name TEXT PRIMARY KEY, version INTEGER NOT NULL, updated_at REAL)"
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO _meta (name, version, updated_at) VALUES (?, 0, ?)",
+                (self.name, time.time()),
+            )
+
+    # ---------- metama'lumot ----------
+    def _meta(self):
+        return self.db.conn.execute(
+            "SELECT version, updated_at FROM _meta WHERE name = ?", (self.name,)
+        ).fetchone()
+
+    @property
+    def version(self):
+        return self._meta()[0]
+
+    @property
+    def updated_at(self):
+        return self._meta()[1]
+
+    def _bump(self, conn):
+        conn.execute(
+            "UPDATE _meta SET version = version + 1, updated_at = ? WHERE name = ?",
+            (time.time(), self.name),
+        )
+
+    # ---------- o'qish ----------
+    def all(self):
+        with self.lock:
+            version = self.version
+            if version != self._cache_version:
+                rows = self.db.conn.execute(f"SELECT data FROM {self.table} ORDER BY seq").fetchall()
+                started = time.perf_counter()
+                self._cache = [CODEC.loads(data) for (data,) in rows]
+                metrics.STORAGE_PARSE.observe(self._label, time.perf_counter() - started)
+                metrics.STORAGE_READ_BYTES.inc(self._label, sum(len(data) for (data,) in rows))
+                self._cache_version = version
+            return list(self._cache)
+
+    def get(self, record_id):
+        if record_id is None or isinstance(record_id, (list, dict)):
+            return None
+        row = self.db.conn.execute(
+            f'SELECT data FROM {self.table} WHERE "id" = ? ORDER BY seq LIMIT 1', (record_id,)
+        ).fetchone()
+        return CODEC.loads(row[0]) if row else None
+
+    def find_by(self, field, value):
+        """`field == value` bo'lgan yozuvlar; indekslangan maydonlar uchun index seek"""
+        if field not in INDEXED_FIELDS or value is None or isinstance(value, (list, dict)):
+            return [r for r in self.all() if r.get(field) == value]
+        rows = self.db.conn.execute(
+            f'SELECT data FROM {self.table} WHERE "{field}" = ? ORDER BY seq', (value,)
+        )
+        return [CODEC.loads(data) for (data,) in rows]
+
+    def __len__(self):
+        return self.db.conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def sync(self):
+        # O'qishlar har doim bazadan - sinxronlash shart emas
+        pass
+
+    # ---------- yozish ----------
+    def _notify(self, old, new):
+        for listener in self.listeners:
+            listener(old, new)
+
+    def _seq_of(self, conn, record_id):
+        row = conn.execute(
+            f'SELECT seq, data FROM {self.table} WHERE "id" = ? ORDER BY seq LIMIT 1', (record_id,)
+        ).fetchone()
+        return row if row else (None, None)
+
+    def insert(self, record):
+        record = dict(record)
+        with self.lock, self.db.transaction() as conn:
+            seq, data = self._seq_of(conn, record.get("id"))
+            if seq is None:
+                conn.execute(
+                    f"INSERT INTO {self.table} ({_COLUMNS}, data) VALUES ({_PLACEHOLDERS}, ?)",
+                    _row(record),
+                )
+            else:
+                conn.execute(
+                    f"UPDATE {self.table} SET {_ASSIGNMENTS}, data = ? WHERE seq = ?",
+                    _row(record) + [seq],
+                )
+            self._bump(conn)
+            self._notify(CODEC.loads(data) if data else None, record)
+        return record
+
+    def update(self, record_id, changes):
+        """Yozuvni yangilaydi va yangi dictni qaytaradi (topilmasa None)"""
+        with self.lock, self.db.transaction() as conn:
+            seq, data = self._seq_of(conn, record_id)
+            if seq is None:
+                return None
+            new = {**CODEC.loads(data), **changes}
+            conn.execute(
+                f"UPDATE {self.table} SET {_ASSIGNMENTS}, data = ? WHERE seq = ?",
+                _row(new) + [seq],
+            )
+            self._bump(conn)
+            self._notify(CODEC.loads(data), new)
+        return new
+
+    def delete(self, record_id):
+        """Yozuvni o'chiradi va uni qaytaradi (topilmasa None)"""
+        with self.lock, self.db.transaction() as conn:
+            seq, data = self._seq_of(conn, record_id)
+            if seq is None:
+                return None
+            conn.execute(f"DELETE FROM {self.table} WHERE seq = ?", (seq,))
+            self._bump(conn)
+            old = CODEC.loads(data)
+            self._notify(old, None)
+        return old
+
+    def replace(self, records):
+        """Butun kolleksiyani almashtiradi"""
+        records = [dict(r) for r in records]
+        with self.lock, self.db.transaction() as conn:
+            conn.execute(f"DELETE FROM {self.table}")
+            conn.executemany(
+                f"INSERT INTO {self.table} ({_COLUMNS}, data) VALUES ({_PLACEHOLDERS}, ?)",
+                (_row(r) for r in records),
+            )
+            self._bump(conn)
+            self._notify(None, None)
+
+    # JSON backend bilan bir xil interfeys uchun
+    def compact(self):
+        return False
+
+    def reset_after_fork(self):
+        self.lock = threading.RLock()
+
+    def needs_compaction(self, now):
+        return False
+
+    def close(self):
+        pass
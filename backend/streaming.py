@@ -0,0 +1,90 @@
+"""
+Ro'yxatlarni oqim (stream) ko'rinishida yuborish
+
+`jsonify(...)` butun javobni xotirada quradi va shundan keyingina birinchi
+baytni yuboradi. Bu yerdagi generatorlar yozuvlarni birma-bir kodlaydi va
+taxminan CHUNK_SIZE baytlik bo'laklarda yuboradi, shuning uchun xotira
+kolleksiya hajmiga bog'liq bo'lmaydi.
+
+    Accept: application/json      -> [ {...}, {...} ]   (standart)
+    Accept: application/x-ndjson  -> har qatorda bitta JSON yozuv
+
+Birinchi bo'lak javob qaytarilishidan oldin tayyorlanadi: shu paytdagi
+xatolar (hydrate, kodlash) chaqiruvchiga ko'tariladi va u oddiy 500
+qaytaradi. Keyingi bo'laklardagi xato logga yoziladi va oqim xato belgisi
+bilan tugaydi - 200 sarlavha ketib bo'lgan, lekin JSON massiv yopilmaydi,
+shuning uchun mijoz yarim ro'yxatni to'liq deb qabul qilmaydi. Bunday
+so'rovda `stream_failed()` True bo'ladi (masalan qisman tana keshlanmasligi uchun).
+"""
+from flask import Response, current_app, g, request, stream_with_context
+
+JSON = "application/json"
+NDJSON = "application/x-ndjson"
+CHUNK_SIZE = 64 * 1024
+STREAM_ERROR = "Ro'yxatni yuborishda xatolik, javob to'liq emas"
+
+
+def negotiate():
+    """Mijoz so'ragan format (Accept sarlavhasi bo'yicha)"""
+    return request.accept_mimetypes.best_match([JSON, NDJSON]) or JSON
+
+
+def _chunked(parts):
+    buffer, size = [], 0
+    for part in parts:
+        buffer.append(part)
+        size += len(part)
+        if size >= CHUNK_SIZE:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def iter_json_array(items, dumps):
+    yield "["
+    first = True
+    for item in items:
+        yield dumps(item) if first else "," + dumps(item)
+        first = False
+    yield "]\n"
+
+
+def iter_ndjson(items, dumps):
+    for item in items:
+        yield dumps(item) + "\n"
+
+
+def stream_failed():
+    """Shu so'rovning oqimi xato belgisi bilan tugaganmi"""
+    return g.get("stream_failed", False)
+
+
+def _guarded(first, chunks, mimetype, dumps):
+    yield first
+    try:
+        yield from chunks
+    except Exception:
+        current_app.logger.exception("Ro'yxat oqimida xatolik (javob qisman yuborildi)")
+        g.stream_failed = True
+        marker = dumps({"error": STREAM_ERROR}) + "\n"
+        yield marker if mimetype == NDJSON else "\n" + marker
+
+
+def stream_list(items, headers=None):
+    """Yozuvlar iteratoridan oqimli javob (JSON massiv yoki NDJSON).
+
+    Birinchi bo'lakdagi xatolar shu yerdan ko'tariladi (javob hali yaratilmagan).
+    """
+    dumps = current_app.json.dumps
+    mimetype = negotiate()
+    if mimetype == NDJSON:
+        body = iter_ndjson(items, dumps)
+    else:
+        body = iter_json_array(items, dumps)
+    chunks = _chunked(body)
+    first = next(chunks, "")
+    response = Response(stream_with_context(_guarded(first, chunks, mimetype, dumps)),
+                        mimetype=mimetype, headers=headers)
+    response.vary.add("Accept")
+    return response
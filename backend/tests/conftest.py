@@ -0,0 +1,103 @@
+"""
+Testlar uchun umumiy fixturelar
+
+    cd backend && python -m pytest tests
+
+Har bir test vaqtinchalik DATA_DIR bilan ishlaydi. Ko'p jarayonli holatlar
+(gunicorn workerlari) `other_process` orqali tekshiriladi: kod shu papkani
+ochgan alohida Python jarayonida bajariladi.
+"""
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import server  # noqa: E402
+
+# other_process kodidan oldin: `app`, `client` va `server` tayyor bo'ladi
+PRELUDE = """
+import json, sys
+import server
+app = server.create_app({{"DATA_DIR": {data_dir!r}, "PRELOAD": False, "ADMIN_TOKEN": {token!r}}})
+client = app.test_client()
+"""
+ADMIN_TOKEN = "test-admin-token"
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    return str(tmp_path)
+
+
+@pytest.fixture
+def make_app(data_dir):
+    """create_app(...) ni shu DATA_DIR bilan chaqiradi; test oxirida ombor yopiladi"""
+    def factory(**config):
+        app = server.create_app({"DATA_DIR": data_dir, "PRELOAD": False, "ADMIN_TOKEN": ADMIN_TOKEN, **config})
+        app.testing = True
+        return app
+    yield factory
+    if server.store is not None:
+        server.store.close()
+        server.store = None
+
+
+@pytest.fixture
+def client(make_app):
+    return make_app().test_client()
+
+
+@pytest.fixture
+def admin():
+    return {"X-Admin-Token": ADMIN_TOKEN}
+
+
+def _start(data_dir, code):
+    source = PRELUDE.format(data_dir=data_dir, token=ADMIN_TOKEN) + textwrap.dedent(code)
+    return subprocess.Popen([sys.executable, "-c", source], cwd=BACKEND_DIR,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+
+
+def _finish(process):
+    stdout, stderr = process.communicate(timeout=120)
+    if process.returncode != 0:
+        pytest.fail(f"Boshqa jarayon xato bilan tugadi:\n{stderr}")
+    return stdout
+
+
+@pytest.fixture
+def other_process(data_dir):
+    """other_process(code) - kodni boshqa jarayonda bajaradi, stdout ni qaytaradi"""
+    def run(code):
+        return _finish(_start(data_dir, code))
+    return run
+
+
+@pytest.fixture
+def other_processes(data_dir):
+    """other_processes(code, n) - kodni n ta jarayonda bir vaqtda bajaradi (`sys.argv[1]` - tartib raqami)"""
+    def run(code, count):
+        processes = [_start(data_dir, f"sys.argv[1:] = [{i!r}]\n" + textwrap.dedent(code)) for i in range(count)]
+        return [_finish(p) for p in processes]
+    return run
+
+
+@pytest.fixture
+def background_process(data_dir):
+    """background_process(code) - kodni boshqa jarayonda ishga tushiradi, kutish funksiyasini qaytaradi"""
+    started = []
+
+    def start(code):
+        process = _start(data_dir, code)
+        started.append(process)
+        return lambda: _finish(process)
+    yield start
+    for process in started:
+        if process.poll() is None:
+            process.kill()
+            process.communicate()
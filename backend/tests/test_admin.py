@@ -0,0 +1,31 @@
+"""Admin funksiyalari faqat X-Admin-Token bilan"""
+
+
+def test_register_admin_requires_token(client, admin):
+    user = {"username": "boss", "password": "secret123", "role": "admin"}
+    assert client.post("/auth/register", json=user).status_code == 403
+    assert client.post("/auth/register", json=user, headers=admin).status_code == 201
+
+
+def test_admin_session_is_not_enough(client, admin):
+    client.post("/auth/register", json={"username": "boss", "password": "secret123", "role": "admin"},
+                headers=admin)
+    token = client.post("/auth/login", json={"username": "boss", "password": "secret123"}).get_json()["token"]
+    session = {"Authorization": f"Bearer {token}"}
+    for path in ("/admin/profiles", "/admin/snapshots"):
+        assert client.get(path, headers=session).status_code == 403
+        assert client.get(path, headers=admin).status_code == 200
+
+
+def test_admin_disabled_without_token(make_app):
+    client = make_app(ADMIN_TOKEN="").test_client()
+    assert client.get("/admin/snapshots", headers={"X-Admin-Token": ""}).status_code == 403
+    assert client.post("/auth/register", json={"username": "boss", "password": "secret123",
+                                                "role": "admin"}).status_code == 403
+
+
+def test_ledger_maintenance_requires_token(client, admin):
+    for path in ("/ledger/snapshot", "/ledger/rebuild"):
+        assert client.post(path).status_code == 403
+    assert client.post("/ledger/snapshot", headers=admin).status_code == 201
+    assert client.post("/ledger/rebuild", headers=admin).status_code == 200
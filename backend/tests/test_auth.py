@@ -0,0 +1,67 @@
+"""Sessiyalar: token barcha workerlarda (jarayonlarda) amal qiladi"""
+import os
+import threading
+import time
+
+import server
+from auth import SessionStore
+
+
+def login(client, username="teacher1", password="secret123"):
+    client.post("/auth/register", json={"username": username, "password": password, "role": "teacher"})
+    response = client.post("/auth/login", json={"username": username, "password": password})
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.get_json()['token']}"}
+
+
+def test_token_from_other_process(client, other_process):
+    token = other_process("""
+        client.post("/auth/register", json={"username": "teacher1", "password": "secret123", "role": "teacher"})
+        print(client.post("/auth/login", json={"username": "teacher1", "password": "secret123"}).get_json()["token"])
+    """).strip()
+    response = client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.get_json()["user"]["username"] == "teacher1"
+
+
+def test_logout_applies_to_other_process(client, other_process):
+    headers = login(client)
+    assert other_process(f"""
+        print(client.get("/auth/me", headers={headers!r}).status_code)
+    """).strip() == "200"
+    assert client.post("/auth/logout", headers=headers).status_code == 200
+    assert other_process(f"""
+        print(client.get("/auth/me", headers={headers!r}).status_code)
+    """).strip() == "401"
+
+
+def test_session_expires(tmp_path):
+    sessions = SessionStore(str(tmp_path), ttl=60)
+    token = sessions.create({"id": 1})
+    assert sessions.get(token)["user"] == {"id": 1}
+    path = sessions._path(token)
+    os.utime(path, (time.time() - 61, time.time() - 61))
+    assert sessions.get(token) is None
+    assert not os.path.exists(path)
+
+
+def test_least_recently_used_evicted(tmp_path):
+    sessions = SessionStore(str(tmp_path), max_sessions=2)
+    first, second = sessions.create({"id": 1}), sessions.create({"id": 2})
+    old = time.time() - 10
+    os.utime(sessions._path(first), (old, old))
+    os.utime(sessions._path(second), (old + 1, old + 1))
+    sessions.get(first)          # first endi eng so'nggi ishlatilgan
+    sessions.cleanup()
+    sessions.create({"id": 3})
+    assert sessions.get(first) is not None
+    assert sessions.get(second) is None
+    assert len(sessions) == 2
+
+
+def test_hasher_busy_is_503(client, monkeypatch):
+    monkeypatch.setattr(server.hasher, "_slots", threading.BoundedSemaphore(1))
+    server.hasher._slots.acquire()
+    response = client.post("/auth/register", json={"username": "teacher1", "password": "secret123", "role": "teacher"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,86 @@
+"""Ommaviy import: yaroqli qatorlar saqlanadi, yaroqsizlari qator raqami bilan qaytadi"""
+import io
+
+import bulk
+import server
+
+
+def test_partial_failure_reports_rows(client):
+    response = client.post("/students/bulk", json=[
+        {"name": "Ali Valiyev", "groupId": "5"},
+        {"phone": "+998901112233"},
+        "matn",
+        {"name": "Vali Aliyev", "balance": "ko'p"},
+        {"name": "Said Karimov", "id": 1},
+    ])
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body["inserted"] == 2 and body["failed"] == 3
+    assert body["errors"] == [
+        {"row": 2, "error": "'name' maydoni majburiy"},
+        {"row": 3, "error": "Qator obyekt bo'lishi kerak"},
+        {"row": 4, "error": "'balance' son bo'lishi kerak"},
+    ]
+    students = client.get("/students").get_json()
+    assert [s["name"] for s in students] == ["Ali Valiyev", "Said Karimov"]
+    assert students[0]["groupId"] == 5 and students[0]["status"] == "active"
+    # Yuborilgan id e'tiborsiz - yangi id beriladi
+    assert [s["id"] for s in students] == body["ids"] and 1 not in body["ids"]
+
+
+def test_atomic_saves_nothing_on_error(client):
+    response = client.post("/students/bulk?atomic=1", json=[{"name": "Ali Valiyev"}, {}])
+    assert response.status_code == 400
+    assert response.get_json()["errors"] == [{"row": 2, "error": "'name' maydoni majburiy"}]
+    assert client.get("/students").get_json() == []
+
+
+def test_csv_body_and_upload(client):
+    # Excel CSV: BOM bilan
+    data = "\ufeffname,subject,phone\nDilnoza Karimova,Matematika,+998901234567\nBobur,,+998907654321\n"
+    response = client.post("/teachers/bulk", data=data.encode("utf-8"), content_type="text/csv")
+    assert response.get_json()["inserted"] == 1
+    assert response.get_json()["errors"] == [{"row": 2, "error": "'subject' maydoni majburiy"}]
+
+    upload = {"file": (io.BytesIO(b"name,phone\nAli Valiyev,+998901112233\n"), "students.csv")}
+    response = client.post("/students/bulk", data=upload, content_type="multipart/form-data")
+    assert response.status_code == 201
+    assert client.get("/students").get_json()[0]["phone"] == "+998901112233"
+
+
+def test_bad_requests(client):
+    assert client.post("/students/bulk", json={"name": "Ali"}).status_code == 400
+    assert client.post("/students/bulk", data="x", content_type="application/xml").status_code == 400
+    assert client.post("/students/bulk", data={}, content_type="multipart/form-data").status_code == 400
+    # Hamma qator yaroqsiz - 400
+    response = client.post("/students/bulk", json=[{}])
+    assert response.status_code == 400
+    assert response.get_json()["inserted"] == 0
+
+
+def test_row_limit(client, monkeypatch):
+    monkeypatch.setattr(bulk, "MAX_ROWS", 2)
+    body = client.post("/students/bulk", json=[{"name": f"S{i}"} for i in range(5)]).get_json()
+    assert body["inserted"] == 2
+    assert body["errors"] == [{"row": 3, "error": "Bir so'rovda ko'pi bilan 2 ta qator"}]
+
+
+def test_payments_unknown_student(client):
+    student = client.post("/students", json={"name": "Ali Valiyev", "balance": 0}).get_json()
+    response = client.post("/payments/bulk", json=[
+        {"studentId": 999, "amount": 100, "paymentDate": "2025-02-01"},
+        {"studentId": student["id"], "amount": 100, "paymentDate": "2025-02-01"},
+        {"studentId": student["id"], "amount": -5, "paymentDate": "2025-02-02"},
+        {"studentId": student["id"], "amount": "50", "paymentDate": "2025-02-03"},
+    ])
+    body = response.get_json()
+    assert body["inserted"] == 2
+    # Tekshiruv va "student topilmadi" xatolari qator tartibida
+    assert body["errors"] == [
+        {"row": 1, "error": "Student topilmadi"},
+        {"row": 3, "error": "'amount' musbat bo'lishi kerak"},
+    ]
+    assert len(client.get("/payments").get_json()) == 2
+    ledger = client.get(f"/students/{student['id']}/ledger").get_json()
+    assert [e["type"] for e in ledger["entries"]] == ["payment", "payment"]
+    assert ledger["balance"] == server.store["students.json"].get(student["id"])["balance"] == -150
@@ -0,0 +1,40 @@
+"""ETag / 304: boshqa worker yozgan o'zgarishlar ko'rinishi kerak"""
+
+
+def test_write_in_other_process_changes_etag(client, other_process):
+    client.post("/students", json={"name": "Ali Valiyev", "status": "active"})
+    first = client.get("/students")
+    etag = first.headers["ETag"]
+    assert len(first.get_json()) == 1
+
+    other_process("""
+        client.post("/students", json={"name": "Dilnoza Karimova", "status": "active"})
+    """)
+
+    second = client.get("/students", headers={"If-None-Match": etag})
+    assert second.status_code == 200
+    assert second.headers["ETag"] != etag
+    assert len(second.get_json()) == 2
+
+
+def test_etag_matches_body_across_processes(client, other_process):
+    """Boshqa jarayon ko'rgan ETag shu jarayonda ham aynan shu ma'lumotga tegishli"""
+    client.post("/students", json={"name": "Ali Valiyev"})
+    client.get("/students")
+    other = other_process("""
+        client.post("/students", json={"name": "Dilnoza Karimova"})
+        response = client.get("/students")
+        print(response.headers["ETag"], len(response.get_json()))
+    """).split()
+    etag, count = other[0], int(other[1])
+
+    response = client.get("/students", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert count == 2
+    assert len(client.get("/students").get_json()) == count
+
+
+def test_not_modified_without_writes(client):
+    client.post("/students", json={"name": "Ali Valiyev"})
+    etag = client.get("/students").headers["ETag"]
+    assert client.get("/students", headers={"If-None-Match": etag}).status_code == 304
@@ -0,0 +1,133 @@
+"""O'zgarishlar lentasi: /changes va /changes/stream"""
+import json
+import os
+import time
+
+import changes
+import server
+
+
+def cursor(client, collections=None):
+    query = f"?collections={collections}" if collections else ""
+    return client.get(f"/changes{query}").get_json()["cursor"]
+
+
+def since(client, position, collections=None):
+    query = f"&collections={collections}" if collections else ""
+    response = client.get(f"/changes?since={position}{query}")
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_stream_limit_follows_threads(make_app):
+    assert changes.max_streams(4) == 2
+    assert changes.max_streams(1) == 1
+    client = make_app(THREADS=3).test_client()
+
+    first = client.get("/changes/stream")
+    assert first.status_code == 200
+    second = client.get("/changes/stream")
+    assert second.status_code == 503
+    assert second.headers["Retry-After"]
+
+    # Birinchi ulanish yopilgach (hatto bitta hodisa o'qilmasdan) joy bo'shaydi
+    first.close()
+    third = client.get("/changes/stream")
+    assert third.status_code == 200
+    third.close()
+
+
+def test_changes_after_cursor_are_collapsed(client):
+    start = cursor(client)
+    student = client.post("/students", json={"name": "Ali Valiyev"}).get_json()
+    client.put(f"/students/{student['id']}", json={"status": "inactive"})
+    client.put(f"/students/{student['id']}", json={"phone": "+998901112233"})
+    teacher = client.post("/teachers", json={"name": "Dilnoza Karimova"}).get_json()
+
+    body = since(client, start)
+    assert body["reset"] == []
+    # Oraliqda qo'shilib o'zgartirilgan yozuv - bitta "insert", oxirgi holati bilan
+    assert [(c["collection"], c["op"], c["id"]) for c in body["changes"]] == [
+        ("students", "insert", student["id"]), ("teachers", "insert", teacher["id"])]
+    assert body["changes"][0]["record"]["phone"] == "+998901112233"
+    assert since(client, body["cursor"])["changes"] == []
+
+    client.delete(f"/teachers/{teacher['id']}")
+    deleted = since(client, body["cursor"])["changes"]
+    assert [(c["op"], c["id"], c["record"]) for c in deleted] == [("delete", teacher["id"], None)]
+
+
+def test_collections_filter_and_errors(client):
+    start = cursor(client, "groups")
+    client.post("/students", json={"name": "Ali Valiyev"})
+    assert since(client, start, "groups")["changes"] == []
+    assert client.get("/changes?collections=secrets").status_code == 400
+    assert client.get("/changes?since=not-a-cursor").status_code == 400
+
+
+def test_users_without_password(client):
+    start = cursor(client)
+    client.post("/auth/register", json={"username": "ustoz", "password": "maxfiy123", "role": "teacher"})
+    users = [c for c in since(client, start)["changes"] if c["collection"] == "users"]
+    assert users and "password" not in users[0]["record"]
+
+
+def test_reset_when_history_is_gone(make_app, monkeypatch):
+    monkeypatch.setattr(changes, "MAX_EVENTS", 3)
+    client = make_app().test_client()
+    start = cursor(client)
+    recent = client.post("/students", json={"name": "S0"})
+    middle = cursor(client)
+    for i in range(1, 5):
+        client.post("/students", json={"name": f"S{i}"})
+    # 3 tadan eski cursor - studentlar to'liq qayta yuklanadi
+    body = since(client, start)
+    assert body["reset"] == ["students"]
+    assert since(client, middle)["reset"] == ["students"]
+    assert recent.status_code == 201
+    assert len(since(client, cursor(client))["changes"]) == 0
+
+    # Kolleksiya butunlay almashtirilsa ham reset
+    position = cursor(client)
+    server.store["students.json"].replace([])
+    assert since(client, position)["reset"] == ["students"]
+
+
+def test_cursor_is_shared_between_processes(client, data_dir, background_process):
+    """Boshqa worker yozgan o'zgarish shu cursor bilan ikkala jarayonda bir xil ko'rinadi"""
+    start = cursor(client)
+    done = os.path.join(data_dir, "done")
+    wait = background_process(f"""
+        import os, time
+        client.post("/students", json={{"name": "Dilnoza Karimova"}})
+        print(json.dumps(client.get("/changes?since={start}").get_json()))
+        # Chiqishda loglar siqiladi (boshqa workerlar uchun reset) - test tugaguncha kutadi
+        while not os.path.exists({done!r}):
+            time.sleep(0.01)
+    """)
+    deadline = time.monotonic() + 30
+    while not ((body := since(client, start))["changes"] or body["reset"]) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    open(done, "w").close()
+    other = json.loads(wait())
+    assert other["reset"] == []
+    assert [c["record"]["name"] for c in other["changes"]] == ["Dilnoza Karimova"]
+    if os.environ.get("LEARNIFY_STORAGE") == "sqlite":
+        # Boshqa jarayonning SQLite yozuvi listenerga kelmaydi - kolleksiya qayta yuklanadi
+        assert body["reset"] == ["students"] and body["cursor"] == other["cursor"]
+    else:
+        assert body == other
+
+
+def test_stream_sends_ready_and_changes(client):
+    response = client.get("/changes/stream?collections=students")
+    events = (chunk.decode() for chunk in response.response)
+    assert next(events) == "retry: 3000\n\n"
+    ready = next(events)
+    assert ready.startswith("id: ") and "event: ready" in ready
+    client.post("/students", json={"name": "Ali Valiyev"})
+    event = next(events)
+    assert "event: changes" in event
+    data = json.loads(event.split("data: ", 1)[1])
+    assert [c["record"]["name"] for c in data["changes"]] == ["Ali Valiyev"]
+    response.close()
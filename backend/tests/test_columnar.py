@@ -0,0 +1,93 @@
+"""ColumnTable: yozuvlar dict bilan aynan bir xil qaytishi va vacuum"""
+import pytest
+
+import columnar
+import server
+from columnar import ColumnTable
+
+SCHEMA = {"id": "int", "amount": "number", "type": "enum", "note": "str", "groupId": "int"}
+
+
+def same(a, b):
+    """Qiymatlar, turlari va kalitlar tartibi bir xil"""
+    assert list(a.items()) == list(b.items())
+    assert [type(v) for v in a.values()] == [type(v) for v in b.values()]
+
+
+RECORDS = [
+    {"id": 1, "amount": 100, "type": "cash", "note": "yanvar", "groupId": 7},
+    {"note": "", "amount": 99.5, "id": 2, "type": "card", "groupId": None},
+    {"id": 3, "amount": True, "type": 5, "note": None, "groupId": "7", "tags": ["a"], "paid": False},
+    {"id": 4, "amount": 2 ** 60, "type": "cash", "groupId": 2 ** 64},
+    {"id": 5},
+]
+
+
+def test_records_round_trip():
+    table = ColumnTable(SCHEMA, RECORDS)
+    assert list(table) == [1, 2, 3, 4, 5]
+    for record in RECORDS:
+        same(table[record["id"]], record)
+    for stored, record in zip(table.rows(), RECORDS):
+        same(stored, record)
+    assert table.get(6) is None
+
+
+def test_unknown_kind():
+    with pytest.raises(ValueError):
+        ColumnTable({"id": "date"})
+
+
+def test_columns_and_totals():
+    table = ColumnTable(SCHEMA, RECORDS)
+    rows = table.rows()
+    assert rows.column("type") == ["cash", "card", 5, "cash", None]
+    assert rows.column("groupId") == [7, None, "7", 2 ** 64, None]
+    assert rows.take([3, 0]).column("id") == [4, 1]
+    assert rows.totals("type", "amount") == {"cash": 100 + 2 ** 60, "card": 99.5, 5: True, None: 0}
+    lookup = rows.lookup("note")
+    assert lookup["yanvar"]["id"] == 1 and "yo'q" not in lookup
+
+
+def test_update_keeps_position_and_rows_snapshot():
+    table = ColumnTable(SCHEMA, RECORDS[:3])
+    before = table.rows()
+    table[1] = {"id": 1, "amount": 150.0, "type": "transfer"}
+    removed = table.pop(2)
+    assert removed["type"] == "card"
+    assert list(table) == [1, 3]
+    assert [r["id"] for r in table.rows()] == [1, 3]
+    assert table[1] == {"id": 1, "amount": 150.0, "type": "transfer"}
+    # Oldingi snapshot o'zgarmaydi
+    assert [r["amount"] for r in before] == [100, 99.5, True]
+
+
+def test_vacuum(monkeypatch):
+    monkeypatch.setattr(columnar, "VACUUM_MIN_DEAD", 10)
+    table = ColumnTable(SCHEMA, [{"id": i, "amount": i, "type": "cash"} for i in range(5)])
+    snapshot = table.rows()
+    for n in range(9):
+        table[2] = {"id": 2, "amount": n, "type": "card", "tags": [n]}
+    # 9 ta o'lik qator - chegaradan kam
+    assert table.stats() == {"records": 5, "rows": 14, "layouts": 2, "extras": 9}
+    table[3] = {"id": 3, "amount": 30, "type": "card"}
+    # 10 ta o'lik (>= VACUUM_MIN_DEAD va tiriklardan ko'p) - faqat tiriklar ko'chiriladi
+    assert table.stats() == {"records": 5, "rows": 5, "layouts": 2, "extras": 1}
+    assert [r["id"] for r in table.rows()] == [0, 1, 2, 3, 4]
+    assert [r["amount"] for r in table.rows()] == [0, 1, 8, 30, 4]
+    assert table[2]["tags"] == [8]
+    assert [r["amount"] for r in snapshot] == [0, 1, 2, 3, 4]
+
+
+def test_collection_with_schema_matches_plain(make_app):
+    """Ombor ustunli va oddiy rejimda bir xil yozuvlar qaytaradi (kalitlar tartibi ham)"""
+    payment = {"studentId": 1, "amount": 120000, "paymentDate": "2025-02-01",
+               "paymentType": "cash", "description": "=izoh"}
+    stored = []
+    for columnar_on in (True, False):
+        client = make_app(COLUMNAR=columnar_on).test_client()
+        created = client.post("/payments", json=payment).get_json()
+        record = server.store["payments.json"].get(created["id"])
+        stored.append({k: v for k, v in record.items() if k not in ("id", "createdAt")})
+    same(stored[0], stored[1])
+    assert stored[0]["amount"] == 120000.0
@@ -0,0 +1,116 @@
+"""Javoblarni siqish va siqilgan javoblar keshi"""
+import gzip
+import json
+
+import pytest
+
+import compression
+import server
+import streaming
+from compression import CompressedCache, negotiate
+from query import ListQuery
+
+GZIP = {"Accept-Encoding": "gzip"}
+
+
+@pytest.fixture
+def client(make_app, monkeypatch):
+    # Kesh modul darajasida - har bir test bo'sh kesh bilan
+    monkeypatch.setattr(server.compressor, "cache", CompressedCache())
+    client = make_app().test_client()
+    for i in range(5):
+        client.post("/students", json={"name": f"Student {i}"})
+    return client
+
+
+def test_failed_stream_is_not_cached(client, monkeypatch):
+    def broken(self, records):
+        for i, record in enumerate(records):
+            if i == 3:
+                raise RuntimeError("kodlash xatosi")
+            yield record
+
+    monkeypatch.setattr(streaming, "CHUNK_SIZE", 1)
+    with monkeypatch.context() as patch:
+        patch.setattr(ListQuery, "project", broken)
+        failed = client.get("/students", headers=GZIP)
+    assert failed.status_code == 200
+    assert streaming.STREAM_ERROR in gzip.decompress(failed.get_data()).decode()
+    assert server.compressor.cache.size == 0
+
+    # Ma'lumot o'zgarmagan (ETag bir xil), lekin javob keshdan emas - to'liq ro'yxat
+    response = client.get("/students", headers=GZIP)
+    assert response.headers["ETag"] == failed.headers["ETag"]
+    body = gzip.decompress(response.get_data()).decode()
+    assert streaming.STREAM_ERROR not in body
+    assert len(json.loads(body)) == 5
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate", "gzip"),
+    ("gzip;q=0", None),
+    ("GZIP;q=0.5", "gzip"),
+    ("identity", None),
+    ("gzip;q=abc", None),
+    ("", None),
+    (None, None),
+])
+def test_negotiate_gzip(monkeypatch, header, expected):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert negotiate(header) == expected
+
+
+def test_negotiate_prefers_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", object())
+    assert negotiate("gzip, br") == "br"
+    assert negotiate("gzip, br;q=0") == "gzip"
+
+
+def test_collection_response_is_cached(client, monkeypatch):
+    first = client.get("/students", headers=GZIP)
+    assert first.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in first.headers["Vary"]
+    assert len(json.loads(gzip.decompress(first.get_data()))) == 5
+
+    calls = []
+    with monkeypatch.context() as patch:
+        patch.setattr(compression, "compress", lambda data, encoding: calls.append(data) or b"")
+        # Ma'lumot o'zgarmagan - keshdan, qayta siqilmaydi
+        again = client.get("/students", headers=GZIP)
+        assert again.get_data() == first.get_data() and calls == []
+        # Parametrli so'rov keshlanmaydi (oqim bo'laklab siqiladi)
+        filtered = client.get("/students?status=active", headers=GZIP)
+        assert filtered.headers["Content-Encoding"] == "gzip" and calls == []
+        assert "Content-Length" not in filtered.headers
+
+    # Yozuvdan keyin ETag o'zgaradi - yangi javob siqiladi
+    client.post("/students", json={"name": "Student 5"})
+    fresh = client.get("/students", headers=GZIP)
+    assert fresh.headers["ETag"] != first.headers["ETag"]
+    assert len(json.loads(gzip.decompress(fresh.get_data()))) == 6
+
+
+def test_not_compressed(client):
+    plain = client.get("/students")
+    assert "Content-Encoding" not in plain.headers
+    assert "Accept-Encoding" in plain.headers["Vary"]
+    # Kichik javob (MIN_SIZE dan kam) va xato javoblari siqilmaydi
+    small = client.get("/search?q=zzz", headers=GZIP)
+    assert small.status_code == 200 and "Content-Encoding" not in small.headers
+    missing = client.get("/groups/999", headers=GZIP)
+    assert missing.status_code == 404 and "Content-Encoding" not in missing.headers
+    # 304 ga tana yo'q
+    etag = plain.headers["ETag"]
+    assert client.get("/students", headers={**GZIP, "If-None-Match": etag}).status_code == 304
+
+
+def test_cache_evicts_least_recently_used():
+    cache = CompressedCache(max_bytes=10)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    assert cache.get("a") == b"1234"
+    cache.put("c", b"1234")
+    assert cache.get("b") is None and cache.get("a") and cache.get("c")
+    assert cache.size == 8
+    cache.put("d", b"x" * 11)   # kesh hajmidan katta - saqlanmaydi
+    assert cache.get("d") is None
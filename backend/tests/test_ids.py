@@ -0,0 +1,100 @@
+"""Snowflake id lar: eski yozuvlar bilan to'qnashmaslik, o'sish va jarayonlar orasida noyoblik"""
+import json
+import os
+
+import pytest
+
+import ids
+import server
+from ids import IdGenerator
+
+
+def test_ids_above_floor(data_dir):
+    floor = 1 << 52   # hozirgi vaqtdan ancha keyingi id
+    generator = IdGenerator(data_dir, worker=0, floor=floor)
+    batch = generator.next_ids(1000)
+    assert min(batch) > floor
+    assert batch == sorted(set(batch))
+
+
+def test_new_records_above_legacy_ids(make_app):
+    legacy = 1 << 52
+    make_app()
+    server.store["students.json"].insert({"id": legacy, "name": "Eski student"})
+    # Qayta ishga tushish: floor ombordan olinadi
+    client = make_app().test_client()
+    response = client.post("/students", json={"name": "Yangi student"})
+    assert response.status_code == 201
+    assert response.get_json()["id"] > legacy
+
+
+def parts(record_id):
+    """id -> (millisekund, worker, tartib raqami)"""
+    return (record_id >> (ids.WORKER_BITS + ids.SEQUENCE_BITS),
+            record_id >> ids.SEQUENCE_BITS & (ids.MAX_WORKERS - 1),
+            record_id & ids.MAX_SEQUENCE)
+
+
+def test_batch_larger_than_one_millisecond(data_dir, monkeypatch):
+    """Soat to'xtab qolsa ham (bir millisekundda 512 tadan ko'p) id lar o'sib boradi"""
+    monkeypatch.setattr(ids.time, "time", lambda: 1767225600.0)
+    generator = IdGenerator(data_dir, worker=5)
+    first = generator.next_ids(1300)
+    second = [generator.next_id() for _ in range(300)]
+    batch = first + second
+    assert batch == sorted(set(batch)) and len(batch) == 1600
+    assert {parts(i)[1] for i in batch} == {5}
+    # Ichki soat oldinga siljiydi: 1600 ta id = 4 millisekund
+    assert len({parts(i)[0] for i in batch}) == 4
+
+
+def test_clock_moving_backwards(data_dir, monkeypatch):
+    clock = iter([1767225600.0, 1767225599.0, 1767225500.0])
+    monkeypatch.setattr(ids.time, "time", lambda: next(clock))
+    generator = IdGenerator(data_dir, worker=0)
+    batch = [generator.next_id() for _ in range(3)]
+    assert batch == sorted(set(batch))
+
+
+def test_unique_across_workers(data_dir, other_processes):
+    """Bir vaqtda ishlayotgan jarayonlar turli slot oladi, id lar takrorlanmaydi"""
+    count = 4
+    outputs = other_processes(f"""
+        import os, time
+        index = int(sys.argv[1])
+        worker = server.id_generator.worker
+        # Hamma jarayon slot olguncha kutiladi - slotlar bir vaqtda band
+        open(os.path.join({data_dir!r}, f"ready-{{index}}"), "w").close()
+        while len([f for f in os.listdir({data_dir!r}) if f.startswith("ready-")]) < {count}:
+            time.sleep(0.01)
+        batch = []
+        for _ in range(200):
+            batch += server.id_generator.next_ids(37)
+        print(json.dumps({{"worker": worker, "ids": batch}}))
+    """, count)
+    results = [json.loads(out) for out in outputs]
+    assert len({r["worker"] for r in results}) == count
+    every = []
+    for result in results:
+        assert result["ids"] == sorted(result["ids"])
+        assert {parts(i)[1] for i in result["ids"]} == {result["worker"]}
+        every += result["ids"]
+    assert len(set(every)) == len(every) == count * 200 * 37
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork yo'q")
+def test_child_takes_own_slot_after_fork(data_dir):
+    generator = IdGenerator(data_dir)
+    parent = generator.worker
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.write(write, str(generator.worker).encode())
+        finally:
+            os._exit(0)
+    os.close(write)
+    child = int(os.read(read, 16))
+    os.close(read)
+    os.waitpid(pid, 0)
+    assert child != parent
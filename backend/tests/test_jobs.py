@@ -0,0 +1,156 @@
+"""Fon joblari va eksportlar"""
+import csv
+import os
+import threading
+import time
+
+import pytest
+
+import exports
+import jobs
+import server
+from jobs import JobQueue, JobsBusy
+
+
+def wait(client, admin, job_id):
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        job = client.get(f"/jobs/{job_id}", headers=admin).get_json()
+        if job["status"] in ("done", "failed", "cancelled"):
+            return job
+        time.sleep(0.02)
+    pytest.fail(f"Job {job_id} tugamadi")
+
+
+def test_export_requires_token(client, admin):
+    assert client.post("/jobs/export", json={"type": "students"}).status_code == 403
+    job = client.post("/jobs/export", json={"type": "students"}, headers=admin).get_json()
+    wait(client, admin, job["id"])
+    for method, path in (("get", f"/jobs/{job['id']}"), ("get", f"/jobs/{job['id']}/download"),
+                         ("delete", f"/jobs/{job['id']}")):
+        assert getattr(client, method)(path).status_code == 403
+
+
+@pytest.mark.parametrize("value", ["=HYPERLINK(\"http://x\")", "+998901112233", "-1+2", "@SUM(A1)", "\tx", "\rx"])
+def test_formula_cells_are_escaped(value):
+    assert exports._cell(value) == "'" + value
+
+
+def test_csv_export_escapes_formulas(client, admin):
+    client.post("/students", json={"name": "=HYPERLINK(\"http://evil\",\"x\")", "status": "active"})
+    job = client.post("/jobs/export", json={"type": "students", "format": "csv"}, headers=admin).get_json()
+    assert wait(client, admin, job["id"])["status"] == "done"
+    body = client.get(f"/jobs/{job['id']}/download", headers=admin).get_data().decode("utf-8-sig")
+    rows = list(csv.DictReader(body.splitlines()))
+    assert rows[0]["name"] == "'=HYPERLINK(\"http://evil\",\"x\")"
+    assert exports._cell(5.0) == 5.0 and exports._cell(-3) == -3
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "PROGRESS_SECONDS", 0)
+    return JobQueue(str(tmp_path / "jobs"), workers=1, queue=1, keep_hours=1)
+
+
+def finished(queue, job_id):
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        meta = queue.get(job_id)
+        if meta["status"] in jobs.FINISHED:
+            return meta
+        time.sleep(0.01)
+    pytest.fail(f"Job {job_id} tugamadi")
+
+
+def blocking(started, release):
+    """Bekor qilinguncha (yoki release gacha) progress yozib turadigan job"""
+    def run(job):
+        started.set()
+        with open(job.path, "w") as f:
+            f.write("qisman")
+        while not release.is_set():
+            job.progress(1, 10)
+            time.sleep(0.01)
+    return run
+
+
+def test_cancel_running_and_queued(queue):
+    started, release = threading.Event(), threading.Event()
+    running = queue.submit("test", {}, blocking(started, release), "a.csv")
+    queued = queue.submit("test", {}, lambda job: pytest.fail("bekor qilingan job ishladi"), "b.csv")
+    # 1 ta ishlayotgan + 1 ta navbatda - boshqa joy yo'q
+    with pytest.raises(JobsBusy):
+        queue.submit("test", {}, lambda job: None, "c.csv")
+    assert started.wait(10)
+
+    # Navbatdagisi darhol bekor bo'ladi
+    assert queue.cancel(queued["id"])["status"] == "cancelled"
+    # Ishlayotgani progress yozishda to'xtaydi
+    meta = queue.cancel(running["id"])
+    assert meta["cancelling"] is True
+    assert finished(queue, running["id"])["status"] == "cancelled"
+    assert sorted(os.listdir(queue.directory)) == sorted([running["id"] + ".json", queued["id"] + ".json"])
+    with pytest.raises(ValueError):
+        queue.result(running["id"])
+
+
+def test_failed_and_done_jobs(queue):
+    def broken(job):
+        raise RuntimeError("disk to'ldi")
+    failed = queue.submit("test", {}, broken, "a.csv")
+    assert finished(queue, failed["id"])["error"] == "RuntimeError: disk to'ldi"
+
+    def run(job):
+        with open(job.path, "w") as f:
+            f.write("id\n1\n")
+    done = queue.submit("test", {}, run, "b.csv")
+    meta = finished(queue, done["id"])
+    assert meta["status"] == "done" and meta["progress"] == 1.0 and meta["size"] == 5
+    path, _ = queue.result(done["id"])
+    assert open(path).read() == "id\n1\n"
+    # Tugagan jobni "bekor qilish" - natijasini o'chirish
+    assert queue.cancel(done["id"]) is None
+    with pytest.raises(LookupError):
+        queue.get(done["id"])
+
+
+def test_expired_jobs_are_removed(queue):
+    def run(job):
+        with open(job.path, "w") as f:
+            f.write("x")
+    old = queue.submit("test", {}, run, "a.csv")
+    finished(queue, old["id"])
+    orphan = os.path.join(queue.directory, "abc-0123abcd.result")
+    open(orphan, "w").close()
+
+    queue.cleanup(now=time.time() + 1800)
+    assert queue.get(old["id"])["status"] == "done"
+    assert not os.path.exists(orphan)
+    queue.cleanup(now=time.time() + 3601)
+    with pytest.raises(LookupError):
+        queue.get(old["id"])
+    assert os.listdir(queue.directory) == []
+
+
+def test_job_of_dead_process_fails(queue):
+    os.makedirs(queue.directory, exist_ok=True)
+    queue.save({"id": "abc-0123abcd", "status": "running", "pid": 2 ** 22 + 1})
+    meta = queue.get("abc-0123abcd")
+    assert meta["status"] == "failed" and "to'xtadi" in meta["error"]
+    with pytest.raises(LookupError):
+        queue.get("../../etc/passwd")
+
+
+def test_job_routes(client, admin, monkeypatch):
+    monkeypatch.setattr(jobs, "PROGRESS_SECONDS", 0)
+    started, release = threading.Event(), threading.Event()
+    monkeypatch.setattr(server, "export_job", lambda kind, fmt, filters: blocking(started, release))
+    job = client.post("/jobs/export", json={"type": "students"}, headers=admin)
+    assert job.status_code == 202 and job.headers["Location"] == f"/jobs/{job.get_json()['id']}"
+    job_id = job.get_json()["id"]
+    assert started.wait(10)
+    assert client.get(f"/jobs/{job_id}/download", headers=admin).status_code == 409
+    assert client.delete(f"/jobs/{job_id}", headers=admin).status_code == 202
+    assert wait(client, admin, job_id)["status"] == "cancelled"
+    assert client.delete(f"/jobs/{job_id}", headers=admin).status_code == 200
+    assert client.get(f"/jobs/{job_id}", headers=admin).status_code == 404
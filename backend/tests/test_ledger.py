@@ -0,0 +1,82 @@
+"""To'lov routelari: students.json balansi, ledger va to'lovlar bir-biriga mos"""
+import server
+
+PROCESSES = 3
+ROUNDS = 20
+
+
+def add_student(client, balance=0):
+    return client.post("/students", json={"name": "Ali Valiyev", "balance": balance}).get_json()["id"]
+
+
+def pay(client, student_id, amount):
+    return client.post("/payments", json={"studentId": student_id, "amount": amount, "paymentDate": "2025-11-20"})
+
+
+def assert_consistent(client, student_id, expected):
+    """Balans nusxasi, ledger yig'indisi va to'lov yozuvlari bir xil"""
+    student = server.store["students.json"].get(student_id)
+    ledger = client.get(f"/students/{student_id}/ledger?limit=1000").get_json()
+    entries = ledger["entries"]
+    assert student["balance"] == ledger["balance"] == expected
+    assert student["paymentStatus"] == ("paid" if expected <= 0 else "unpaid")
+    assert round(sum(e["delta"] for e in entries), 2) == expected
+    assert entries[-1]["balance"] == expected
+    payments = server.store["payments.json"].find_by("studentId", student_id)
+    assert sorted(e["refId"] for e in entries if e["type"] == "payment") == sorted(p["id"] for p in payments)
+
+
+def test_payment_routes(client):
+    student_id = add_student(client, balance=100000)
+    assert client.post(f"/students/{student_id}/charges", json={"amount": 500000}).status_code == 201
+    assert pay(client, student_id, 300000).status_code == 201
+    bulk = [{"studentId": student_id, "amount": amount, "paymentDate": "2025-11-21"} for amount in (100000, 50000)]
+    assert client.post("/payments/bulk", json=bulk).status_code == 201
+    assert_consistent(client, student_id, 150000)
+
+    # Qo'lda o'zgartirish - tuzatish yozuvi
+    client.put(f"/students/{student_id}", json={"balance": 0})
+    assert_consistent(client, student_id, 0)
+    types = [e["type"] for e in client.get(f"/students/{student_id}/ledger").get_json()["entries"]]
+    assert types == ["opening", "charge", "payment", "payment", "payment", "adjustment"]
+
+
+def test_concurrent_payments_from_workers(client, other_processes):
+    student_id = add_student(client)
+    client.post(f"/students/{student_id}/charges", json={"amount": 1000000})
+    other_processes(f"""
+        for _ in range({ROUNDS}):
+            assert client.post("/payments", json={{"studentId": {student_id}, "amount": 1000,
+                                                   "paymentDate": "2025-11-20"}}).status_code == 201
+    """, PROCESSES)
+    assert_consistent(client, student_id, 1000000 - PROCESSES * ROUNDS * 1000)
+
+
+def test_rebuild_from_snapshot_matches(client):
+    student_id = add_student(client, balance=20000)
+    for _ in range(3):
+        pay(client, student_id, 1000)
+    server.ledger.snapshot()
+    for _ in range(2):
+        pay(client, student_id, 1000)
+    before = server.ledger.balances()
+    result = server.ledger.rebuild()
+    assert result["fromSnapshot"] == 4 and result["replayed"] == 2
+    assert server.ledger.balances() == before == {student_id: 15000}
+
+
+def test_manual_balance_is_stored_as_number(client):
+    student_id = add_student(client, balance=10000)
+    pay(client, student_id, 4000)
+    response = client.put(f"/students/{student_id}", json={"balance": "25000.50"})
+    assert response.get_json()["balance"] == 25000.5
+    assert_consistent(client, student_id, 25000.5)
+
+
+def test_manual_balance_adjusts_from_ledger(client):
+    """students.json nusxasi eskirgan bo'lsa ham tuzatish ledger balansidan hisoblanadi"""
+    student_id = add_student(client, balance=10000)
+    pay(client, student_id, 4000)
+    server.store["students.json"].update(student_id, {"balance": 999})
+    client.put(f"/students/{student_id}", json={"balance": 1000})
+    assert_consistent(client, student_id, 1000)
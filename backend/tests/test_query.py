@@ -0,0 +1,101 @@
+"""ListQuery: filtr, saralash, sahifalash va fields; ustunli (columnar) yo'l ham xuddi shunday"""
+import pytest
+from werkzeug.datastructures import MultiDict
+
+from columnar import ColumnTable
+from query import ListQuery
+
+SCHEMA = {"id": "int", "name": "str", "status": "enum", "amount": "number", "date": "enum", "groupId": "int"}
+RECORDS = [
+    {"id": 1, "name": "Ali", "status": "active", "amount": 300, "date": "2025-01-05", "groupId": 10},
+    {"id": 2, "name": "Vali", "status": "inactive", "amount": 100.5, "date": "2025-01-31 18:00", "groupId": 20},
+    {"id": 3, "name": "Said", "status": "active", "amount": 200, "date": "2025-02-01", "groupId": None},
+    {"id": 4, "name": "Bobur", "status": "active", "amount": 100.5, "date": "2024-12-31", "groupId": "10"},
+    {"id": 5, "name": "Aziz", "status": None, "amount": None, "date": None, "groupId": 10},
+]
+
+
+def run(records, args, filters=("status", "groupId"), date_field="date"):
+    query = ListQuery(MultiDict(args), filters, date_field)
+    page, total, cursor = query.apply(records)
+    return [dict(r) for r in query.project(page)], total, cursor
+
+
+@pytest.fixture(params=["list", "columnar"])
+def records(request):
+    if request.param == "list":
+        return [dict(r) for r in RECORDS]
+    return ColumnTable(SCHEMA, RECORDS).rows()
+
+
+def ids(result):
+    return [r["id"] for r in result[0]]
+
+
+@pytest.mark.parametrize("args, expected", [
+    ({}, [1, 2, 3, 4, 5]),
+    ({"status": "active"}, [1, 3, 4]),
+    ({"status": "inactive,active"}, [1, 2, 3, 4]),
+    ({"groupId": "10"}, [1, 4, 5]),            # 10 va "10" bir xil (matn sifatida solishtiriladi)
+    ({"status": "active", "groupId": "10"}, [1, 4]),
+    ({"from": "2025-01-01", "to": "2025-01-31"}, [1, 2]),   # "to" kuni to'liq kiradi
+    ({"to": "2025-01"}, [1, 2, 4]),
+    ({"sort": "name"}, [1, 5, 4, 3, 2]),
+    ({"sort": "-amount,name"}, [5, 1, 3, 4, 2]),  # kamayishda None boshida, tenglari name bo'yicha
+    ({"sort": "-id", "status": "active"}, [4, 3, 1]),
+    ({"sort": "groupId"}, [1, 5, 2, 4, 3]),       # sonlar, matnlar, keyin None
+])
+def test_filter_and_sort(records, args, expected):
+    result = run(records, args)
+    assert ids(result) == expected
+    assert result[1] == len(expected)
+
+
+def test_same_result_for_columnar_and_list():
+    args = {"status": "active,inactive", "sort": "-amount", "limit": "2", "fields": "id,amount"}
+    assert run([dict(r) for r in RECORDS], args) == run(ColumnTable(SCHEMA, RECORDS).rows(), args)
+
+
+def test_limit_offset_and_fields(records):
+    page, total, cursor = run(records, {"sort": "id", "limit": "2", "offset": "1", "fields": "id,name,missing"})
+    assert page == [{"id": 2, "name": "Vali"}, {"id": 3, "name": "Said"}]
+    assert total == 5
+    assert cursor is not None
+
+
+def test_cursor_walks_all_pages(records):
+    seen, cursor = [], None
+    while True:
+        args = {"limit": "2", **({"cursor": cursor} if cursor else {})}
+        page, total, cursor = run(records, args)
+        seen.extend(r["id"] for r in page)
+        if cursor is None:
+            break
+    assert seen == [1, 2, 3, 4, 5]
+
+
+def test_cursor_survives_deleted_record():
+    records = [dict(r) for r in RECORDS]
+    _, _, cursor = run(records, {"limit": "2"})
+    # Birinchi sahifadagi yozuv o'chirildi: offset siljidi, cursor id bo'yicha davom etadi
+    del records[0]
+    page, _, _ = run(records, {"limit": "2", "cursor": cursor})
+    assert [r["id"] for r in page] == [3, 4]
+
+
+@pytest.mark.parametrize("args", [{"limit": "x"}, {"offset": "-1"}, {"cursor": "!!!"}])
+def test_invalid_arguments(args):
+    with pytest.raises(ValueError):
+        ListQuery(MultiDict(args))
+
+
+def test_endpoint_headers(client):
+    for i in range(5):
+        client.post("/students", json={"name": f"Student {i}", "status": "active" if i % 2 else "inactive"})
+    response = client.get("/students?status=active&sort=-name&limit=1&fields=name")
+    assert response.get_json() == [{"name": "Student 3"}]
+    assert response.headers["X-Total-Count"] == "2"
+    rest = client.get(f"/students?status=active&sort=-name&limit=1&fields=name&cursor={response.headers['X-Next-Cursor']}")
+    assert rest.get_json() == [{"name": "Student 1"}]
+    assert "X-Next-Cursor" not in rest.headers
+    assert client.get("/students?limit=abc").status_code == 400
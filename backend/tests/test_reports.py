@@ -0,0 +1,106 @@
+"""Tushum hisobotlari (kunlik/oylik yig'indilar)"""
+import random
+
+import pytest
+
+import reports
+import server
+
+
+@pytest.fixture
+def client(make_app):
+    client = make_app().test_client()
+    student = client.post("/students", json={"name": "Ali Valiyev"}).get_json()
+    for date, amount in [("2025-01-31", 100), ("2025-02-01", 200), ("2025-02-28", 300), ("2025-03-01", 400)]:
+        client.post("/payments", json={"studentId": student["id"], "amount": amount, "paymentDate": date})
+    return client
+
+
+@pytest.mark.parametrize("date_to", ["2025-02-28", "2025-02", "2025"])
+def test_full_month_uses_monthly_rollup(client, monkeypatch, date_to):
+    """Fevral 28 kun: "to=2025-02-28" ham oyni to'liq qamraydi"""
+    def days_total(self, lo, hi):
+        pytest.fail(f"kunlik yig'indi kerak emas: {lo}..{hi}")
+
+    monkeypatch.setattr(reports.RevenueIndex, "_days_total", days_total)
+    report = server.revenue.report("2025-02-01", date_to)
+    february = report["buckets"][0]
+    assert february == {"period": "2025-02", "revenue": 500.0, "count": 2}
+
+
+def test_month_end_in_leap_year():
+    assert reports._month_end("2024-02") == "2024-02-29"
+    assert reports._month_end("2025-02") == "2025-02-28"
+    assert reports._month_end("2025-04") == "2025-04-30"
+
+
+def brute_force(payments, date_from, date_to, bucket):
+    """Hisobotning to'lovlardan to'g'ridan-to'g'ri hisoblangan nusxasi"""
+    width = 10 if bucket == "day" else 7
+    buckets = {}
+    for p in payments:
+        day = p["paymentDate"]
+        if date_from and day < date_from or date_to and day[:len(date_to)] > date_to:
+            continue
+        revenue, count = buckets.get(day[:width], (0, 0))
+        buckets[day[:width]] = (revenue + p["amount"], count + 1)
+    return [{"period": k, "revenue": round(v[0], 2), "count": v[1]} for k, v in sorted(buckets.items())]
+
+
+def test_rollups_match_brute_force(make_app):
+    client = make_app().test_client()
+    student = client.post("/students", json={"name": "Vali Aliyev"}).get_json()
+    rng = random.Random(7)
+    payments = [{"studentId": student["id"], "amount": rng.randrange(1, 500) * 1000,
+                 "paymentDate": f"2024-{rng.randrange(11, 13)}-{rng.randrange(1, 31):02d}"} for _ in range(40)]
+    payments += [{"studentId": student["id"], "amount": rng.randrange(1, 500) * 1000,
+                  "paymentDate": f"2025-0{rng.randrange(1, 4)}-{rng.randrange(1, 29):02d}"} for _ in range(60)]
+    client.post("/payments/bulk", json=payments)
+    for date_from, date_to in [(None, None), ("2024-11-15", "2025-02-10"), ("2025-01", "2025-01"),
+                               ("2024", "2024"), ("2024-12-31", "2025-01-01")]:
+        for bucket in ("day", "month"):
+            report = server.revenue.report(date_from, date_to, bucket)
+            assert report["buckets"] == brute_force(payments, date_from, date_to, bucket)
+            assert report["count"] == sum(b["count"] for b in report["buckets"])
+
+
+def test_breakdown_keeps_scope_at_payment_time(client):
+    student = client.get("/students").get_json()[0]
+    client.put(f"/students/{student['id']}", json={"groupId": 7, "branchId": 2})
+    client.post("/payments", json={"studentId": student["id"], "amount": 50, "paymentDate": "2025-02-10",
+                                   "paymentType": "card"})
+    # Student boshqa guruhga o'tdi - to'lov o'z guruhida (7) qoladi; groupId siz
+    # eski to'lovlar studentning hozirgi guruhidan olinadi
+    client.put(f"/students/{student['id']}", json={"groupId": 8})
+    report = client.get("/reports/revenue?from=2025-02&to=2025-02&by=group").get_json()
+    assert report["by"] == {"8": 500.0, "7": 50.0}
+    by_type = client.get("/reports/revenue?from=2025-02&to=2025-02&by=type").get_json()
+    assert by_type["by"] == {"cash": 500.0, "card": 50.0}
+
+
+def test_updates_and_deletes_adjust_rollups(client):
+    payments = server.store["payments.json"]
+    first = next(p for p in payments.all() if p["paymentDate"] == "2025-01-31")
+    payments.update(first["id"], {"paymentDate": "2025-02-15", "amount": 150})
+    report = server.revenue.report(None, None, "month")
+    assert [(b["period"], b["revenue"]) for b in report["buckets"]] == [("2025-02", 650.0), ("2025-03", 400.0)]
+    last = next(p for p in payments.all() if p["paymentDate"] == "2025-03-01")
+    payments.delete(last["id"])
+    report = server.revenue.report(None, None, "day")
+    assert [b["period"] for b in report["buckets"]] == ["2025-02-01", "2025-02-15", "2025-02-28"]
+    assert client.get("/dashboard/summary").get_json()["revenue"] == 650.0
+
+
+def test_payment_from_other_process(client, other_process):
+    other_process("""
+        student = client.get("/students").get_json()[0]
+        client.post("/payments", json={"studentId": student["id"], "amount": 1000, "paymentDate": "2025-03-20"})
+    """)
+    march = client.get("/reports/revenue?from=2025-03&to=2025-03").get_json()
+    assert march["revenue"] == 1400.0 and march["count"] == 2
+    assert client.get("/dashboard/summary").get_json()["revenue"] == 2000.0
+
+
+@pytest.mark.parametrize("query", ["from=2025-1-1", "bucket=week", "by=teacher"])
+def test_invalid_arguments(client, query):
+    assert client.get(f"/reports/revenue?{query}").status_code == 400
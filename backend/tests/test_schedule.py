@@ -0,0 +1,67 @@
+"""Dars jadvali: o'qituvchi/xona to'qnashuvlari va bo'sh vaqtlar"""
+import pytest
+
+
+def add_group(client, **fields):
+    group = {"name": "Guruh", "teacherId": 1, "schedule": "Dushanba Chorshanba Juma",
+             "startTime": "14:00", "endTime": "15:30", **fields}
+    return client.post("/groups", json=group)
+
+
+@pytest.fixture
+def group(client):
+    response = add_group(client, name="Ingliz tili A1")
+    assert response.status_code == 201
+    return response.get_json()
+
+
+def test_overlapping_teacher_time_is_409(client, group):
+    response = add_group(client, name="Ingliz tili A2", schedule="Toq kunlar", startTime="15:00", endTime="16:00")
+    assert response.status_code == 409
+    conflicts = response.get_json()["conflicts"]
+    assert {c["day"] for c in conflicts} == {"dushanba", "chorshanba", "juma"}
+    assert all(c["groupId"] == group["id"] and c["resource"] == "teacher" for c in conflicts)
+    assert len(client.get("/groups").get_json()) == 1
+
+
+@pytest.mark.parametrize("fields", [
+    {"startTime": "15:30", "endTime": "17:00"},   # oldingi dars tugagan daqiqada boshlanadi
+    {"schedule": "Seshanba Payshanba"},           # boshqa kunlar
+    {"teacherId": 2},                             # boshqa o'qituvchi
+    {"status": "completed"},                      # tugagan guruh joy egallamaydi
+])
+def test_no_conflict(client, group, fields):
+    assert add_group(client, name="Boshqa guruh", **fields).status_code == 201
+
+
+def test_same_room_is_409(client):
+    assert add_group(client, teacherId=1, branchId=1, room="101").status_code == 201
+    response = add_group(client, teacherId=2, branchId=1, room="101")
+    assert response.status_code == 409
+    assert {c["resource"] for c in response.get_json()["conflicts"]} == {"room"}
+    # Boshqa filialdagi shu nomli xona - boshqa resurs
+    assert add_group(client, teacherId=2, branchId=2, room="101").status_code == 201
+
+
+def test_update_into_conflict_is_409(client, group):
+    other = add_group(client, name="Kechki guruh", startTime="18:00", endTime="19:30").get_json()
+    response = client.put(f"/groups/{other['id']}", json={"startTime": "15:00", "endTime": "16:30"})
+    assert response.status_code == 409
+    assert client.get(f"/groups/{other['id']}").get_json()["startTime"] == "18:00"
+    # Vaqtga tegmaydigan tahrir tekshirilmaydi, o'z darsi bilan to'qnashmaydi
+    assert client.put(f"/groups/{group['id']}", json={"name": "Ingliz tili B1"}).status_code == 200
+    assert client.put(f"/groups/{group['id']}", json={"endTime": "16:00"}).status_code == 200
+
+
+def test_invalid_time_is_400(client):
+    assert add_group(client, startTime="25:00").status_code == 400
+    assert add_group(client, startTime="16:00", endTime="15:00").status_code == 400
+
+
+def test_timetable_and_free_slots(client, group):
+    day = client.get("/timetable?teacherId=1&day=chorshanba").get_json()["days"]
+    assert day == {"chorshanba": [{"groupId": group["id"], "name": "Ingliz tili A1",
+                                   "startTime": "14:00", "endTime": "15:30", "conflicts": []}]}
+    free = client.get("/timetable/free?teacherId=1&day=juma&from=12:00&to=18:00&duration=60").get_json()
+    assert free["free"] == [{"startTime": "12:00", "endTime": "14:00"}, {"startTime": "15:30", "endTime": "18:00"}]
+    assert client.get("/timetable/free?teacherId=1").status_code == 400
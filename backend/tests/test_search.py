@@ -0,0 +1,71 @@
+"""/search: trigramma indeksi va natijalar tartibi"""
+import pytest
+
+
+@pytest.fixture
+def client(make_app):
+    client = make_app().test_client()
+    for name, phone in [("Ali Valiyev", "+998 90 111 22 33"), ("Alisher Karimov", "+998 90 444 55 66"),
+                        ("Vali Aliyev", "+998 91 777 88 99"), ("G'ayrat O'tkirov", "+998 93 000 11 22")]:
+        client.post("/students", json={"name": name, "phone": phone})
+    client.post("/teachers", json={"name": "Dilnoza Karimova", "phone": "+998 97 123 45 67", "subject": "Ali matematika"})
+    return client
+
+
+def names(response):
+    return [hit["record"]["name"] for hit in response.get_json()["hits"]]
+
+
+def test_exact_word_ranks_above_prefix_and_infix(client):
+    response = client.get("/search?q=ali&type=student")
+    # Ali - to'liq so'z, Alisher - so'z boshi, Aliyev - so'z boshi (familiya), Vali - so'z ichi
+    assert names(response) == ["Ali Valiyev", "Alisher Karimov", "Vali Aliyev"]
+    scores = [hit["score"] for hit in response.get_json()["hits"]]
+    assert scores == sorted(scores, reverse=True)
+    assert scores[0] > scores[1]
+
+
+def test_name_ranks_above_subject(client):
+    hits = client.get("/search?q=ali").get_json()["hits"]
+    kinds = [(hit["type"], hit["record"]["name"]) for hit in hits]
+    # O'qituvchi faqat fan bo'yicha mos (og'irligi past) - oxirida
+    assert kinds[-1] == ("teacher", "Dilnoza Karimova")
+
+
+def test_all_words_must_match(client):
+    assert names(client.get("/search?q=ali valiyev")) == ["Ali Valiyev"]
+    assert names(client.get("/search?q=ali karimov&type=student")) == ["Alisher Karimov"]
+
+
+def test_apostrophes_and_case_ignored(client):
+    assert names(client.get("/search?q=gayrat")) == ["G'ayrat O'tkirov"]
+    assert names(client.get("/search?q=O%E2%80%98TKIROV")) == ["G'ayrat O'tkirov"]
+
+
+def test_phone_digits(client):
+    assert names(client.get("/search?q=444 55")) == ["Alisher Karimov"]
+    assert names(client.get("/search?q=(98) 90")) == ["Ali Valiyev", "Alisher Karimov"]
+    # 1-2 raqam - faqat raqam boshidan
+    assert names(client.get("/search?q=90")) == []
+
+
+def test_index_follows_writes(client):
+    student = client.get("/search?q=alisher").get_json()["hits"][0]
+    client.put(f"/students/{student['id']}", json={"name": "Bobur Karimov"})
+    assert names(client.get("/search?q=alisher")) == []
+    assert names(client.get("/search?q=bobur")) == ["Bobur Karimov"]
+    client.delete(f"/students/{student['id']}")
+    assert names(client.get("/search?q=bobur")) == []
+
+
+def test_paging_and_total(client):
+    first = client.get("/search?q=ali&type=student&limit=2")
+    assert first.get_json()["total"] == 3
+    assert first.headers["X-Total-Count"] == "3"
+    second = client.get("/search?q=ali&type=student&limit=2&offset=2")
+    assert names(first) + names(second) == ["Ali Valiyev", "Alisher Karimov", "Vali Aliyev"]
+
+
+def test_invalid_arguments(client):
+    assert client.get("/search?q=ali&type=course").status_code == 400
+    assert client.get("/search?q=ali&limit=0").status_code == 400
@@ -0,0 +1,84 @@
+"""Snapshotlar: tartib, izchillik va tiklash"""
+import os
+import time
+
+import pytest
+
+import server
+import snapshot
+from codec import CODEC
+
+# SQLite snapshoti - bazaning bitta nusxasi (ota snapshot yo'q), tiklash oflayn
+pytestmark = pytest.mark.skipif(os.environ.get("LEARNIFY_STORAGE") == "sqlite",
+                                reason="JSON backend snapshotlari")
+
+
+def test_same_second_snapshots_keep_order(make_app):
+    client = make_app(SNAPSHOT_KEEP=2).test_client()
+    client.post("/students", json={"name": "Ali Valiyev"})
+    created = []
+    for i in range(4):
+        client.post("/teachers", json={"name": f"Teacher {i}"})
+        created.append(server.snapshots.create())
+    listed = server.snapshots.list()
+    assert [m["id"] for m in listed] == [created[3]["id"], created[2]["id"]]
+    for previous, manifest in zip(created, created[1:]):
+        assert manifest["parent"] == previous["id"]
+
+
+def snapshot_records(manifest, file):
+    with open(os.path.join(server.snapshots.path(manifest["id"]), file), "rb") as f:
+        return CODEC.loads(f.read())
+
+
+def state():
+    return {file: list(server.store[file].all()) for file in server.COLLECTION_FILES}
+
+
+def test_snapshot_consistent_while_other_process_writes(client, data_dir, background_process):
+    stop = os.path.join(data_dir, "stop")
+    wait = background_process(f"""
+        import os
+        i = 0
+        while not os.path.exists({stop!r}):
+            # Har bir tranzaksiya ikki kolleksiyaga bir xil id bilan yozadi
+            with server.store.transaction("tasks.json", "teachers.json"):
+                server.store["tasks.json"].insert({{"id": i, "title": "x"}})
+                server.store["teachers.json"].insert({{"id": i, "name": "x"}})
+            i += 1
+    """)
+    deadline = time.monotonic() + 30
+    while len(server.store["tasks.json"]) < 10 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    manifests = [server.snapshots.create() for _ in range(3)]
+    open(stop, "w").close()
+    wait()
+
+    for manifest in manifests:
+        tasks = {r["id"] for r in snapshot_records(manifest, "tasks.json")}
+        teachers = {r["id"] for r in snapshot_records(manifest, "teachers.json")}
+        assert tasks == teachers and tasks
+        snapshot.verify(server.snapshots.path(manifest["id"]))
+
+
+def test_restore_while_running(client, data_dir, other_process):
+    student_id = client.post("/students", json={"name": "Ali Valiyev", "balance": 50000}).get_json()["id"]
+    client.post("/payments", json={"studentId": student_id, "amount": 20000, "paymentDate": "2025-11-20"})
+    manifest = server.snapshots.create()
+    saved = state()
+
+    other_process(f"""
+        client.put("/students/{student_id}", json={{"name": "O'zgargan"}})
+        client.post("/payments", json={{"studentId": {student_id}, "amount": 5000, "paymentDate": "2025-11-21"}})
+        client.post("/teachers", json={{"name": "Yangi o'qituvchi"}})
+    """)
+    assert state() != saved
+
+    snapshot.restore(server.snapshots.path(manifest["id"]), data_dir, derived=(server.LEDGER_SNAPSHOT,))
+    assert state() == saved
+    assert server.ledger.balance(student_id) == 30000
+    # Boshqa worker (va qayta ishga tushgan server) ham tiklangan holatni ko'radi
+    assert other_process(f"""
+        print(server.store["students.json"].get({student_id})["name"], len(server.store["teachers.json"]),
+              server.ledger.balance({student_id}))
+    """).split() == ["Ali", "Valiyev", "0", "30000.0"]
@@ -0,0 +1,87 @@
+"""Bir nechta jarayon (worker) bitta DATA_DIR ga yozganda yo'qolgan o'zgarishlar bo'lmasligi"""
+import os
+
+import pytest
+
+import server
+from storage import TXN_LOG, Collection, TransactionLog
+
+PROCESSES = 3
+ROUNDS = 40
+
+
+def test_concurrent_read_modify_write(client, other_processes):
+    server.store["tasks.json"].insert({"id": 1, "title": "counter", "n": 0})
+    other_processes(f"""
+        tasks = server.store["tasks.json"]
+        for _ in range({ROUNDS}):
+            with server.store.transaction("tasks.json"):
+                tasks.update(1, {{"n": tasks.get(1)["n"] + 1}})
+    """, PROCESSES)
+    assert server.store["tasks.json"].get(1)["n"] == PROCESSES * ROUNDS
+
+
+def test_concurrent_inserts_get_unique_ids(client, other_processes):
+    outputs = other_processes(f"""
+        for i in range({ROUNDS}):
+            response = client.post("/students", json={{"name": f"Student {{sys.argv[1]}}-{{i}}"}})
+            print(response.get_json()["id"])
+    """, PROCESSES)
+    ids = [int(line) for output in outputs for line in output.split()]
+    assert len(set(ids)) == PROCESSES * ROUNDS
+    students = client.get("/students").get_json()
+    assert sorted(s["id"] for s in students) == sorted(ids)
+
+
+def test_stale_if_match_conflicts(client, other_process):
+    created = client.post("/students", json={"name": "Ali Valiyev"})
+    student_id, etag = created.get_json()["id"], created.headers["ETag"]
+    other_process(f"""
+        client.put("/students/{student_id}", json={{"name": "Ali Valiyev (boshqa admin)"}})
+    """)
+    response = client.put(f"/students/{student_id}", json={"name": "Ali"}, headers={"If-Match": etag})
+    assert response.status_code == 409
+    assert server.store["students.json"].get(student_id)["name"] == "Ali Valiyev (boshqa admin)"
+
+
+def test_restart_sees_all_writes(make_app, other_processes):
+    make_app().test_client()
+    other_processes(f"""
+        for i in range({ROUNDS}):
+            client.post("/teachers", json={{"name": f"Teacher {{sys.argv[1]}}-{{i}}"}})
+    """, PROCESSES)
+    server.store.close()
+    server.store = None
+    make_app()
+    assert len(server.store["teachers.json"]) == PROCESSES * ROUNDS
+
+
+@pytest.mark.skipif(os.environ.get("LEARNIFY_STORAGE") == "sqlite", reason="JSON backend siqilishi")
+def test_reload_during_compaction(data_dir, background_process):
+    """Boshqa jarayon tez-tez siqayotganda noldan yuklash va sync yozuvlarni yo'qotmaydi"""
+    path = os.path.join(data_dir, "tasks.json")
+    total = 3000
+    wait = background_process(f"""
+        tasks = server.store["tasks.json"]
+        for i in range({total}):
+            if i % 2:
+                # Tranzaksiya yozuvlari transactions.log ga tushadi (compact_all uni ham siqadi)
+                with server.store.transaction("tasks.json"):
+                    tasks.insert({{"id": i}})
+            else:
+                tasks.insert({{"id": i}})
+            if i % 25 == 0:
+                server.store.compact_all()
+    """)
+    txn_log = TransactionLog(os.path.join(data_dir, TXN_LOG))
+    live = Collection(path, txn_log)
+    seen = 0
+    while seen < total:
+        fresh = Collection(path, txn_log)
+        for collection in (fresh, live):
+            ids = [r["id"] for r in collection.all()]
+            assert ids == list(range(len(ids)))
+        seen = len(ids)
+        fresh.close()
+    wait()
+    live.close()
@@ -0,0 +1,130 @@
+"""SQLite ombori: JSON backend bilan bir xil interfeys, tranzaksiyalar va jarayonlar orasida ko'rinish"""
+import os
+
+import pytest
+
+import server
+from migrate import migrate
+from storage import Storage
+
+
+@pytest.fixture
+def store(data_dir):
+    store = Storage(data_dir, backend="sqlite")
+    yield store
+    store.close()
+
+
+def test_crud_keeps_insert_order(store):
+    students = store["students.json"]
+    changes = []
+    students.listeners.append(lambda old, new: changes.append((old and old["id"], new and new["id"])))
+    assert students.version == 0 and students.all() == []
+
+    for i in (3, 1, 2):
+        students.insert({"id": i, "name": f"S{i}", "groupId": 10})
+    assert [s["id"] for s in students.all()] == [3, 1, 2]
+    assert len(students) == 3
+
+    # Yangilash yozuv o'rnini o'zgartirmaydi; mavjud id bilan insert - almashtirish
+    assert students.update(1, {"name": "Ali"}) == {"id": 1, "name": "Ali", "groupId": 10}
+    students.insert({"id": 3, "name": "Vali"})
+    assert [(s["id"], s["name"]) for s in students.all()] == [(3, "Vali"), (1, "Ali"), (2, "S2")]
+    assert students.get(3) == {"id": 3, "name": "Vali"}
+
+    assert students.delete(2)["name"] == "S2"
+    assert students.get(2) is None
+    assert students.update(2, {"name": "x"}) is None and students.delete(2) is None
+    assert students.version == 6 and students.updated_at is not None
+    assert changes == [(None, 3), (None, 1), (None, 2), (1, 1), (3, 3), (2, None)]
+
+
+def test_all_returns_copy_of_cache(store):
+    students = store["students.json"]
+    students.insert({"id": 1, "name": "Ali"})
+    records = students.all()
+    records.append({"id": 2})
+    assert students.all() == [{"id": 1, "name": "Ali"}]
+
+
+def test_find_by_indexed_and_plain_fields(store):
+    students = store["students.json"]
+    students.insert({"id": 1, "groupId": 5, "status": "active", "tags": ["a"]})
+    students.insert({"id": 2, "groupId": "5", "status": "inactive"})
+    students.insert({"id": 3, "groupId": [5], "status": "active"})
+    # Indekslangan ustun - turi ham solishtiriladi (JSON backenddagi == kabi)
+    assert [s["id"] for s in students.find_by("groupId", 5)] == [1]
+    assert [s["id"] for s in students.find_by("groupId", "5")] == [2]
+    # Ro'yxat qiymatlari ustunga yozilmaydi - to'liq ko'rib chiqiladi
+    assert [s["id"] for s in students.find_by("groupId", [5])] == [3]
+    assert [s["id"] for s in students.find_by("status", "active")] == [1, 3]
+    assert students.get([1]) is None and students.get(None) is None
+
+
+def test_transaction_rolls_back_all_collections(store):
+    groups, students = store["groups.json"], store["students.json"]
+    groups.insert({"id": 1, "name": "Matematika"})
+    reloads = []
+    students.listeners.append(lambda old, new: reloads.append((old, new)))
+    with pytest.raises(RuntimeError):
+        with store.transaction("groups.json", "students.json"):
+            groups.update(1, {"name": "Fizika"})
+            students.insert({"id": 7, "name": "Ali", "groupId": 1})
+            raise RuntimeError("to'xtatildi")
+    assert groups.get(1)["name"] == "Matematika"
+    assert students.all() == [] and groups.version == 1
+    # Bekor qilingan o'zgarish uchun listenerlar "qayta yuklang" signalini oladi
+    assert reloads[-1] == (None, None)
+
+    with store.transaction("groups.json", "students.json"):
+        with store.transaction("students.json"):
+            students.insert({"id": 7, "name": "Ali", "groupId": 1})
+        groups.update(1, {"name": "Fizika"})
+    assert students.get(7)["groupId"] == 1 and groups.get(1)["name"] == "Fizika"
+
+
+def test_replace(store):
+    students = store["students.json"]
+    students.insert({"id": 1, "name": "Ali"})
+    students.replace([{"id": 2, "name": "Vali", "phone": "+998901112233"}, {"id": 1, "name": "Said"}])
+    assert [s["id"] for s in students.all()] == [2, 1]
+    assert students.find_by("phone", "+998901112233")[0]["name"] == "Vali"
+    assert students.version == 2
+
+
+def test_invalid_collection_name(store):
+    with pytest.raises(ValueError):
+        store["students; DROP TABLE users.json"]
+
+
+def test_writes_from_other_process(store, data_dir, other_process):
+    students = store["students.json"]
+    students.insert({"id": 1, "name": "Ali", "balance": 0})
+    assert students.all()[0]["balance"] == 0
+    other_process(f"""
+        from storage import Storage
+        other = Storage({data_dir!r}, backend="sqlite")["students.json"]
+        other.update(1, {{"balance": 100}})
+        other.insert({{"id": 2, "name": "Vali"}})
+    """)
+    # Kesh versiya bo'yicha yangilanadi - sync shart emas
+    assert [s.get("balance") for s in students.all()] == [100, None]
+    assert students.get(2)["name"] == "Vali" and students.version == 3
+
+
+def test_migrate_copies_json_records(make_app, data_dir):
+    client = make_app(STORAGE="json").test_client()
+    for name in ("Ali Valiyev", "Vali Aliyev"):
+        client.post("/students", json={"name": name})
+    expected = list(server.store["students.json"].all())
+    server.store.close()
+    server.store = None
+
+    migrate(data_dir, "learnify.db")
+    client = make_app(STORAGE="sqlite").test_client()
+    assert server.store.backend == "sqlite"
+    assert os.path.exists(os.path.join(data_dir, "learnify.db"))
+    assert server.store["students.json"].all() == expected
+    assert [s["name"] for s in client.get("/students").get_json()] == ["Ali Valiyev", "Vali Aliyev"]
+    assert client.post("/students", json={"name": "Said Karimov"}).status_code == 201
+    assert len(server.store["students.json"]) == 3
@@ -0,0 +1,54 @@
+"""Oqimli ro'yxatlar: xato yarim massivni 200 bilan to'liq javobdek yubormaydi"""
+import json
+
+import pytest
+
+import server
+import streaming
+from query import ListQuery
+
+
+def broken(after):
+    def hydrate(records):
+        for i, record in enumerate(records):
+            if i == after:
+                raise RuntimeError("hydrate xatosi")
+            yield record
+    return hydrate
+
+
+@pytest.fixture
+def app(make_app):
+    app = make_app()
+    client = app.test_client()
+    for i in range(5):
+        client.post("/students", json={"name": f"Student {i}"})
+    return app
+
+
+def test_error_before_first_chunk_is_500(app):
+    with app.test_request_context("/students"):
+        response, status = server.list_response(server.read_json("students.json"), ListQuery({}),
+                                                broken(0), error="Studentlarni o'qishda xatolik")
+    assert status == 500
+    assert response.get_json() == {"error": "Studentlarni o'qishda xatolik"}
+
+
+@pytest.mark.parametrize("accept", ["application/json", "application/x-ndjson"])
+def test_error_mid_stream_ends_with_marker(app, monkeypatch, accept):
+    monkeypatch.setattr(streaming, "CHUNK_SIZE", 1)
+    with app.test_request_context("/students", headers={"Accept": accept}):
+        response = server.list_response(server.read_json("students.json"), ListQuery({}), broken(3))
+        assert response.status_code == 200
+        body = "".join(chunk if isinstance(chunk, str) else chunk.decode() for chunk in response.response)
+    last = body.rstrip("\n").rsplit("\n", 1)[-1]
+    assert json.loads(last) == {"error": streaming.STREAM_ERROR}
+    if accept == "application/json":
+        with pytest.raises(ValueError):
+            json.loads(body)
+
+
+def test_list_endpoint_still_streams(app):
+    response = app.test_client().get("/students", headers={"Accept": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert len(response.get_data(as_text=True).splitlines()) == 5
@@ -0,0 +1,10 @@
+"""
+WSGI kirish nuqtasi (production)
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Sozlamalar muhit o'zgaruvchilaridan olinadi (qarang: config.py).
+"""
+from server import create_app
+
+app = create_app()
@@ -8,6 +8,8 @@ export const API_ENDPOINTS = {
   STUDENT_LOGIN: `${API_BASE}/auth/login/student`,
   TEACHER_LOGIN: `${API_BASE}/auth/login/teacher`,
   REGISTER: `${API_BASE}/auth/register`,
+  ME: `${API_BASE}/auth/me`,
+  LOGOUT: `${API_BASE}/auth/logout`,
   USERS: `${API_BASE}/users`,
   
   // CRUD
@@ -18,6 +20,9 @@ export const API_ENDPOINTS = {
   TASKS: `${API_BASE}/tasks`,
   COMPANIES: `${API_BASE}/companies`,
   BRANCHES: `${API_BASE}/branches`,
+
+  // O'zgarishlar lentasi
+  CHANGES: `${API_BASE}/changes`,
 };
 
 
@@ -1,4 +1,5 @@
 import React, { createContext, useContext, useState, useEffect } from "react";
+import { API_ENDPOINTS } from "../config/api";
 
 const AuthContext = createContext();
 
@@ -28,23 +29,37 @@ export const AuthProvider = ({ children }) => {
         console.error("User ma'lumotlarini o'qishda xatolik:", error);
         localStorage.removeItem("user");
         localStorage.removeItem("isAuthenticated");
+        localStorage.removeItem("token");
       }
     }
     setLoading(false);
   }, []);
 
-  const login = (userData) => {
+  const login = (userData, token) => {
     setUser(userData);
     setIsAuthenticated(true);
     localStorage.setItem("user", JSON.stringify(userData));
     localStorage.setItem("isAuthenticated", "true");
+    // Sessiya tokeni - keyingi so'rovlarda Authorization: Bearer <token>
+    if (token) {
+      localStorage.setItem("token", token);
+    }
   };
 
   const logout = () => {
+    const token = localStorage.getItem("token");
+    if (token) {
+      // Serverdagi sessiyani bekor qilish (javobini kutish shart emas)
+      fetch(API_ENDPOINTS.LOGOUT, {
+        method: "POST",
+        headers: { Authorization: `Bearer ${token}` },
+      }).catch(() => {});
+    }
     setUser(null);
     setIsAuthenticated(false);
     localStorage.removeItem("user");
     localStorage.removeItem("isAuthenticated");
+    localStorage.removeItem("token");
   };
 
   const value = {
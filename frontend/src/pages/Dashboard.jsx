@@ -877,37 +877,34 @@ export default function Dashboard() {
 
   const fetchDashboardData = async () => {
     try {
-      // Barcha ma'lumotlarni parallel ravishda olish
-      const [studentsRes, teachersRes, groupsRes] = await Promise.all([
-        fetch(`${API_BASE}/students`),
-        fetch(`${API_BASE}/teachers`),
-        fetch(`${API_BASE}/groups`)
+      // Statistika serverda hisoblanadi; faoliyat uchun faqat oxirgi yozuvlar olinadi
+      const recent = (path, limit) =>
+        `${API_BASE}/${path}?sort=-id&limit=${limit}&fields=id,name`;
+      const [summaryRes, studentsRes, teachersRes, groupsRes] = await Promise.all([
+        fetch(`${API_BASE}/dashboard/summary`),
+        fetch(recent("students", 3)),
+        fetch(recent("teachers", 2)),
+        fetch(recent("groups", 2))
       ]);
 
-      if (!studentsRes.ok || !teachersRes.ok || !groupsRes.ok) {
+      if (!summaryRes.ok || !studentsRes.ok || !teachersRes.ok || !groupsRes.ok) {
         throw new Error("Ma'lumotlarni olishda xatolik");
       }
 
-      const students = await studentsRes.json();
-      const teachers = await teachersRes.json();
-      const groups = await groupsRes.json();
-
-      // Statistikani hisoblash
-      const totalStudents = students.length;
-      const totalTeachers = teachers.length;
-      const totalGroups = groups.length;
-
-      // To'lov stavkasini hisoblash
-      const paymentRate = calculatePaymentRate(students);
+      const summary = await summaryRes.json();
+      // Eng yangisi oxirida bo'lishi uchun teskari tartibga keltiramiz
+      const students = (await studentsRes.json()).reverse();
+      const teachers = (await teachersRes.json()).reverse();
+      const groups = (await groupsRes.json()).reverse();
 
       // So'nggi faoliyatni yaratish
       const activity = generateRecentActivity(students, teachers, groups);
 
       setStats({
-        students: totalStudents,
-        teachers: totalTeachers,
-        groups: totalGroups,
-        paymentRate: paymentRate
+        students: summary.students,
+        teachers: summary.teachers,
+        groups: summary.groups,
+        paymentRate: summary.paymentRate
       });
       setRecentActivity(activity);
     } catch (error) {
@@ -924,17 +921,6 @@ export default function Dashboard() {
     }
   };
 
-  // To'lov stavkasini hisoblash funksiyasi
-  const calculatePaymentRate = (students) => {
-    if (students.length === 0) return 0;
-    
-    const paidStudents = students.filter(student => 
-      student.payment === 'paid'
-    ).length;
-    
-    return Math.round((paidStudents / students.length) * 100);
-  };
-
   // So'nggi faoliyatni yaratish funksiyasi
   const generateRecentActivity = (students, teachers, groups) => {
     const activities = [];
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from "react";
+import React, { useState, useEffect, useRef } from "react";
 import Sidebar from "../components/Sidebar";
 import Navbar from "../components/Navbar";
 import { API_ENDPOINTS, API_BASE } from "../config/api";
@@ -27,6 +27,8 @@ export default function Groups() {
     studentIds: []
   });
   const [selectedStudent, setSelectedStudent] = useState("");
+  // /changes cursori: studentlar ro'yxati qaysi holatgacha yangilangan
+  const studentsCursor = useRef(null);
 
   // API orqali ma'lumotlarni olish
   useEffect(() => {
@@ -34,6 +36,12 @@ export default function Groups() {
       try {
         setLoading(true);
         setError(null);
+
+        // Cursor ro'yxatlardan oldin olinadi - oradagi o'zgarishlar keyingi sinxronda keladi
+        const changesRes = await fetch(`${API_ENDPOINTS.CHANGES}?collections=students`);
+        if (changesRes.ok) {
+          studentsCursor.current = (await changesRes.json()).cursor;
+        }
         
         const [groupsRes, studentsRes, teachersRes] = await Promise.all([
           fetch(API_ENDPOINTS.GROUPS),
@@ -71,6 +79,12 @@ export default function Groups() {
         body: JSON.stringify(newGroupData),
       });
 
+      if (response.status === 409 || response.status === 400) {
+        // Jadval to'qnashuvi yoki noto'g'ri vaqt - foydalanuvchi tuzatadi
+        const errorData = await response.json();
+        alert(errorData.error);
+        return;
+      }
       if (!response.ok) {
         throw new Error("Guruh yaratishda xatolik yuz berdi");
       }
@@ -102,6 +116,33 @@ export default function Groups() {
     }
   };
 
+  // Studentlarni yangilash: butun ro'yxat o'rniga faqat o'zgarganlari
+  const syncStudents = async () => {
+    const cursor = studentsCursor.current;
+    if (cursor) {
+      const res = await fetch(`${API_ENDPOINTS.CHANGES}?since=${cursor}&collections=students`);
+      if (res.ok) {
+        const { cursor: next, changes, reset } = await res.json();
+        studentsCursor.current = next;
+        if (!reset.includes("students")) {
+          setStudents(prev => {
+            const byId = new Map(prev.map(s => [s.id, s]));
+            changes.forEach(change => {
+              if (change.op === "delete") byId.delete(change.id);
+              else byId.set(change.id, change.record);
+            });
+            return Array.from(byId.values());
+          });
+          return;
+        }
+      }
+    }
+    // Cursor eskirgan yoki lenta mavjud emas - to'liq qayta yuklash
+    const studentsRes = await fetch(API_ENDPOINTS.STUDENTS);
+    const studentsData = await studentsRes.json();
+    setStudents(studentsData);
+  };
+
   // Guruhga student qo'shish
   const handleAddStudentToGroup = async (groupId, studentId) => {
     try {
@@ -131,9 +172,7 @@ export default function Groups() {
       }
 
       // Studentlarni yangilash
-      const studentsRes = await fetch(API_ENDPOINTS.STUDENTS);
-      const studentsData = await studentsRes.json();
-      setStudents(studentsData);
+      await syncStudents();
 
       console.log("✅ O'quvchi muvaffaqiyatli qo'shildi");
       
@@ -172,9 +211,7 @@ export default function Groups() {
       }
 
       // Studentlarni yangilash
-      const studentsRes = await fetch(API_ENDPOINTS.STUDENTS);
-      const studentsData = await studentsRes.json();
-      setStudents(studentsData);
+      await syncStudents();
 
       console.log("✅ O'quvchi muvaffaqiyatli o'chirildi");
       
@@ -102,7 +102,7 @@ export default function Login() {
         const role = data.user.role;
 
         // AuthContext orqali login qilish
-        login(data.user);
+        login(data.user, data.token);
 
         // Role bo'yicha to'g'ri sahifaga yo'naltirish
         switch (role) {
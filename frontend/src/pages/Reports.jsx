@@ -2,6 +2,7 @@ import React, { useState, useEffect } from "react";
 import Sidebar from "../components/Sidebar";
 import Navbar from "../components/Navbar";
 import * as XLSX from "xlsx";
+import { API_BASE } from "../config/api";
 
 // Skeleton loader komponenti
 function ReportsSkeleton() {
@@ -86,13 +87,23 @@ export default function Reports() {
   useEffect(() => {
     const fetchReportsData = async () => {
       try {
-        await new Promise((resolve) => setTimeout(resolve, 1500));
-
-        // Simulyatsiya qilingan ma'lumotlar
+        // Oxirgi 6 oy tushumi serverdagi oylik yig'indilardan
+        const [year, month] = selectedMonth.split("-").map(Number);
+        const start = new Date(year, month - 6, 1);
+        const from = `${start.getFullYear()}-${String(start.getMonth() + 1).padStart(2, "0")}`;
+        const res = await fetch(`${API_BASE}/reports/revenue?from=${from}&to=${selectedMonth}&bucket=month`);
+        if (!res.ok) {
+          throw new Error("Hisobotni olishda xatolik");
+        }
+        const report = await res.json();
+        const current = report.buckets.find((b) => b.period === selectedMonth);
+        const monthRevenue = current ? current.revenue : 0;
+
+        // Xarajatlar hozircha simulyatsiya qilingan
         const simulatedData = {
-          studentPayments: 24500000,
+          studentPayments: monthRevenue,
           teacherSalaries: 1800000,
-          totalRevenue: 24500000,
+          totalRevenue: monthRevenue,
           expenses: {
             rent: 5000000,
             tax: 1500000,
@@ -121,15 +132,19 @@ export default function Reports() {
 
         setExpenses(simulatedData.expenses);
 
-        // Oylik daromadlar tarixi
-        const history = [
-          { month: '2024-01', revenue: 22000000, profit: 3200000 },
-          { month: '2024-02', revenue: 23500000, profit: 3800000 },
-          { month: '2024-03', revenue: 24500000, profit: 4200000 },
-          { month: '2024-04', revenue: 22800000, profit: 3500000 },
-          { month: '2024-05', revenue: 26000000, profit: 4800000 },
-          { month: '2024-06', revenue: 24500000, profit: 4200000 },
-        ];
+        // Oylik daromadlar tarixi: server faqat to'lovi bor oylarni qaytaradi,
+        // to'lovsiz oylar 0 bilan to'ldiriladi (oraliqdagi barcha 6 oy)
+        const byPeriod = Object.fromEntries(report.buckets.map((b) => [b.period, b.revenue]));
+        const history = Array.from({ length: 6 }, (_, i) => {
+          const date = new Date(start.getFullYear(), start.getMonth() + i, 1);
+          const period = `${date.getFullYear()}-${String(date.getMonth() + 1).padStart(2, "0")}`;
+          const revenue = byPeriod[period] || 0;
+          return {
+            month: period,
+            revenue: revenue,
+            profit: revenue - totalExpenses
+          };
+        });
         setRevenueHistory(history);
 
       } catch (error) {